@@ -3,8 +3,11 @@
 Roster URL Collector - Main Script
 Extracts SFA URLs for all campaigns from Spotify for Artists Roster
 """
+import argparse
 import asyncio
 import json
+import os
+import sys
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Any
@@ -13,7 +16,93 @@ from runner.app.csv_parser import CampaignCSVParser, extract_track_id
 from runner.app.roster_scraper import RosterScraper
 
 
-async def main():
+async def process_client(scraper, roster_page, parser, client_name, i, total, results, sfa_urls, totals):
+    """Collect SFA URLs for one client's campaigns into results['clients'][client_name]"""
+    print(f"\n[{i}/{total}] Processing: {client_name}")
+    print("-" * 40)
+    
+    try:
+        # Get campaign songs for this client
+        client_campaigns = parser.get_songs_by_client(client_name)
+        print(f"   📝 {len(client_campaigns)} campaign(s) for this client")
+        
+        # Get all songs from Roster (cached catalog if it already covers these campaigns)
+        roster_songs = await scraper.get_artist_songs_from_roster(
+            client_name, [campaign.song_name for campaign in client_campaigns], roster_page=roster_page
+        )
+        
+        if not roster_songs:
+            print(f"   ⚠️  No songs found in Roster: {client_name}")
+            totals['failed_clients'] += 1
+            
+            # Save client result
+            results['clients'][client_name] = {
+                'campaigns': len(client_campaigns),
+                'roster_songs_found': 0,
+                'matched_songs': 0,
+                'status': 'no_roster_songs'
+            }
+            return
+        
+        print(f"   ✅ Found {len(roster_songs)} song(s) in Roster for {client_name}")
+        
+        # Match all campaign songs to roster songs in one call (roster indexed once)
+        matched_songs = []
+        matches = roster_page.match_songs(
+            [campaign.song_name for campaign in client_campaigns], roster_songs
+        )
+        for campaign, match in zip(client_campaigns, matches):
+            song_name = campaign.song_name
+            
+            if match:
+                print(f"      ✅ Matched: {song_name} → {match['sfa_url']} "
+                      f"({match['match_rule']}, {match['match_score']:.2f})")
+                
+                matched_songs.append({
+                    'campaign': campaign.campaign_name,
+                    'client': client_name,
+                    'artist': campaign.artist_name,
+                    'song': song_name,
+                    'roster_song': match['name'],
+                    'match_score': match['match_score'],
+                    'match_rule': match['match_rule'],
+                    'sfa_url': match['sfa_url'],
+                    'track_id': match['track_id'],
+                    'goal': campaign.goal,
+                    'vendor': campaign.vendor
+                })
+                
+                sfa_urls.append(match['sfa_url'])
+                totals['successful_songs'] += 1
+            else:
+                print(f"      ⚠️  No match: {song_name}")
+                totals['failed_songs'] += 1
+        
+        # Save client result
+        results['clients'][client_name] = {
+            'campaigns': len(client_campaigns),
+            'roster_songs_found': len(roster_songs),
+            'matched_songs': len(matched_songs),
+            'songs': matched_songs,
+            'status': 'success'
+        }
+        
+        totals['successful_clients'] += 1
+    
+    except Exception as e:
+        print(f"   ❌ Error ({client_name}): {e}")
+        totals['failed_clients'] += 1
+        
+        results['clients'][client_name] = {
+            'campaigns': len(parser.get_songs_by_client(client_name)),
+            'roster_songs_found': 0,
+            'matched_songs': 0,
+            'status': 'error',
+            'error': str(e)
+        }
+
+
+async def main(workers: int = 1):
     print("=" * 80)
     print("🎯 SPOTIFY FOR ARTISTS - ROSTER URL COLLECTOR")
     print("=" * 80)
@@ -34,8 +123,9 @@ async def main():
     unique_clients = parser.get_unique_clients()
     
     print()
-    input("Press Enter to continue...")
-    print()
+    if sys.stdin.isatty():
+        input("Press Enter to continue...")
+        print()
     
     # Step 2: Initialize scraper
     print("🚀 Step 2: Initializing browser...")
@@ -67,95 +157,34 @@ async def main():
         }
         
         sfa_urls = []
-        successful_songs = 0
-        failed_songs = 0
-        successful_clients = 0
-        failed_clients = 0
+        totals = {'successful_songs': 0, 'failed_songs': 0, 'successful_clients': 0, 'failed_clients': 0}
         
+        # N workers on their own tabs pull clients from one queue; every navigation
+        # goes through the scraper's shared rate limiter, so S4A sees the same request rate
+        queue = asyncio.Queue()
         for i, client_name in enumerate(unique_clients, 1):
-            print(f"\n[{i}/{len(unique_clients)}] Processing: {client_name}")
-            print("-" * 40)
-            
-            try:
-                # Get campaign songs for this client
-                client_campaigns = parser.get_songs_by_client(client_name)
-                print(f"   📝 {len(client_campaigns)} campaign(s) for this client")
-                
-                # Get all songs from Roster
-                roster_songs = await scraper.get_artist_songs_from_roster(client_name)
-                
-                if not roster_songs:
-                    print(f"   ⚠️  No songs found in Roster")
-                    failed_clients += 1
-                    
-                    # Save client result
-                    results['clients'][client_name] = {
-                        'campaigns': len(client_campaigns),
-                        'roster_songs_found': 0,
-                        'matched_songs': 0,
-                        'status': 'no_roster_songs'
-                    }
-                    continue
-                
-                print(f"   ✅ Found {len(roster_songs)} song(s) in Roster")
-                
-                # Match campaign songs to roster songs
-                matched_songs = []
-                for campaign in client_campaigns:
-                    # Extract song name from campaign
-                    song_name = campaign.song_name
-                    
-                    # Find matching song in roster
-                    match = scraper.roster_page.find_song_match(song_name, roster_songs)
-                    
-                    if match:
-                        print(f"      ✅ Matched: {song_name} → {match['sfa_url']}")
-                        
-                        matched_songs.append({
-                            'campaign': campaign.campaign_name,
-                            'client': client_name,
-                            'artist': campaign.artist_name,
-                            'song': song_name,
-                            'sfa_url': match['sfa_url'],
-                            'track_id': match['track_id'],
-                            'goal': campaign.goal,
-                            'vendor': campaign.vendor
-                        })
-                        
-                        sfa_urls.append(match['sfa_url'])
-                        successful_songs += 1
-                    else:
-                        print(f"      ⚠️  No match: {song_name}")
-                        failed_songs += 1
-                
-                # Save client result
-                results['clients'][client_name] = {
-                    'campaigns': len(client_campaigns),
-                    'roster_songs_found': len(roster_songs),
-                    'matched_songs': len(matched_songs),
-                    'songs': matched_songs,
-                    'status': 'success'
-                }
-                
-                successful_clients += 1
-                
-                # Wait between clients to avoid rate limiting
-                if i < len(unique_clients):
-                    print("   ⏳ Waiting 2 seconds...")
-                    await asyncio.sleep(2)
-            
-            except Exception as e:
-                print(f"   ❌ Error: {e}")
-                failed_clients += 1
-                
-                results['clients'][client_name] = {
-                    'campaigns': len(parser.get_songs_by_client(client_name)),
-                    'roster_songs_found': 0,
-                    'matched_songs': 0,
-                    'status': 'error',
-                    'error': str(e)
-                }
-                continue
+            queue.put_nowait((i, client_name))
+        
+        roster_pages = await scraper.open_worker_pages(workers)
+        if workers > 1:
+            print(f"👷 {workers} roster workers, "
+                  f"{scraper.rate_limiter.min_interval:.1f}s between navigations")
+        
+        async def worker(roster_page):
+            while True:
+                try:
+                    i, client_name = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                await process_client(scraper, roster_page, parser, client_name, i, len(unique_clients),
+                                     results, sfa_urls, totals)
+        
+        await asyncio.gather(*(worker(roster_page) for roster_page in roster_pages))
+        
+        # Workers finish clients out of order - keep the output files sorted by client
+        results['clients'] = dict(sorted(results['clients'].items()))
+        successful_songs, failed_songs = totals['successful_songs'], totals['failed_songs']
+        successful_clients, failed_clients = totals['successful_clients'], totals['failed_clients']
         
         # Step 4: Save results
         print("\n" + "=" * 80)
@@ -242,5 +271,9 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    arg_parser = argparse.ArgumentParser(description='Collect SFA URLs for all campaigns from the S4A Roster')
+    arg_parser.add_argument('--workers', type=int, default=int(os.getenv('ROSTER_WORKERS', '1')),
+                            help='Artist workers on separate tabs (navigations share one rate limit)')
+    args = arg_parser.parse_args()
+    asyncio.run(main(workers=max(1, args.workers)))
 
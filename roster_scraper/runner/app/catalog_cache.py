@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Per-artist song catalog cache for the roster collector.
+
+Every run of run_roster_scraper.py re-scraped every artist's Songs page,
+although most catalogs do not change between weekly pipeline runs. The
+cache keeps what RosterPage.get_artist_songs() returned for each artist:
+song name, SFA URL and track id, plus when the catalog was last scraped.
+Entries are keyed by the artist's S4A id (the /artist/<id> part of the
+artist URL), so the /home and /music/songs URLs share one entry.
+
+RosterScraper.get_artist_songs_from_roster() skips an artist's Songs page
+when the cached catalog is younger than the TTL (ROSTER_CATALOG_TTL_DAYS)
+and every campaign song of the client matches a cached song by key rather
+than fuzzily (CATALOG_MIN_SCORE). A new campaign, a new remix or an
+expired entry scrapes the page again and replaces the entry.
+"""
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+CACHE_VERSION = 1
+
+# Key-tier matches only (exact/alias/compact/tokens, see song_matcher.py). A 'base',
+# 'core' or fuzzy hit may be an older version of a song the page would list.
+CATALOG_MIN_SCORE = 0.94
+
+SONG_FIELDS = ('name', 'sfa_url', 'track_id')
+
+
+def default_catalog_path() -> Path:
+    """roster_scraper/data/song_catalog.json unless ROSTER_CATALOG_PATH is set."""
+    default = Path(__file__).resolve().parents[2] / 'data' / 'song_catalog.json'
+    return Path(os.getenv('ROSTER_CATALOG_PATH', str(default)))
+
+
+def _parse_ts(value: Optional[str]) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+class CatalogCache:
+    def __init__(self, ttl_days: float = 14):
+        self.ttl_days = ttl_days
+        # artist id -> {'artist', 'last_seen', 'songs': [{'name', 'sfa_url', 'track_id'}]}
+        self.artists: Dict[str, Dict[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.artists)
+
+    def fresh_songs(self, artist_id: str, now: Optional[datetime] = None) -> Optional[List[Dict[str, Any]]]:
+        """Cached catalog of an artist, or None if missing or older than the TTL."""
+        entry = self.artists.get(artist_id)
+        last_seen = _parse_ts(entry.get('last_seen')) if entry else None
+        if last_seen is None:
+            return None
+        now = now or datetime.now(timezone.utc)
+        if now - last_seen >= timedelta(days=self.ttl_days):
+            return None
+        return entry['songs']
+
+    def store(self, artist_id: str, artist_name: str, songs: List[Dict[str, Any]]) -> None:
+        """Replace an artist's catalog with freshly scraped songs."""
+        self.artists[artist_id] = {
+            'artist': artist_name,
+            'last_seen': datetime.now(timezone.utc).isoformat(),
+            'songs': [{field: song.get(field) for field in SONG_FIELDS} for song in songs],
+        }
+
+    # ----- disk cache -----
+
+    @classmethod
+    def load(cls, path, ttl_days: float = 14) -> 'CatalogCache':
+        """Cache from disk (empty if missing or unreadable)."""
+        cache = cls(ttl_days)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == CACHE_VERSION:
+                cache.artists = dict(data.get('artists', {}))
+        except (OSError, ValueError, TypeError, AttributeError):
+            pass
+        return cache
+
+    def save(self, path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = {'version': CACHE_VERSION, 'artists': self.artists}
+        tmp = path.with_suffix('.tmp')
+        tmp.write_text(json.dumps(data, ensure_ascii=False, indent=1))
+        tmp.replace(path)
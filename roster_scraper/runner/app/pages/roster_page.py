@@ -5,22 +5,52 @@ Handles navigation, artist search, and SFA URL extraction
 """
 from playwright.async_api import Page
 from typing import List, Dict, Any, Optional
+from pathlib import Path
 import asyncio
 import re
+import sys
+
+# Name matching and condition waits are shared with spotify_scraper (runner/app)
+sys.path.insert(0, str(Path(__file__).resolve().parents[4] / 'spotify_scraper' / 'runner'))
+from app.song_matcher import SongIndex, names_match
+from app.rate_limiter import NavigationRateLimiter
+from app.waits import wait_for_function, wait_for_rows_stable
+
+SONG_LINK_SELECTOR = 'a[href*="/song/"]'
+
+# Every song link with its text and the text of its table row (cells on separate lines)
+SONG_ROWS_JS = """
+(selector) => Array.from(document.querySelectorAll(selector), (a) => {
+    const row = a.closest('tr');
+    return {
+        href: a.getAttribute('href'),
+        text: (a.textContent || '').trim(),
+        row: row ? Array.from(row.cells, (c) => (c.innerText || '').trim()).join('\\n') : '',
+    };
+})
+"""
 
 
 class RosterPage:
     """Handles Spotify for Artists Roster page interactions"""
     
-    def __init__(self, page: Page):
+    def __init__(self, page: Page, rate_limiter: Optional[NavigationRateLimiter] = None):
         self.page = page
         self.base_url = "https://artists.spotify.com/c/roster"
+        # Shared by every tab of a RosterScraper, so parallel workers keep one request rate
+        self.rate_limiter = rate_limiter
+    
+    async def _pace(self) -> None:
+        """Wait for a slot from the shared rate limiter before anything that loads S4A pages (no-op without one)"""
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire()
     
     async def navigate_to_roster(self) -> None:
         """Navigate to the main Roster page"""
         print("📋 Navigating to Roster page...")
         
         try:
+            await self._pace()
             await self.page.goto(self.base_url, wait_until='networkidle', timeout=30000)
             await asyncio.sleep(2)
             
@@ -46,6 +76,7 @@ class RosterPage:
         print("🎤 Fetching all artists from roster...")
         
         artists = []
+        seen_names = set()
         
         # Scroll to load all artists (lazy loading)
         await self.scroll_to_bottom()
@@ -100,8 +131,9 @@ class RosterPage:
                     artist_name = artist_name.strip()
                     
                     # Skip if it's a duplicate
-                    if any(a['name'] == artist_name for a in artists):
+                    if artist_name in seen_names:
                         continue
+                    seen_names.add(artist_name)
                     
                     artists.append({
                         'name': artist_name,
@@ -150,7 +182,8 @@ class RosterPage:
                 print(f"   ⚠️  Search bar not found, falling back to manual search")
                 return await self.find_artist_manual(artist_name)
             
-            # Clear and type into search bar
+            # Clear and type into search bar (the search fires S4A requests, so it takes a slot too)
+            await self._pace()
             await search_input.click()
             await search_input.fill('')  # Clear existing text
             await asyncio.sleep(0.5)
@@ -159,23 +192,29 @@ class RosterPage:
             # Wait for results to load
             await asyncio.sleep(2)
             
-            # Look for the artist in the filtered results
+            # Look for the artist in the filtered results (best-scoring name, not the first hit)
             artist_elements = await self.page.query_selector_all('a[href*="/artist/"]')
             
+            candidates = []
             for element in artist_elements:
                 try:
                     text = await element.text_content()
-                    if text and self.names_match(artist_name, text.strip()):
-                        artist_url = await element.get_attribute('href')
-                        print(f"   ✅ Found: {text.strip()}")
-                        return {
-                            'name': text.strip(),
-                            'url': artist_url or '',
-                            'element': element
-                        }
+                    if text and text.strip():
+                        candidates.append((text.strip(), element))
                 except:
                     continue
             
+            match = SongIndex(candidates, name=lambda c: c[0]).best_match(artist_name)
+            if match:
+                text, element = match.item
+                artist_url = await element.get_attribute('href')
+                print(f"   ✅ Found: {text} ({match.rule}, {match.score:.2f})")
+                return {
+                    'name': text,
+                    'url': artist_url or '',
+                    'element': element
+                }
+            
             print(f"   ❌ Artist not found: {artist_name}")
             return None
             
@@ -193,42 +232,24 @@ class RosterPage:
         # Get all artists (old method)
         artists = await self.get_all_artists()
         
-        # Fuzzy match (case-insensitive, handle variations)
-        for artist in artists:
-            if self.names_match(artist_name, artist['name']):
-                print(f"   ✅ Found: {artist['name']}")
-                return artist
+        # Fuzzy match (case, accents and punctuation ignored), best-scoring artist wins
+        match = SongIndex(artists).best_match(artist_name)
+        if match:
+            print(f"   ✅ Found: {match.name} ({match.rule}, {match.score:.2f})")
+            return match.item
         
         return None
     
     def names_match(self, name1: str, name2: str) -> bool:
-        """Check if two artist names match (fuzzy matching)"""
-        # Normalize names
-        n1 = name1.lower().strip()
-        n2 = name2.lower().strip()
-        
-        # Exact match
-        if n1 == n2:
-            return True
-        
-        # Remove special characters and compare
-        n1_clean = re.sub(r'[^a-z0-9]', '', n1)
-        n2_clean = re.sub(r'[^a-z0-9]', '', n2)
-        
-        if n1_clean == n2_clean:
-            return True
-        
-        # Check if one contains the other (for cases like "Reece Rose" vs "Reece Rosé")
-        if n1_clean in n2_clean or n2_clean in n1_clean:
-            return True
-        
-        return False
+        """Check if two artist names match (fuzzy matching, see app/song_matcher.py)"""
+        return names_match(name1, name2)
     
     async def navigate_to_artist(self, artist_info: Dict[str, Any]) -> None:
         """Navigate to a specific artist's page and then to their Songs page"""
         print(f"📂 Opening artist: {artist_info['name']}")
         
         try:
+            await self._pace()
             if artist_info.get('url') and artist_info['url'].startswith('/'):
                 # Navigate directly via URL
                 full_url = f"https://artists.spotify.com{artist_info['url']}"
@@ -264,6 +285,7 @@ class RosterPage:
             
             if see_songs_button:
                 # Click the "See songs" button
+                await self._pace()
                 await see_songs_button.click()
                 await self.page.wait_for_load_state('networkidle', timeout=30000)
                 await asyncio.sleep(2)
@@ -274,6 +296,7 @@ class RosterPage:
                 try:
                     music_tab = await self.page.wait_for_selector('text="Music"', timeout=3000)
                     if music_tab:
+                        await self._pace()
                         await music_tab.click()
                         await asyncio.sleep(2)
                         print(f"   ✅ Clicked Music tab")
@@ -284,6 +307,44 @@ class RosterPage:
             print(f"   ❌ Failed to navigate to artist: {e}")
             raise
     
+    async def crawl_roster(self) -> List[Dict[str, str]]:
+        """
+        Crawl the whole roster once for the artist directory (see roster_index.py)
+        
+        Returns:
+            List of dicts with 'name' and 'url' (/c/artist/<id>/...) for each artist
+        """
+        await self.navigate_to_roster()
+        artists = await self.get_all_artists()
+        crawled = [{'name': a['name'], 'url': a['url']} for a in artists if '/artist/' in (a.get('url') or '')]
+        
+        if not crawled:
+            # get_all_artists matched rows without links - read the artist links directly
+            for element in await self.page.query_selector_all('a[href*="/artist/"]'):
+                try:
+                    text = (await element.text_content() or '').strip()
+                    if text and text not in ['Roster', 'Artist']:
+                        crawled.append({'name': text, 'url': await element.get_attribute('href') or ''})
+                except:
+                    continue
+        
+        print(f"   📇 {len(crawled)} artist(s) with roster links")
+        return crawled
+    
+    async def open_songs_page(self, artist_info: Dict[str, Any]) -> None:
+        """Go straight to the artist's Songs page if its URL is known, else click through the artist page"""
+        if artist_info.get('songs_url'):
+            print(f"📂 Opening songs of: {artist_info['name']}")
+            try:
+                await self._pace()
+                await self.page.goto(artist_info['songs_url'], wait_until='domcontentloaded', timeout=30000)
+                await self.page.wait_for_selector('a[href*="/song/"]', timeout=15000)
+                print(f"   ✅ Navigated to Songs page")
+                return
+            except Exception as e:
+                print(f"   ⚠️  Direct Songs URL failed ({e}), opening the artist page instead")
+        await self.navigate_to_artist(artist_info)
+    
     async def get_artist_songs(self, artist_info: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
         Get all songs for an artist from their Songs page
@@ -295,98 +356,60 @@ class RosterPage:
         Returns:
             List of song dicts with name, url, sfa_url, etc.
         """
-        # Navigate to the artist's page first
-        await self.navigate_to_artist(artist_info)
+        # Navigate to the artist's Songs page first
+        await self.open_songs_page(artist_info)
         
         print(f"🎵 Getting all songs for: {artist_info['name']}")
         
-        songs = []
-        
-        # We're now on the Songs page - let's extract all song links
-        # The songs are in table rows with links to /song/
-        await asyncio.sleep(2)  # Let page settle
+        # We're now on the Songs page - wait for the song rows, then load lazily rendered ones
+        await wait_for_rows_stable(self.page, 'roster.song_rows', selector=SONG_LINK_SELECTOR,
+                                   timeout=10.0, settle=0.3)
+        await self.scroll_to_bottom(SONG_LINK_SELECTOR)
         
-        # Find all song links on the page
-        song_links = await self.page.query_selector_all('a[href*="/song/"]')
+        # One round trip for every link: href, link text and row text together
+        rows = await self.page.evaluate(SONG_ROWS_JS, SONG_LINK_SELECTOR)
         
-        print(f"   Found {len(song_links)} song links on page")
+        print(f"   Found {len(rows)} song links on page")
         
+        songs = []
         seen_urls = set()
+        seen_names = set()
         
-        for link_element in song_links:
-            try:
-                # Extract song SFA URL
-                song_url = await link_element.get_attribute('href')
-                
-                if not song_url or song_url in seen_urls:
-                    continue
-                
-                seen_urls.add(song_url)
-                
-                # Extract song name - try to get the text from the link or parent row
+        for row in rows:
+            song_url = row.get('href')
+            if not song_url or song_url in seen_urls:
+                continue
+            seen_urls.add(song_url)
+            
+            # Song name: the link text, else the first meaningful cell of its table row
+            song_name = (row.get('text') or '').strip()
+            if len(song_name) <= 2:
                 song_name = None
-                
-                # Method 1: Direct link text
-                text = await link_element.text_content()
-                if text and text.strip() and len(text.strip()) > 2:
-                    song_name = text.strip()
-                
-                # Method 2: Look for title in the same row
-                if not song_name or len(song_name) < 2:
-                    try:
-                        # Try to find the parent table row and get clean text
-                        row = await link_element.evaluate_handle('element => element.closest("tr")')
-                        if row:
-                            # Get all text from the row
-                            row_text = await row.as_element().text_content()
-                            if row_text:
-                                # Split by newlines and numbers, get the meaningful part
-                                parts = row_text.split('\n')
-                                for part in parts:
-                                    part = part.strip()
-                                    # Skip if it's just a number or too short
-                                    if part and len(part) > 2 and not part.isdigit():
-                                        # Remove leading numbers (like "1", "2", etc.)
-                                        part = re.sub(r'^\d+', '', part).strip()
-                                        if part and len(part) > 2:
-                                            song_name = part
-                                            break
-                    except:
-                        pass
-                
-                if song_name and song_url:
-                    # Construct full SFA URL
-                    if song_url.startswith('/'):
-                        sfa_url = f"https://artists.spotify.com{song_url}"
-                    else:
-                        sfa_url = song_url
-                    
-                    # Ensure it ends with /stats
-                    if '/stats' not in sfa_url:
-                        sfa_url = f"{sfa_url}/stats" if sfa_url.endswith('/') else f"{sfa_url}/stats"
-                    
-                    # Extract track ID from URL
-                    track_id = self.extract_track_id_from_sfa_url(sfa_url)
-                    
-                    # Clean song name (remove extra whitespace, numbers, etc.)
-                    song_name = song_name.strip()
-                    
-                    # Skip if song name is just a number or too short
-                    if len(song_name) < 2 or song_name.isdigit():
-                        continue
-                    
-                    # Skip duplicates by name
-                    if any(s['name'] == song_name for s in songs):
-                        continue
-                    
-                    songs.append({
-                        'name': song_name,
-                        'sfa_url': sfa_url,
-                        'track_id': track_id,
-                        'element': link_element
-                    })
-            except Exception as e:
+                for part in (row.get('row') or '').split('\n'):
+                    part = re.sub(r'^\d+', '', part.strip()).strip()
+                    if len(part) > 2:
+                        song_name = part
+                        break
+            
+            # Skip if song name is missing, just a number or too short
+            if not song_name or len(song_name) < 2 or song_name.isdigit():
+                continue
+            
+            # Skip duplicates by name
+            if song_name in seen_names:
                 continue
+            seen_names.add(song_name)
+            
+            # Construct full SFA URL, ending with /stats
+            sfa_url = f"https://artists.spotify.com{song_url}" if song_url.startswith('/') else song_url
+            if '/stats' not in sfa_url:
+                sfa_url = f"{sfa_url}stats" if sfa_url.endswith('/') else f"{sfa_url}/stats"
+            
+            songs.append({
+                'name': song_name,
+                'sfa_url': sfa_url,
+                'track_id': self.extract_track_id_from_sfa_url(sfa_url),
+            })
         
         print(f"   ✅ Extracted {len(songs)} unique songs")
         
@@ -409,52 +432,46 @@ class RosterPage:
         match = re.search(r'/song/([a-zA-Z0-9]+)', sfa_url)
         return match.group(1) if match else None
     
-    async def scroll_to_bottom(self) -> None:
-        """Scroll to bottom of page to trigger lazy loading"""
-        last_height = await self.page.evaluate('document.body.scrollHeight')
-        
-        while True:
-            # Scroll down
+    async def scroll_to_bottom(self, selector: Optional[str] = None, timeout: float = 3.0,
+                               max_rounds: int = 50) -> None:
+        """
+        Scroll to bottom of page to trigger lazy loading.
+        After each scroll, waits until more rows matching selector (or a taller page,
+        without one) appear; stops when a scroll loads nothing new within timeout.
+        """
+        measure = ('(sel) => sel ? document.querySelectorAll(sel).length : document.body.scrollHeight')
+        for _ in range(max_rounds):
+            before = await self.page.evaluate(measure, selector)
             await self.page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
-            await asyncio.sleep(1.5)
-            
-            # Calculate new height
-            new_height = await self.page.evaluate('document.body.scrollHeight')
-            
-            if new_height == last_height:
+            grew = await wait_for_function(
+                self.page, 'roster.scroll',
+                f'([sel, before]) => ({measure})(sel) > before',
+                arg=[selector, before], timeout=timeout,
+            )
+            if not grew:
                 break
-            
-            last_height = new_height
     
     def find_song_match(self, target_song_name: str, roster_songs: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
         """
-        Find a song in the roster that matches the target song name
+        Find the roster song that best matches the target song name
         
         Args:
             target_song_name: Song name to find (e.g., "DNBMF", "The Same")
             roster_songs: List of songs from get_artist_songs()
             
         Returns:
-            Matching song dict or None
+            Matching song dict (plus match_score / match_rule) or None
         """
-        target_clean = target_song_name.lower().strip()
-        target_alphanum = re.sub(r'[^a-z0-9]', '', target_clean)
-        
-        for song in roster_songs:
-            song_clean = song['name'].lower().strip()
-            song_alphanum = re.sub(r'[^a-z0-9]', '', song_clean)
-            
-            # Exact match
-            if target_clean == song_clean:
-                return song
-            
-            # Alphanumeric match
-            if target_alphanum == song_alphanum:
-                return song
-            
-            # Contains match (for partial names)
-            if target_alphanum in song_alphanum or song_alphanum in target_alphanum:
-                return song
-        
-        return None
-
+        return self.match_songs([target_song_name], roster_songs)[0]
+    
+    def match_songs(self, target_song_names: List[str],
+                    roster_songs: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Match all campaign songs of a client against their roster in one call.
+        The roster is indexed once; results are in the order of target_song_names.
+        """
+        index = SongIndex(roster_songs)
+        return [
+            {**match.item, 'match_score': match.score, 'match_rule': match.rule} if match else None
+            for match in index.match_all(target_song_names)
+        ]
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Roster artist directory: artist name -> S4A artist URL, crawled once per run.
+
+get_artist_songs_from_roster() used to open the Roster page, type the
+client name into the search box and click through the artist's home page
+to "See songs" for every client. That is three page loads per client.
+The index instead crawls the whole roster once (scroll_to_bottom +
+get_all_artists). It stores each artist's id, name and URL on disk, and
+the scraper goes straight to /c/artist/<id>/music/songs.
+
+  - Lookups go through app.song_matcher's key tiers (normalized, alias,
+    compact and token keys), so "Reece Rose" finds "Reece Rosé". Fuzzy and
+    suffix-stripped hits are not accepted (ARTIST_MIN_SCORE): across the
+    whole roster "Segan" would otherwise find "Segan Beats", and a newly
+    signed client would never trigger the refresh below.
+  - The cache has a TTL (ROSTER_INDEX_TTL_HOURS). Past the TTL the next
+    crawl replaces the index, which drops artists that left the roster.
+  - A client that is missing from a fresh index triggers one incremental
+    crawl per run. It is merged into the cache, so artists added to the
+    roster since the last full crawl are picked up without a full
+    refresh. Artists found via the search-box fallback are merged too.
+"""
+import json
+import os
+import re
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / 'spotify_scraper' / 'runner'))
+from app.song_matcher import SongIndex
+
+CACHE_VERSION = 1
+# Key-tier matches only (exact/alias/compact/tokens, see song_matcher.py), as in catalog_cache.py
+ARTIST_MIN_SCORE = 0.94
+S4A_BASE_URL = 'https://artists.spotify.com'
+
+
+def artist_id_from_url(url: Optional[str]) -> Optional[str]:
+    match = re.search(r'/artist/([a-zA-Z0-9]+)', url or '')
+    return match.group(1) if match else None
+
+
+def songs_url(artist_id: str) -> str:
+    return f'{S4A_BASE_URL}/c/artist/{artist_id}/music/songs'
+
+
+def default_index_path() -> Path:
+    """roster_scraper/data/roster_index.json unless ROSTER_INDEX_PATH is set."""
+    default = Path(__file__).resolve().parents[2] / 'data' / 'roster_index.json'
+    return Path(os.getenv('ROSTER_INDEX_PATH', str(default)))
+
+
+def _parse_ts(value: Optional[str]) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+class RosterIndex:
+    def __init__(self, ttl_hours: float = 24):
+        self.ttl_hours = ttl_hours
+        # artist id -> {'name', 'url', 'last_seen'}
+        self.artists: Dict[str, Dict[str, Any]] = {}
+        self.crawled_at: Optional[datetime] = None
+        self._names: Optional[SongIndex] = None
+
+    def __len__(self) -> int:
+        return len(self.artists)
+
+    def is_stale(self, now: Optional[datetime] = None) -> bool:
+        if not self.artists or self.crawled_at is None:
+            return True
+        now = now or datetime.now(timezone.utc)
+        return now - self.crawled_at >= timedelta(hours=self.ttl_hours)
+
+    def merge(self, artists: Iterable[Dict[str, Any]], full: bool = False) -> int:
+        """Add crawled artists ({'name', 'url'}). full=True replaces the index. Returns how many are new."""
+        now = datetime.now(timezone.utc)
+        if full:
+            previous, self.artists = self.artists, {}
+            self.crawled_at = now
+        else:
+            previous = self.artists
+        added = 0
+        for artist in artists:
+            artist_id = artist_id_from_url(artist.get('url'))
+            name = (artist.get('name') or '').strip()
+            if not artist_id or not name:
+                continue
+            if artist_id not in previous:
+                added += 1
+            self.artists[artist_id] = {'name': name, 'url': artist['url'], 'last_seen': now.isoformat()}
+        self._names = None
+        return added
+
+    def find(self, name: str) -> Optional[Dict[str, Any]]:
+        """Artist info for a client name ({'id', 'name', 'url', 'songs_url', 'score'}), or None."""
+        if self._names is None:
+            self._names = SongIndex(self.artists.items(), name=lambda item: item[1]['name'],
+                                    min_score=ARTIST_MIN_SCORE)
+        match = self._names.best_match(name)
+        if not match:
+            return None
+        artist_id, artist = match.item
+        return {
+            'id': artist_id,
+            'name': artist['name'],
+            'url': artist['url'],
+            'songs_url': songs_url(artist_id),
+            'score': match.score,
+        }
+
+    # ----- disk cache -----
+
+    @classmethod
+    def load(cls, path, ttl_hours: float = 24) -> 'RosterIndex':
+        """Index from the on-disk cache (empty if missing or unreadable)."""
+        index = cls(ttl_hours)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != CACHE_VERSION:
+                return index
+            index.artists = dict(data.get('artists', {}))
+            index.crawled_at = _parse_ts(data.get('crawled_at'))
+        except (OSError, ValueError, TypeError, AttributeError):
+            pass
+        return index
+
+    def save(self, path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            'version': CACHE_VERSION,
+            'crawled_at': self.crawled_at.isoformat() if self.crawled_at else None,
+            'artists': self.artists,
+        }
+        tmp = path.with_suffix('.tmp')
+        tmp.write_text(json.dumps(data, ensure_ascii=False, indent=1))
+        tmp.replace(path)
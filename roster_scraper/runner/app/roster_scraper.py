@@ -5,10 +5,21 @@ Roster Scraper - Extracts SFA URLs from Spotify for Artists Roster
 import asyncio
 from playwright.async_api import async_playwright, Browser, BrowserContext, Page
 import os
+import sys
 from typing import Optional, Dict, Any, List
 from pathlib import Path
 
 from .pages.roster_page import RosterPage
+from .roster_index import RosterIndex, artist_id_from_url, default_index_path, songs_url
+from .catalog_cache import CATALOG_MIN_SCORE, CatalogCache, default_catalog_path
+
+# Shared browser helpers live in the production scraper's package
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / 'spotify_scraper' / 'runner'))
+from app.request_routing import RequestPolicy
+from app.browser_host_client import attach as attach_browser_host, launch_lease
+from app.leases import Lease, lease_dir
+from app.song_matcher import SongIndex
+from app.rate_limiter import NavigationRateLimiter
 
 
 class RosterScraper:
@@ -18,8 +29,27 @@ class RosterScraper:
         self.user_data_dir = os.getenv('USER_DATA_DIR', './data/browser_data')
         self.playwright = None
         self.context = None
+        self.host_session = None
+        self.profile_lease = None
         self.page = None
         self.roster_page = None
+        self.worker_pages: List[Page] = []
+        self.request_policy = RequestPolicy.from_env()
+        # One navigation budget for every tab (replaces the fixed 2s pause between clients)
+        self.rate_limiter = NavigationRateLimiter(float(os.getenv('ROSTER_MIN_NAV_INTERVAL', '2')))
+        self.index_lock = asyncio.Lock()
+        # Artist directory: the roster is crawled at most once per run
+        self.roster_index_path = default_index_path()
+        self.roster_index = RosterIndex.load(
+            self.roster_index_path, ttl_hours=float(os.getenv('ROSTER_INDEX_TTL_HOURS', '24'))
+        )
+        self.roster_crawled = False
+        self.roster_crawl_found = False
+        # Song catalogs: an artist's Songs page is skipped while its cached catalog covers the campaigns
+        self.catalog_path = default_catalog_path()
+        self.catalog = CatalogCache.load(
+            self.catalog_path, ttl_days=float(os.getenv('ROSTER_CATALOG_TTL_DAYS', '14'))
+        )
     
     async def __aenter__(self):
         await self.start()
@@ -30,24 +60,51 @@ class RosterScraper:
     
     async def start(self):
         """Initialize browser with persistent context"""
-        print("🚀 Starting browser with persistent context...")
         self.playwright = await async_playwright().start()
         
-        # Use persistent context to maintain login state
-        self.context = await self.playwright.chromium.launch_persistent_context(
-            user_data_dir=self.user_data_dir,
-            headless=False,  # Run in headed mode so user can see progress
-            viewport={'width': 1920, 'height': 1080}
-        )
+        # Attach to the shared browser host (browser_host.py) when it is running
+        if os.getenv('BROWSER_HOST_ENABLED', 'true').lower() == 'true':
+            self.host_session = await attach_browser_host(self.playwright, self.user_data_dir, holder='roster_scraper')
+        if self.host_session is not None:
+            print("🔌 Attached to the shared browser host")
+            self.context = self.host_session.context
+        else:
+            print("🚀 Starting browser with persistent context...")
+            self.profile_lease = await launch_lease(self.user_data_dir, 'roster_scraper', timeout=300)
+            if self.profile_lease is None:
+                holder = Lease(lease_dir(self.user_data_dir), 'profile').holder_info()
+                raise RuntimeError(f"Browser profile is in use by {holder} - try again later")
+            # Use persistent context to maintain login state
+            self.context = await self.playwright.chromium.launch_persistent_context(
+                user_data_dir=self.user_data_dir,
+                headless=False,  # Run in headed mode so user can see progress
+                viewport={'width': 1920, 'height': 1080}
+            )
         self.page = await self.context.new_page()
-        self.roster_page = RosterPage(self.page)
+        # Roster extraction reads text and links only - skip images, fonts, media, analytics
+        # (on the host's shared context only our own tabs are routed)
+        await self.request_policy.install(self.page if self.host_session else self.context)
+        self.roster_page = RosterPage(self.page, rate_limiter=self.rate_limiter)
         
         print("✅ Browser started")
     
     async def stop(self):
         """Clean up resources"""
-        if self.context:
+        if self.request_policy.enabled:
+            print(f"🚦 Request routing: {self.request_policy.summary()}")
+        if self.catalog.hits or self.catalog.misses:
+            print(f"🗂️  Song catalog: {self.catalog.hits} artist(s) from cache, "
+                  f"{self.catalog.misses} Songs page(s) scraped")
+        if self.host_session:
+            # Shared browser: close our tabs and disconnect, the host keeps running
+            for page in [self.page] + self.worker_pages:
+                if page and not page.is_closed():
+                    await page.close()
+            await self.host_session.close()
+        elif self.context:
             await self.context.close()
+        if self.profile_lease:
+            self.profile_lease.release()
         if self.playwright:
             await self.playwright.stop()
     
@@ -57,6 +114,7 @@ class RosterScraper:
             print("🔐 Verifying login status...")
             
             # Navigate to home page
+            await self.rate_limiter.acquire()
             await self.page.goto('https://artists.spotify.com/home', wait_until='networkidle', timeout=60000)
             await asyncio.sleep(3)
             
@@ -86,30 +144,109 @@ class RosterScraper:
             print(f"   ❌ Login verification failed: {e}")
             return False
     
-    async def get_artist_songs_from_roster(self, client_name: str) -> List[Dict[str, Any]]:
+    async def open_worker_pages(self, workers: int) -> List[RosterPage]:
+        """
+        RosterPages for parallel artist workers: the main tab plus workers - 1 new tabs
+        in the same context. They share the login, the request policy and the rate limiter.
+        """
+        roster_pages = [self.roster_page]
+        for _ in range(workers - 1):
+            page = await self.context.new_page()
+            self.worker_pages.append(page)
+            if self.host_session:
+                await self.request_policy.install(page)
+            roster_pages.append(RosterPage(page, rate_limiter=self.rate_limiter))
+        return roster_pages
+    
+    async def get_artist_songs_from_roster(self, client_name: str,
+                                           song_names: Optional[List[str]] = None,
+                                           roster_page: Optional[RosterPage] = None) -> List[Dict[str, Any]]:
         """
         Get all songs for a client from the Roster
         
         Args:
             client_name: Client/artist name (e.g., "Segan")
+            song_names: Campaign songs of the client. If the cached catalog matches all
+                of them, it is returned without loading the artist's Songs page.
+            roster_page: The worker tab to use (default: the main tab)
             
         Returns:
             List of songs with SFA URLs
         """
-        # Navigate to Roster
-        await self.roster_page.navigate_to_roster()
+        roster_page = roster_page or self.roster_page
+        # One crawl per run even with parallel workers: the first one crawls, the rest wait
+        async with self.index_lock:
+            artist_info = await self.find_artist_in_index(client_name, roster_page)
         
-        # Find the artist
-        artist_info = await self.roster_page.find_artist(client_name)
+        if artist_info is None and not self.roster_crawl_found:
+            # The crawl found no artist links (or failed) - search the roster instead
+            await roster_page.navigate_to_roster()
+            artist_info = await roster_page.find_artist(client_name)
+            if artist_info:
+                async with self.index_lock:
+                    if self.roster_index.merge([artist_info]):
+                        self.roster_index.save(self.roster_index_path)
+            artist_id = artist_id_from_url(artist_info.get('url')) if artist_info else None
+            if artist_id:
+                artist_info['songs_url'] = songs_url(artist_id)
         
         if not artist_info:
             return []
         
-        # Get all songs for this artist
-        songs = await self.roster_page.get_artist_songs(artist_info)
+        artist_id = artist_id_from_url(artist_info.get('url'))
+        cached = self.catalog.fresh_songs(artist_id) if artist_id and song_names else None
+        if cached and all(SongIndex(cached).match_all(song_names, min_score=CATALOG_MIN_SCORE)):
+            self.catalog.hits += 1
+            print(f"   🗂️  All {len(song_names)} campaign song(s) in the cached catalog - skipping the Songs page")
+            return cached
+        
+        # Get all songs for this artist (straight to the Songs page when the artist id is known)
+        songs = await roster_page.get_artist_songs(artist_info)
+        
+        if artist_id and songs:
+            self.catalog.misses += 1
+            self.catalog.store(artist_id, artist_info['name'], songs)
+            self.catalog.save(self.catalog_path)
         
         return songs
     
+    async def find_artist_in_index(self, client_name: str,
+                                   roster_page: Optional[RosterPage] = None) -> Optional[Dict[str, Any]]:
+        """
+        Look the client up in the roster directory, crawling the roster when needed:
+        a full crawl if the cached index is past its TTL, an incremental one (merged
+        into the cache) if a fresh index misses the client. At most one crawl per run.
+        """
+        if self.roster_index.is_stale() and not self.roster_crawled:
+            await self.crawl_roster(full=True, roster_page=roster_page)
+        
+        artist_info = self.roster_index.find(client_name)
+        if artist_info is None and not self.roster_crawled:
+            print(f"   📇 {client_name} is not in the cached roster index - refreshing it")
+            await self.crawl_roster(full=False, roster_page=roster_page)
+            artist_info = self.roster_index.find(client_name)
+        
+        if artist_info:
+            print(f"   📇 Roster index: {client_name} → {artist_info['name']}")
+        return artist_info
+    
+    async def crawl_roster(self, full: bool, roster_page: Optional[RosterPage] = None) -> None:
+        """Crawl the roster into the artist directory and save it (on the caller's tab)"""
+        self.roster_crawled = True
+        print(f"📇 Crawling the roster ({'full' if full else 'incremental'})...")
+        try:
+            artists = await (roster_page or self.roster_page).crawl_roster()
+        except Exception as e:
+            print(f"   ⚠️  Roster crawl failed: {e}")
+            return
+        if not artists:
+            # Never replace a cached directory with an empty crawl
+            return
+        self.roster_crawl_found = True
+        added = self.roster_index.merge(artists, full=full)
+        self.roster_index.save(self.roster_index_path)
+        print(f"   ✅ Roster index: {len(self.roster_index)} artist(s), {added} new")
+    
     async def wait_for_login(self):
         """Wait for user to log in manually"""
         print("\n" + "=" * 80)
@@ -50,7 +50,7 @@ send_status() {
 
 # Check if already running
 if [ -f "$LOCK_FILE" ]; then
-    LOCK_PID=$(cat "$LOCK_FILE" 2>/dev/null || echo "")
+    LOCK_PID=$(head -n1 "$LOCK_FILE" 2>/dev/null || echo "")
     if [ -n "$LOCK_PID" ] && kill -0 "$LOCK_PID" 2>/dev/null; then
         log "⚠️  Scraper already running (PID: $LOCK_PID)"
         exit 0
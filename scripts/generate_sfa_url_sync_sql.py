@@ -6,9 +6,16 @@ This bypasses Node.js JWT authentication issues
 
 import json
 import os
+import sys
 from pathlib import Path
 import re
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'spotify_scraper' / 'runner'))
+from app.song_matcher import name_score
+
+# Roster matches scoring below this (fuzzy matches) are listed for review instead of synced
+MIN_MATCH_SCORE = float(os.getenv('SFA_SYNC_MIN_MATCH_SCORE', '0.9'))
+
 def extract_track_id(url):
     """Extract Spotify track ID from URL"""
     if not url:
@@ -43,20 +50,34 @@ def generate_sql():
     
     # Extract SFA URLs
     sfa_urls = []
+    low_confidence = []
     
     if 'clients' in data:
         for client_name, client_data in data['clients'].items():
             if 'songs' in client_data:
                 for song in client_data['songs']:
                     if song.get('sfa_url') and song.get('track_id'):
+                        song_name = song.get('song') or song.get('song_name', 'Unknown')
+                        score = song.get('match_score')
+                        if score is None and song.get('roster_song'):
+                            score = name_score(song['roster_song'], song_name)[0]
+                        # Results written before match scores were recorded are synced as before
+                        if score is not None and score < MIN_MATCH_SCORE:
+                            low_confidence.append((client_name, song_name, song.get('roster_song'), score))
+                            continue
                         sfa_urls.append({
                             'track_id': song['track_id'],
                             'sfa_url': song['sfa_url'],
-                            'song_name': song.get('song_name', 'Unknown'),
+                            'song_name': song_name,
                             'artist_name': client_data.get('artist_name', client_name)
                         })
     
     print(f"✅ Found {len(sfa_urls)} SFA URLs to sync\n")
+    if low_confidence:
+        print(f"⚠️  Skipped {len(low_confidence)} low-confidence match(es) (score < {MIN_MATCH_SCORE}), check by hand:")
+        for client_name, song_name, roster_song, score in low_confidence:
+            print(f"   {client_name}: {song_name} → {roster_song} ({score:.2f})")
+        print()
     
     # Generate SQL
     output_file = Path(__file__).parent.parent / 'SYNC-SFA-URLS.sql'
@@ -6,9 +6,13 @@ This bypasses the JWT authentication issue by creating direct SQL statements
 
 import json
 import os
+import sys
 from pathlib import Path
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'spotify_scraper' / 'runner'))
+from app.vendor_index import VendorIndex, default_cache_path
+
 def extract_track_id_from_filename(filename):
     """Extract Spotify track ID from filename like 'song_08Bd5NkwharGRRlyycDD8R_20251023.json'"""
     if filename.startswith('song_') and filename.endswith('.json'):
@@ -44,6 +48,13 @@ def generate_sql_from_scraped_data():
         print("⚠️  No song JSON files found!")
         return
     
+    # Vendor matching index (on-disk cache written by the production scraper)
+    vendor_index = VendorIndex.load(default_cache_path())
+    if len(vendor_index):
+        print(f"🏷️  Vendor index: {len(vendor_index)} playlists")
+    else:
+        print("⚠️  No vendor index cache found - vendor_id will be NULL (run the scraper or sync_existing_data.py first)")
+    
     sql_statements = []
     sql_statements.append("-- ================================================================================")
     sql_statements.append("-- AUTO-GENERATED SQL IMPORT FROM SCRAPED DATA")
@@ -120,6 +131,7 @@ def generate_sql_from_scraped_data():
                         if playlist_key not in all_playlists:
                             all_playlists[playlist_key] = {
                                 'name': name,
+                                'vendor_id': vendor_index.match(playlist['name']),
                                 'curator': curator,
                                 'date_added': date_added,
                                 'streams': {}
@@ -140,19 +152,21 @@ def generate_sql_from_scraped_data():
                     sql_statements.append(f"    INSERT INTO campaign_playlists (")
                     sql_statements.append(f"      campaign_id, playlist_name, playlist_curator,")
                     sql_statements.append(f"      streams_24h, streams_7d, streams_12m,")
-                    sql_statements.append(f"      date_added, last_scraped")
+                    sql_statements.append(f"      date_added, last_scraped, vendor_id")
                     sql_statements.append(f"    ) VALUES (")
                     sql_statements.append(f"      v_campaign_id,")
                     sql_statements.append(f"      '{playlist_data['name']}',")
                     sql_statements.append(f"      '{playlist_data['curator']}',")
                     sql_statements.append(f"      {streams_24h}, {streams_7d}, {streams_12m},")
-                    sql_statements.append(f"      '{playlist_data['date_added']}', NOW()")
+                    vendor_sql = f"'{playlist_data['vendor_id']}'" if playlist_data['vendor_id'] else 'NULL'
+                    sql_statements.append(f"      '{playlist_data['date_added']}', NOW(), {vendor_sql}")
                     sql_statements.append(f"    ) ON CONFLICT (campaign_id, playlist_name, playlist_curator)")
                     sql_statements.append(f"    DO UPDATE SET")
                     sql_statements.append(f"      streams_24h = EXCLUDED.streams_24h,")
                     sql_statements.append(f"      streams_7d = EXCLUDED.streams_7d,")
                     sql_statements.append(f"      streams_12m = EXCLUDED.streams_12m,")
                     sql_statements.append(f"      last_scraped = EXCLUDED.last_scraped,")
+                    sql_statements.append(f"      vendor_id = COALESCE(EXCLUDED.vendor_id, campaign_playlists.vendor_id),")
                     sql_statements.append(f"      updated_at = NOW();")
                     sql_statements.append(f"")
                     
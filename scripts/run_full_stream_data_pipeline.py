@@ -127,9 +127,9 @@ def main():
     print_stage(1, "Collecting SFA URLs from Roster")
     print("📋 This will:")
     print("   - Parse active campaigns from CSV")
-    print("   - Search Spotify for Artists Roster")
-    print("   - Extract SFA URLs for matching songs")
-    print("   - Expected time: ~15-20 minutes\n")
+    print("   - Look up artists in the Spotify for Artists Roster (cached artist index)")
+    print("   - Extract SFA URLs for matching songs (cached song catalogs, new songs only)")
+    print("   - Expected time: ~15-20 minutes on a first run, a few minutes once caches are warm\n")
     
     roster_dir = project_root / "roster_scraper"
     
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Shared browser host: one warm Chromium on the S4A profile for every job.
+
+The production scraper, the session keepalive and the roster scraper each
+cold-launched Chromium on the same profile and fought over it. This
+long-lived process owns the profile instead. It holds the 'profile'
+lease, launches the persistent context once with a local CDP port, and
+publishes the endpoint in <profile>.leases/browser_host.json. Jobs
+attach with connect_over_cdp (app/browser_host_client.py) and open their
+own pages. When no host is running, they fall back to launching Chromium
+themselves.
+
+Housekeeping, every --tick seconds:
+  - relaunch Chromium if it crashed or was closed;
+  - once no job holds a 'browser' lease: close pages jobs left behind, and
+    restart Chromium if a job requested it (RSS over the scraper's limit)
+    or the host's own RSS limit is exceeded.
+
+For a manual VNC login while the host runs headed on DISPLAY, log in from
+the host's window. Stop the host before running scripts that launch their
+own browser on the profile without a lease (manual_browser_login.py).
+
+Usage:
+  python3 browser_host.py                 # run until SIGTERM / Ctrl+C
+  python3 browser_host.py --port 9223
+  python3 browser_host.py --status        # print the running host, if any
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import signal
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / 'runner'))
+from app.browser_host_client import (
+    clear_restart_request, clear_stale_singletons, read_host, remove_host, restart_requested, write_host,
+)
+from app.browser_supervisor import chromium_rss_mb
+from app.leases import Lease, lease_dir
+from app.stealth import STEALTH_ARGS, STEALTH_JS, USER_AGENT, VIEWPORT
+
+LOG_DIR = Path(__file__).parent / 'logs'
+LOG_DIR.mkdir(exist_ok=True)
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.StreamHandler(),
+        logging.FileHandler(LOG_DIR / 'browser_host.log'),
+    ]
+)
+logger = logging.getLogger('browser_host')
+
+USER_DATA_DIR = os.getenv('USER_DATA_DIR', '/root/arti-marketing-ops/spotify_scraper/data/browser_data')
+BROWSER_HOST_PORT = int(os.getenv('BROWSER_HOST_PORT', '9222'))
+BROWSER_HOST_MAX_RSS_MB = float(os.getenv('BROWSER_HOST_MAX_RSS_MB', '2000'))
+
+
+class BrowserHost:
+    def __init__(self, user_data_dir, port, headless, max_rss_mb=0, tick=10.0):
+        self.user_data_dir = user_data_dir
+        self.port = port
+        self.headless = headless
+        self.max_rss_mb = max_rss_mb
+        self.tick = tick
+        self.profile_lease = Lease(lease_dir(user_data_dir), 'profile', holder='browser_host')
+        self.browser_lease = Lease(lease_dir(user_data_dir), 'browser', holder='browser_host')
+        self.playwright = None
+        self.context = None
+        self.launches = 0
+        self._stopping = asyncio.Event()
+        self._crashed = False
+
+    def stop(self):
+        self._stopping.set()
+
+    async def _launch(self):
+        removed = clear_stale_singletons(self.user_data_dir)
+        if removed:
+            logger.info(f"🧹 Removed stale Chromium profile locks: {', '.join(removed)}")
+        started = time.monotonic()
+        self.context = await self.playwright.chromium.launch_persistent_context(
+            user_data_dir=self.user_data_dir,
+            headless=self.headless,
+            args=STEALTH_ARGS + [f'--remote-debugging-port={self.port}', '--remote-debugging-address=127.0.0.1'],
+            timeout=60000,
+            viewport=VIEWPORT,
+            user_agent=USER_AGENT,
+            ignore_https_errors=True,
+        )
+        await self.context.add_init_script(STEALTH_JS)
+        if not self.context.pages:
+            await self.context.new_page()  # keeps a headed window open for VNC logins
+        self._crashed = False
+        context = self.context
+        context.on('close', lambda *_: self._on_close(context))
+        self.launches += 1
+        write_host(self.user_data_dir, {
+            'endpoint': f'http://127.0.0.1:{self.port}',
+            'pid': os.getpid(),
+            'port': self.port,
+            'user_data_dir': self.user_data_dir,
+            'headless': self.headless,
+            'generation': self.launches,
+            'started_at': datetime.now(timezone.utc).isoformat(),
+        })
+        logger.info(f"🚀 Chromium ready on port {self.port} in {time.monotonic() - started:.1f}s "
+                    f"(launch #{self.launches})")
+
+    def _on_close(self, context):
+        # _close_browser() detaches the context first, so only unexpected closes count
+        if context is self.context and not self._stopping.is_set():
+            self._crashed = True
+
+    async def _close_browser(self):
+        if self.context is None:
+            return
+        context, self.context = self.context, None
+        try:
+            await context.close()
+        except Exception:
+            pass
+
+    async def _housekeeping(self):
+        """Restart or tidy Chromium, but only while no job is attached."""
+        if self._crashed:
+            logger.warning("💥 Chromium closed unexpectedly - relaunching")
+            self.context = None
+            await self._launch()
+            return
+
+        reason = restart_requested(self.user_data_dir)
+        if reason is None and self.max_rss_mb:
+            rss = chromium_rss_mb(self.user_data_dir)
+            if rss is not None and rss > self.max_rss_mb:
+                reason = f"rss: {rss:.0f}MB > {self.max_rss_mb:.0f}MB"
+
+        if not self.browser_lease.try_acquire(exclusive=True):
+            return  # a job is attached
+        try:
+            if reason:
+                logger.info(f"♻️  Restarting Chromium: {reason}")
+                await self._close_browser()
+                await self._launch()
+                clear_restart_request(self.user_data_dir)
+                return
+            # Nobody attached: close tabs jobs left behind, keep one
+            leftovers = self.context.pages[1:]
+            for page in leftovers:
+                try:
+                    await page.close()
+                except Exception:
+                    pass
+            if leftovers:
+                logger.info(f"🧹 Closed {len(leftovers)} tab(s) left by detached jobs")
+        finally:
+            self.browser_lease.release()
+
+    async def run(self):
+        if not self.profile_lease.try_acquire():
+            logger.error(f"❌ Profile is in use by {self.profile_lease.holder_info()} - not starting")
+            return False
+        from playwright.async_api import async_playwright
+        self.playwright = await async_playwright().start()
+        try:
+            await self._launch()
+            while not self._stopping.is_set():
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.tick)
+                except asyncio.TimeoutError:
+                    pass
+                if not self._stopping.is_set():
+                    try:
+                        await self._housekeeping()
+                    except Exception as e:
+                        logger.error(f"❌ Housekeeping failed: {e}")
+                        self._crashed = True
+            return True
+        finally:
+            remove_host(self.user_data_dir)
+            await self._close_browser()
+            await self.playwright.stop()
+            self.profile_lease.release()
+            logger.info("Browser host stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Shared warm Chromium for the S4A profile')
+    parser.add_argument('--port', type=int, default=BROWSER_HOST_PORT, help='Local CDP port')
+    parser.add_argument('--tick', type=float, default=10.0, help='Seconds between housekeeping checks')
+    parser.add_argument('--status', action='store_true', help='Show the running host and exit')
+    args = parser.parse_args()
+
+    if args.status:
+        info = read_host(USER_DATA_DIR)
+        if info is None:
+            print("No browser host running")
+            return 1
+        print(json.dumps(info, indent=2))
+        return 0
+
+    os.makedirs(USER_DATA_DIR, exist_ok=True)
+    display = os.getenv('DISPLAY')
+    headless = os.getenv('HEADLESS', 'true' if not display else 'false').lower() == 'true'
+    logger.info(f"DISPLAY={display}, headless={headless}, user_data_dir={USER_DATA_DIR}")
+
+    host = BrowserHost(USER_DATA_DIR, args.port, headless, max_rss_mb=BROWSER_HOST_MAX_RSS_MB, tick=args.tick)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, host.stop)
+        return await host.run()
+
+    return 0 if asyncio.run(run()) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -44,7 +44,7 @@ is_pid_running() {
 
 # Check if scraper is already running with stale lock detection
 if [ -f "$LOCK_FILE" ]; then
-    OLD_PID=$(cat "$LOCK_FILE" 2>/dev/null)
+    OLD_PID=$(head -n1 "$LOCK_FILE" 2>/dev/null)
     LOCK_AGE=$(( $(date +%s) - $(stat -c %Y "$LOCK_FILE" 2>/dev/null || echo 0) ))
     
     # Check if PID is still running
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Backfill / compaction: rewrite scraped_data history rows in the compact
+dict-delta encoding (see runner/app/history_codec.py).
+
+For every campaign, all of its history rows are read in scraped_at order
+(legacy full JSON rows matched by song_url, plus rows already tagged with
+campaign_id). The full snapshots are rebuilt and re-encoded as keyframes and
+deltas, and each row is updated in place with campaign_id, encoding and the
+stream-total columns. Row ids and scraped_at are kept. Running it again is
+safe: rows whose stored form is already what it would write are skipped.
+
+Deltas point at playlists and countries by index into the chain, so a row
+the scraper appends while a chain is rewritten would decode wrongly until
+the next keyframe. The tool refuses to run while the production scraper
+holds scraper.lock (SCRAPER_LOCK_FILE, PID on line 1), and before writing a
+campaign it re-checks that no newer row was added since it was read.
+
+Usage:
+  python3 compact_scraped_history.py --dry-run          # report sizes only
+  python3 compact_scraped_history.py                    # compact everything
+  python3 compact_scraped_history.py --campaign 123     # one campaign
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from dotenv import load_dotenv
+import requests
+
+# Load environment
+env_path = Path(__file__).parent / '.env'
+load_dotenv(env_path)
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'runner'))
+from app.history_codec import ENCODING, HistoryChain, rebuild, scalar_columns
+
+SUPABASE_URL = os.getenv('SUPABASE_URL', 'https://api.artistinfluence.com')
+SUPABASE_SERVICE_ROLE_KEY = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
+HISTORY_KEYFRAME_EVERY = int(os.getenv('HISTORY_KEYFRAME_EVERY', '7'))
+PAGE_SIZE = 500
+LOCK_FILE = Path(os.getenv('SCRAPER_LOCK_FILE', str(Path(__file__).parent / 'scraper.lock')))
+
+headers = {
+    'apikey': SUPABASE_SERVICE_ROLE_KEY,
+    'Authorization': f'Bearer {SUPABASE_SERVICE_ROLE_KEY}',
+    'Content-Type': 'application/json'
+}
+
+session = requests.Session()
+session.headers.update(headers)
+
+
+def _size(value):
+    return len(json.dumps(value, separators=(',', ':'))) if value is not None else 0
+
+
+def fetch_all(table, params):
+    """Page through a PostgREST table with limit/offset."""
+    url = f"{SUPABASE_URL}/rest/v1/{table}"
+    rows = []
+    while True:
+        page_params = dict(params, limit=str(PAGE_SIZE), offset=str(len(rows)))
+        response = session.get(url, params=page_params, timeout=60)
+        if response.status_code != 200:
+            raise RuntimeError(f"GET {table} failed: {response.status_code} - {response.text[:200]}")
+        page = response.json()
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            return rows
+
+
+def scraper_pid():
+    """PID of a running production scraper (line 1 of scraper.lock), or None."""
+    try:
+        pid = int(LOCK_FILE.read_text().split()[0])
+        os.kill(pid, 0)
+    except PermissionError:
+        return pid  # alive, owned by another user
+    except (OSError, ValueError, IndexError):
+        return None
+    return pid
+
+
+def _history_filter(campaign):
+    sfa = (campaign.get('sfa') or '').replace('"', '')
+    return f'(campaign_id.eq.{campaign["id"]},and(campaign_id.is.null,song_url.eq."{sfa}"))'
+
+
+def fetch_history(campaign):
+    return fetch_all('scraped_data', {
+        'select': 'id,campaign_id,scraped_at,encoding,raw_data',
+        'or': _history_filter(campaign),
+        'order': 'scraped_at.asc,id.asc',
+    })
+
+
+def newest_row_id(campaign):
+    response = session.get(f"{SUPABASE_URL}/rest/v1/scraped_data", params={
+        'select': 'id',
+        'or': _history_filter(campaign),
+        'order': 'scraped_at.desc,id.desc',
+        'limit': '1',
+    }, timeout=60)
+    if response.status_code != 200:
+        raise RuntimeError(f"GET scraped_data failed: {response.status_code} - {response.text[:200]}")
+    rows = response.json()
+    return rows[0]['id'] if rows else None
+
+
+def compact_campaign(campaign, keyframe_every, dry_run):
+    """Re-encode one campaign's history. Returns (rows, bytes before, bytes after, rows updated)."""
+    rows = fetch_history(campaign)
+    if not rows:
+        return 0, 0, 0, 0
+
+    chain = HistoryChain(keyframe_every)
+    before = after = 0
+    updates = []
+    for row, song_data in rebuild(rows, keyframe_every):
+        payload = chain.encode(song_data)
+        before += _size(row.get('raw_data'))
+        after += _size(payload)
+
+        if (row.get('encoding') == ENCODING and row.get('raw_data') == payload
+                and row.get('campaign_id') == campaign['id']):
+            continue
+        updates.append((row, {
+            'campaign_id': campaign['id'],
+            'encoding': ENCODING,
+            'raw_data': payload,
+            **scalar_columns(song_data),
+        }))
+
+    if dry_run or not updates:
+        return len(rows), before, after, len(updates)
+    # A row appended since the read was encoded against the old chain: leave this campaign for the next run
+    if newest_row_id(campaign) != rows[-1]['id']:
+        raise RuntimeError("new history row since it was read - skipped, run again")
+
+    for row, update in updates:
+        response = session.patch(
+            f"{SUPABASE_URL}/rest/v1/scraped_data",
+            params={'id': f'eq.{row["id"]}'},
+            json=update,
+            timeout=60,
+        )
+        if response.status_code not in [200, 204]:
+            raise RuntimeError(f"PATCH scraped_data {row['id']} failed: {response.status_code} - {response.text[:200]}")
+
+    return len(rows), before, after, len(updates)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compact scraped_data history into the dict-delta encoding')
+    parser.add_argument('--dry-run', action='store_true', help='Only report the size reduction')
+    parser.add_argument('--campaign', type=int, help='Only compact this campaign id')
+    parser.add_argument('--keyframe-every', type=int, default=HISTORY_KEYFRAME_EVERY,
+                        help=f'Rows per keyframe (default {HISTORY_KEYFRAME_EVERY})')
+    args = parser.parse_args()
+
+    pid = scraper_pid()
+    if pid and not args.dry_run:
+        print(f"❌ The production scraper is running (PID {pid}, {LOCK_FILE}) - run this after it finishes")
+        return 1
+
+    print("="*60)
+    print(f" COMPACT scraped_data HISTORY{' (DRY RUN)' if args.dry_run else ''}")
+    print("="*60)
+    print()
+
+    params = {'select': 'id,campaign,sfa', 'order': 'id.asc'}
+    if args.campaign:
+        params['id'] = f'eq.{args.campaign}'
+    campaigns = fetch_all('spotify_campaigns', params)
+    print(f"Found {len(campaigns)} campaigns")
+    print()
+
+    total_rows = total_before = total_after = total_updated = 0
+    for i, campaign in enumerate(campaigns, 1):
+        try:
+            rows, before, after, updated = compact_campaign(campaign, args.keyframe_every, args.dry_run)
+        except Exception as e:
+            print(f"[{i}/{len(campaigns)}] {campaign.get('campaign', 'Unknown')}... ❌ {e}")
+            continue
+        if not rows:
+            continue
+        print(f"[{i}/{len(campaigns)}] {campaign.get('campaign', 'Unknown')}... "
+              f"{rows} rows, {before / 1024:.0f} KB -> {after / 1024:.0f} KB, {updated} to update")
+        total_rows += rows
+        total_before += before
+        total_after += after
+        total_updated += updated
+
+    print()
+    print("="*60)
+    saved = (1 - total_after / total_before) * 100 if total_before else 0
+    print(f"✅ {total_rows} history rows: {total_before / 1048576:.1f} MB -> {total_after / 1048576:.1f} MB raw_data ({saved:.0f}% smaller)")
+    print(f"{'Would update' if args.dry_run else '✅ Updated'} {total_updated} rows")
+    if not args.dry_run and total_updated:
+        print("Run VACUUM (FULL) scraped_data in the SQL editor to return the freed space to the OS")
+    print("="*60)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Summarize per-stage scraper timings across runs (logs/metrics.jsonl).
+
+Shows which stages dominate a campaign (navigation, time-range switching,
+extraction, waits, DB writes) and which campaigns are consistently slow.
+
+Usage:
+  python3 metrics_report.py                  # all recorded runs
+  python3 metrics_report.py --runs 5         # last 5 runs
+  python3 metrics_report.py --top 20 --stage persist.total
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'runner'))
+from app.metrics import default_metrics_path, read_metrics, slowest_campaigns, stage_report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Summarize scraper stage timings across runs')
+    parser.add_argument('--file', default=str(default_metrics_path()), help='metrics.jsonl to read')
+    parser.add_argument('--runs', type=int, help='Only the last N runs')
+    parser.add_argument('--top', type=int, default=10, help='How many stages/campaigns to list')
+    parser.add_argument('--stage', default='scrape.total', help='Stage used to rank campaigns')
+    args = parser.parse_args()
+
+    records = read_metrics(args.file, args.runs)
+    runs = [r for r in records if r.get('type') == 'run']
+    if not runs:
+        print(f"❌ No runs recorded in {args.file}")
+        return 1
+
+    print(f"📊 {len(runs)} run(s) from {runs[0]['timestamp'][:16]} to {runs[-1]['timestamp'][:16]}")
+    print()
+    print("Slowest stages (time per campaign, all runs):")
+    print(f"  {'stage':<34} {'count':>7} {'total s':>10} {'p50':>8} {'p95':>8} {'max':>8}")
+    report = sorted(stage_report(records).items(), key=lambda kv: kv[1]['total'], reverse=True)
+    for stage, s in report[:args.top]:
+        print(f"  {stage:<34} {s['count']:>7} {s['total']:>10.1f} {s['p50']:>8.2f} {s['p95']:>8.2f} {s['max']:>8.2f}")
+
+    print()
+    print(f"Slowest campaigns by {args.stage} (mean across runs):")
+    print(f"  {'campaign':<40} {'runs':>5} {'mean s':>8} {'max s':>8}  top stage")
+    for row in slowest_campaigns(records, args.top, args.stage):
+        print(f"  {row['campaign_id']:<40} {row['runs']:>5} {row['mean']:>8.2f} {row['max']:>8.2f}  {row['top_stage'] or '-'}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
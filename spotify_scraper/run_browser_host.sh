@@ -0,0 +1,41 @@
+#!/bin/bash
+
+# ==========================================
+#  Shared Browser Host Wrapper
+# ==========================================
+# Keeps one warm Chromium on the S4A profile that the scraper,
+# the session keepalive and the roster scraper attach to over CDP.
+#
+# Start at boot (restarts itself if it exits):
+#   @reboot /root/arti-marketing-ops/spotify_scraper/run_browser_host.sh
+# Status:
+#   python3 browser_host.py --status
+# ==========================================
+
+cd /root/arti-marketing-ops/spotify_scraper
+
+# Create logs directory
+mkdir -p logs
+
+# ---- Load environment ----
+if [ -f .env ]; then
+    export $(grep -v '^#' .env | xargs)
+fi
+
+# ---- Set up display for GUI mode (VNC logins happen in the host's window) ----
+export DISPLAY=:99
+export HEADLESS=false
+
+if ! pgrep -x "Xvfb" > /dev/null; then
+    echo "[$(date)] Starting Xvfb on display :99" >> logs/browser_host.log
+    Xvfb :99 -screen 0 1920x1080x24 -ac > /dev/null 2>&1 &
+    sleep 3
+fi
+
+# ---- Run the host; relaunch it if it dies ----
+while true; do
+    echo "[$(date)] Starting browser host..." >> logs/browser_host.log
+    python3 browser_host.py >> logs/browser_host.out 2>&1
+    echo "[$(date)] Browser host exited (code $?) -- restarting in 30s" >> logs/browser_host.log
+    sleep 30
+done
@@ -7,6 +7,8 @@ Designed to run daily via cron job.
 Usage:
   python3 run_production_scraper.py              # Scrape all campaigns
   python3 run_production_scraper.py --limit 10   # Test with 10 campaigns
+  python3 run_production_scraper.py --all        # Ignore the freshness scheduler
+  python3 run_production_scraper.py --resume     # Skip campaigns an aborted run already finished
 """
 
 import asyncio
@@ -14,12 +16,12 @@ import os
 import re
 import sys
 import logging
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Any
 from pathlib import Path
 from dotenv import load_dotenv
 import requests
-from playwright.async_api import async_playwright
+from playwright.async_api import async_playwright, Error as PlaywrightError
 
 # Load environment variables
 env_path = Path(__file__).parent / '.env'
@@ -28,6 +30,28 @@ load_dotenv(env_path)
 # Add runner to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'runner'))
 from app.pages.spotify_artists import SpotifyArtistsPage, SessionExpiredError, PageNotFoundError
+from app.postgrest import PostgrestClient
+from app.write_behind import WriteBehindQueue
+from app.rate_limiter import NavigationRateLimiter
+from app.waits import WAIT_STATS
+from app.metrics import METRICS, default_metrics_path
+from app.scheduler import CampaignScheduler
+from app.checkpoint import CheckpointJournal, STATUS_DONE, STATUS_NOT_FOUND
+from app.goal_evaluator import GoalEvaluator
+from app.browser_supervisor import BrowserSupervisor, chromium_rss_mb
+from app.browser_host_client import attach as attach_browser_host, launch_lease, request_restart
+from app.leases import Lease, lease_dir
+from app.request_routing import RequestPolicy
+from app.stealth import STEALTH_ARGS, STEALTH_JS, USER_AGENT, VIEWPORT
+from app.snapshots import SnapshotTable
+from app.fingerprint import scrape_fingerprint
+from app.vendor_index import VendorIndex, default_cache_path as default_vendor_index_path, normalize_name
+from app.song_matcher import DEFAULT_MIN_SCORE as TITLE_MIN_SCORE, name_score
+from app.history_codec import (
+    ENCODING as HISTORY_ENCODING, HistoryChain,
+    load_chain as load_history_chain, load_chains as load_history_chains,
+    scalar_columns as history_scalar_columns,
+)
 
 # Configuration
 SUPABASE_URL = os.getenv('SUPABASE_URL', 'https://api.artistinfluence.com')
@@ -35,6 +59,55 @@ SUPABASE_SERVICE_ROLE_KEY = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
 SPOTIFY_EMAIL = os.getenv('SPOTIFY_EMAIL')
 SPOTIFY_PASSWORD = os.getenv('SPOTIFY_PASSWORD')
 MANUAL_LOGIN_TIMEOUT_MINUTES = int(os.getenv('MANUAL_LOGIN_TIMEOUT_MINUTES', '10'))
+DB_TIMEOUT_SECONDS = float(os.getenv('DB_TIMEOUT_SECONDS', '30'))
+DB_MAX_RETRIES = int(os.getenv('DB_MAX_RETRIES', '3'))
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '10'))
+PERSIST_WORKERS = int(os.getenv('PERSIST_WORKERS', '2'))
+PERSIST_QUEUE_SIZE = int(os.getenv('PERSIST_QUEUE_SIZE', '4'))
+SCRAPE_WORKERS = int(os.getenv('SCRAPE_WORKERS', '2'))
+SCRAPE_MIN_NAV_INTERVAL = float(os.getenv('SCRAPE_MIN_NAV_INTERVAL', '5'))
+S4A_CAPTURE_RESPONSES = os.getenv('S4A_CAPTURE_RESPONSES', 'false').lower() == 'true'
+# Freshness scheduling: scrape only campaigns that are due, within a run budget
+SCHEDULER_ENABLED = os.getenv('SCHEDULER_ENABLED', 'true').lower() == 'true'
+SCHEDULE_NORMAL_HOURS = float(os.getenv('SCHEDULE_NORMAL_HOURS', '20'))
+SCHEDULE_STAGNANT_HOURS = float(os.getenv('SCHEDULE_STAGNANT_HOURS', '68'))
+SCHEDULE_NEAR_GOAL_RATIO = float(os.getenv('SCHEDULE_NEAR_GOAL_RATIO', '0.8'))
+SCHEDULE_HOT_WEEKLY_STREAMS = int(os.getenv('SCHEDULE_HOT_WEEKLY_STREAMS', '5000'))
+SCRAPE_RUN_BUDGET_MINUTES = float(os.getenv('SCRAPE_RUN_BUDGET_MINUTES', '90'))
+SCHEDULE_SECONDS_PER_CAMPAIGN = float(os.getenv('SCHEDULE_SECONDS_PER_CAMPAIGN', '60'))
+# --resume skips campaigns completed (per the checkpoint journal) within this window
+RESUME_WINDOW_HOURS = float(os.getenv('RESUME_WINDOW_HOURS', '12'))
+# Run-state files the API and keepalive read; moved by run_throughput_test.py so a benchmark never looks like a production run
+LOGS_DIR = Path(os.getenv('SCRAPER_LOGS_DIR', str(Path(__file__).parent / 'logs')))
+LOCK_FILE = Path(os.getenv('SCRAPER_LOCK_FILE', str(Path(__file__).parent / 'scraper.lock')))
+CHECKPOINT_FILE = LOGS_DIR / 'checkpoints.jsonl'
+# Campaigns whose playlists are upserted together in one request
+PLAYLIST_SYNC_BATCH_SIZE = int(os.getenv('PLAYLIST_SYNC_BATCH_SIZE', '5'))
+# Rows per request when reading the campaign list
+CAMPAIGN_PAGE_SIZE = int(os.getenv('CAMPAIGN_PAGE_SIZE', '1000'))
+# Skip the heavy writes when a scrape's fingerprint matches the stored one
+WRITE_AVOIDANCE_ENABLED = os.getenv('WRITE_AVOIDANCE_ENABLED', 'true').lower() == 'true'
+# scraped_data history: a full keyframe every N rows per campaign, deltas in between
+HISTORY_KEYFRAME_EVERY = int(os.getenv('HISTORY_KEYFRAME_EVERY', '7'))
+# History chain tails are bulk-loaded at run start from rows this recent (older chains restart with a keyframe)
+HISTORY_TAIL_DAYS = float(os.getenv('HISTORY_TAIL_DAYS', '8'))
+# Vendor matching index cache (refreshed incrementally, fully every N hours)
+VENDOR_INDEX_CACHE = default_vendor_index_path()
+VENDOR_INDEX_FULL_REFRESH_HOURS = float(os.getenv('VENDOR_INDEX_FULL_REFRESH_HOURS', '24'))
+# Goal completion is evaluated every N synced campaigns and once at the end of the run
+GOAL_EVAL_BATCH_SIZE = int(os.getenv('GOAL_EVAL_BATCH_SIZE', '25'))
+# Per-stage timings: JSONL history (see metrics_report.py) and a Prometheus textfile
+METRICS_FILE = default_metrics_path()
+METRICS_PROM_FILE = os.getenv('METRICS_PROM_FILE', str(LOGS_DIR / 'metrics.prom'))
+# One browser context is kept across batches and recycled only past these limits (0 = off)
+BROWSER_MAX_RSS_MB = float(os.getenv('BROWSER_MAX_RSS_MB', '1500'))
+BROWSER_MAX_HEAP_MB = float(os.getenv('BROWSER_MAX_HEAP_MB', '512'))
+BROWSER_MAX_CAMPAIGNS = int(os.getenv('BROWSER_MAX_CAMPAIGNS', '0'))
+# Attach to browser_host.py when it is running; otherwise launch Chromium under the profile lease
+BROWSER_HOST_ENABLED = os.getenv('BROWSER_HOST_ENABLED', 'true').lower() == 'true'
+BROWSER_LEASE_TIMEOUT_SECONDS = float(os.getenv('BROWSER_LEASE_TIMEOUT_SECONDS', '300'))
+# Images, fonts, media and analytics beacons are aborted (REQUEST_ROUTING_ENABLED / REQUEST_BLOCK_*)
+REQUEST_POLICY = RequestPolicy.from_env()
 
 # Setup logging
 logging.basicConfig(
@@ -44,12 +117,47 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # Error log setup
-error_handler = logging.FileHandler(Path(__file__).parent / 'logs' / 'errors.log')
+error_handler = logging.FileHandler(LOGS_DIR / 'errors.log')
 error_handler.setLevel(logging.ERROR)
 error_logger = logging.getLogger('errors')
 error_logger.addHandler(error_handler)
 
 
+# Checkpoint journal for the current run (set in main)
+_checkpoint = None
+
+# Previous stream values per campaign (loaded in fetch_campaigns_from_database)
+_snapshots = None
+
+# campaign id -> HistoryChain positioned after its latest scraped_data row (loaded in _main_inner)
+_history_chains = {}
+
+# Shared async PostgREST client (created lazily inside the running event loop)
+_db_client = None
+
+
+def get_db():
+    """Get or initialize the shared async PostgREST client."""
+    global _db_client
+    if _db_client is None:
+        _db_client = PostgrestClient(
+            SUPABASE_URL,
+            SUPABASE_SERVICE_ROLE_KEY,
+            timeout=DB_TIMEOUT_SECONDS,
+            max_retries=DB_MAX_RETRIES,
+            pool_size=DB_POOL_SIZE,
+        )
+    return _db_client
+
+
+async def close_db():
+    """Close the shared PostgREST session (call once at the end of the run)."""
+    global _db_client
+    if _db_client is not None:
+        await _db_client.close()
+        _db_client = None
+
+
 def check_api_health():
     """Check if Supabase API is reachable before starting scrape"""
     try:
@@ -238,142 +346,40 @@ def send_campaign_complete_email(campaign_name, streams_delivered, goal, client_
         return False
 
 
-async def check_and_complete_campaign(campaign, scrape_result):
-    """Check if a campaign has reached its stream goal using vendor playlist streams."""
-    try:
-        goal_raw = campaign.get('goal')
-        goal = parse_goal_string(goal_raw)
-        if goal <= 0:
-            return
-
-        campaign_id = campaign['id']
-        campaign_name = campaign.get('campaign', f'Campaign {campaign_id}')
-
-        headers = {
-            'apikey': SUPABASE_SERVICE_ROLE_KEY,
-            'Authorization': f'Bearer {SUPABASE_SERVICE_ROLE_KEY}',
-            'Content-Type': 'application/json'
-        }
-
-        # Fetch vendor playlist streams (exclude algorithmic and organic)
-        pl_url = f"{SUPABASE_URL}/rest/v1/campaign_playlists"
-        pl_params = {
-            'campaign_id': f'eq.{campaign_id}',
-            'select': 'streams_12m,is_algorithmic,is_organic',
-            'or': '(is_algorithmic.is.null,is_algorithmic.eq.false)',
-        }
-        pl_resp = requests.get(pl_url, headers=headers, params=pl_params)
-        if pl_resp.status_code != 200:
-            return
-
-        playlists = pl_resp.json()
-        vendor_streams = sum(
-            (p.get('streams_12m') or 0)
-            for p in playlists
-            if not p.get('is_organic', False)
-        )
-
-        if vendor_streams < goal:
-            return
+# Batched goal evaluator and completion-email queue for the current run (set in _main_inner)
+_goal_evaluator = None
+_email_queue = None
 
-        logger.info(f"[{campaign_id}] 🎯 Goal reached! Vendor streams: {vendor_streams:,} / {goal:,} — marking Complete")
 
-        url = f"{SUPABASE_URL}/rest/v1/spotify_campaigns"
-        params = {'id': f'eq.{campaign_id}'}
-        update_data = {
-            'status': 'complete',
-            'completed_at': datetime.now(timezone.utc).isoformat(),
-        }
-        response = requests.patch(url, headers=headers, params=params, json=update_data)
-        if response.status_code not in [200, 204]:
-            if 'completed_at' in (response.text or ''):
-                update_data.pop('completed_at', None)
-                response = requests.patch(url, headers=headers, params=params, json=update_data)
-
-        if response.status_code in [200, 204]:
-            logger.info(f"[{campaign_id}] ✓ Song status updated to Complete")
-        else:
-            logger.warning(f"[{campaign_id}] Could not update status: {response.status_code}")
-            return
+async def send_completion_email_item(item):
+    """Email queue handler: smtplib is blocking - keep it off the event loop."""
+    return await asyncio.to_thread(send_campaign_complete_email, *item)
 
-        # Also update campaign_groups status if all songs in the group are complete
-        group_id = campaign.get('campaign_group_id')
-        if group_id:
-            try:
-                # Fetch all songs in this group
-                songs_resp = requests.get(
-                    f"{SUPABASE_URL}/rest/v1/spotify_campaigns",
-                    headers=headers,
-                    params={'campaign_group_id': f'eq.{group_id}', 'select': 'id,goal,status'}
-                )
-                if songs_resp.status_code == 200:
-                    group_songs = songs_resp.json()
-                    # Check each song: fetch vendor playlist streams and compare to goal
-                    all_songs_complete = True
-                    songs_with_goals = 0
-                    for song in group_songs:
-                        song_goal = parse_goal_string(song.get('goal'))
-                        if song_goal <= 0:
-                            continue
-                        songs_with_goals += 1
-                        s_pl_resp = requests.get(pl_url, headers=headers, params={
-                            'campaign_id': f'eq.{song["id"]}',
-                            'select': 'streams_12m,is_algorithmic,is_organic',
-                            'or': '(is_algorithmic.is.null,is_algorithmic.eq.false)',
-                        })
-                        if s_pl_resp.status_code == 200:
-                            s_vendor = sum(
-                                (p.get('streams_12m') or 0)
-                                for p in s_pl_resp.json()
-                                if not p.get('is_organic', False)
-                            )
-                            if s_vendor < song_goal:
-                                all_songs_complete = False
-                                break
-                        else:
-                            all_songs_complete = False
-                            break
-
-                    if all_songs_complete and songs_with_goals > 0:
-                        grp_resp = requests.patch(
-                            f"{SUPABASE_URL}/rest/v1/campaign_groups",
-                            headers=headers,
-                            params={'id': f'eq.{group_id}'},
-                            json={'status': 'complete'}
-                        )
-                        if grp_resp.status_code in [200, 204]:
-                            logger.info(f"[{campaign_id}] ✓ Campaign group {group_id} also marked Complete")
-            except Exception as grp_err:
-                logger.warning(f"[{campaign_id}] Could not check/update group status: {grp_err}")
-
-        # Fetch client email
-        client_id = campaign.get('client_id')
-        if client_id:
-            client_url = f"{SUPABASE_URL}/rest/v1/clients"
-            client_params = {'id': f'eq.{client_id}', 'select': 'emails'}
-            client_resp = requests.get(client_url, headers=headers, params=client_params)
-            if client_resp.status_code == 200 and client_resp.json():
-                client_emails = client_resp.json()[0].get('emails') or []
-                send_campaign_complete_email(campaign_name, vendor_streams, goal, client_emails)
 
-    except Exception as e:
-        logger.warning(f"[{campaign.get('id', '?')}] Error in auto-complete check: {e}")
+async def queue_completion_email(campaign_name, streams_delivered, goal, client_emails):
+    await _email_queue.put((campaign_name, streams_delivered, goal, client_emails))
 
 
-def log_scraper_run(status, campaigns_total=0, campaigns_success=0, campaigns_failed=0, error_message=None):
+def log_scraper_run(status, campaigns_total=0, campaigns_success=0, campaigns_failed=0, error_message=None,
+                    campaigns_resumed=0, browser_stats=None):
     """Log scraper run status to a dedicated status file"""
     import json
     
     log_entry = {
         'timestamp': datetime.now(timezone.utc).isoformat(),
+        'run_id': _checkpoint.run_id if _checkpoint else None,
         'status': status,  # 'success', 'partial', 'failed', 'no_api'
         'campaigns_total': campaigns_total,
         'campaigns_success': campaigns_success,
         'campaigns_failed': campaigns_failed,
+        'campaigns_resumed': campaigns_resumed,  # skipped by --resume (already done)
         'error_message': error_message
     }
+    if browser_stats:
+        # Launches, restarts (by reason), crashes and RSS/heap high-water marks
+        log_entry.update(browser_stats)
     
-    status_file = Path(__file__).parent / 'logs' / 'status.jsonl'
+    status_file = LOGS_DIR / 'status.jsonl'
     status_file.parent.mkdir(exist_ok=True)
     
     with open(status_file, 'a') as f:
@@ -851,22 +857,38 @@ async def fetch_campaigns_from_database(limit=None):
     
     url = f"{SUPABASE_URL}/rest/v1/spotify_campaigns"
     params = {
-        'select': 'id,campaign,sfa,track_name,artist_name,goal,status,client_id,campaign_group_id',
+        # Stream/freshness fields feed the scheduler; previous comes from the last scrape
+        'select': 'id,campaign,sfa,track_name,artist_name,goal,status,client_id,campaign_group_id,'
+                  'last_scraped_at,streams_24h,streams_7d,streams_12m,previous:scrape_data->previous,'
+                  'scrape_fingerprint,scrape_history_date',
         'sfa': 'like.https://artists.spotify.com%',
         'status': 'eq.active',
         'order': 'id.asc'
     }
     
-    if limit:
-        params['limit'] = str(limit)
-    
-    # Use retry logic with exponential backoff
-    campaigns = fetch_campaigns_with_retry(url, headers, params, max_retries=3)
+    # Page through the table so large rosters are not cut off by the API row cap
+    campaigns = []
+    while True:
+        page_size = min(CAMPAIGN_PAGE_SIZE, limit - len(campaigns)) if limit else CAMPAIGN_PAGE_SIZE
+        params['limit'] = str(page_size)
+        params['offset'] = str(len(campaigns))
+        
+        # Use retry logic with exponential backoff
+        page = fetch_campaigns_with_retry(url, headers, params, max_retries=3)
+        
+        if page is None:
+            logger.error("❌ FATAL: Could not fetch campaigns from database after retries")
+            error_logger.error("Failed to fetch campaigns - API unreachable")
+            return None
+        
+        campaigns.extend(page)
+        if len(page) < page_size or (limit and len(campaigns) >= limit):
+            break
     
-    if campaigns is None:
-        logger.error("❌ FATAL: Could not fetch campaigns from database after retries")
-        error_logger.error("Failed to fetch campaigns - API unreachable")
-        return None
+    # Previous stream values for zero-protection, trends and goal checks
+    global _snapshots
+    _snapshots = SnapshotTable(parse_goal_string)
+    _snapshots.load(campaigns)
     
     if len(campaigns) == 0:
         logger.warning("⚠️  No campaigns found with valid SFA URLs")
@@ -876,6 +898,19 @@ async def fetch_campaigns_from_database(limit=None):
     return campaigns
 
 
+def check_song_title(campaign, song_data):
+    """Warn when the S4A page title does not match the campaign's track (SFA link to the wrong song)."""
+    track_name = campaign.get('track_name')
+    titles = [r['stats'].get('title') for r in song_data['time_ranges'].values()]
+    title = next((t for t in titles if t and t != 'Unknown'), None)
+    if not track_name or not title:
+        return
+    score, _ = name_score(title, track_name)
+    if score < TITLE_MIN_SCORE:
+        logger.warning(f"[{campaign['id']}] ⚠️  S4A song title '{title}' does not match track "
+                       f"'{track_name}' (score {score:.2f}) - check the SFA link")
+
+
 async def scrape_campaign(page, spotify_page, campaign):
     """Scrape data for a single campaign.
     
@@ -898,8 +933,8 @@ async def scrape_campaign(page, spotify_page, campaign):
             return None
         
         # --- Step 1: Navigate to Overview (/stats) and get all-time streams ---
+        # navigate_to_song waits for the page to render (no fixed sleeps here)
         await spotify_page.navigate_to_song(sfa_url, target_tab='stats')
-        await asyncio.sleep(2)
         
         alltime_streams = await spotify_page.get_alltime_streams()
         logger.info(f"  All-time streams: {alltime_streams:,}")
@@ -907,30 +942,31 @@ async def scrape_campaign(page, spotify_page, campaign):
         # --- Step 2: Read total streams per time range from Overview page ---
         overview_streams = {}
         for time_range in ['7day', '28day', '12months']:
-            streams = await spotify_page.get_period_streams(time_range)
+            # Prefer the captured stats API payload (no chip clicking) when enabled
+            streams = await spotify_page.get_captured_period_streams(time_range)
+            if streams is None:
+                streams = await spotify_page.get_period_streams(time_range)
             overview_streams[time_range] = streams
             logger.info(f"  {time_range} total streams (overview): {streams:,}")
         
         # --- Step 3: Navigate to Playlists page for playlist breakdown ---
         await spotify_page.navigate_to_song(sfa_url, target_tab='playlists')
-        await asyncio.sleep(2)
         
         song_data = {'time_ranges': {}, 'alltime_streams': alltime_streams}
         
         for time_range in ['7day', '28day', '12months']:
             logger.info(f"  Extracting {time_range} playlist data...")
             
-            await spotify_page.switch_time_range(time_range)
-            await asyncio.sleep(2)
-            
-            stats = await spotify_page.get_song_stats()
+            # Captured/replayed playlists API payload - skips the dropdown entirely
+            stats = await spotify_page.get_captured_song_stats(time_range)
+            if stats is None:
+                await spotify_page.switch_time_range(time_range)
+                stats = await spotify_page.get_song_stats()
             
             if len(stats.get('playlists', [])) == 0:
                 logger.warning(f"    {time_range}: 0 playlists -- dropdown switch may have failed, retrying...")
                 await spotify_page.navigate_to_song(sfa_url, target_tab='playlists')
-                await asyncio.sleep(3)
                 await spotify_page.switch_time_range(time_range)
-                await asyncio.sleep(2)
                 stats = await spotify_page.get_song_stats()
             
             # Use accurate total from overview; keep playlist detail for breakdown
@@ -943,8 +979,9 @@ async def scrape_campaign(page, spotify_page, campaign):
         # --- Step 4: Navigate to Location page for regional data ---
         try:
             await spotify_page.navigate_to_song(sfa_url, target_tab='location')
-            await asyncio.sleep(2)
-            region_data = await spotify_page.get_location_data()
+            region_data = await spotify_page.get_captured_location_data()
+            if region_data is None:
+                region_data = await spotify_page.get_location_data()
             song_data['regions'] = region_data
             logger.info(f"  Regions: {len(region_data)} countries")
         except Exception as e:
@@ -956,6 +993,7 @@ async def scrape_campaign(page, spotify_page, campaign):
         stats_12m = song_data['time_ranges']['12months']['stats']
         
         song_data['alltime_streams'] = alltime_streams
+        check_song_title(campaign, song_data)
         
         now_iso = datetime.now(timezone.utc).isoformat()
         result = {
@@ -1019,38 +1057,66 @@ async def handle_session_expired(page):
     return await wait_for_manual_login(page, timeout_seconds=MANUAL_LOGIN_TIMEOUT_MINUTES * 60)
 
 
+class SessionGuard:
+    """Coordinates session-expiry handling between parallel scraper tabs.
+
+    All tabs share one logged-in context, so when the session dies every
+    worker sees it at roughly the same time. Only the first worker waits for
+    the manual VNC login; the others block on the lock and then either retry
+    (login succeeded, generation moved on) or stop (session is dead).
+    """
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self.generation = 0
+        self.dead = False
+
+    async def recover(self, page, seen_generation):
+        """Return True if the session is usable again, False if it is dead."""
+        async with self._lock:
+            if self.dead:
+                return False
+            if self.generation != seen_generation:
+                # Another worker already completed the manual login
+                return True
+            if await handle_session_expired(page):
+                self.generation += 1
+                return True
+            self.dead = True
+            return False
+
+
 async def update_campaign_in_database(campaign_id, data):
     """Update campaign data in spotify_campaigns table (raw data storage)
     
     IMPORTANT: This function now includes safeguards against overwriting
     valid data with zeros when the scraper fails to extract data.
     """
-    headers = {
-        'apikey': SUPABASE_SERVICE_ROLE_KEY,
-        'Authorization': f'Bearer {SUPABASE_SERVICE_ROLE_KEY}',
-        'Content-Type': 'application/json'
-    }
+    db = get_db()
     
-    # First, fetch the previous values for trend calculation AND zero-protection
-    get_url = f"{SUPABASE_URL}/rest/v1/spotify_campaigns"
-    get_params = {'id': f'eq.{campaign_id}', 'select': 'streams_24h,streams_7d,streams_12m'}
-    previous_values = {'streams_24h': 0, 'streams_7d': 0, 'streams_12m': 0}
+    # Previous values for trend calculation AND zero-protection come from the
+    # snapshot loaded with the campaign list; only unknown campaigns need a GET
+    snapshot = _snapshots.previous_values(campaign_id) if _snapshots is not None else None
+    previous_values = snapshot or {'streams_24h': 0, 'streams_7d': 0, 'streams_12m': 0}
     
-    try:
-        previous_response = requests.get(get_url, headers=headers, params=get_params)
-        if previous_response.status_code == 200 and previous_response.json():
-            prev_data = previous_response.json()[0]
-            previous_values = {
-                'streams_24h': prev_data.get('streams_24h') or 0,
-                'streams_7d': prev_data.get('streams_7d') or 0,
-                'streams_12m': prev_data.get('streams_12m') or 0
-            }
-            # Add previous values to scrape_data for trend calculation
-            if 'scrape_data' in data and isinstance(data['scrape_data'], dict):
-                data['scrape_data']['previous'] = previous_values
-                logger.info(f"[{campaign_id}] Stored previous values: 24h={previous_values['streams_24h']}, 7d={previous_values['streams_7d']}, 12m={previous_values['streams_12m']}")
-    except Exception as e:
-        logger.warning(f"[{campaign_id}] Could not fetch previous values: {e}")
+    if snapshot is None:
+        get_params = {'id': f'eq.{campaign_id}', 'select': 'streams_24h,streams_7d,streams_12m'}
+        try:
+            previous_response = await db.get('spotify_campaigns', params=get_params)
+            if previous_response.status_code == 200 and previous_response.json():
+                prev_data = previous_response.json()[0]
+                snapshot = previous_values = {
+                    'streams_24h': prev_data.get('streams_24h') or 0,
+                    'streams_7d': prev_data.get('streams_7d') or 0,
+                    'streams_12m': prev_data.get('streams_12m') or 0
+                }
+        except Exception as e:
+            logger.warning(f"[{campaign_id}] Could not fetch previous values: {e}")
+    
+    # Add previous values to scrape_data for trend calculation
+    if snapshot is not None and 'scrape_data' in data and isinstance(data['scrape_data'], dict):
+        data['scrape_data']['previous'] = previous_values
+        logger.info(f"[{campaign_id}] Stored previous values: 24h={previous_values['streams_24h']}, 7d={previous_values['streams_7d']}, 12m={previous_values['streams_12m']}")
     
     # SAFEGUARD: Don't overwrite non-zero values with zeros
     # This prevents failed scrapes from erasing good data
@@ -1077,10 +1143,9 @@ async def update_campaign_in_database(campaign_id, data):
     if data_protected:
         logger.warning(f"[{campaign_id}] ⚠️  Zero-protection triggered - this indicates a potential scraping failure")
     
-    url = f"{SUPABASE_URL}/rest/v1/spotify_campaigns"
     params = {'id': f'eq.{campaign_id}'}
     
-    response = requests.patch(url, headers=headers, params=params, json=data)
+    response = await db.patch('spotify_campaigns', params=params, json=data)
     
     if response.status_code not in [200, 204]:
         error_text = response.text or ''
@@ -1097,9 +1162,11 @@ async def update_campaign_in_database(campaign_id, data):
                     bad_col = col_match.group(1)
                     logger.warning(f"[{campaign_id}] Column '{bad_col}' missing in DB, retrying without it")
                     data.pop(bad_col, None)
-                    response = requests.patch(url, headers=headers, params=params, json=data)
+                    response = await db.patch('spotify_campaigns', params=params, json=data)
                     if response.status_code in [200, 204]:
                         logger.info(f"[{campaign_id}] ✓ Raw data updated (without {bad_col}){' [PROTECTED]' if data_protected else ''}")
+                        if _snapshots is not None:
+                            _snapshots.update(campaign_id, data)
                         return True
             except Exception:
                 pass
@@ -1108,6 +1175,8 @@ async def update_campaign_in_database(campaign_id, data):
         return False
     
     logger.info(f"[{campaign_id}] ✓ Raw data updated in spotify_campaigns (with trend history){' [PROTECTED]' if data_protected else ''}")
+    if _snapshots is not None:
+        _snapshots.update(campaign_id, data)
     return True
 
 
@@ -1164,31 +1233,44 @@ async def save_to_scraped_data_table(campaign, scrape_data):
     """
     FIX #1: Save historical scraped data to scraped_data table.
     This preserves historical trends and performance data over time.
-    """
-    headers = {
-        'apikey': SUPABASE_SERVICE_ROLE_KEY,
-        'Authorization': f'Bearer {SUPABASE_SERVICE_ROLE_KEY}',
-        'Content-Type': 'application/json'
-    }
     
+    raw_data is stored in the compact dict-delta encoding (app.history_codec):
+    playlists and countries are dictionary encoded and only what changed since
+    the campaign's previous history row is written.
+    """
     try:
+        db = get_db()
+        # Bulk-loaded at run start; taken out so a failed write never leaves an advanced chain behind
+        chain = _history_chains.pop(campaign['id'], None)
+        if chain is None:
+            try:
+                chain = await load_history_chain(db, campaign['id'], HISTORY_KEYFRAME_EVERY)
+            except Exception as e:
+                logger.warning(f"[{campaign['id']}] Could not load history chain, writing a keyframe: {e}")
+                chain = HistoryChain(HISTORY_KEYFRAME_EVERY)
+        payload = chain.encode(scrape_data)
+        
         record = {
             'platform': 'spotify',
+            'campaign_id': campaign['id'],
             'song_url': campaign.get('sfa', ''),
             'artist_name': campaign.get('artist_name'),
             'song_title': campaign.get('track_name'),
             'scraped_at': datetime.now(timezone.utc).isoformat(),
-            'raw_data': scrape_data  # Full JSON with all time ranges and playlists
+            'encoding': HISTORY_ENCODING,
+            'raw_data': payload,
+            **history_scalar_columns(scrape_data),
         }
         
-        url = f"{SUPABASE_URL}/rest/v1/scraped_data"
-        response = requests.post(url, headers=headers, json=record)
+        response = await db.post('scraped_data', json=record)
         
         if response.status_code not in [200, 201]:
             logger.warning(f"[{campaign['id']}] Failed to save historical data: {response.status_code} - {response.text}")
             return False
         
-        logger.info(f"[{campaign['id']}] ✓ Historical data saved to scraped_data table")
+        _history_chains[campaign['id']] = chain
+        kind = 'keyframe' if payload.get('k') else 'delta'
+        logger.info(f"[{campaign['id']}] ✓ Historical data saved to scraped_data table ({kind})")
         return True
         
     except Exception as e:
@@ -1198,81 +1280,172 @@ async def save_to_scraped_data_table(campaign, scrape_data):
 
 async def fetch_vendor_playlists_cache():
     """
-    Fetch all vendor playlists from the vendor_playlists table for auto-matching.
-    Returns a dict mapping normalized playlist names to vendor_id.
+    Load the vendor playlist matching index for auto-matching.
+    Starts from the on-disk cache and refreshes it from vendor_playlists
+    (incrementally by updated_at, fully once a day or when rows were deleted).
     """
-    headers = {
-        'apikey': SUPABASE_SERVICE_ROLE_KEY,
-        'Authorization': f'Bearer {SUPABASE_SERVICE_ROLE_KEY}',
-        'Content-Type': 'application/json'
-    }
-    
+    index = VendorIndex.load(VENDOR_INDEX_CACHE, full_refresh_hours=VENDOR_INDEX_FULL_REFRESH_HOURS)
     try:
-        url = f"{SUPABASE_URL}/rest/v1/vendor_playlists"
-        params = {'select': 'playlist_name_normalized,vendor_id'}
-        
-        response = requests.get(url, headers=headers, params=params)
-        
-        if response.status_code != 200:
-            logger.warning(f"Could not fetch vendor_playlists: {response.status_code}")
-            return {}
-        
-        data = response.json()
-        # Build dict: normalized_name -> vendor_id
-        vendor_map = {}
-        for row in data:
-            if row.get('playlist_name_normalized') and row.get('vendor_id'):
-                vendor_map[row['playlist_name_normalized']] = row['vendor_id']
-        
-        logger.info(f"Loaded {len(vendor_map)} vendor playlists for auto-matching")
-        return vendor_map
-        
+        mode = await index.refresh_async(get_db())
+        index.save(VENDOR_INDEX_CACHE)
+        logger.info(f"Loaded {len(index)} vendor playlists for auto-matching ({mode} refresh)")
     except Exception as e:
-        logger.warning(f"Error fetching vendor_playlists: {e}")
-        return {}
+        if len(index):
+            logger.warning(f"Could not refresh vendor_playlists, using cached index ({len(index)} playlists): {e}")
+        else:
+            logger.warning(f"Error fetching vendor_playlists: {e}")
+    return index
 
 
 # Global cache for vendor playlists (loaded once per scraper run)
 _vendor_playlists_cache = None
+# Persistence workers run concurrently - only the first one should fetch the cache
+_vendor_playlists_lock = asyncio.Lock()
 
 async def get_vendor_playlists_cache():
     """Get or initialize the vendor playlists cache."""
     global _vendor_playlists_cache
-    if _vendor_playlists_cache is None:
-        _vendor_playlists_cache = await fetch_vendor_playlists_cache()
+    async with _vendor_playlists_lock:
+        if _vendor_playlists_cache is None:
+            _vendor_playlists_cache = await fetch_vendor_playlists_cache()
     return _vendor_playlists_cache
 
 
-async def sync_to_campaign_playlists(campaign_id, scrape_data):
+def normalize_playlist_name(name):
+    """Normalize playlist name for consistent deduplication.
+    
+    Must match normalize_campaign_playlist_name() in the database, since the
+    result is half of the campaign_playlists upsert key. Same normalizer as
+    the vendor matching index.
+    """
+    return normalize_name(name)
+
+
+class PlaylistSyncBatcher:
+    """Collects campaign_playlists rows from several campaigns and upserts them together.
+    
+    One flush is three requests no matter how many campaigns it covers:
+      1. POST upsert on (campaign_id, playlist_name_normalized) with
+         return=representation, so row ids come back in the same call
+      2. DELETE rows of those campaigns that this sync didn't touch
+         (last_scraped older than the flush timestamp)
+      3. POST the day's performance entries using the returned ids
+    Rows are updated in place, so readers never see an empty playlist list.
+    """
+    
+    def __init__(self, batch_size=PLAYLIST_SYNC_BATCH_SIZE):
+        self.batch_size = max(1, batch_size)
+        self._pending = {}  # campaign_id -> list of row dicts
+        self._callbacks = []  # coroutines to run once the pending rows are written
+        self._lock = asyncio.Lock()
+    
+    async def add(self, campaign_id, rows, on_flushed=None):
+        """Queue a campaign's rows; on_flushed(ok) is awaited once their batch is flushed."""
+        async with self._lock:
+            self._pending[campaign_id] = rows
+            if on_flushed:
+                self._callbacks.append(on_flushed)
+            if len(self._pending) < self.batch_size:
+                return True
+            batch, self._pending = self._pending, {}
+            callbacks, self._callbacks = self._callbacks, []
+        return await self._flush(batch, callbacks)
+    
+    async def flush(self):
+        async with self._lock:
+            batch, self._pending = self._pending, {}
+            callbacks, self._callbacks = self._callbacks, []
+        if not batch:
+            return True
+        return await self._flush(batch, callbacks)
+    
+    async def _flush(self, batch, callbacks):
+        ok = False
+        try:
+            ok = await self._write(batch)
+            return ok
+        finally:
+            # e.g. goal checks, which read the rows just written; ok=False when the upsert failed
+            for callback in callbacks:
+                try:
+                    await callback(ok)
+                except Exception as e:
+                    logger.warning(f"Post-sync callback failed: {e}")
+    
+    async def _write(self, batch):
+        db = get_db()
+        campaign_ids = list(batch.keys())
+        ids_filter = f"in.({','.join(str(cid) for cid in campaign_ids)})"
+        # last_scraped is TIMESTAMP (no tz): send naive UTC so comparisons line up
+        flush_ts = datetime.now(timezone.utc).replace(tzinfo=None).isoformat()
+        
+        rows = []
+        for campaign_rows in batch.values():
+            for row in campaign_rows:
+                rows.append({**row, 'last_scraped': flush_ts})
+        
+        try:
+            upsert_response = await db.post(
+                'campaign_playlists',
+                json=rows,
+                params={'on_conflict': 'campaign_id,playlist_name_normalized'},
+                headers={'Prefer': 'resolution=merge-duplicates,return=representation'},
+            )
+            if upsert_response.status_code not in [200, 201]:
+                logger.error(f"Failed to upsert playlists for campaigns {campaign_ids}: {upsert_response.status_code} - {upsert_response.text}")
+                return False
+            saved_rows = upsert_response.json() or []
+            
+            # Playlists that dropped off S4A since the last scrape
+            stale_response = await db.delete('campaign_playlists', params={
+                'campaign_id': ids_filter,
+                'or': f'(last_scraped.is.null,last_scraped.lt.{flush_ts})',
+            })
+            if stale_response.status_code not in [200, 204]:
+                logger.warning(f"Could not remove stale playlists for campaigns {campaign_ids}: {stale_response.status_code} - {stale_response.text}")
+            
+            if len(campaign_ids) == 1:
+                logger.info(f"[{campaign_ids[0]}] ✓ Upserted {len(saved_rows)} playlists")
+            else:
+                logger.info(f"✓ Upserted {len(saved_rows)} playlists for {len(campaign_ids)} campaigns in one batch")
+            
+            await save_performance_entries(saved_rows)
+            return True
+        except Exception as e:
+            logger.error(f"Error flushing playlist batch for campaigns {campaign_ids}: {e}")
+            return False
+
+
+_playlist_batcher = None
+
+def get_playlist_batcher():
+    """Get or initialize the shared playlist sync batcher."""
+    global _playlist_batcher
+    if _playlist_batcher is None:
+        _playlist_batcher = PlaylistSyncBatcher()
+    return _playlist_batcher
+
+
+async def sync_to_campaign_playlists(campaign_id, scrape_data, on_flushed=None):
     """
     Bridge function: Sync scraped playlist data to campaign_playlists table
     This keeps the UI working with existing queries while storing raw data in spotify_campaigns
     
     FIX #2: Now preserves is_algorithmic flags by auto-detecting algorithmic playlists
     FIX #3: Auto-assigns vendor_id from vendor_playlists cache
+    
+    Rows are upserted (via PlaylistSyncBatcher) on (campaign_id, normalized
+    name); playlists no longer on S4A are removed after the upsert.
+    on_flushed(ok) is awaited once the rows' batch is flushed, with ok=False
+    if the upsert failed (right away with ok=True if nothing is written).
     """
-    headers = {
-        'apikey': SUPABASE_SERVICE_ROLE_KEY,
-        'Authorization': f'Bearer {SUPABASE_SERVICE_ROLE_KEY}',
-        'Content-Type': 'application/json'
-    }
+    db = get_db()
+    handed_to_batcher = False
     
     try:
         # Get vendor playlists cache for auto-matching
         vendor_cache = await get_vendor_playlists_cache()
         
-        # Helper function to normalize playlist names for deduplication
-        def normalize_playlist_name(name):
-            """Normalize playlist name for consistent deduplication"""
-            if not name:
-                return "unknown"
-            # Convert to lowercase, strip whitespace, normalize unicode
-            import unicodedata
-            normalized = unicodedata.normalize('NFKD', str(name).lower().strip())
-            # Remove extra whitespace
-            normalized = ' '.join(normalized.split())
-            return normalized
-        
         # Extract unique playlists across all time ranges
         # Use normalized name as key, but keep original name for display
         playlists_by_normalized = {}
@@ -1309,27 +1482,25 @@ async def sync_to_campaign_playlists(campaign_id, scrape_data):
                 elif time_range == '12months':
                     playlists_by_normalized[normalized_key]['streams_12m'] = streams
         
-        # Convert back to list (playlists_by_id for compatibility with rest of code)
-        playlists_by_id = playlists_by_normalized
-        
-        if not playlists_by_id:
+        if not playlists_by_normalized:
             # SAFEGUARD: Don't delete existing playlists if we didn't scrape any
             # This indicates a scraping failure, not that the song has no playlists
             logger.warning(f"[{campaign_id}] No playlists scraped - SKIPPING sync to preserve existing data")
+            if on_flushed:
+                await on_flushed(True)
             return True
         
         # SAFEGUARD: Check if ALL playlists have 0 streams across ALL time ranges
         # This indicates a scraping failure (e.g., page didn't load properly)
         total_streams = sum(
             p.get('streams_24h', 0) + p.get('streams_7d', 0) + p.get('streams_12m', 0)
-            for p in playlists_by_id.values()
+            for p in playlists_by_normalized.values()
         )
         
-        if total_streams == 0 and len(playlists_by_id) > 0:
+        if total_streams == 0 and len(playlists_by_normalized) > 0:
             # Check if we have existing data that we would be destroying
-            check_url = f"{SUPABASE_URL}/rest/v1/campaign_playlists"
             check_params = {'campaign_id': f'eq.{campaign_id}', 'select': 'streams_24h,streams_7d,streams_12m'}
-            check_response = requests.get(check_url, headers=headers, params=check_params)
+            check_response = await db.get('campaign_playlists', params=check_params)
             
             if check_response.status_code == 200:
                 existing_playlists = check_response.json()
@@ -1340,32 +1511,22 @@ async def sync_to_campaign_playlists(campaign_id, scrape_data):
                 
                 if existing_total > 0:
                     logger.warning(f"[{campaign_id}] ⚠️  ZERO-PROTECTION: All scraped streams are 0 but existing data has {existing_total} streams - SKIPPING sync")
+                    if on_flushed:
+                        await on_flushed(True)
                     return True
         
-        # Delete existing campaign_playlists entries for this campaign
-        # Only do this if we have valid new data to replace it with
-        delete_url = f"{SUPABASE_URL}/rest/v1/campaign_playlists"
-        delete_params = {'campaign_id': f'eq.{campaign_id}'}
-        
-        delete_response = requests.delete(delete_url, headers=headers, params=delete_params)
-        if delete_response.status_code not in [200, 204]:
-            logger.warning(f"[{campaign_id}] Could not delete old playlists: {delete_response.status_code} - {delete_response.text}")
-        else:
-            logger.debug(f"[{campaign_id}] Cleared existing playlist records before sync")
-        
-        # Insert new playlist data with auto-detected is_algorithmic flag and vendor_id
+        # Build rows with auto-detected is_algorithmic flag and vendor_id
         playlist_records = []
         algorithmic_count = 0
         vendor_count = 0
         vendor_matched_count = 0
         
-        for playlist_data in playlists_by_id.values():
+        for normalized_key, playlist_data in playlists_by_normalized.items():
             playlist_name = playlist_data['playlist_name']
             is_algo = is_algorithmic_playlist(playlist_name)
             
-            # Auto-match vendor from vendor_playlists cache
-            normalized_name = playlist_name.lower().strip()
-            vendor_id = vendor_cache.get(normalized_name)
+            # Auto-match vendor from the vendor_playlists index (exact, then alias/token key)
+            vendor_id = vendor_cache.match(playlist_name)
             
             if is_algo:
                 algorithmic_count += 1
@@ -1377,6 +1538,7 @@ async def sync_to_campaign_playlists(campaign_id, scrape_data):
             record = {
                 'campaign_id': campaign_id,
                 'playlist_name': playlist_name,
+                'playlist_name_normalized': normalized_key,
                 'streams_24h': playlist_data['streams_24h'],
                 'streams_7d': playlist_data['streams_7d'],
                 'streams_12m': playlist_data['streams_12m'],
@@ -1386,46 +1548,34 @@ async def sync_to_campaign_playlists(campaign_id, scrape_data):
             
             playlist_records.append(record)
         
-        # Batch insert
-        insert_url = f"{SUPABASE_URL}/rest/v1/campaign_playlists"
-        insert_response = requests.post(insert_url, headers=headers, json=playlist_records)
-        
-        if insert_response.status_code not in [200, 201]:
-            logger.error(f"[{campaign_id}] Failed to sync playlists: {insert_response.status_code} - {insert_response.text}")
-            return False
-        
         vendor_match_info = f", {vendor_matched_count} vendor-matched" if vendor_matched_count > 0 else ""
-        logger.info(f"[{campaign_id}] ✓ Synced {len(playlist_records)} playlists ({algorithmic_count} algorithmic, {vendor_count} vendor{vendor_match_info})")
+        logger.info(f"[{campaign_id}] Syncing {len(playlist_records)} playlists ({algorithmic_count} algorithmic, {vendor_count} vendor{vendor_match_info})")
         
-        # After successful sync, save performance entries for historical tracking
-        await save_performance_entries(campaign_id, playlist_records, headers)
-        
-        return True
+        # Upsert (possibly batched with other campaigns); performance entries follow the flush
+        handed_to_batcher = True
+        return await get_playlist_batcher().add(campaign_id, playlist_records, on_flushed)
         
     except Exception as e:
         logger.error(f"[{campaign_id}] Error syncing playlists: {e}")
         import traceback
         traceback.print_exc()
+        # Once queued, the batcher runs on_flushed itself
+        if on_flushed and not handed_to_batcher:
+            await on_flushed(False)
         return False
 
 
-async def save_performance_entries(campaign_id, playlist_records, headers):
+async def save_performance_entries(playlist_rows):
     """
     Save daily performance entries for historical tracking.
     This allows us to show streaming performance history over time.
+    
+    playlist_rows are campaign_playlists rows as returned by the upsert
+    (return=representation), so their ids are already known.
     """
+    db = get_db()
     try:
-        # First, get the campaign_playlists IDs we just created
-        get_url = f"{SUPABASE_URL}/rest/v1/campaign_playlists"
-        get_params = {'campaign_id': f'eq.{campaign_id}', 'select': 'id,playlist_name,streams_24h'}
-        
-        response = requests.get(get_url, headers=headers, params=get_params)
-        if response.status_code != 200:
-            logger.warning(f"[{campaign_id}] Could not fetch playlist IDs for performance entries")
-            return
-        
-        playlists = response.json()
-        if not playlists:
+        if not playlist_rows:
             return
         
         # Get today's date
@@ -1433,8 +1583,8 @@ async def save_performance_entries(campaign_id, playlist_records, headers):
         
         # Create performance entries for each playlist
         performance_entries = []
-        for playlist in playlists:
-            if playlist['streams_24h'] and playlist['streams_24h'] > 0:
+        for playlist in playlist_rows:
+            if playlist.get('streams_24h') and playlist['streams_24h'] > 0:
                 performance_entries.append({
                     'campaign_id': None,  # campaign_playlists.campaign_id is integer, but performance_entries expects UUID - leaving null for now
                     'playlist_id': playlist['id'],  # This is the UUID from campaign_playlists
@@ -1446,28 +1596,23 @@ async def save_performance_entries(campaign_id, playlist_records, headers):
             return
         
         # Use upsert to avoid duplicates if run multiple times in a day
-        insert_url = f"{SUPABASE_URL}/rest/v1/performance_entries"
         # Add Prefer header for upsert on conflict
-        upsert_headers = {**headers, 'Prefer': 'resolution=merge-duplicates'}
+        upsert_headers = {'Prefer': 'resolution=merge-duplicates'}
         
-        insert_response = requests.post(insert_url, headers=upsert_headers, json=performance_entries)
+        insert_response = await db.post('performance_entries', headers=upsert_headers, json=performance_entries)
         
         if insert_response.status_code in [200, 201]:
-            logger.info(f"[{campaign_id}] ✓ Saved {len(performance_entries)} performance entries for {today}")
+            logger.info(f"✓ Saved {len(performance_entries)} performance entries for {today}")
         else:
-            logger.warning(f"[{campaign_id}] Could not save performance entries: {insert_response.status_code}")
+            logger.warning(f"Could not save performance entries: {insert_response.status_code}")
             
     except Exception as e:
-        logger.warning(f"[{campaign_id}] Error saving performance entries: {e}")
+        logger.warning(f"Error saving performance entries: {e}")
 
 
 async def sync_campaign_regions(campaign_id, scrape_data):
     """Sync scraped location/region data to the campaign_regions table."""
-    headers = {
-        'apikey': SUPABASE_SERVICE_ROLE_KEY,
-        'Authorization': f'Bearer {SUPABASE_SERVICE_ROLE_KEY}',
-        'Content-Type': 'application/json'
-    }
+    db = get_db()
 
     try:
         regions = scrape_data.get('regions', [])
@@ -1475,9 +1620,8 @@ async def sync_campaign_regions(campaign_id, scrape_data):
             return True
 
         # Delete existing region records for this campaign
-        delete_url = f"{SUPABASE_URL}/rest/v1/campaign_regions"
         delete_params = {'campaign_id': f'eq.{campaign_id}'}
-        delete_response = requests.delete(delete_url, headers=headers, params=delete_params)
+        delete_response = await db.delete('campaign_regions', params=delete_params)
         if delete_response.status_code not in [200, 204]:
             logger.warning(f"[{campaign_id}] Could not delete old regions: {delete_response.status_code}")
 
@@ -1492,8 +1636,7 @@ async def sync_campaign_regions(campaign_id, scrape_data):
             })
 
         # Batch insert
-        insert_url = f"{SUPABASE_URL}/rest/v1/campaign_regions"
-        insert_response = requests.post(insert_url, headers=headers, json=region_records)
+        insert_response = await db.post('campaign_regions', json=region_records)
 
         if insert_response.status_code not in [200, 201]:
             logger.error(f"[{campaign_id}] Failed to sync regions: {insert_response.status_code} - {insert_response.text}")
@@ -1502,7 +1645,7 @@ async def sync_campaign_regions(campaign_id, scrape_data):
         logger.info(f"[{campaign_id}] ✓ Synced {len(region_records)} regions")
 
         # Save daily history snapshot
-        await save_regions_history(campaign_id, region_records, headers)
+        await save_regions_history(campaign_id, region_records)
 
         return True
 
@@ -1513,7 +1656,7 @@ async def sync_campaign_regions(campaign_id, scrape_data):
         return False
 
 
-async def save_regions_history(campaign_id, region_records, headers):
+async def save_regions_history(campaign_id, region_records):
     """Save daily region snapshots to campaign_regions_history for trend tracking."""
     try:
         today = datetime.now(timezone.utc).strftime('%Y-%m-%d')
@@ -1531,9 +1674,7 @@ async def save_regions_history(campaign_id, region_records, headers):
         if not history_entries:
             return
 
-        upsert_url = f"{SUPABASE_URL}/rest/v1/campaign_regions_history"
         upsert_headers = {
-            **headers,
             'Prefer': 'resolution=merge-duplicates',
         }
         upsert_params = {
@@ -1545,7 +1686,7 @@ async def save_regions_history(campaign_id, region_records, headers):
         saved = 0
         for i in range(0, len(history_entries), batch_size):
             batch = history_entries[i:i + batch_size]
-            response = requests.post(upsert_url, headers=upsert_headers, json=batch, params=upsert_params)
+            response = await get_db().post('campaign_regions_history', headers=upsert_headers, json=batch, params=upsert_params)
             if response.status_code in [200, 201]:
                 saved += len(batch)
             else:
@@ -1558,6 +1699,143 @@ async def save_regions_history(campaign_id, region_records, headers):
         logger.warning(f"[{campaign_id}] Error saving region history: {e}")
 
 
+async def save_unchanged_daily_history(campaign, scrape_data):
+    """Daily history for a campaign whose numbers did not move.
+
+    The heavy syncs are skipped, but the history tables still get today's
+    rows: one scraped_data snapshot, region history from the scraped
+    regions, and performance entries for the campaign's existing playlists.
+    """
+    campaign_id = campaign['id']
+    await save_to_scraped_data_table(campaign, scrape_data)
+    region_records = [
+        {'campaign_id': campaign_id, 'country': r.get('country', 'Unknown'), 'streams_28d': r.get('streams', 0)}
+        for r in scrape_data.get('regions', [])
+    ]
+    await save_regions_history(campaign_id, region_records)
+    try:
+        resp = await get_db().get('campaign_playlists', params={
+            'campaign_id': f'eq.{campaign_id}',
+            'select': 'id,streams_24h',
+        })
+        if resp.status_code == 200:
+            await save_performance_entries(resp.json() or [])
+    except Exception as e:
+        logger.warning(f"[{campaign_id}] Could not save performance entries: {e}")
+
+
+async def persist_unchanged_campaign(campaign, data):
+    """Write path for a scrape identical to the stored one: touch last_scraped_at only.
+
+    The first unchanged scrape of a UTC day also records today's history rows.
+    """
+    campaign_id = campaign['id']
+    today = datetime.now(timezone.utc).strftime('%Y-%m-%d')
+    update_data = {'last_scraped_at': data['last_scraped_at']}
+    history_due = _snapshots.history_date(campaign_id) != today
+    if history_due:
+        update_data['scrape_history_date'] = today
+    
+    response = await get_db().patch('spotify_campaigns', params={'id': f'eq.{campaign_id}'}, json=update_data)
+    if response.status_code not in [200, 204]:
+        logger.error(f"[{campaign_id}] Database update failed: {response.status_code} - {response.text}")
+        return False
+    _snapshots.update(campaign_id, update_data)
+    logger.info(f"[{campaign_id}] ⏭️  Unchanged since last scrape - only last_scraped_at updated")
+    
+    if history_due:
+        await save_unchanged_daily_history(campaign, data.get('scrape_data', {}))
+    return True
+
+
+async def save_scrape_fingerprint(campaign_id, fingerprint):
+    """Mark the stored scrape complete: written only once playlists and regions are synced."""
+    response = await get_db().patch(
+        'spotify_campaigns', params={'id': f'eq.{campaign_id}'}, json={'scrape_fingerprint': fingerprint}
+    )
+    if response.status_code not in [200, 204]:
+        logger.warning(f"[{campaign_id}] Could not store scrape fingerprint: {response.status_code} - {response.text}")
+        return False
+    _snapshots.update(campaign_id, {'scrape_fingerprint': fingerprint})
+    return True
+
+
+def is_unchanged_scrape(campaign, data):
+    """Same fingerprint as the stored scrape, and the stored trend already settled.
+
+    scrape_data.previous drives the scheduler's hot/stagnant tiers, so while
+    it still differs from the current numbers one more full write is needed
+    to let the campaign settle into the stagnant tier.
+    """
+    if not WRITE_AVOIDANCE_ENABLED or _snapshots is None:
+        return False
+    if _snapshots.fingerprint(campaign['id']) != data.get('scrape_fingerprint'):
+        return False
+    previous = campaign.get('previous') or {}
+    return all((previous.get(f) or 0) == (data.get(f) or 0) for f in ('streams_24h', 'streams_7d', 'streams_12m'))
+
+
+async def persist_campaign_result(item):
+    """Write-behind handler: persist one scraped campaign.
+
+    Runs on a persistence worker while the browser moves on to the next
+    campaign. Returns True when the raw campaign update succeeded.
+    """
+    campaign, data = item
+    token = METRICS.set_campaign(campaign['id'])
+    try:
+        async with METRICS.span('persist.total'):
+            return await _persist_campaign_result(campaign, data)
+    finally:
+        METRICS.reset_campaign(token)
+
+
+async def _persist_campaign_result(campaign, data):
+    scrape_data = data.get('scrape_data', {})
+    data['scrape_fingerprint'] = scrape_fingerprint(scrape_data)
+    
+    if is_unchanged_scrape(campaign, data):
+        async with METRICS.span('persist.unchanged'):
+            saved = await persist_unchanged_campaign(campaign, data)
+        if not saved:
+            return False
+        # Goals can be edited in the UI, so the campaign is still evaluated
+        if _goal_evaluator:
+            await _goal_evaluator.add(campaign)
+        if _checkpoint:
+            _checkpoint.record(campaign['id'], STATUS_DONE)
+        return True
+    
+    data['scrape_history_date'] = datetime.now(timezone.utc).strftime('%Y-%m-%d')
+    # The fingerprint lets the next identical scrape skip playlists and regions, so the
+    # campaign row clears it now and gets the new one after those syncs succeed
+    fingerprint = data['scrape_fingerprint']
+    data['scrape_fingerprint'] = None
+    async with METRICS.span('persist.campaign'):
+        updated = await update_campaign_in_database(campaign['id'], data)
+    if not updated:
+        return False
+    async with METRICS.span('persist.scraped_data'):
+        await save_to_scraped_data_table(campaign, scrape_data)
+    async with METRICS.span('persist.regions'):
+        regions_synced = await sync_campaign_regions(campaign['id'], scrape_data)
+    
+    async def on_playlists_flushed(ok):
+        # Goal evaluation reads campaign_playlists, so the campaign is registered once its rows are flushed
+        if _goal_evaluator:
+            await _goal_evaluator.add(campaign)
+        # Only a written batch completes the campaign: --resume re-scrapes one lost to a crash or failed upsert
+        if ok and _checkpoint:
+            _checkpoint.record(campaign['id'], STATUS_DONE)
+        if ok and regions_synced and WRITE_AVOIDANCE_ENABLED and _snapshots is not None:
+            await save_scrape_fingerprint(campaign['id'], fingerprint)
+    
+    # Playlist sync failures still count as success (raw data is saved).
+    async with METRICS.span('persist.playlists'):
+        await sync_to_campaign_playlists(campaign['id'], scrape_data, on_flushed=on_playlists_flushed)
+    return True
+
+
 def get_directory_size(path):
     """Get total size of directory in bytes"""
     import shutil
@@ -1598,355 +1876,327 @@ def clear_browser_data_if_needed(user_data_dir, max_size_mb=500):
         return False
 
 
-def clear_browser_profile_locks(user_data_dir):
-    """Remove stale Chromium singleton lock files if present"""
-    lock_files = [
-        os.path.join(user_data_dir, 'SingletonLock'),
-        os.path.join(user_data_dir, 'SingletonSocket'),
-        os.path.join(user_data_dir, 'SingletonCookie'),
-    ]
-    removed = False
-    for lock_path in lock_files:
-        try:
-            if os.path.exists(lock_path):
-                os.remove(lock_path)
-                removed = True
-        except Exception as e:
-            logger.warning(f"⚠️  Could not remove lock file {lock_path}: {e}")
-    if removed:
-        logger.info("🧹 Removed stale Chromium profile lock files")
-
-
 async def launch_browser_context(playwright, user_data_dir, headless):
-    """Launch a fresh browser context with all stability and stealth args"""
-    clear_browser_profile_locks(user_data_dir)
-    
-    # STEALTH MODE: Enhanced args to hide automation detection
-    # This prevents "Chrome is being controlled by automated test software" detection
-    stealth_args = [
-        # Core automation hiding
-        '--disable-blink-features=AutomationControlled',
-        '--disable-infobars',  # Removes the automation info bar
-        '--disable-automation',  # Disables automation extension
-        '--disable-browser-side-navigation',
-        '--disable-web-security',
-        
-        # Memory/stability args
-        '--disable-dev-shm-usage',
-        '--no-sandbox',
-        '--disable-setuid-sandbox',
-        '--disable-gpu',
-        '--disable-software-rasterizer',
-        '--disable-extensions',
-        '--disable-background-networking',
-        '--disable-background-timer-throttling',
-        '--disable-backgrounding-occluded-windows',
-        '--disable-breakpad',
-        '--disable-component-extensions-with-background-pages',
-        '--disable-features=TranslateUI',
-        '--disable-ipc-flooding-protection',
-        '--disable-renderer-backgrounding',
-        '--force-color-profile=srgb',
-        '--metrics-recording-only',
-        '--no-first-run',
-        '--password-store=basic',
-        '--use-mock-keychain',
-        '--disable-hang-monitor',
-        '--single-process',
-        '--disable-features=site-per-process',
-        
-        # Additional stealth flags
-        '--excludeSwitches=enable-automation',
-        '--useAutomationExtension=false',
-    ]
-    
+    """Launch a fresh browser context with all stability and stealth args.
+
+    The caller must hold the profile lease (launch_lease), which also cleared stale Singleton* locks.
+    Args, viewport and user agent come from app.stealth, shared with the keepalive and browser host.
+    """
     # Launch with persistent context (maintains session across runs)
     context = await playwright.chromium.launch_persistent_context(
         user_data_dir=user_data_dir,
         headless=headless,
-        args=stealth_args,
+        # STEALTH MODE: hides "Chrome is being controlled by automated test software"
+        args=STEALTH_ARGS,
         # Add timeout to prevent hanging
         timeout=60000,
-        # Additional stealth: Set realistic viewport and user agent
-        viewport={'width': 1920, 'height': 1080},
-        user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
+        viewport=VIEWPORT,
+        user_agent=USER_AGENT,
         # Ignore HTTPS errors to avoid SSL issues
         ignore_https_errors=True,
     )
     
+    await prepare_context(context)
+    return context
+
+
+async def prepare_context(context):
+    """Request routing and stealth hooks for a context we launched (and own)."""
+    # Skip resources the extractors never read (shorter networkidle, smaller profile)
+    await REQUEST_POLICY.install(context)
+    
     # CRITICAL: Inject stealth scripts to hide webdriver property
     for page in context.pages:
         await apply_stealth_scripts(page)
     
     # Hook into new pages to apply stealth scripts
     context.on('page', lambda page: asyncio.create_task(apply_stealth_scripts(page)))
-    
-    return context
+
+
+async def prepare_own_tab(page, supervisor):
+    """Routing and crash watch for a tab we opened on the browser host's shared context.
+
+    The context also holds the host's, keepalive's and roster jobs' tabs, so
+    nothing is installed context-wide; the host already adds STEALTH_JS to it.
+    """
+    await REQUEST_POLICY.install(page)
+    supervisor.watch_page(page)
 
 
 async def apply_stealth_scripts(page):
     """Apply JavaScript patches to hide automation detection"""
     try:
-        # Remove webdriver property
-        await page.add_init_script("""
-            // Overwrite navigator.webdriver
-            Object.defineProperty(navigator, 'webdriver', {
-                get: () => undefined
-            });
-            
-            // Remove automation indicators from window
-            delete window.cdc_adoQpoasnfa76pfcZLmcfl_Array;
-            delete window.cdc_adoQpoasnfa76pfcZLmcfl_Promise;
-            delete window.cdc_adoQpoasnfa76pfcZLmcfl_Symbol;
-            
-            // Overwrite chrome runtime to hide automation
-            if (window.chrome) {
-                window.chrome.runtime = {
-                    connect: () => {},
-                    sendMessage: () => {},
-                    onMessage: { addListener: () => {} }
-                };
-            }
-            
-            // Override permissions query to always return 'granted' for notifications
-            const originalQuery = window.navigator.permissions.query;
-            window.navigator.permissions.query = (parameters) => (
-                parameters.name === 'notifications' ?
-                    Promise.resolve({ state: Notification.permission }) :
-                    originalQuery(parameters)
-            );
-            
-            // Make plugins array look realistic
-            Object.defineProperty(navigator, 'plugins', {
-                get: () => [
-                    { name: 'Chrome PDF Viewer', filename: 'internal-pdf-viewer' },
-                    { name: 'Chrome PDF Plugin', filename: 'mhjfbmdgcfjbbpaeojofohoefgiehjai' },
-                    { name: 'Native Client', filename: 'internal-nacl-plugin' }
-                ]
-            });
-            
-            // Make languages array realistic
-            Object.defineProperty(navigator, 'languages', {
-                get: () => ['en-US', 'en']
-            });
-        """)
+        await page.add_init_script(STEALTH_JS)
         logger.debug("Applied stealth scripts to page")
     except Exception as e:
         logger.warning(f"Could not apply stealth scripts: {e}")
 
 
-async def process_batch(campaigns, batch_num, total_batches, user_data_dir, headless):
-    """Process a batch of campaigns with a fresh browser instance.
+async def _retry_after_login(page, spotify_page, campaign, guard):
+    """Retry a campaign once after the session was recovered."""
+    try:
+        data = await scrape_campaign(page, spotify_page, campaign)
+    except PageNotFoundError:
+        logger.warning(f"[{campaign['id']}] ⚠️ Page not found (404) - SKIPPING to preserve existing data")
+        return 'skipped', None
+    except Exception as retry_error:
+        logger.error(f"[{campaign['id']}] Retry failed: {retry_error}")
+        guard.dead = True
+        return 'session_dead', None
+    return ('ok', data) if data else ('failed', None)
+
+
+async def scrape_campaign_with_recovery(page, spotify_page, campaign, guard):
+    """Scrape one campaign, coordinating session expiry with the other tabs.
+    
+    Returns (status, data) where status is 'ok', 'failed', 'skipped' (404)
+    or 'session_dead' (manual login timed out / CAPTCHA - stop the batch).
+    """
+    generation = guard.generation
+    try:
+        data = await scrape_campaign(page, spotify_page, campaign)
+        
+        if not data:
+            # Check if we got redirected to login
+            current_url = page.url
+            if 'login' in current_url.lower() or 'accounts.spotify.com' in current_url:
+                if not await guard.recover(page, generation):
+                    return 'session_dead', None
+                return await _retry_after_login(page, spotify_page, campaign, guard)
+            elif 'challenge' in current_url.lower():
+                logger.error(f"[{campaign['id']}] ❌ CAPTCHA challenge detected")
+                logger.error("⚠️  Please solve CAPTCHA via VNC and restart scraper.")
+                guard.dead = True
+                return 'session_dead', None
+            return 'failed', None
+        return 'ok', data
+        
+    except SessionExpiredError as e:
+        logger.error(f"[{campaign['id']}] Error during scrape: {e}")
+        if not await guard.recover(page, generation):
+            return 'session_dead', None
+        return await _retry_after_login(page, spotify_page, campaign, guard)
+    except PageNotFoundError:
+        # Song page doesn't exist (404) - skip without overwriting data
+        logger.warning(f"[{campaign['id']}] ⚠️ Page not found (404) - SKIPPING to preserve existing data")
+        logger.warning(f"[{campaign['id']}] URL: {campaign.get('sfa', 'unknown')}")
+        async with METRICS.span('sleep.error_backoff'):
+            await asyncio.sleep(1)
+        return 'skipped', None
+    except Exception as e:
+        error_msg = str(e)
+        logger.error(f"[{campaign['id']}] Error during scrape: {e}")
+        
+        # Check if this is a session expiry error
+        if 'SESSION_EXPIRED' in error_msg or 'login' in error_msg.lower():
+            if not await guard.recover(page, generation):
+                return 'session_dead', None
+            return await _retry_after_login(page, spotify_page, campaign, guard)
+        # Other error - try to continue with next campaign
+        async with METRICS.span('sleep.error_backoff'):
+            await asyncio.sleep(3)
+        return 'failed', None
+
+
+async def scrape_worker(worker_id, page, spotify_page, work_queue, guard, persist_queue, counts, batch_num, batch_size):
+    """Scrape campaigns from the shared batch queue on one browser tab."""
+    while not guard.dead and not counts['browser_dead']:
+        try:
+            i, campaign = work_queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        
+        logger.info(f"[Batch {batch_num}: {i}/{batch_size}] [tab {worker_id}] Processing campaign {campaign['id']}")
+        
+        # CRITICAL: Check if browser is still alive before each campaign
+        if page.is_closed():
+            logger.error(f"⚠️  Browser tab {worker_id} closed unexpectedly! Stopping batch...")
+            counts['browser_dead'] = True
+            counts['failed'] += 1
+            return
+        
+        # Spans recorded on this tab are attributed to the campaign
+        token = METRICS.set_campaign(campaign['id'])
+        try:
+            async with METRICS.span('scrape.total'):
+                status, data = await scrape_campaign_with_recovery(page, spotify_page, campaign, guard)
+        finally:
+            METRICS.reset_campaign(token)
+        
+        if status == 'ok':
+            # Hand off to the persistence workers; blocks only if the DB is behind
+            await persist_queue.put((campaign, data))
+            counts['success'] += 1
+        elif status == 'skipped':
+            # Count as skipped (not success and not failure)
+            counts['skipped'] += 1
+            if _checkpoint:
+                _checkpoint.record(campaign['id'], STATUS_NOT_FOUND)
+        else:
+            counts['failed'] += 1
+        
+        logger.info("")
+
+
+async def process_batch(campaigns, batch_num, total_batches, supervisor, persist_queue, rate_limiter=None):
+    """Process a batch of campaigns on the supervised browser context.
     
     IMPORTANT: This function now operates in SESSION-ONLY mode.
     It requires a valid session established via manual VNC login.
     Automated login is disabled because it triggers bot detection.
+    
+    The context is shared across batches; the login check only runs right
+    after the supervisor (re)launched it. After the batch the supervisor
+    samples browser memory and tab health and recycles the context if a
+    threshold was crossed or a crash was seen.
+    
+    Up to SCRAPE_WORKERS tabs in the same logged-in context pull campaigns
+    from a shared queue. Navigations are paced by the shared rate_limiter,
+    so tabs only overlap their page-wait time, not their request rate.
+    
+    Scraped results are handed to persist_queue (write-behind), so the
+    returned success count is campaigns scraped and queued for writing;
+    DB write outcomes are tallied by the queue itself.
     """
     logger.info("")
     logger.info("="*60)
     logger.info(f"BATCH {batch_num}/{total_batches} - Processing {len(campaigns)} campaigns")
     logger.info("="*60)
     
-    success_count = 0
-    failure_count = 0
-    skipped_count = 0
-    session_expired = False
-    
-    # Launch fresh browser for this batch
-    playwright = await async_playwright().start()
+    counts = {'success': 0, 'failed': 0, 'skipped': 0, 'browser_dead': False}
+    guard = SessionGuard()
+    pages = []
+    own_first_tab = False
     
     try:
-        context = await launch_browser_context(playwright, user_data_dir, headless)
-        page = context.pages[0] if context.pages else await context.new_page()
-        
-        # Apply stealth scripts to the page
-        await apply_stealth_scripts(page)
-        
-        # Check if we already have a valid session
-        already_logged_in = await check_if_logged_in(page)
-        
-        if not already_logged_in:
-            # SESSION-ONLY MODE: Do not attempt automated login
-            # Automated login triggers bot detection every time
-            logger.error("="*60)
-            logger.error("❌ NO VALID SESSION FOUND")
-            logger.error("="*60)
-            logger.error("Automated login is DISABLED because it triggers bot detection.")
-            logger.error("Please log in manually via VNC and run the scraper again:")
-            logger.error("  1. Connect to VNC: artistinfluence:99")
-            logger.error("  2. Run: cd /root/arti-marketing-ops/spotify_scraper && python3 manual_browser_login.py")
-            logger.error("  3. Complete the login manually (including CAPTCHA if needed)")
-            logger.error("  4. Run the scraper again")
-            logger.error("="*60)
-            return 0, len(campaigns)  # All campaigns in batch failed
-        
-        logger.info("✓ Valid session found - proceeding with scraping")
-        logger.info("  (Automated re-login is disabled to avoid bot detection)")
-        # Clear session-expired flag so dashboard shows Active after this run
-        session_flag = Path(__file__).parent / 'logs' / 'session_expired.flag'
-        if session_flag.exists():
-            try:
-                session_flag.unlink()
-                logger.info("  Cleared session_expired.flag (session is valid)")
-            except Exception:
-                pass
-        # Create Spotify page helper
-        spotify_page = SpotifyArtistsPage(page)
-        
-        # Scrape each campaign in this batch
-        for i, campaign in enumerate(campaigns, 1):
-            # Skip remaining campaigns if session expired
-            if session_expired:
-                failure_count += 1
-                continue
-                
-            logger.info(f"[Batch {batch_num}: {i}/{len(campaigns)}] Processing campaign {campaign['id']}")
+        context, fresh = await supervisor.acquire()
+        # A host-attached context (context.browser is set; a persistent launch has none)
+        # also holds the host's and other jobs' tabs: always open our own
+        own_first_tab = getattr(context, 'browser', None) is not None
+        page = context.pages[0] if context.pages and not own_first_tab else await context.new_page()
+        pages.append(page)
+        if own_first_tab:
+            await prepare_own_tab(page, supervisor)
+        
+        if fresh:
+            # Apply stealth scripts to the page
+            await apply_stealth_scripts(page)
             
-            # CRITICAL: Check if browser is still alive before each campaign
-            try:
-                if context.pages:
-                    test_page = context.pages[0]
-                    if test_page.is_closed():
-                        logger.error(f"⚠️  Browser context died! Breaking batch...")
-                        raise Exception("Browser context closed unexpectedly")
-                else:
-                    logger.error(f"⚠️  No pages in context! Browser may have crashed.")
-                    raise Exception("No pages in browser context")
-            except Exception as browser_check_error:
-                logger.error(f"❌ Browser health check failed: {browser_check_error}")
-                failure_count += len(campaigns) - i + 1
-                break
+            # Check if we already have a valid session
+            already_logged_in = await check_if_logged_in(page)
             
-            # Scrape data - NO re-login attempts
-            data = None
-            try:
-                data = await scrape_campaign(page, spotify_page, campaign)
-                
-                if not data:
-                    # Check if we got redirected to login
-                    current_url = page.url
-                    if 'login' in current_url.lower() or 'accounts.spotify.com' in current_url:
-                        if await handle_session_expired(page):
-                            # Retry once after manual login
-                            try:
-                                data = await scrape_campaign(page, spotify_page, campaign)
-                            except Exception as retry_error:
-                                logger.error(f"[{campaign['id']}] Retry failed: {retry_error}")
-                                session_expired = True
-                                failure_count += 1
-                                continue
-                        else:
-                            session_expired = True
-                            failure_count += 1
-                            continue
-                    elif 'challenge' in current_url.lower():
-                        logger.error(f"[{campaign['id']}] ❌ CAPTCHA challenge detected")
-                        logger.error("⚠️  Please solve CAPTCHA via VNC and restart scraper.")
-                        session_expired = True
-                        failure_count += 1
-                        continue
-                        
-            except SessionExpiredError as e:
-                logger.error(f"[{campaign['id']}] Error during scrape: {e}")
-                if await handle_session_expired(page):
-                    # Retry once after manual login
-                    try:
-                        data = await scrape_campaign(page, spotify_page, campaign)
-                    except Exception as retry_error:
-                        logger.error(f"[{campaign['id']}] Retry failed: {retry_error}")
-                        session_expired = True
-                        failure_count += 1
-                        continue
-                else:
-                    session_expired = True
-                    failure_count += 1
-                    continue
-            except PageNotFoundError as e:
-                # Song page doesn't exist (404) - skip without overwriting data
-                logger.warning(f"[{campaign['id']}] ⚠️ Page not found (404) - SKIPPING to preserve existing data")
-                logger.warning(f"[{campaign['id']}] URL: {campaign.get('sfa', 'unknown')}")
-                # Count as skipped (not success and not failure)
-                skipped_count += 1
-                await asyncio.sleep(1)
-                continue
-            except Exception as e:
-                error_msg = str(e)
-                logger.error(f"[{campaign['id']}] Error during scrape: {e}")
-                
-                # Check if this is a session expiry error
-                if 'SESSION_EXPIRED' in error_msg or 'login' in error_msg.lower():
-                    if await handle_session_expired(page):
-                        # Retry once after manual login
-                        try:
-                            data = await scrape_campaign(page, spotify_page, campaign)
-                        except Exception as retry_error:
-                            logger.error(f"[{campaign['id']}] Retry failed: {retry_error}")
-                            session_expired = True
-                            failure_count += 1
-                            continue
-                    else:
-                        session_expired = True
-                        failure_count += 1
-                        continue
-                else:
-                    # Other error - try to continue with next campaign
-                    failure_count += 1
-                    await asyncio.sleep(3)
-                    continue
-            
-            if data:
-                if await update_campaign_in_database(campaign['id'], data):
-                    scrape_data = data.get('scrape_data', {})
-                    await save_to_scraped_data_table(campaign, scrape_data)
-                    if await sync_to_campaign_playlists(campaign['id'], scrape_data):
-                        success_count += 1
-                    else:
-                        success_count += 1  # Still count as success
-                    await sync_campaign_regions(campaign['id'], scrape_data)
-                    await check_and_complete_campaign(campaign, data)
-                else:
-                    failure_count += 1
-            else:
-                failure_count += 1
-            
-            logger.info("")
+            if not already_logged_in:
+                # SESSION-ONLY MODE: Do not attempt automated login
+                # Automated login triggers bot detection every time
+                logger.error("="*60)
+                logger.error("❌ NO VALID SESSION FOUND")
+                logger.error("="*60)
+                logger.error("Automated login is DISABLED because it triggers bot detection.")
+                logger.error("Please log in manually via VNC and run the scraper again:")
+                logger.error("  1. Connect to VNC: artistinfluence:99")
+                logger.error("  2. Run: cd /root/arti-marketing-ops/spotify_scraper && python3 manual_browser_login.py")
+                logger.error("  3. Complete the login manually (including CAPTCHA if needed)")
+                logger.error("  4. Run the scraper again")
+                logger.error("="*60)
+                return 0, len(campaigns)  # All campaigns in batch failed
             
-            if i < len(campaigns):
-                await asyncio.sleep(2)
+            logger.info("✓ Valid session found - proceeding with scraping")
+            logger.info("  (Automated re-login is disabled to avoid bot detection)")
+            # Clear session-expired flag so dashboard shows Active after this run
+            session_flag = LOGS_DIR / 'session_expired.flag'
+            if session_flag.exists():
+                try:
+                    session_flag.unlink()
+                    logger.info("  Cleared session_expired.flag (session is valid)")
+                except Exception:
+                    pass
         
+        # Shared work queue for this batch
+        work_queue = asyncio.Queue()
+        for i, campaign in enumerate(campaigns, 1):
+            work_queue.put_nowait((i, campaign))
+        
+        # One tab per worker; extra tabs get stealth scripts from the context 'page' hook
+        # (or the host's init script when attached)
+        worker_count = max(1, min(SCRAPE_WORKERS, len(campaigns)))
+        for _ in range(worker_count - 1):
+            pages.append(await context.new_page())
+            if own_first_tab:
+                await prepare_own_tab(pages[-1], supervisor)
+        if worker_count > 1:
+            logger.info(f"Scraping with {worker_count} tabs in parallel")
+        
+        results = await asyncio.gather(
+            *(
+                scrape_worker(
+                    n, tab, SpotifyArtistsPage(tab, rate_limiter=rate_limiter, capture_responses=S4A_CAPTURE_RESPONSES),
+                    work_queue, guard, persist_queue, counts, batch_num, len(campaigns)
+                )
+                for n, tab in enumerate(pages, 1)
+            ),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"❌ Scrape worker crashed: {result}")
+                counts['failed'] += 1
+        
+        # Campaigns never picked up (session died / browser crashed) count as failed
+        counts['failed'] += work_queue.qsize()
+        
+    except PlaywrightError as e:
+        # Launch failures and a dying browser end the batch; the context is relaunched next batch
+        logger.error(f"❌ Browser error in batch {batch_num}: {e}")
+        supervisor.mark_crashed(f"batch error: {e}")
+        counts['failed'] = len(campaigns) - counts['success'] - counts['skipped']
+    except Exception as e:
+        # Not a browser failure (e.g. a bug or a busy profile): the context is kept
+        logger.error(f"❌ Batch {batch_num} failed: {e!r}", exc_info=True)
+        counts['failed'] = len(campaigns) - counts['success'] - counts['skipped']
     finally:
-        # Always cleanup browser
-        try:
-            await context.close()
-        except:
-            pass
-        await playwright.stop()
+        supervisor.note_campaigns(counts['success'] + counts['failed'] + counts['skipped'])
+        if counts['browser_dead']:
+            supervisor.mark_crashed('tab closed unexpectedly')
+        # Health/memory check on the tabs this batch used, then close the tabs we opened
+        await supervisor.check(pages)
+        for tab in (pages if own_first_tab else pages[1:]):
+            try:
+                if not tab.is_closed():
+                    await tab.close()
+            except Exception:
+                pass
     
-    if session_expired:
+    if guard.dead:
         logger.warning("="*60)
         logger.warning("⚠️  BATCH INCOMPLETE - Session expired during scraping")
         logger.warning("Please login via VNC and run the scraper again to continue.")
         logger.warning("="*60)
     
+    success_count = counts['success']
+    failure_count = counts['failed']
+    skipped_count = counts['skipped']
     skip_msg = f", {skipped_count} skipped (404)" if skipped_count > 0 else ""
-    logger.info(f"Batch {batch_num} complete: {success_count} success, {failure_count} failed{skip_msg}")
+    logger.info(f"Batch {batch_num} complete: {success_count} scraped (queued for DB), {failure_count} failed{skip_msg}")
     return success_count, failure_count
 
 
-async def main(limit=None):
+async def main(limit=None, scrape_all=False, resume=False):
     """Main scraper execution with batch processing to prevent browser crashes"""
+    global _checkpoint
+    _checkpoint = CheckpointJournal(CHECKPOINT_FILE)
     
-    # Create lock file so the dashboard and keepalive know we're running
-    LOCK_FILE = Path(__file__).parent / 'scraper.lock'
+    # Create lock file so the dashboard and keepalive know we're running.
+    # Line 1 is the PID (read by the shell wrappers and keepalive), line 2 the run id.
     try:
-        LOCK_FILE.write_text(str(os.getpid()))
-        logger.info(f"Lock file created: {LOCK_FILE} (PID {os.getpid()})")
+        LOCK_FILE.write_text(f"{os.getpid()}\n{_checkpoint.run_id}\n")
+        logger.info(f"Lock file created: {LOCK_FILE} (PID {os.getpid()}, run {_checkpoint.run_id})")
     except Exception as e:
         logger.warning(f"Could not create lock file: {e}")
     
     try:
-        return await _main_inner(limit)
+        return await _main_inner(limit, scrape_all, resume)
     finally:
+        await close_db()
         # Always remove lock file on exit
         try:
             LOCK_FILE.unlink(missing_ok=True)
@@ -1955,20 +2205,27 @@ async def main(limit=None):
             pass
 
 
-async def _main_inner(limit=None):
+async def _main_inner(limit=None, scrape_all=False, resume=False):
     """Inner main function (wrapped by main() for lock file management)"""
     
     # Configuration for batch processing
-    BATCH_SIZE = 15  # Process 15 campaigns per browser instance
-    MAX_BROWSER_DATA_MB = 500  # Clear browser data if larger than 500MB
+    BATCH_SIZE = 15  # Campaigns between browser memory/health checks
+    MAX_BROWSER_DATA_MB = 500  # Clear browser data if larger than 500MB (checked at launch)
     
     logger.info("="*60)
     logger.info("SPOTIFY FOR ARTISTS PRODUCTION SCRAPER")
-    logger.info("(Batch Processing Mode - Browser Restarts Every 15 Campaigns)")
+    logger.info("(Batch Processing Mode - Browser Recycled on Memory/Crash)")
     logger.info("="*60)
     logger.info(f"Supabase URL: {SUPABASE_URL}")
     logger.info(f"Spotify Email: {SPOTIFY_EMAIL}")
-    logger.info(f"Batch Size: {BATCH_SIZE} campaigns per browser instance")
+    logger.info(f"Batch Size: {BATCH_SIZE} campaigns per health check")
+    logger.info(f"Browser recycle limits: RSS {BROWSER_MAX_RSS_MB:.0f}MB, tab heap {BROWSER_MAX_HEAP_MB:.0f}MB, "
+                f"campaigns {BROWSER_MAX_CAMPAIGNS or 'unlimited'}")
+    logger.info(f"Browser host: {'attach if running (browser_host.py), else launch under the profile lease' if BROWSER_HOST_ENABLED else 'disabled - launch under the profile lease'}")
+    logger.info(f"Scrape tabs: {SCRAPE_WORKERS} (min {SCRAPE_MIN_NAV_INTERVAL:.1f}s between navigations)")
+    logger.info(f"S4A response capture: {'enabled (DOM fallback)' if S4A_CAPTURE_RESPONSES else 'disabled'}")
+    logger.info(f"Request routing: {'blocking ' + ','.join(sorted(REQUEST_POLICY.blocked_types)) + ' + analytics' if REQUEST_POLICY.enabled else 'disabled'}")
+    logger.info(f"Persistence: {PERSIST_WORKERS} write-behind worker(s), queue size {PERSIST_QUEUE_SIZE}")
     logger.info(f"Limit: {limit if limit else 'No limit (all campaigns)'}")
     logger.info("")
     
@@ -1984,7 +2241,7 @@ async def _main_inner(limit=None):
         return False
     
     # CHECK: Session keepalive status
-    session_flag_path = Path(__file__).parent / 'logs' / 'session_expired.flag'
+    session_flag_path = LOGS_DIR / 'session_expired.flag'
     if session_flag_path.exists():
         try:
             expired_at = session_flag_path.read_text().strip()
@@ -1999,7 +2256,7 @@ async def _main_inner(limit=None):
             logger.warning("Session expired flag exists but could not read timestamp")
     
     # Log last keepalive status
-    keepalive_log_path = Path(__file__).parent / 'logs' / 'keepalive.log'
+    keepalive_log_path = LOGS_DIR / 'keepalive.log'
     if keepalive_log_path.exists():
         try:
             # Read last few lines of keepalive log
@@ -2055,6 +2312,64 @@ async def _main_inner(limit=None):
     logger.info(f"✅ Found {len(campaigns)} campaigns to scrape")
     logger.info("")
     
+    # Keep the checkpoint journal bounded (a week is plenty for --resume)
+    _checkpoint.prune(keep_hours=max(168, RESUME_WINDOW_HOURS))
+    
+    # RESUME: skip campaigns an earlier (aborted) run already wrote to the DB
+    resumed_count = 0
+    if resume:
+        completed = _checkpoint.completed_since(RESUME_WINDOW_HOURS)
+        remaining_campaigns = [c for c in campaigns if c['id'] not in completed]
+        resumed_count = len(campaigns) - len(remaining_campaigns)
+        runs = sorted({completed[c['id']] for c in campaigns if c['id'] in completed})
+        logger.info(f"⏩ Resume: {resumed_count} campaigns already completed in the last {RESUME_WINDOW_HOURS:.0f}h"
+                    f"{' (runs ' + ', '.join(runs) + ')' if runs else ''}")
+        logger.info(f"   {len(remaining_campaigns)} campaigns remaining")
+        logger.info("")
+        campaigns = remaining_campaigns
+        if not campaigns:
+            logger.info("✅ Nothing left to resume")
+            log_scraper_run('success', campaigns_total=0, campaigns_success=0, campaigns_resumed=resumed_count)
+            return True
+    
+    # Freshness scheduling: skip campaigns that are not due yet
+    if SCHEDULER_ENABLED and not scrape_all:
+        scheduler = CampaignScheduler(
+            parse_goal_string,
+            normal_interval_hours=SCHEDULE_NORMAL_HOURS,
+            stagnant_interval_hours=SCHEDULE_STAGNANT_HOURS,
+            near_goal_ratio=SCHEDULE_NEAR_GOAL_RATIO,
+            hot_weekly_streams=SCHEDULE_HOT_WEEKLY_STREAMS,
+            budget_minutes=SCRAPE_RUN_BUDGET_MINUTES,
+            seconds_per_campaign=SCHEDULE_SECONDS_PER_CAMPAIGN,
+            parallel_workers=SCRAPE_WORKERS,
+        )
+        campaigns, plan = scheduler.plan(campaigns)
+        tiers = ', '.join(f"{tier}={count}" for tier, count in sorted(plan['tiers'].items()))
+        logger.info(f"📅 Scheduler: {plan['selected']}/{plan['total']} campaigns due this run ({tiers})")
+        if plan['not_due']:
+            logger.info(f"   {plan['not_due']} not due yet (scraped recently and not moving)")
+        if plan['over_budget']:
+            logger.warning(f"   {plan['over_budget']} due campaigns deferred - over the {SCRAPE_RUN_BUDGET_MINUTES:.0f} min run budget")
+        logger.info("")
+        
+        if not campaigns:
+            logger.info("✅ Nothing due this run")
+            log_scraper_run('success', campaigns_total=0, campaigns_success=0, campaigns_resumed=resumed_count)
+            return True
+    
+    # History chain tails for every campaign of this run, so each history write is a single POST
+    global _history_chains
+    try:
+        since = datetime.now(timezone.utc) - timedelta(days=HISTORY_TAIL_DAYS)
+        _history_chains = await load_history_chains(
+            get_db(), [c['id'] for c in campaigns], since, HISTORY_KEYFRAME_EVERY
+        )
+        logger.info(f"Loaded history chains for {len(_history_chains)}/{len(campaigns)} campaigns")
+    except Exception as e:
+        _history_chains = {}
+        logger.warning(f"Could not bulk-load history chains, reading them per campaign: {e}")
+    
     # Use headless mode based on environment
     # Default to headless=true on servers without a display
     display = os.getenv('DISPLAY')
@@ -2068,59 +2383,143 @@ async def _main_inner(limit=None):
     
     logger.info(f"Browser data directory: {user_data_dir}")
     
-    # CRASH PREVENTION: Clear browser data if it's too large
-    clear_browser_data_if_needed(user_data_dir, MAX_BROWSER_DATA_MB)
-    
     # Calculate batches
     total_campaigns = len(campaigns)
     total_batches = (total_campaigns + BATCH_SIZE - 1) // BATCH_SIZE
     
     logger.info(f"")
     logger.info(f"📦 Will process {total_campaigns} campaigns in {total_batches} batches")
-    logger.info(f"   Each batch gets a fresh browser to prevent memory issues")
+    logger.info(f"   One browser is reused across batches and recycled on memory/crash")
     logger.info(f"")
     
     total_success = 0
     total_failure = 0
     
-    # Process campaigns in batches
-    for batch_num in range(1, total_batches + 1):
-        batch_start = (batch_num - 1) * BATCH_SIZE
-        batch_end = min(batch_start + BATCH_SIZE, total_campaigns)
-        batch_campaigns = campaigns[batch_start:batch_end]
-        
-        # Process this batch with a fresh browser
-        success, failure = await process_batch(
-            batch_campaigns, 
-            batch_num, 
-            total_batches, 
-            user_data_dir, 
-            headless
-        )
-        
-        total_success += success
-        total_failure += failure
-        
-        # EARLY ABORT: If an entire batch failed with 0 successes, the session is dead
-        # Don't waste time looping through the remaining batches
-        if success == 0 and failure == len(batch_campaigns):
-            remaining = total_campaigns - batch_end
-            logger.error("="*60)
-            logger.error("ABORTING: Session invalid - no campaigns succeeded in this batch")
-            logger.error(f"  {remaining} campaigns were NOT scraped (still showing older 'last update' times)")
-            logger.error(f"  Skipping remaining {total_batches - batch_num} batches.")
-            logger.error("  Fix: Re-login via VNC (start_vnc_and_login.sh), then run the scraper again to update all.")
-            logger.error("="*60)
-            total_failure += remaining
-            break
-        
-        # Brief pause between batches to let memory settle
-        if batch_num < total_batches:
-            logger.info(f"⏸️  Pausing 5 seconds before next batch...")
-            await asyncio.sleep(5)
-            
-            # Check if browser data needs clearing between batches
+    # Write-behind persistence: DB writes for one campaign overlap the next page load
+    persist_queue = WriteBehindQueue(
+        persist_campaign_result,
+        workers=PERSIST_WORKERS,
+        maxsize=PERSIST_QUEUE_SIZE,
+    )
+    await persist_queue.start()
+    
+    # Goal completion is checked in batches; completion emails go out from their own queue
+    global _goal_evaluator, _email_queue
+    _email_queue = WriteBehindQueue(send_completion_email_item, workers=1, maxsize=100, name='email')
+    await _email_queue.start()
+    _goal_evaluator = GoalEvaluator(
+        get_db(), parse_goal_string,
+        notify=queue_completion_email,
+        batch_size=GOAL_EVAL_BATCH_SIZE,
+        snapshots=_snapshots,
+    )
+    
+    # One politeness limiter for the whole run, shared by every tab in every batch
+    rate_limiter = NavigationRateLimiter(SCRAPE_MIN_NAV_INTERVAL)
+    
+    # One Playwright instance and one supervised browser context for the whole run
+    playwright = await async_playwright().start()
+    
+    # Either attached to the shared browser host, or our own Chromium under the profile lease
+    browser_owner = {'host': None, 'lease': None}
+    
+    async def launch():
+        if BROWSER_HOST_ENABLED:
+            session = await attach_browser_host(playwright, user_data_dir, holder='scraper')
+            if session is not None:
+                # Routing and crash watch go on our own tabs only (prepare_own_tab)
+                browser_owner['host'] = session
+                return session.context
+        lease = await launch_lease(user_data_dir, 'scraper', timeout=BROWSER_LEASE_TIMEOUT_SECONDS)
+        if lease is None:
+            raise RuntimeError(f"Browser profile busy for {BROWSER_LEASE_TIMEOUT_SECONDS:.0f}s "
+                               f"(held by {Lease(lease_dir(user_data_dir), 'profile').holder_info()})")
+        browser_owner['lease'] = lease
+        try:
+            # CRASH PREVENTION: Clear browser data if it's too large (browser is closed here)
             clear_browser_data_if_needed(user_data_dir, MAX_BROWSER_DATA_MB)
+            return await launch_browser_context(playwright, user_data_dir, headless)
+        except Exception:
+            lease.release()
+            browser_owner['lease'] = None
+            raise
+    
+    async def close(context, reason):
+        session, lease = browser_owner['host'], browser_owner['lease']
+        browser_owner['host'] = browser_owner['lease'] = None
+        if session is not None:
+            # Memory limits: only the host can restart the shared Chromium (once nobody is attached)
+            if reason and reason.split(':')[0] in ('rss', 'heap', 'campaigns'):
+                request_restart(user_data_dir, reason)
+            await session.close()
+            return
+        try:
+            await context.close()
+        finally:
+            if lease is not None:
+                lease.release()
+    
+    supervisor = BrowserSupervisor(
+        launch,
+        rss_probe=lambda: chromium_rss_mb(user_data_dir),
+        max_rss_mb=BROWSER_MAX_RSS_MB,
+        max_heap_mb=BROWSER_MAX_HEAP_MB,
+        max_campaigns=BROWSER_MAX_CAMPAIGNS,
+        close=close,
+    )
+    
+    scraped_total = 0
+    try:
+        # Process campaigns in batches
+        for batch_num in range(1, total_batches + 1):
+            batch_start = (batch_num - 1) * BATCH_SIZE
+            batch_end = min(batch_start + BATCH_SIZE, total_campaigns)
+            batch_campaigns = campaigns[batch_start:batch_end]
+            
+            # Process this batch on the shared (supervised) browser context
+            success, failure = await process_batch(
+                batch_campaigns, 
+                batch_num, 
+                total_batches, 
+                supervisor,
+                persist_queue,
+                rate_limiter
+            )
+            
+            scraped_total += success
+            total_failure += failure
+            
+            # EARLY ABORT: If an entire batch failed with 0 successes, the session is dead
+            # Don't waste time looping through the remaining batches
+            if success == 0 and failure == len(batch_campaigns):
+                remaining = total_campaigns - batch_end
+                logger.error("="*60)
+                logger.error("ABORTING: Session invalid - no campaigns succeeded in this batch")
+                logger.error(f"  {remaining} campaigns were NOT scraped (still showing older 'last update' times)")
+                logger.error(f"  Skipping remaining {total_batches - batch_num} batches.")
+                logger.error("  Fix: Re-login via VNC (start_vnc_and_login.sh), then run the scraper with --resume")
+                logger.error("       to scrape only the campaigns this run did not finish.")
+                logger.error("="*60)
+                total_failure += remaining
+                break
+    finally:
+        await supervisor.close()
+        await playwright.stop()
+        # Anything still queued must be written before the run is logged
+        await persist_queue.drain()
+        await get_playlist_batcher().flush()
+        await _goal_evaluator.evaluate()
+        await _email_queue.drain()
+    
+    if _goal_evaluator.campaigns_completed:
+        logger.info(f"🎯 {_goal_evaluator.campaigns_completed} campaign(s) and {_goal_evaluator.groups_completed} group(s) "
+                    f"marked complete ({_goal_evaluator.requests} goal-check requests)")
+    
+    # Scraped campaigns only count as successful once their DB write landed
+    total_success = persist_queue.succeeded
+    total_failure += persist_queue.failed
+    if persist_queue.failed:
+        logger.warning(f"⚠️  {persist_queue.failed} of {scraped_total} scraped campaigns failed to save to the database")
     
     # Summary
     logger.info("")
@@ -2133,8 +2532,43 @@ async def _main_inner(limit=None):
     logger.info(f"Failed: {total_failure}")
     success_rate = (total_success / total_campaigns * 100) if total_campaigns > 0 else 0
     logger.info(f"Success rate: {success_rate:.1f}%")
+    browser_stats = supervisor.stats()
+    logger.info(f"Browser: {browser_stats['browser_launches']} launch(es), {browser_stats['browser_restarts']} recycle(s) "
+                f"{browser_stats['browser_restart_reasons'] or ''}, peak RSS {browser_stats['browser_rss_peak_mb']:.0f}MB, "
+                f"peak tab heap {browser_stats['browser_heap_peak_mb']:.0f}MB")
+    logger.info(f"Request routing: {REQUEST_POLICY.summary()}")
+    browser_stats['requests_blocked'] = REQUEST_POLICY.blocked_total
+    browser_stats['requests_blocked_by_reason'] = dict(REQUEST_POLICY.blocked)
+    browser_stats['requests_allowed'] = REQUEST_POLICY.allowed
     logger.info("")
     
+    # How playlists were matched to vendors (alias/token hits are near-exact names)
+    if _vendor_playlists_cache is not None and any(_vendor_playlists_cache.hits.values()):
+        hits = _vendor_playlists_cache.hits
+        logger.info(f"Vendor matching: {hits['exact']} exact, {hits['alias']} alias, {hits['token']} token, {hits['miss']} unmatched")
+    
+    # Which page waits dominated this run
+    wait_lines = WAIT_STATS.summary_lines()
+    if wait_lines:
+        logger.info("Page wait timings (slowest first):")
+        for line in wait_lines:
+            logger.info(f"  {line}")
+        logger.info("")
+    
+    # Where the time went, per stage (history in metrics.jsonl - see metrics_report.py)
+    stage_lines = METRICS.summary_lines()
+    if stage_lines:
+        logger.info("Stage timings (slowest first):")
+        for line in stage_lines:
+            logger.info(f"  {line}")
+        logger.info("")
+    try:
+        METRICS.write_jsonl(METRICS_FILE, run_id=_checkpoint.run_id if _checkpoint else None,
+                            extra={'campaigns_total': total_campaigns, 'waits': WAIT_STATS.snapshot()})
+        METRICS.write_prometheus(METRICS_PROM_FILE)
+    except Exception as e:
+        logger.warning(f"⚠️  Could not write metrics: {e}")
+    
     # FAILSAFE: Log run status
     if total_success == total_campaigns:
         status = 'success'
@@ -2158,7 +2592,9 @@ async def _main_inner(limit=None):
         status=status,
         campaigns_total=total_campaigns,
         campaigns_success=total_success,
-        campaigns_failed=total_failure
+        campaigns_failed=total_failure,
+        campaigns_resumed=resumed_count,
+        browser_stats=browser_stats
     )
     # Ensure completion logs are written before exit (avoids "hanging" log view when stdout is redirected)
     try:
@@ -2176,9 +2612,13 @@ if __name__ == "__main__":
     
     parser = argparse.ArgumentParser(description='Spotify for Artists Production Scraper')
     parser.add_argument('--limit', type=int, help='Limit number of campaigns to scrape (for testing)')
+    parser.add_argument('--all', action='store_true', dest='scrape_all',
+                        help='Scrape every active campaign, ignoring the freshness scheduler')
+    parser.add_argument('--resume', action='store_true',
+                        help='Skip campaigns already completed within RESUME_WINDOW_HOURS (after an aborted run)')
     args = parser.parse_args()
     
-    success = asyncio.run(main(limit=args.limit))
+    success = asyncio.run(main(limit=args.limit, scrape_all=args.scrape_all, resume=args.resume))
     try:
         sys.stdout.flush()
         sys.stderr.flush()
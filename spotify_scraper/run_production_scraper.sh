@@ -28,7 +28,7 @@ is_pid_running() {
 
 # Check if already running with stale lock detection
 if [ -f "$LOCK_FILE" ]; then
-    OLD_PID=$(cat "$LOCK_FILE" 2>/dev/null)
+    OLD_PID=$(head -n1 "$LOCK_FILE" 2>/dev/null)
     if is_pid_running "$OLD_PID"; then
         echo "[$(date)] Scraper already running (PID: $OLD_PID), exiting" >> logs/production.log
         exit 0
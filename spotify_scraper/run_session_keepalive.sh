@@ -17,16 +17,9 @@ cd /root/arti-marketing-ops/spotify_scraper
 # Create logs directory
 mkdir -p logs
 
-LOCK_FILE="scraper.lock"
-
-# ---- Check if scraper is already running ----
-if [ -f "$LOCK_FILE" ]; then
-    OLD_PID=$(cat "$LOCK_FILE" 2>/dev/null)
-    if [ -n "$OLD_PID" ] && ps -p "$OLD_PID" > /dev/null 2>&1; then
-        echo "[$(date)] Scraper is running (PID: $OLD_PID) -- skipping keepalive" >> logs/keepalive.log
-        exit 0
-    fi
-fi
+# No scraper.lock check here: session_keepalive.py attaches to the browser host
+# (browser_host.py) alongside a running scrape, and otherwise skips itself when
+# another process holds the browser profile lease.
 
 # ---- Load environment ----
 if [ -f .env ]; then
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+End-to-end throughput test of the production scraper against local stand-ins.
+
+Runs run_production_scraper.main() unchanged against:
+  - a fake PostgREST (tests/standins/fake_postgrest.py) seeded with N
+    synthetic campaigns, which counts every call per endpoint;
+  - a fake S4A (tests/standins/fake_s4a.py) serving templated song pages,
+    with configurable latency, row counts and error/login-redirect injection.
+
+The scraper hard-codes https://artists.spotify.com, so the fake S4A is
+mapped onto those URLs with context.route() in the launched browser.
+Nothing touches production: the Supabase URL, browser profile, logs dir
+(checkpoint journal, errors.log, session flag), scraper.lock, metrics and
+vendor index cache all point at a temp dir, so the API never sees the
+benchmark as a production run. The run status is printed instead of
+appended to status.jsonl, and alert and completion emails are not sent.
+
+Reports campaigns per minute, DB calls per campaign (by endpoint, with
+server-side latency) and S4A page loads per campaign.
+
+Usage:
+  python3 run_throughput_test.py --campaigns 30
+  python3 run_throughput_test.py --campaigns 60 --workers 3 --nav-interval 0.5 --page-latency 0.4
+  python3 run_throughput_test.py --campaigns 20 --fail-rate 0.1 --login-rate 0.02 --json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE))
+
+from tests.standins.background import ServerThread
+from tests.standins.fake_postgrest import FakePostgrest
+from tests.standins.fake_s4a import FakeS4A
+
+FIRST_CAMPAIGN_ID = 900001
+
+
+def seed_tables(count):
+    campaigns = []
+    for i in range(count):
+        campaign_id = FIRST_CAMPAIGN_ID + i
+        campaigns.append({
+            'id': campaign_id,
+            'campaign': f'Throughput test {i + 1}',
+            'sfa': f'https://artists.spotify.com/c/artist/0TnOYISbd1XYRBk9myaseg/song/tt{campaign_id:014d}/stats',
+            'track_name': f'Song tt{campaign_id:06d}',
+            'artist_name': 'Throughput Artist',
+            'goal': '100000000',
+            'status': 'active',
+            'client_id': 1,
+            'campaign_group_id': None,
+            'scrape_data': None,
+            'last_scraped_at': None,
+        })
+    # Matches the first playlist rows FakeS4A renders for every song ('Playlist tt0000 <n>')
+    vendor_playlists = [
+        {'id': i, 'vendor_id': 1, 'playlist_name': f'Playlist tt0000 {i}', 'updated_at': '2026-01-01T00:00:00+00:00'}
+        for i in range(1, 11)
+    ]
+    return {
+        'spotify_campaigns': campaigns,
+        'vendor_playlists': vendor_playlists,
+        'clients': [{'id': 1, 'name': 'Throughput Client', 'emails': []}],
+    }
+
+
+def configure_env(args, db_url, workdir):
+    """Point the scraper at the stand-ins before it is imported (it reads env at import)."""
+    os.environ.update({
+        'SUPABASE_URL': db_url,
+        'SUPABASE_SERVICE_ROLE_KEY': 'throughput-test',
+        'SPOTIFY_EMAIL': 'throughput@example.com',
+        'SPOTIFY_PASSWORD': 'unused',
+        'USER_DATA_DIR': str(workdir / 'browser_data'),
+        'SCRAPER_LOGS_DIR': str(workdir / 'logs'),
+        'SCRAPER_LOCK_FILE': str(workdir / 'scraper.lock'),
+        'HEADLESS': 'true',
+        'BROWSER_HOST_ENABLED': 'false',
+        'SCRAPE_WORKERS': str(args.workers),
+        'SCRAPE_MIN_NAV_INTERVAL': str(args.nav_interval),
+        'SCHEDULER_ENABLED': 'false',
+        'MANUAL_LOGIN_TIMEOUT_MINUTES': '1',
+        'VENDOR_INDEX_CACHE': str(workdir / 'vendor_index.json'),
+        'METRICS_FILE': str(workdir / 'metrics.jsonl'),
+        'METRICS_PROM_FILE': str(workdir / 'metrics.prom'),
+    })
+
+
+def report(args, db, s4a, elapsed, statuses):
+    campaigns = args.campaigns
+    per = lambda n: round(n / campaigns, 2) if campaigns else 0.0
+    page_loads = sum(v for k, v in s4a.hits.items() if k in ('stats', 'playlists', 'location'))
+    result = {
+        'campaigns': campaigns,
+        'elapsed_s': round(elapsed, 1),
+        'campaigns_per_min': round(campaigns / elapsed * 60, 2) if elapsed else 0.0,
+        'status': statuses[-1] if statuses else None,
+        'db_calls_total': db.total_calls(),
+        'db_calls_per_campaign': per(db.total_calls()),
+        'db_writes_per_campaign': per(db.total_calls(include_reads=False)),
+        'db_endpoints': {k: dict(v, per_campaign=per(v['count'])) for k, v in db.latency_summary().items()},
+        's4a_page_loads_per_campaign': per(page_loads),
+        's4a_hits': dict(sorted(s4a.hits.items())),
+    }
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    status = result['status'] or {}
+    print()
+    print('=' * 60)
+    print('THROUGHPUT TEST')
+    print('=' * 60)
+    print(f"📦 {campaigns} campaigns in {elapsed:.1f}s -> {result['campaigns_per_min']} campaigns/min "
+          f"({args.workers} tab(s), {args.nav_interval}s nav interval)")
+    print(f"   run status: {status.get('status')} "
+          f"({status.get('campaigns_success', 0)} ok, {status.get('campaigns_failed', 0)} failed)")
+    print(f"🗄️  DB calls: {result['db_calls_total']} total, {result['db_calls_per_campaign']}/campaign "
+          f"({result['db_writes_per_campaign']} writes/campaign)")
+    print(f"   {'endpoint':<36} {'calls':>6} {'/campaign':>10} {'mean ms':>9} {'p95 ms':>8}")
+    for endpoint, s in result['db_endpoints'].items():
+        print(f"   {endpoint:<36} {s['count']:>6} {s['per_campaign']:>10} {s['mean_ms']:>9} {s['p95_ms']:>8}")
+    print(f"🌐 S4A page loads: {result['s4a_page_loads_per_campaign']}/campaign "
+          f"({', '.join(f'{k}={v}' for k, v in result['s4a_hits'].items())})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Scraper throughput test against local S4A/PostgREST stand-ins')
+    parser.add_argument('--campaigns', type=int, default=20, help='Synthetic campaigns to scrape')
+    parser.add_argument('--rows', type=int, default=25, help='Playlist rows per song')
+    parser.add_argument('--page-latency', type=float, default=0.2, help='Seconds per S4A page response')
+    parser.add_argument('--db-latency', type=float, default=0.03, help='Seconds per PostgREST request')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='Share of song pages served as errors')
+    parser.add_argument('--login-rate', type=float, default=0.0, help='Share of song pages that bounce to login')
+    parser.add_argument('--workers', type=int, default=2, help='SCRAPE_WORKERS (tabs)')
+    parser.add_argument('--nav-interval', type=float, default=1.0, help='SCRAPE_MIN_NAV_INTERVAL seconds')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args()
+
+    db = FakePostgrest(seed_tables(args.campaigns), latency=args.db_latency)
+    s4a = FakeS4A(latency=args.page_latency, rows=args.rows, fail_rate=args.fail_rate, login_rate=args.login_rate)
+    with tempfile.TemporaryDirectory(prefix='throughput-') as tmp, ServerThread(db, s4a):
+        workdir = Path(tmp)
+        configure_env(args, db.url, workdir)
+        (workdir / 'logs').mkdir()
+        import run_production_scraper as scraper
+
+        statuses = []
+        scraper.log_scraper_run = lambda status, **kwargs: statuses.append(dict(kwargs, status=status))
+        scraper.send_alert_email = lambda subject, body: print(f"(alert not sent) {subject}")
+        scraper.send_campaign_complete_email = lambda *a, **kw: None
+        launch_browser_context = scraper.launch_browser_context
+
+        async def launch_with_standin(*a, **kw):
+            context = await launch_browser_context(*a, **kw)
+            await s4a.install(context)
+            return context
+
+        scraper.launch_browser_context = launch_with_standin
+
+        db.reset_stats()
+        started = time.monotonic()
+        ok = asyncio.run(scraper.main(limit=args.campaigns, scrape_all=True))
+        elapsed = time.monotonic() - started
+        report(args, db, s4a, elapsed, statuses)
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
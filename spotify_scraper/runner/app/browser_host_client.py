@@ -0,0 +1,165 @@
+"""
+Attach to the shared browser host (browser_host.py) over CDP.
+
+browser_host.py keeps one Chromium running on the persistent profile and
+publishes its CDP endpoint in <profile>.leases/browser_host.json. Jobs call
+attach() instead of launching Chromium. They connect in well under a
+second, share the logged-in cookies and open their own pages. A job never
+closes the host's context: it closes the pages it opened, and
+HostSession.close() disconnects and releases its 'browser' lease. Pages a
+job leaves behind are closed by the host once no job is attached.
+
+When no host is running, attach() returns None and the job launches
+Chromium itself, holding the 'profile' lease (see launch_lease()).
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .leases import Lease, lease_dir
+
+logger = logging.getLogger(__name__)
+
+HOST_FILE = 'browser_host.json'
+RESTART_FILE = 'browser_host.restart'
+SINGLETON_FILES = ('SingletonLock', 'SingletonSocket', 'SingletonCookie')
+
+
+def host_file(user_data_dir: str) -> Path:
+    return lease_dir(user_data_dir) / HOST_FILE
+
+
+def read_host(user_data_dir: str) -> Optional[Dict[str, Any]]:
+    """The running host's endpoint info, or None if no live host owns the profile."""
+    path = host_file(user_data_dir)
+    try:
+        info = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+    # The host holds the profile lease for its whole life; a file without it is left over
+    if not Lease(lease_dir(user_data_dir), 'profile').is_held_elsewhere():
+        return None
+    try:
+        os.kill(int(info.get('pid', 0)), 0)
+    except (ValueError, ProcessLookupError, PermissionError):
+        return None
+    return info
+
+
+def write_host(user_data_dir: str, info: Dict[str, Any]) -> None:
+    path = host_file(user_data_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.tmp')
+    tmp.write_text(json.dumps(info))
+    tmp.replace(path)
+
+
+def remove_host(user_data_dir: str) -> None:
+    host_file(user_data_dir).unlink(missing_ok=True)
+
+
+def request_restart(user_data_dir: str, reason: str) -> None:
+    """Ask the host to restart Chromium once no job is attached (e.g. RSS over the limit)."""
+    path = lease_dir(user_data_dir) / RESTART_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({'reason': reason, 'pid': os.getpid(),
+                                'at': datetime.now(timezone.utc).isoformat()}))
+
+
+def restart_requested(user_data_dir: str) -> Optional[str]:
+    try:
+        return json.loads((lease_dir(user_data_dir) / RESTART_FILE).read_text()).get('reason', 'requested')
+    except (OSError, ValueError):
+        return None
+
+
+def clear_restart_request(user_data_dir: str) -> None:
+    (lease_dir(user_data_dir) / RESTART_FILE).unlink(missing_ok=True)
+
+
+def clear_stale_singletons(user_data_dir: str) -> List[str]:
+    """Remove Chromium's Singleton* files. Only call while holding the 'profile' lease."""
+    removed = []
+    for name in SINGLETON_FILES:
+        path = os.path.join(user_data_dir, name)
+        try:
+            if os.path.lexists(path):
+                os.remove(path)
+                removed.append(name)
+        except OSError as e:
+            logger.warning(f"⚠️  Could not remove {name}: {e}")
+    return removed
+
+
+async def launch_lease(user_data_dir: str, holder: str, timeout: float = 0) -> Optional[Lease]:
+    """Take the 'profile' lease for a job launching its own Chromium, then clear stale locks.
+
+    Returns None if the profile stays busy (the host or another job's browser) for timeout seconds.
+    """
+    lease = Lease(lease_dir(user_data_dir), 'profile', holder=holder)
+    if not await lease.acquire(timeout=timeout, poll=2.0):
+        return None
+    removed = clear_stale_singletons(user_data_dir)
+    if removed:
+        logger.info(f"🧹 Removed stale Chromium profile locks: {', '.join(removed)}")
+    return lease
+
+
+class HostSession:
+    """A job's attachment to the browser host."""
+
+    def __init__(self, browser, context, lease: Lease, info: Dict[str, Any]):
+        self.browser = browser
+        self.context = context
+        self.lease = lease
+        self.info = info
+
+    async def close(self) -> None:
+        """Disconnect and release the lease. The host (and its Chromium) keeps running."""
+        try:
+            # For a CDP connection this only disconnects
+            await self.browser.close()
+        except Exception:
+            pass
+        self.lease.release()
+
+
+async def attach(playwright, user_data_dir: str, holder: str, timeout: float = 60) -> Optional[HostSession]:
+    """Connect to the running browser host, or return None if there is none.
+
+    Waits (up to timeout) while a requested browser restart is pending, then takes a
+    shared 'browser' lease so the host does not restart Chromium under this job.
+    """
+    info = read_host(user_data_dir)
+    if info is None:
+        return None
+
+    deadline = time.monotonic() + timeout
+    while restart_requested(user_data_dir) and time.monotonic() < deadline:
+        await asyncio.sleep(1.0)
+    lease = Lease(lease_dir(user_data_dir), 'browser', holder=holder)
+    if not await lease.acquire(exclusive=False, timeout=max(0.0, deadline - time.monotonic())):
+        logger.warning("Browser host is restarting Chromium - could not attach")
+        return None
+
+    info = read_host(user_data_dir) or info  # re-read: a restart may have changed the endpoint
+    started = time.monotonic()
+    try:
+        browser = await playwright.chromium.connect_over_cdp(info['endpoint'], timeout=15000)
+    except Exception as e:
+        lease.release()
+        logger.warning(f"Browser host at {info.get('endpoint')} is not answering: {e}")
+        return None
+    if not browser.contexts:
+        await browser.close()
+        lease.release()
+        return None
+    logger.info(f"🔌 Attached to browser host (pid {info.get('pid')}, {info.get('endpoint')}) "
+                f"in {time.monotonic() - started:.2f}s")
+    return HostSession(browser, browser.contexts[0], lease, info)
+
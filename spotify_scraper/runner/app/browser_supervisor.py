@@ -0,0 +1,259 @@
+"""
+Keeps one browser context alive across scrape batches and recycles it only
+when it needs to be recycled.
+
+The production scraper used to tear down Playwright, the persistent
+context and Chromium every 15 campaigns. Each teardown also paid a pause,
+a walk of the whole profile directory and a fresh login-check navigation.
+The supervisor keeps the context and, after each batch, checks:
+
+  - Chromium RSS: the processes launched with our --user-data-dir and
+    their children, read from /proc;
+  - JS heap of every open tab (performance.memory);
+  - health: context closed or a tab crashed / closed unexpectedly;
+  - an optional campaign cap per context, as a safety valve.
+
+The context is closed only when a threshold is crossed or a crash is
+seen, and relaunched lazily by the next acquire(). Launch counts, restart reasons and memory high-water marks are
+available in stats() for the run log.
+"""
+import logging
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+HEAP_JS = "() => (performance.memory ? performance.memory.usedJSHeapSize : 0)"
+
+
+def _read(path: Path) -> str:
+    try:
+        return path.read_text()
+    except OSError:
+        return ''
+
+
+def chromium_rss_mb(user_data_dir: str, proc_root: str = '/proc') -> Optional[float]:
+    """Total RSS in MB of the Chromium processes using this profile.
+
+    Matches processes whose command line contains ``--user-data-dir=<dir>``
+    and adds all of their descendants (renderers, GPU, utility processes).
+    Returns None when /proc is unavailable (not Linux) or nothing matched.
+    """
+    root = Path(proc_root)
+    if not root.is_dir():
+        return None
+    marker = f'--user-data-dir={user_data_dir}'
+    parents: Dict[int, int] = {}
+    roots: List[int] = []
+    for entry in root.iterdir():
+        if not entry.name.isdigit():
+            continue
+        pid = int(entry.name)
+        stat = _read(entry / 'stat')
+        # pid (comm) state ppid ... ; comm may contain spaces, so split after ')'
+        if ')' in stat:
+            fields = stat.rsplit(')', 1)[1].split()
+            if len(fields) > 1 and fields[1].isdigit():
+                parents[pid] = int(fields[1])
+        if marker in _read(entry / 'cmdline').replace('\0', ' '):
+            roots.append(pid)
+    if not roots:
+        return None
+
+    tree = set(roots)
+    changed = True
+    while changed:
+        changed = False
+        for pid, ppid in parents.items():
+            if ppid in tree and pid not in tree:
+                tree.add(pid)
+                changed = True
+
+    total_kb = 0
+    for pid in tree:
+        for line in _read(root / str(pid) / 'status').splitlines():
+            if line.startswith('VmRSS:'):
+                parts = line.split()
+                if len(parts) > 1 and parts[1].isdigit():
+                    total_kb += int(parts[1])
+                break
+    return total_kb / 1024
+
+
+class BrowserSupervisor:
+    """Owns the browser context's lifecycle for a scraper run.
+
+    Args:
+        launch: Coroutine returning a new browser context.
+        rss_probe: Returns current browser RSS in MB (None if unknown).
+        max_rss_mb: Recycle when browser RSS exceeds this (0 = off).
+        max_heap_mb: Recycle when any tab's JS heap exceeds this (0 = off).
+        max_campaigns: Recycle after this many campaigns per context (0 = off).
+        close: Coroutine closing a context, given the context and the recycle
+            reason (None at the end of the run). Defaults to context.close(); jobs
+            attached to the browser host disconnect instead.
+    """
+
+    def __init__(
+        self,
+        launch: Callable[[], Awaitable[Any]],
+        rss_probe: Optional[Callable[[], Optional[float]]] = None,
+        max_rss_mb: float = 1500,
+        max_heap_mb: float = 512,
+        max_campaigns: int = 0,
+        close: Optional[Callable[[Any, Optional[str]], Awaitable[None]]] = None,
+    ):
+        self._launch = launch
+        self._close = close
+        self.rss_probe = rss_probe
+        self.max_rss_mb = max_rss_mb
+        self.max_heap_mb = max_heap_mb
+        self.max_campaigns = max_campaigns
+        self.context = None
+        self.launches = 0
+        self.restarts = 0
+        self.crashes = 0
+        self.restart_reasons: Dict[str, int] = {}
+        self.rss_peak_mb = 0.0
+        self.heap_peak_mb = 0.0
+        self.campaigns_in_context = 0
+        self._crash_reason: Optional[str] = None
+        self._closing = False
+        self._fresh = False
+
+    # ----- lifecycle -----
+
+    async def acquire(self) -> Tuple[Any, bool]:
+        """Current context, launching one if needed. Returns (context, freshly launched)."""
+        if self.context is not None and self._crash_reason is not None:
+            await self.recycle(self._crash_reason)
+        if self.context is None:
+            await self._start()
+        fresh, self._fresh = self._fresh, False
+        return self.context, fresh
+
+    async def _start(self) -> None:
+        self.context = await self._launch()
+        self.launches += 1
+        self.campaigns_in_context = 0
+        self._crash_reason = None
+        self._fresh = True
+        self._watch(self.context)
+
+    def _watch(self, context) -> None:
+        try:
+            context.on('close', lambda *_: self._on_context_close(context))
+            # A browser-host context (context.browser is set) also holds other jobs' tabs:
+            # there the caller registers its own tabs with watch_page()
+            if getattr(context, 'browser', None) is not None:
+                return
+            for page in context.pages:
+                self.watch_page(page)
+            context.on('page', self.watch_page)
+        except Exception:
+            pass  # fakes / contexts without events
+
+    def watch_page(self, page) -> None:
+        try:
+            page.on('crash', lambda *_: self.mark_crashed('page crashed'))
+        except Exception:
+            pass
+
+    def _on_context_close(self, context) -> None:
+        if context is self.context and not self._closing:
+            self.mark_crashed('browser closed unexpectedly')
+
+    def mark_crashed(self, reason: str) -> None:
+        if self._crash_reason is None:
+            self.crashes += 1
+            self._crash_reason = reason
+            logger.warning(f"💥 Browser health: {reason}")
+
+    async def _close_context(self, reason: Optional[str] = None) -> None:
+        if self.context is None:
+            return
+        self._closing = True
+        try:
+            if self._close is not None:
+                await self._close(self.context, reason)
+            else:
+                await self.context.close()
+        except Exception:
+            pass
+        finally:
+            self._closing = False
+            self.context = None
+
+    async def recycle(self, reason: str) -> None:
+        """Close the context; the next acquire() launches a new one."""
+        logger.info(f"♻️  Recycling browser context: {reason}")
+        self.restarts += 1
+        key = reason.split(':')[0]
+        self.restart_reasons[key] = self.restart_reasons.get(key, 0) + 1
+        await self._close_context(reason)
+        self._crash_reason = None
+
+    async def close(self) -> None:
+        await self._close_context()
+
+    # ----- health checks -----
+
+    def note_campaigns(self, count: int) -> None:
+        self.campaigns_in_context += count
+
+    async def sample(self, pages: Iterable[Any]) -> Tuple[Optional[float], float]:
+        """(browser RSS MB or None, largest tab JS heap MB); updates high-water marks."""
+        rss = None
+        if self.rss_probe is not None:
+            try:
+                rss = self.rss_probe()
+            except Exception:
+                rss = None
+        if rss is not None:
+            self.rss_peak_mb = max(self.rss_peak_mb, rss)
+
+        heap = 0.0
+        for page in pages:
+            try:
+                if page.is_closed():
+                    continue
+                heap = max(heap, (await page.evaluate(HEAP_JS) or 0) / (1024 * 1024))
+            except Exception:
+                continue
+        self.heap_peak_mb = max(self.heap_peak_mb, heap)
+        return rss, heap
+
+    async def check(self, pages: Iterable[Any]) -> Optional[str]:
+        """Sample memory and close the context if it needs recycling. Returns the reason, if any."""
+        pages = list(pages)
+        if self.context is None:
+            return None
+        if self._crash_reason is None and any(page.is_closed() for page in pages):
+            self.mark_crashed('tab closed unexpectedly')
+
+        reason = self._crash_reason
+        if reason is None:
+            rss, heap = await self.sample(pages)
+            rss_text = f"{rss:.0f}MB" if rss is not None else 'n/a'
+            logger.info(f"🧠 Browser memory: RSS {rss_text}, largest tab heap {heap:.0f}MB "
+                        f"({self.campaigns_in_context} campaigns on this context)")
+            if self.max_rss_mb and rss is not None and rss > self.max_rss_mb:
+                reason = f"rss: {rss:.0f}MB > {self.max_rss_mb:.0f}MB"
+            elif self.max_heap_mb and heap > self.max_heap_mb:
+                reason = f"heap: {heap:.0f}MB > {self.max_heap_mb:.0f}MB"
+            elif self.max_campaigns and self.campaigns_in_context >= self.max_campaigns:
+                reason = f"campaigns: {self.campaigns_in_context} on this context"
+        if reason:
+            await self.recycle(reason)
+        return reason
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'browser_launches': self.launches,
+            'browser_restarts': self.restarts,
+            'browser_restart_reasons': dict(self.restart_reasons),
+            'browser_crashes': self.crashes,
+            'browser_rss_peak_mb': round(self.rss_peak_mb, 1),
+            'browser_heap_peak_mb': round(self.heap_peak_mb, 1),
+        }
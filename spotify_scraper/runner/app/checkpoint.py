@@ -0,0 +1,98 @@
+"""
+Append-only checkpoint journal for production scraper runs.
+
+Every campaign whose scrape result has been written to the database is
+recorded as one JSON line in logs/checkpoints.jsonl, tagged with the run id.
+If a run dies halfway (the session expires, the browser crashes), the
+operator logs in again via VNC and re-runs with --resume. That run skips
+every campaign completed within the resume window, so recovery only costs
+the remaining campaigns.
+
+The file is append-only and each line is flushed on write. A crash can at
+worst leave a truncated final line, which the reader ignores.
+"""
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Optional, Set
+
+STATUS_DONE = 'done'
+STATUS_NOT_FOUND = 'not_found'
+STATUS_FAILED = 'failed'
+
+
+def new_run_id() -> str:
+    """Sortable, unique-enough run id: UTC timestamp plus PID."""
+    return f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}-{os.getpid()}"
+
+
+class CheckpointJournal:
+    def __init__(self, path: Path, run_id: Optional[str] = None):
+        self.path = Path(path)
+        self.run_id = run_id or new_run_id()
+        self.recorded = 0
+
+    def record(self, campaign_id, status: str = STATUS_DONE) -> None:
+        entry = {
+            'ts': datetime.now(timezone.utc).isoformat(),
+            'run_id': self.run_id,
+            'campaign_id': campaign_id,
+            'status': status,
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(entry) + '\n')
+            f.flush()
+        self.recorded += 1
+
+    def _entries(self):
+        if not self.path.exists():
+            return
+        with open(self.path, 'r') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    entry['ts'] = datetime.fromisoformat(entry['ts'])
+                except (ValueError, KeyError, TypeError):
+                    continue  # truncated line from a crash
+                yield entry
+
+    def completed_since(self, window_hours: float, now: Optional[datetime] = None) -> Dict[object, str]:
+        """Campaign ids completed within the window -> run id that completed them."""
+        cutoff = (now or datetime.now(timezone.utc)) - timedelta(hours=window_hours)
+        completed = {}
+        for entry in self._entries():
+            if entry.get('status') == STATUS_DONE and entry['ts'] >= cutoff:
+                completed[entry['campaign_id']] = entry.get('run_id')
+        return completed
+
+    def runs_since(self, window_hours: float, now: Optional[datetime] = None) -> Set[str]:
+        cutoff = (now or datetime.now(timezone.utc)) - timedelta(hours=window_hours)
+        return {e.get('run_id') for e in self._entries() if e['ts'] >= cutoff}
+
+    def prune(self, keep_hours: float = 168, now: Optional[datetime] = None) -> int:
+        """Drop entries older than keep_hours so the journal stays small.
+
+        Returns the number of entries removed.
+        """
+        if not self.path.exists():
+            return 0
+        cutoff = (now or datetime.now(timezone.utc)) - timedelta(hours=keep_hours)
+        kept, removed = [], 0
+        with open(self.path, 'r') as f:
+            for line in f:
+                try:
+                    ts = datetime.fromisoformat(json.loads(line)['ts'])
+                except (ValueError, KeyError, TypeError):
+                    removed += 1
+                    continue
+                if ts >= cutoff:
+                    kept.append(line if line.endswith('\n') else line + '\n')
+                else:
+                    removed += 1
+        if removed:
+            tmp = self.path.with_suffix('.tmp')
+            tmp.write_text(''.join(kept))
+            tmp.replace(self.path)
+        return removed
@@ -0,0 +1,65 @@
+"""
+Content fingerprint of a campaign scrape.
+
+The fingerprint is a sha256 over the normalized song_data: per time range,
+the stream total and the playlist rows; the regions; and all-time streams.
+Anything that does not describe S4A's numbers is left out, so two scrapes
+showing the same numbers hash the same. That covers timestamps, the
+``previous`` trend values and the display rank of tied rows.
+
+The scraper stores the fingerprint on spotify_campaigns. When the next
+scrape produces the same one, it only bumps last_scraped_at (plus one
+history row per day) instead of rewriting the campaign, playlists and
+regions.
+"""
+import hashlib
+import json
+import re
+import unicodedata
+from typing import Any, Dict
+
+# Bump when the normalization changes so old fingerprints stop matching
+FINGERPRINT_VERSION = 'v1'
+
+TIME_RANGES = ('7day', '28day', '12months')
+
+
+def _text(value: Any) -> str:
+    text = unicodedata.normalize('NFKD', str(value or '')).lower()
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def _int(value: Any) -> int:
+    if isinstance(value, bool):
+        return 0
+    if isinstance(value, (int, float)):
+        return int(value)
+    digits = re.sub(r'[^\d]', '', str(value or ''))
+    return int(digits) if digits else 0
+
+
+def normalize_song_data(song_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Reduce song_data to the fields that carry S4A's numbers, in a stable order."""
+    time_ranges = {}
+    for time_range in TIME_RANGES:
+        stats = (((song_data.get('time_ranges') or {}).get(time_range) or {}).get('stats')) or {}
+        playlists = sorted(
+            (_text(p.get('name')), _text(p.get('made_by')), _int(p.get('streams')), _text(p.get('date_added')))
+            for p in stats.get('playlists') or []
+        )
+        time_ranges[time_range] = {'streams': _int(stats.get('streams')), 'playlists': playlists}
+
+    regions = sorted(
+        (_text(r.get('country')), _int(r.get('streams')))
+        for r in song_data.get('regions') or []
+    )
+    return {
+        'time_ranges': time_ranges,
+        'regions': regions,
+        'alltime_streams': _int(song_data.get('alltime_streams')),
+    }
+
+
+def scrape_fingerprint(song_data: Dict[str, Any]) -> str:
+    payload = json.dumps(normalize_song_data(song_data or {}), sort_keys=True, separators=(',', ':'))
+    return f"{FINGERPRINT_VERSION}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
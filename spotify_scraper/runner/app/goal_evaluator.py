@@ -0,0 +1,272 @@
+"""
+Batched stream-goal completion for spotify_campaigns and campaign_groups.
+
+Campaigns are registered once their campaign_playlists rows are flushed,
+and completion is evaluated in batches: every BATCH_SIZE registrations and
+once more at the end of the run. Each pass costs a fixed number of requests,
+however many campaigns and group siblings it covers:
+
+  1. vendor playlist rows for every registered campaign (id=in.(...))
+  2. one PATCH marking the campaigns that reached their goal complete
+  3. the sibling songs of their groups, plus vendor rows for any sibling
+     not already loaded
+  4. one PATCH marking fully complete groups
+  5. client emails for every completed campaign in one query
+
+Completion emails are handed to a notify coroutine (the scraper puts them on
+a queue) so SMTP never blocks a scrape or persistence worker.
+"""
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Vendor streams = non-algorithmic, non-organic playlists
+VENDOR_FILTER = '(is_algorithmic.is.null,is_algorithmic.eq.false)'
+
+# Ids per in.(...) filter, keeps URLs well under proxy limits
+ID_CHUNK_SIZE = 100
+# Rows per page when reading campaign_playlists
+PAGE_SIZE = 1000
+
+
+def _chunks(items: List[Any], size: int):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _in_filter(ids: Iterable[Any]) -> str:
+    return f"in.({','.join(str(i) for i in ids)})"
+
+
+def vendor_streams_by_campaign(playlist_rows: Iterable[Dict[str, Any]]) -> Dict[Any, int]:
+    """Sum 12-month streams of non-organic vendor playlists per campaign."""
+    totals: Dict[Any, int] = {}
+    for row in playlist_rows:
+        campaign_id = row.get('campaign_id')
+        totals.setdefault(campaign_id, 0)
+        if not row.get('is_organic', False):
+            totals[campaign_id] += row.get('streams_12m') or 0
+    return totals
+
+
+def completed_campaigns(
+    campaigns: Iterable[Dict[str, Any]],
+    vendor_streams: Dict[Any, int],
+    goal_parser: Callable[[Any], int],
+) -> List[Tuple[Dict[str, Any], int, int]]:
+    """(campaign, vendor streams, goal) for each campaign at or over its goal."""
+    done = []
+    for campaign in campaigns:
+        goal = goal_parser(campaign.get('goal'))
+        if goal <= 0:
+            continue
+        streams = vendor_streams.get(campaign['id'], 0)
+        if streams >= goal:
+            done.append((campaign, streams, goal))
+    return done
+
+
+def completed_groups(
+    siblings: Iterable[Dict[str, Any]],
+    vendor_streams: Dict[Any, int],
+    goal_parser: Callable[[Any], int],
+) -> List[Any]:
+    """Group ids where every song with a goal has reached it.
+
+    Groups without any song goal are never complete, matching the old
+    per-campaign check.
+    """
+    songs_with_goals: Dict[Any, int] = {}
+    incomplete = set()
+    for song in siblings:
+        group_id = song.get('campaign_group_id')
+        if group_id is None:
+            continue
+        songs_with_goals.setdefault(group_id, 0)
+        goal = goal_parser(song.get('goal'))
+        if goal <= 0:
+            continue
+        songs_with_goals[group_id] += 1
+        if vendor_streams.get(song['id'], 0) < goal:
+            incomplete.add(group_id)
+    return [group_id for group_id, count in songs_with_goals.items() if count and group_id not in incomplete]
+
+
+class GoalEvaluator:
+    """Collects touched campaigns and evaluates their goals in batches.
+
+    Args:
+        db: PostgrestClient (get/patch).
+        goal_parser: Turns the campaign ``goal`` field into an int.
+        notify: Awaited with (campaign_name, streams, goal, client_emails) for
+            every campaign marked complete that has client emails.
+        batch_size: Evaluate as soon as this many campaigns are pending
+            (0 = only when evaluate() is called).
+        snapshots: Optional SnapshotTable; campaigns whose total 12-month
+            streams are still below the goal are skipped without a query.
+    """
+
+    def __init__(
+        self,
+        db,
+        goal_parser: Callable[[Any], int],
+        notify: Optional[Callable[..., Awaitable[Any]]] = None,
+        batch_size: int = 25,
+        snapshots=None,
+    ):
+        self.db = db
+        self.goal_parser = goal_parser
+        self.notify = notify
+        self.batch_size = max(0, batch_size)
+        self.snapshots = snapshots
+        self.pending: Dict[Any, Dict[str, Any]] = {}
+        self.campaigns_completed = 0
+        self.groups_completed = 0
+        self.requests = 0
+        self._lock = asyncio.Lock()
+
+    async def add(self, campaign: Dict[str, Any]) -> None:
+        """Register a campaign whose playlists are in the table."""
+        self.pending[campaign['id']] = campaign
+        if self.batch_size and len(self.pending) >= self.batch_size:
+            await self.evaluate()
+
+    async def evaluate(self) -> int:
+        """Evaluate every pending campaign. Returns how many were completed."""
+        async with self._lock:
+            batch, self.pending = list(self.pending.values()), {}
+            if not batch:
+                return 0
+            try:
+                return await self._evaluate(batch)
+            except Exception as e:
+                logger.warning(f"Goal evaluation failed for {len(batch)} campaigns: {e}")
+                return 0
+
+    async def _get(self, table: str, params: Dict[str, str]) -> Optional[List[Dict[str, Any]]]:
+        self.requests += 1
+        resp = await self.db.get(table, params=params)
+        if resp.status_code != 200:
+            logger.warning(f"Goal evaluation: GET {table} returned {resp.status_code}")
+            return None
+        return resp.json() or []
+
+    async def _patch(self, table: str, ids: List[Any], data: Dict[str, Any]):
+        self.requests += 1
+        return await self.db.patch(table, params={'id': _in_filter(ids)}, json=data)
+
+    async def _vendor_streams(self, campaign_ids: List[Any]) -> Optional[Dict[Any, int]]:
+        rows: List[Dict[str, Any]] = []
+        for chunk in _chunks(campaign_ids, ID_CHUNK_SIZE):
+            offset = 0
+            while True:
+                page = await self._get('campaign_playlists', {
+                    'campaign_id': _in_filter(chunk),
+                    'select': 'id,campaign_id,streams_12m,is_organic',
+                    'or': VENDOR_FILTER,
+                    'order': 'id.asc',
+                    'limit': str(PAGE_SIZE),
+                    'offset': str(offset),
+                })
+                if page is None:
+                    return None
+                rows.extend(page)
+                if len(page) < PAGE_SIZE:
+                    break
+                offset += PAGE_SIZE
+        totals = vendor_streams_by_campaign(rows)
+        for campaign_id in campaign_ids:
+            totals.setdefault(campaign_id, 0)
+        return totals
+
+    async def _evaluate(self, batch: List[Dict[str, Any]]) -> int:
+        with_goals = [
+            c for c in batch
+            if self.goal_parser(c.get('goal')) > 0
+            and not (self.snapshots is not None and self.snapshots.below_goal(c['id']))
+        ]
+        if not with_goals:
+            return 0
+
+        vendor = await self._vendor_streams([c['id'] for c in with_goals])
+        if vendor is None:
+            return 0
+
+        done = completed_campaigns(with_goals, vendor, self.goal_parser)
+        if not done:
+            return 0
+        for campaign, streams, goal in done:
+            logger.info(f"[{campaign['id']}] 🎯 Goal reached! Vendor streams: {streams:,} / {goal:,} — marking Complete")
+
+        done_ids = [campaign['id'] for campaign, _, _ in done]
+        update_data = {
+            'status': 'complete',
+            'completed_at': datetime.now(timezone.utc).isoformat(),
+        }
+        response = await self._patch('spotify_campaigns', done_ids, update_data)
+        if response.status_code not in [200, 204] and 'completed_at' in (response.text or ''):
+            update_data.pop('completed_at', None)
+            response = await self._patch('spotify_campaigns', done_ids, update_data)
+        if response.status_code not in [200, 204]:
+            logger.warning(f"Could not mark {len(done_ids)} campaigns complete: {response.status_code}")
+            return 0
+        logger.info(f"✓ {len(done_ids)} song(s) marked Complete")
+        self.campaigns_completed += len(done_ids)
+
+        await self._complete_groups(done, vendor)
+        await self._notify_clients(done)
+        return len(done_ids)
+
+    async def _complete_groups(self, done, vendor: Dict[Any, int]) -> None:
+        group_ids = sorted({c['campaign_group_id'] for c, _, _ in done if c.get('campaign_group_id')}, key=str)
+        if not group_ids:
+            return
+        try:
+            siblings: List[Dict[str, Any]] = []
+            for chunk in _chunks(group_ids, ID_CHUNK_SIZE):
+                rows = await self._get('spotify_campaigns', {
+                    'campaign_group_id': _in_filter(chunk),
+                    'select': 'id,goal,status,campaign_group_id',
+                })
+                if rows is None:
+                    return
+                siblings.extend(rows)
+
+            missing = [s['id'] for s in siblings
+                       if s['id'] not in vendor and self.goal_parser(s.get('goal')) > 0]
+            if missing:
+                extra = await self._vendor_streams(missing)
+                if extra is None:
+                    return
+                vendor = {**vendor, **extra}
+
+            complete = completed_groups(siblings, vendor, self.goal_parser)
+            if not complete:
+                return
+            response = await self._patch('campaign_groups', complete, {'status': 'complete'})
+            if response.status_code in [200, 204]:
+                self.groups_completed += len(complete)
+                for group_id in complete:
+                    logger.info(f"✓ Campaign group {group_id} also marked Complete")
+        except Exception as e:
+            logger.warning(f"Could not check/update group status: {e}")
+
+    async def _notify_clients(self, done) -> None:
+        if self.notify is None:
+            return
+        client_ids = sorted({c['client_id'] for c, _, _ in done if c.get('client_id')}, key=str)
+        if not client_ids:
+            return
+        emails: Dict[Any, List[str]] = {}
+        for chunk in _chunks(client_ids, ID_CHUNK_SIZE):
+            rows = await self._get('clients', {'id': _in_filter(chunk), 'select': 'id,emails'})
+            for row in rows or []:
+                emails[row['id']] = row.get('emails') or []
+        for campaign, streams, goal in done:
+            client_emails = emails.get(campaign.get('client_id'))
+            if client_emails:
+                name = campaign.get('campaign', f"Campaign {campaign['id']}")
+                await self.notify(name, streams, goal, client_emails)
@@ -0,0 +1,353 @@
+"""
+Compact, deduplicated encoding for scraped_data.raw_data.
+
+Storing the full song_data JSON on every run mostly repeats the same
+playlist names and countries. Rows written with encoding ``dict-delta/1``
+store a compact payload instead:
+
+  - Playlists ([name, made_by, date_added]) and countries are dictionary
+    encoded. Each row only carries the entries that are new since the
+    previous row; every row refers to them by index.
+  - Each time range is stored as its stream total plus [index, streams]
+    pairs. A delta row only carries the time ranges, regions and totals that
+    changed since the previous row. An unchanged scrape is just ``{"k": 0}``.
+  - Every ``keyframe_every`` rows a keyframe (``"k": 1``) restarts the
+    dictionaries, so rebuilding any snapshot reads at most that many rows.
+
+Rows with encoding NULL are legacy full snapshots; the reader handles both.
+HistoryChain.snapshot() rebuilds the full song_data.
+
+Payload keys:
+    k    1 = keyframe, 0 = delta
+    pl   new playlist dictionary entries
+    co   new country dictionary entries
+    tr   time range -> {s: streams, p: [[pl index, streams, (rank)]...], x: other stats}
+    tr-  time ranges removed since the previous row
+    rg   regions: [[co index, streams, (rank), (extra)]...]
+    at   alltime_streams
+    x    other top-level song_data keys (e.g. the ``previous`` trend values)
+"""
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+ENCODING = 'dict-delta/1'
+
+DEFAULT_KEYFRAME_EVERY = 7
+
+_TOP_LEVEL = ('time_ranges', 'regions', 'alltime_streams')
+
+# spotify_campaigns naming: the S4A 7-day figure is stored as streams_24h, etc.
+SCALAR_COLUMNS = {'7day': 'streams_24h', '28day': 'streams_7d', '12months': 'streams_12m'}
+
+
+def _pack_streams(value: Any) -> Any:
+    """Playlist streams are digit strings in song_data; store them as ints."""
+    if isinstance(value, str) and value.isdigit() and str(int(value)) == value:
+        return int(value)
+    return {'r': value}
+
+
+def _unpack_streams(value: Any) -> Any:
+    if isinstance(value, dict):
+        return value.get('r')
+    return str(value)
+
+
+def _key(entry: Any) -> str:
+    return json.dumps(entry, ensure_ascii=False, sort_keys=True)
+
+
+class HistoryChain:
+    """Encoder/decoder state for one campaign's history rows.
+
+    Encoding appends to the chain, and so does apply() when reading stored
+    payloads back. Both keep the same state, so a chain loaded from the
+    database can keep encoding where the last writer stopped.
+    """
+
+    def __init__(self, keyframe_every: int = DEFAULT_KEYFRAME_EVERY):
+        self.keyframe_every = max(1, keyframe_every)
+        self._reset()
+
+    def _reset(self) -> None:
+        self.playlists: List[Any] = []
+        self.countries: List[Any] = []
+        self._playlist_index: Dict[str, int] = {}
+        self._country_index: Dict[str, int] = {}
+        self.ranges: Dict[str, Dict[str, Any]] = {}
+        self.regions: List[Any] = []
+        self.alltime: Any = None
+        self.extra: Dict[str, Any] = {}
+        self.length = 0
+
+    def restart(self) -> None:
+        """Forget the chain so the next encode() writes a keyframe."""
+        self._reset()
+
+    # ----- dictionaries -----
+
+    def _intern(self, entry, values: List[Any], index: Dict[str, int], added: Optional[List[Any]]) -> int:
+        key = _key(entry)
+        idx = index.get(key)
+        if idx is None:
+            idx = len(values)
+            values.append(entry)
+            index[key] = idx
+            if added is not None:
+                added.append(entry)
+        return idx
+
+    # ----- encoding -----
+
+    def _encode_range(self, range_data: Dict[str, Any], added: List[Any]) -> Dict[str, Any]:
+        stats = dict((range_data or {}).get('stats') or {})
+        playlists = stats.pop('playlists', None) or []
+        encoded: Dict[str, Any] = {'s': stats.pop('streams', None), 'p': []}
+        for pos, playlist in enumerate(playlists, 1):
+            playlist = dict(playlist)
+            rank = playlist.pop('rank', None)
+            streams = playlist.pop('streams', None)
+            entry = [playlist.pop('name', None), playlist.pop('made_by', None), playlist.pop('date_added', None)]
+            if playlist:
+                entry.append(playlist)
+            row = [self._intern(entry, self.playlists, self._playlist_index, added), _pack_streams(streams)]
+            if rank != str(pos):
+                row.append(rank)
+            encoded['p'].append(row)
+        if stats:
+            encoded['x'] = stats
+        other = {k: v for k, v in (range_data or {}).items() if k != 'stats'}
+        if other:
+            encoded['y'] = other
+        return encoded
+
+    def _encode_region(self, pos: int, region: Dict[str, Any], added: List[Any]) -> List[Any]:
+        region = dict(region)
+        country = self._intern(region.pop('country', None), self.countries, self._country_index, added)
+        row = [country, region.pop('streams', None)]
+        rank = region.pop('rank', None)
+        if rank != pos or region:
+            row.append(rank)
+        if region:
+            row.append(region)
+        return row
+
+    def encode(self, song_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Encode the next snapshot as a keyframe or a delta against the last one."""
+        keyframe = self.length == 0 or self.length >= self.keyframe_every
+        if keyframe:
+            self._reset()
+
+        new_playlists: List[Any] = []
+        new_countries: List[Any] = []
+        ranges = {
+            name: self._encode_range(range_data, new_playlists)
+            for name, range_data in (song_data.get('time_ranges') or {}).items()
+        }
+        regions = [
+            self._encode_region(pos, region, new_countries)
+            for pos, region in enumerate(song_data.get('regions') or [], 1)
+        ]
+        alltime = song_data.get('alltime_streams')
+        extra = {k: v for k, v in song_data.items() if k not in _TOP_LEVEL}
+
+        payload: Dict[str, Any] = {'k': 1 if keyframe else 0}
+        if new_playlists:
+            payload['pl'] = new_playlists
+        if new_countries:
+            payload['co'] = new_countries
+        changed = {n: r for n, r in ranges.items() if keyframe or self.ranges.get(n) != r}
+        if changed:
+            payload['tr'] = changed
+        removed = [n for n in self.ranges if n not in ranges]
+        if removed and not keyframe:
+            payload['tr-'] = removed
+        if keyframe or regions != self.regions:
+            payload['rg'] = regions
+        if keyframe or alltime != self.alltime:
+            payload['at'] = alltime
+        if keyframe or extra != self.extra:
+            payload['x'] = extra
+
+        self.ranges, self.regions, self.alltime, self.extra = ranges, regions, alltime, extra
+        self.length += 1
+        return payload
+
+    # ----- decoding -----
+
+    def apply(self, payload: Dict[str, Any]) -> None:
+        """Advance the chain by one stored payload."""
+        if payload.get('k'):
+            self._reset()
+        elif self.length == 0:
+            raise ValueError('delta row without a preceding keyframe')
+        for entry in payload.get('pl', []):
+            self._intern(entry, self.playlists, self._playlist_index, None)
+        for entry in payload.get('co', []):
+            self._intern(entry, self.countries, self._country_index, None)
+        for name in payload.get('tr-', []):
+            self.ranges.pop(name, None)
+        self.ranges.update(payload.get('tr', {}))
+        if 'rg' in payload:
+            self.regions = payload['rg']
+        if 'at' in payload:
+            self.alltime = payload['at']
+        if 'x' in payload:
+            self.extra = payload['x']
+        self.length += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """The full song_data as of the last encoded/applied row."""
+        time_ranges = {}
+        for name, encoded in self.ranges.items():
+            playlists = []
+            for pos, row in enumerate(encoded.get('p', []), 1):
+                entry = self.playlists[row[0]]
+                playlist = {
+                    'rank': row[2] if len(row) > 2 else str(pos),
+                    'name': entry[0],
+                    'made_by': entry[1],
+                    'streams': _unpack_streams(row[1]),
+                    'date_added': entry[2],
+                }
+                if len(entry) > 3:
+                    playlist.update(entry[3])
+                playlists.append(playlist)
+            stats = {'streams': encoded.get('s'), **encoded.get('x', {}), 'playlists': playlists}
+            time_ranges[name] = {'stats': stats, **encoded.get('y', {})}
+
+        regions = []
+        for pos, row in enumerate(self.regions, 1):
+            region = {
+                'rank': row[2] if len(row) > 2 else pos,
+                'country': self.countries[row[0]],
+                'streams': row[1],
+            }
+            if len(row) > 3:
+                region.update(row[3])
+            regions.append(region)
+
+        song_data = {'time_ranges': time_ranges, 'alltime_streams': self.alltime, 'regions': regions}
+        song_data.update(self.extra)
+        return song_data
+
+
+def scalar_columns(song_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Headline stream totals stored as plain columns for time-series queries."""
+    time_ranges = song_data.get('time_ranges') or {}
+    return {
+        column: ((time_ranges.get(name) or {}).get('stats') or {}).get('streams')
+        for name, column in SCALAR_COLUMNS.items()
+    }
+
+
+def rebuild(rows: Iterable[Dict[str, Any]], keyframe_every: int = DEFAULT_KEYFRAME_EVERY) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """Rebuild full snapshots from history rows in scraped_at order.
+
+    Returns (row, song_data) pairs. Legacy rows (encoding NULL) are already
+    full snapshots. Delta rows whose keyframe is not among ``rows`` are
+    skipped.
+    """
+    chain = HistoryChain(keyframe_every)
+    snapshots = []
+    for row in rows:
+        if row.get('encoding') != ENCODING:
+            chain.restart()
+            snapshots.append((row, row.get('raw_data') or {}))
+            continue
+        try:
+            chain.apply(row.get('raw_data') or {})
+        except ValueError:
+            continue
+        snapshots.append((row, chain.snapshot()))
+    return snapshots
+
+
+def chain_from_rows(rows: Iterable[Dict[str, Any]], keyframe_every: int = DEFAULT_KEYFRAME_EVERY) -> HistoryChain:
+    """Chain positioned after the latest row, ready to encode the next one.
+
+    If the latest row is a legacy snapshot (or a delta whose keyframe was
+    not loaded), the next encode() writes a keyframe.
+    """
+    chain = HistoryChain(keyframe_every)
+    for row in rows:
+        if row.get('encoding') != ENCODING:
+            chain.restart()
+            continue
+        try:
+            chain.apply(row.get('raw_data') or {})
+        except ValueError:
+            chain.restart()
+    return chain
+
+
+def _history_params(campaign_id, keyframe_every: int, before: Optional[datetime] = None) -> Dict[str, str]:
+    params = {
+        'campaign_id': f'eq.{campaign_id}',
+        'select': 'id,scraped_at,encoding,raw_data',
+        'order': 'scraped_at.desc,id.desc',
+        # A keyframe (or legacy row) is always among the last keyframe_every rows
+        'limit': str(keyframe_every),
+    }
+    if before is not None:
+        params['scraped_at'] = f'lt.{before.isoformat()}'
+    return params
+
+
+async def load_chain(db, campaign_id, keyframe_every: int = DEFAULT_KEYFRAME_EVERY) -> HistoryChain:
+    """Load the campaign's latest chain so the next history row can be a delta."""
+    resp = await db.get('scraped_data', params=_history_params(campaign_id, keyframe_every))
+    if resp.status_code != 200:
+        return HistoryChain(keyframe_every)
+    return chain_from_rows(reversed(resp.json() or []), keyframe_every)
+
+
+async def load_chains(db, campaign_ids: Iterable[Any], since: datetime,
+                      keyframe_every: int = DEFAULT_KEYFRAME_EVERY,
+                      chunk_size: int = 100, page_size: int = 1000) -> Dict[Any, HistoryChain]:
+    """Chains for many campaigns at once, from their rows scraped since ``since``.
+
+    Loaded at run start so saving a history row needs no read. A campaign
+    whose latest keyframe is older than ``since`` (or that has no rows) gets
+    a chain that writes a keyframe next. Campaigns in a chunk that failed to
+    load are left out; callers fall back to load_chain() for them.
+    """
+    ids = list(campaign_ids)
+    chains: Dict[Any, HistoryChain] = {}
+    for start in range(0, len(ids), chunk_size):
+        chunk = ids[start:start + chunk_size]
+        rows: List[Dict[str, Any]] = []
+        while True:
+            resp = await db.get('scraped_data', params={
+                'campaign_id': f"in.({','.join(str(cid) for cid in chunk)})",
+                'scraped_at': f'gte.{since.isoformat()}',
+                'select': 'campaign_id,id,scraped_at,encoding,raw_data',
+                'order': 'campaign_id.asc,scraped_at.asc,id.asc',
+                'limit': str(page_size),
+                'offset': str(len(rows)),
+            })
+            if resp.status_code != 200:
+                rows = None
+                break
+            page = resp.json() or []
+            if not page:
+                break
+            rows.extend(page)
+        if rows is None:
+            continue
+        by_campaign: Dict[Any, List[Dict[str, Any]]] = {cid: [] for cid in chunk}
+        for row in rows:
+            by_campaign.setdefault(row.get('campaign_id'), []).append(row)
+        for cid, campaign_rows in by_campaign.items():
+            chains[cid] = chain_from_rows(campaign_rows, keyframe_every)
+    return chains
+
+
+async def load_snapshot(db, campaign_id, before: datetime, keyframe_every: int = DEFAULT_KEYFRAME_EVERY) -> Optional[Dict[str, Any]]:
+    """Full song_data of the latest history row scraped before ``before``."""
+    resp = await db.get('scraped_data', params=_history_params(campaign_id, keyframe_every, before))
+    if resp.status_code != 200:
+        return None
+    snapshots = rebuild(reversed(resp.json() or []), keyframe_every)
+    return snapshots[-1][1] if snapshots else None
@@ -0,0 +1,123 @@
+"""
+Leases on the shared browser profile (flock-based).
+
+The scraper, the session keepalive and the roster scraper all use one
+Chromium profile. They used to coordinate through scraper.lock and by
+deleting Chromium's Singleton* files before launching, which also removes
+the lock of a browser that is still running.
+
+A lease is an fcntl.flock() on a file in the profile's lease directory:
+
+  profile  exclusive - held by whoever runs Chromium on the profile (the
+           browser host, or a job launching its own browser). While you
+           hold it, any Singleton* file left in the profile is stale and
+           safe to remove.
+  browser  shared    - held by each job attached to the browser host. The
+           host takes it exclusively before restarting Chromium, so it
+           never restarts under a running job.
+
+The kernel drops a flock when its process exits, so a crashed job never
+leaves a stale lease behind. The lease file also records who holds it (for
+logs and diagnostics only).
+"""
+import asyncio
+import fcntl
+import json
+import os
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+def lease_dir(user_data_dir: str) -> Path:
+    """Leases live next to the profile: rmtree-ing the profile must not delete a held lease."""
+    return Path(f"{str(user_data_dir).rstrip('/')}.leases")
+
+
+class Lease:
+    """One named lease. Usage:
+
+        lease = Lease(lease_dir(USER_DATA_DIR), 'profile', holder='scraper')
+        if await lease.acquire(timeout=300):
+            ...
+            lease.release()
+    """
+
+    def __init__(self, directory, name: str, holder: str = ''):
+        self.path = Path(directory) / f'{name}.lease'
+        self.name = name
+        self.holder = holder
+        self.exclusive = True
+        self._fd: Optional[int] = None
+
+    @property
+    def held(self) -> bool:
+        return self._fd is not None
+
+    def try_acquire(self, exclusive: bool = True) -> bool:
+        """Take the lease without waiting. Returns False if another process holds it."""
+        if self._fd is not None:
+            return True
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, (fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH) | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        self.exclusive = exclusive
+        if exclusive:
+            self._write_holder()
+        return True
+
+    async def acquire(self, exclusive: bool = True, timeout: float = 0, poll: float = 1.0) -> bool:
+        """Wait up to timeout seconds for the lease without blocking the event loop."""
+        deadline = time.monotonic() + timeout
+        while not self.try_acquire(exclusive):
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(poll)
+        return True
+
+    def release(self) -> None:
+        if self._fd is None:
+            return
+        try:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+    def _write_holder(self) -> None:
+        info = {'holder': self.holder, 'pid': os.getpid(), 'since': datetime.now(timezone.utc).isoformat()}
+        os.ftruncate(self._fd, 0)
+        os.pwrite(self._fd, json.dumps(info).encode(), 0)
+
+    def holder_info(self) -> Optional[Dict[str, Any]]:
+        """Last exclusive holder recorded in the lease file (may be stale if nobody holds it now)."""
+        try:
+            return json.loads(self.path.read_text() or 'null')
+        except (OSError, ValueError):
+            return None
+
+    def is_held_elsewhere(self) -> bool:
+        """True if another process holds the lease (in any mode)."""
+        if self._fd is not None:
+            return False
+        if not self.path.exists():
+            return False
+        probe = Lease(self.path.parent, self.name)
+        if probe.try_acquire(exclusive=True):
+            probe.release()
+            return False
+        return True
+
+    def __enter__(self):
+        if not self.try_acquire():
+            raise BlockingIOError(f"lease '{self.name}' is held by {self.holder_info()}")
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
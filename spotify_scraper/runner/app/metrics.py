@@ -0,0 +1,226 @@
+"""
+Per-stage timing for the production scraper.
+
+Spans wrap the expensive stages: navigation, time-range switching,
+extraction and each persistence call. Every span is recorded twice:
+
+  - in a per-run histogram per stage (count, total, p50, p95, max);
+  - against the campaign being processed. The campaign is carried in a
+    contextvar, so the scrape tabs and the write-behind workers each
+    attribute their own spans without passing ids around.
+
+Waits from waits.timed() are folded in as 'wait.<name>' stages, so
+deliberate sleeps and pacing show up next to the work they delay.
+
+At the end of a run, write_jsonl() appends one 'run' line and one
+'campaign' line per campaign to logs/metrics.jsonl.
+write_prometheus() rewrites a node_exporter textfile. metrics_report.py
+summarizes the JSONL across runs.
+"""
+import functools
+import json
+import math
+import os
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+_current_campaign: ContextVar[Optional[str]] = ContextVar('scrape_campaign', default=None)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of values (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    return {
+        'count': len(values),
+        'total': round(sum(values), 3),
+        'p50': round(percentile(values, 50), 3),
+        'p95': round(percentile(values, 95), 3),
+        'max': round(max(values), 3) if values else 0.0,
+    }
+
+
+class Metrics:
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self._stages: Dict[str, List[float]] = {}
+        self._campaigns: Dict[str, Dict[str, float]] = {}
+
+    # ----- recording -----
+
+    def set_campaign(self, campaign_id: Any):
+        """Attribute spans in the current task to campaign_id. Returns a token for reset."""
+        return _current_campaign.set(None if campaign_id is None else str(campaign_id))
+
+    def reset_campaign(self, token) -> None:
+        _current_campaign.reset(token)
+
+    def record(self, stage: str, seconds: float, campaign_id: Any = None) -> None:
+        self._stages.setdefault(stage, []).append(seconds)
+        campaign = str(campaign_id) if campaign_id is not None else _current_campaign.get()
+        if campaign is not None:
+            per = self._campaigns.setdefault(campaign, {})
+            per[stage] = per.get(stage, 0.0) + seconds
+
+    @asynccontextmanager
+    async def span(self, stage: str):
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.record(stage, time.monotonic() - start)
+
+    def timed(self, stage: str):
+        """Decorator: time every call of an async function as ``stage``."""
+        def decorator(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                async with self.span(stage):
+                    return await func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    # ----- reporting -----
+
+    def stage_summary(self) -> Dict[str, Dict[str, float]]:
+        return {stage: summarize(values) for stage, values in self._stages.items()}
+
+    def campaign_totals(self) -> Dict[str, Dict[str, float]]:
+        return {cid: {k: round(v, 3) for k, v in stages.items()} for cid, stages in self._campaigns.items()}
+
+    def summary_lines(self, limit: int = 12) -> List[str]:
+        """Slowest stages by total time."""
+        lines = []
+        ranked = sorted(self.stage_summary().items(), key=lambda kv: kv[1]['total'], reverse=True)
+        for stage, s in ranked[:limit]:
+            lines.append(
+                f"{stage}: {s['count']}x, total {s['total']:.1f}s, "
+                f"p50 {s['p50']:.2f}s, p95 {s['p95']:.2f}s, max {s['max']:.2f}s"
+            )
+        return lines
+
+    def write_jsonl(self, path, run_id: Optional[str] = None, extra: Optional[Dict[str, Any]] = None) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.now(timezone.utc).isoformat()
+        run = {'type': 'run', 'run_id': run_id, 'timestamp': timestamp, 'stages': self.stage_summary()}
+        if extra:
+            run.update(extra)
+        with open(path, 'a') as f:
+            f.write(json.dumps(run) + '\n')
+            for campaign_id, stages in self.campaign_totals().items():
+                f.write(json.dumps({
+                    'type': 'campaign', 'run_id': run_id, 'timestamp': timestamp,
+                    'campaign_id': campaign_id, 'stages': stages,
+                }) + '\n')
+
+    def prometheus_text(self, prefix: str = 'spotify_scraper') -> str:
+        lines = [
+            f'# HELP {prefix}_stage_seconds Time spent per scraper stage in the last run.',
+            f'# TYPE {prefix}_stage_seconds summary',
+        ]
+        summary = self.stage_summary()
+        for stage in sorted(summary):
+            s = summary[stage]
+            label = stage.replace('\\', '\\\\').replace('"', '\\"')
+            lines.append(f'{prefix}_stage_seconds{{stage="{label}",quantile="0.5"}} {s["p50"]}')
+            lines.append(f'{prefix}_stage_seconds{{stage="{label}",quantile="0.95"}} {s["p95"]}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{label}"}} {s["total"]}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{label}"}} {s["count"]}')
+        lines.append(f'# HELP {prefix}_stage_seconds_max Slowest single span per stage in the last run.')
+        lines.append(f'# TYPE {prefix}_stage_seconds_max gauge')
+        for stage in sorted(summary):
+            label = stage.replace('\\', '\\\\').replace('"', '\\"')
+            lines.append(f'{prefix}_stage_seconds_max{{stage="{label}"}} {summary[stage]["max"]}')
+        lines.append(f'# HELP {prefix}_last_run_timestamp_seconds When the metrics were written.')
+        lines.append(f'# TYPE {prefix}_last_run_timestamp_seconds gauge')
+        lines.append(f'{prefix}_last_run_timestamp_seconds {int(time.time())}')
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path) -> None:
+        """Atomically rewrite a node_exporter textfile-collector file."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + '.tmp')
+        tmp.write_text(self.prometheus_text())
+        tmp.replace(path)
+
+
+METRICS = Metrics()
+
+
+def default_metrics_path() -> Path:
+    """spotify_scraper/logs/metrics.jsonl unless METRICS_FILE is set."""
+    default = Path(__file__).resolve().parents[2] / 'logs' / 'metrics.jsonl'
+    return Path(os.getenv('METRICS_FILE', str(default)))
+
+
+# ----- cross-run reporting (metrics_report.py) -----
+
+def read_metrics(path, last_runs: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Lines of metrics.jsonl, restricted to the last N runs if given."""
+    records = []
+    try:
+        with open(path, 'r') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+    except OSError:
+        return []
+    if last_runs:
+        run_ids = [r.get('run_id') for r in records if r.get('type') == 'run'][-last_runs:]
+        keep = set(run_ids)
+        records = [r for r in records if r.get('run_id') in keep]
+    return records
+
+
+def stage_report(records: List[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    """Per-stage distribution of per-campaign time across all campaign lines."""
+    per_stage: Dict[str, List[float]] = {}
+    for record in records:
+        if record.get('type') != 'campaign':
+            continue
+        for stage, seconds in record.get('stages', {}).items():
+            per_stage.setdefault(stage, []).append(seconds)
+    return {stage: summarize(values) for stage, values in per_stage.items()}
+
+
+def slowest_campaigns(records: List[Dict[str, Any]], limit: int = 10,
+                      stage: str = 'scrape.total') -> List[Dict[str, Any]]:
+    """Campaigns with the highest mean time in ``stage``, with their dominant sub-stage."""
+    runs: Dict[str, List[Dict[str, float]]] = {}
+    for record in records:
+        if record.get('type') == 'campaign' and stage in record.get('stages', {}):
+            runs.setdefault(record['campaign_id'], []).append(record['stages'])
+    rows = []
+    for campaign_id, samples in runs.items():
+        totals = [s[stage] for s in samples]
+        sub: Dict[str, float] = {}
+        for s in samples:
+            for name, seconds in s.items():
+                if not name.endswith('.total') and not name.startswith('persist.'):
+                    sub[name] = sub.get(name, 0.0) + seconds
+        top = max(sub.items(), key=lambda kv: kv[1])[0] if sub else None
+        rows.append({
+            'campaign_id': campaign_id,
+            'runs': len(samples),
+            'mean': round(sum(totals) / len(totals), 3),
+            'max': round(max(totals), 3),
+            'top_stage': top,
+        })
+    rows.sort(key=lambda r: r['mean'], reverse=True)
+    return rows[:limit]
@@ -1,7 +1,17 @@
 from playwright.async_api import Page
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+import os
 import re
-import asyncio
+
+from .. import waits
+from ..metrics import METRICS
+from ..rate_limiter import NavigationRateLimiter
+from ..response_capture import (
+    ResponseCapture,
+    parse_location_payload,
+    parse_playlists_payload,
+    parse_stats_payload,
+)
 
 
 class SessionExpiredError(Exception):
@@ -13,10 +23,186 @@ class PageNotFoundError(Exception):
     """Raised when the song/artist page doesn't exist (404)."""
     pass
 
+
+# Serializes the S4A sort-table in a single round trip: one list of cell
+# texts per body row (same selectors and fallbacks as the per-element path).
+# Returns null when no rows are present.
+TABLE_ROWS_JS = """
+(minCells) => {
+    let rows = Array.from(document.querySelectorAll('[data-testid="sort-table-body-row"]'));
+    if (!rows.length) rows = Array.from(document.querySelectorAll('tbody tr'));
+    if (!rows.length) return null;
+    return rows.map(row => {
+        let cells = row.querySelectorAll('td');
+        if (cells.length < minCells) cells = row.querySelectorAll('[role="cell"], :scope > div');
+        return Array.from(cells).map(c => (c.textContent || '').trim());
+    });
+}
+"""
+
+# Stream sources and region rows for get_song_insights in one call
+INSIGHTS_JS = """
+() => {
+    const text = (root, sel, fallback) => {
+        const el = root.querySelector(sel);
+        return el ? el.textContent : fallback;
+    };
+    const sources = Array.from(document.querySelectorAll('[data-testid="stream-source"], .stream-source')).map(el => ({
+        name: text(el, '[data-testid="source-name"], .source-name', 'Unknown'),
+        percentage: text(el, '[data-testid="source-percentage"], .source-percentage', '0%'),
+    }));
+    const regions = Array.from(document.querySelectorAll('[data-testid="region-row"], .region-row')).map(el => ({
+        region: text(el, '[data-testid="region-name"], .region-name', 'Unknown'),
+        listeners: text(el, '[data-testid="region-listeners"], .region-listeners', '0'),
+    }));
+    return {stream_sources: sources, geographical_data: regions};
+}
+"""
+
+
+def parse_playlist_cells(cells: List[str]) -> Optional[Dict[str, str]]:
+    """Turn one Playlists-table row (list of cell texts) into a playlist dict.
+
+    2026 S4A Playlists table structure (confirmed from diagnostic):
+      Cell 0: Rank number (1, 2, 3...)
+      Cell 1: Playlist name (Radio, Mixes, etc.)
+      Cell 2: Made by (Spotify, user name, or "—")
+      Cell 3: Streams count (78,360)
+      Cell 4: Date added (Jan 7, 2026 or "—")
+    """
+    if len(cells) < 4:
+        return None
+    date_added = cells[4] if len(cells) > 4 else ''
+    if date_added == '\u2014':  # em dash
+        date_added = ''
+    return {
+        'rank': cells[0],
+        'name': cells[1],
+        'made_by': cells[2],
+        # Clean streams: keep only digits
+        'streams': re.sub(r'[^\d]', '', cells[3]) or '0',
+        'date_added': date_added,
+    }
+
+
+def parse_country_cells(cells: List[str], next_rank: int) -> Optional[Dict[str, Any]]:
+    """Turn one Location-table row (list of cell texts) into a country dict.
+
+    Numbers-only cells are rank or streams, text is the country. Returns None
+    for rows that don't hold a country name.
+    """
+    rank_val = next_rank
+    country_val = ''
+    streams_val = 0
+
+    if len(cells) >= 3:
+        rank_val = int(cells[0]) if cells[0].isdigit() else next_rank
+        country_val = cells[1]
+        streams_val = int(re.sub(r'[^\d]', '', cells[2]) or '0')
+    elif len(cells) == 2:
+        # Two-column layout: country and streams
+        country_val = cells[0]
+        streams_val = int(re.sub(r'[^\d]', '', cells[1]) or '0')
+
+    # Skip if country is empty or purely numeric (wrong data)
+    if not country_val or country_val == '\u2014':
+        return None
+    if re.match(r'^[\d,. ]+$', country_val):
+        return None
+
+    return {'rank': rank_val, 'country': country_val, 'streams': streams_val}
+
 class SpotifyArtistsPage:
-    def __init__(self, page: Page):
+    def __init__(self, page: Page, rate_limiter=None, capture_responses: bool = False):
         self.page = page
+        # Shared NavigationRateLimiter when several tabs scrape in parallel;
+        # standalone pages get their own so navigations are still paced
+        self.rate_limiter = rate_limiter or NavigationRateLimiter(
+            float(os.getenv('SCRAPE_MIN_NAV_INTERVAL', '5'))
+        )
+        # Spacing between chip/dropdown clicks on this page
+        self.pacer = waits.make_pacer()
+        # Opt-in: record S4A's JSON API responses and prefer them over DOM parsing
+        self.capture = None
+        if capture_responses:
+            self.capture = ResponseCapture()
+            self.capture.attach(page)
+    
+    async def _captured_payload(self, kind: str, range_type: str):
+        """Payload for kind/range: recorded during page load, else replayed."""
+        if self.capture is None:
+            return None
+        await self.capture.settle()
+        captured = self.capture.find(kind, range_type)
+        if captured is not None:
+            return captured.data
+        if self.capture.find(kind) is None:
+            return None
+        await self.rate_limiter.acquire()
+        return await self.capture.replay(kind, range_type)
+    
+    async def get_captured_period_streams(self, range_type: str):
+        """Total streams for a period from the stats API, or None (use the DOM)."""
+        payload = await self._captured_payload('stats', range_type)
+        return parse_stats_payload(payload) if payload is not None else None
+    
+    async def get_captured_song_stats(self, range_type: str):
+        """get_song_stats() equivalent built from the playlists API, or None."""
+        payload = await self._captured_payload('playlists', range_type)
+        playlists = parse_playlists_payload(payload) if payload is not None else None
+        if playlists is None:
+            return None
+        title = 'Unknown'
+        try:
+            h1 = await self.page.query_selector('h1')
+            if h1:
+                title = (await h1.text_content() or 'Unknown').strip()
+        except Exception:
+            pass
+        total_streams = sum(int(p['streams']) for p in playlists)
+        print(f"  Total streams from {len(playlists)} playlists (API): {total_streams:,}")
+        return {'title': title, 'streams': total_streams, 'listeners': 0, 'playlists': playlists}
+    
+    async def get_captured_location_data(self):
+        """get_location_data() equivalent (28-day view) from the location API, or None."""
+        payload = await self._captured_payload('location', '28day')
+        countries = parse_location_payload(payload) if payload is not None else None
+        if countries is not None:
+            print(f"  Extracted {len(countries)} countries from location API")
+        return countries
     
+    async def _read_table_rows(self, min_cells: int) -> Optional[List[List[str]]]:
+        """Read every sort-table row's cell texts with a single page.evaluate.
+        
+        Returns [] when the table has no rows, or None if the evaluate failed
+        and the caller should fall back to per-element extraction.
+        """
+        try:
+            rows = await self.page.evaluate(TABLE_ROWS_JS, min_cells)
+            return rows or []
+        except Exception as e:
+            print(f"  Bulk table read failed, falling back to per-row extraction: {e}")
+            return None
+    
+    async def _read_table_rows_per_element(self, min_cells: int) -> List[List[str]]:
+        """Per-element fallback for _read_table_rows (several IPC calls per row)."""
+        rows = await self.page.query_selector_all('[data-testid="sort-table-body-row"]')
+        if not rows:
+            rows = await self.page.query_selector_all('tbody tr')
+        
+        result = []
+        for row in rows:
+            try:
+                cells = await row.query_selector_all('td')
+                if not cells or len(cells) < min_cells:
+                    cells = await row.query_selector_all('[role="cell"], > div')
+                result.append([(await c.text_content() or '').strip() for c in (cells or [])])
+            except Exception as e:
+                print(f"  Error extracting row: {e}")
+                result.append([])
+        return result
+    
+    @METRICS.timed('navigate')
     async def navigate_to_song(self, url: str, target_tab: str = 'stats') -> None:
         """Navigate to a song's page and wait for data to load.
         
@@ -36,13 +222,24 @@ class SpotifyArtistsPage:
         
         print(f"Navigating to song ({target_tab}): {url}")
         
-        # Human-like navigation delay
-        await asyncio.sleep(1 + (0.5 * asyncio.get_event_loop().time()) % 1)
+        # Deliberate pacing between navigations (shared across tabs)
+        async with waits.timed('nav_pacing'):
+            await self.rate_limiter.acquire()
+        
+        if self.capture is not None:
+            self.capture.reset()
         
-        await self.page.goto(url, wait_until='networkidle')
+        async with waits.timed('goto_networkidle'):
+            await self.page.goto(url, wait_until='networkidle')
         
-        # Human-like delay after navigation
-        await asyncio.sleep(2.5 + (0.5 * asyncio.get_event_loop().time()) % 1.5)
+        # Wait until the SPA has rendered a title, a 404 message or bounced to login
+        await waits.wait_for_function(
+            self.page, 'page_ready',
+            """() => !!document.querySelector('h1')
+                || location.href.includes('accounts.spotify.com')
+                || (document.body && document.body.innerText.toLowerCase().includes("couldn't find"))""",
+            timeout=6,
+        )
         
         # CRITICAL: Check if we were redirected to login page
         current_url = self.page.url
@@ -123,6 +320,27 @@ class SpotifyArtistsPage:
             print(f"Error checking for page errors: {e}")
             # Don't let error checking stop the scraping process
         
+    async def _click_chip(self, chip, wait_name: str) -> None:
+        """Click an Overview chip filter and wait for the hero streams to update.
+        
+        A chip that is already selected is not clicked, since the hero number
+        would not change and the wait would run to its timeout.
+        """
+        for attr in ('aria-checked', 'aria-pressed', 'aria-selected'):
+            if (await chip.get_attribute(attr)) == 'true':
+                return
+        hero = '[data-testid="hero-stats-button-streams"]'
+        before = ''
+        try:
+            el = await self.page.query_selector(hero)
+            before = (await el.text_content() or '') if el else ''
+        except Exception:
+            pass
+        await waits.pace(self.pacer)
+        await chip.click(force=True, timeout=5000)
+        await waits.wait_for_text_change(self.page, hero, before, wait_name, timeout=4)
+    
+    @METRICS.timed('extract.alltime_streams')
     async def get_alltime_streams(self) -> int:
         """Extract the all-time total streams from the song header on the Overview (/stats) page.
         
@@ -194,8 +412,7 @@ class SpotifyArtistsPage:
             try:
                 chip_12m = self.page.locator('[data-encore-id="chipFilter"]:has-text("12 months")').first
                 if await chip_12m.count() > 0:
-                    await chip_12m.click(force=True, timeout=3000)
-                    await asyncio.sleep(2)
+                    await self._click_chip(chip_12m, 'alltime_chip_12m')
                     
                     hero_btn = await self.page.query_selector('[data-testid="hero-stats-button-streams"]')
                     if hero_btn:
@@ -227,6 +444,7 @@ class SpotifyArtistsPage:
             print(f"Error extracting all-time streams: {e}")
             return 0
 
+    @METRICS.timed('extract.period_streams')
     async def get_period_streams(self, range_type: str) -> int:
         """Read total streams from the Overview (/stats) page for a specific time range.
 
@@ -251,8 +469,7 @@ class SpotifyArtistsPage:
                 print(f"  Chip filter '{label}' not found on page")
                 return 0
 
-            await chip.click(force=True, timeout=5000)
-            await asyncio.sleep(2)
+            await self._click_chip(chip, f'period_chip_{range_type}')
 
             hero_btn = await self.page.query_selector('[data-testid="hero-stats-button-streams"]')
             if hero_btn:
@@ -271,6 +488,7 @@ class SpotifyArtistsPage:
             print(f"  Error reading period streams for {label}: {e}")
             return 0
 
+    @METRICS.timed('navigate.playlists_tab')
     async def navigate_to_playlists_tab(self) -> None:
         """Navigate to the Playlists tab if not already there"""
         try:
@@ -282,12 +500,10 @@ class SpotifyArtistsPage:
                 print(f"Already on Playlists tab (URL: {current_url})")
                 return
             
-            # Human-like delay before interaction
-            await asyncio.sleep(1 + (0.3 * asyncio.get_event_loop().time()) % 0.7)
+            await waits.pace(self.pacer)
             
             # First, scroll down a bit to get past the sticky header
             await self.page.evaluate("window.scrollBy(0, 100)")
-            await asyncio.sleep(0.5)
             
             # Look for the Playlists tab - prioritize the data-testid selector
             playlist_tab_selectors = [
@@ -308,8 +524,8 @@ class SpotifyArtistsPage:
                         await locator.click(force=True, timeout=5000)
                         print(f"Clicked Playlists tab with {selector}")
                         
-                        # Wait for content to load
-                        await asyncio.sleep(2 + (0.5 * asyncio.get_event_loop().time()) % 1)
+                        # Wait for the playlists table to load
+                        await waits.wait_for_rows_stable(self.page, 'playlists_tab_rows')
                         return
                 except Exception as e:
                     print(f"Failed to click Playlists tab with {selector}: {e}")
@@ -336,7 +552,7 @@ class SpotifyArtistsPage:
                 }''')
                 if result:
                     print(f"Clicked Playlists tab via JavaScript: {result}")
-                    await asyncio.sleep(2)
+                    await waits.wait_for_rows_stable(self.page, 'playlists_tab_rows')
                     return
             except Exception as e:
                 print(f"JavaScript click failed: {e}")
@@ -356,6 +572,7 @@ class SpotifyArtistsPage:
         except Exception as e:
             print(f"Error navigating to Playlists tab: {e}")
     
+    @METRICS.timed('extract.song_stats')
     async def get_song_stats(self) -> Dict[str, Any]:
         """Extract playlist data from the S4A Playlists tab.
         
@@ -383,60 +600,20 @@ class SpotifyArtistsPage:
         # ----- Extract playlist rows from sort-table (2026 UI) -----
         playlists = []
         try:
-            # Primary: use data-testid selectors
-            rows = await self.page.query_selector_all('[data-testid="sort-table-body-row"]')
-            
-            # Fallback: generic table body rows
-            if not rows:
-                rows = await self.page.query_selector_all('tbody tr')
-                if rows and len(rows) > 0:
-                    rows = rows  # tbody tr already excludes the header in most cases
+            # One evaluate for the whole table; per-element path if that fails
+            rows = await self._read_table_rows(min_cells=4)
+            if rows is None:
+                rows = await self._read_table_rows_per_element(min_cells=4)
             
             if not rows:
                 print("  No playlist table rows found")
             else:
                 print(f"  Found {len(rows)} playlist rows")
             
-            for row in rows:
-                try:
-                    # Get all cells -- the sort-table uses <td> elements
-                    cells = await row.query_selector_all('td')
-                    if not cells or len(cells) < 4:
-                        # Try broader cell selector
-                        cells = await row.query_selector_all('[role="cell"], > div')
-                    
-                    if len(cells) >= 4:
-                        # 2026 S4A Playlists table structure (confirmed from diagnostic):
-                        # Cell 0: Rank number (1, 2, 3...)
-                        # Cell 1: Playlist name (Radio, Mixes, etc.)
-                        # Cell 2: Made by (Spotify, user name, or "—")
-                        # Cell 3: Streams count (78,360)
-                        # Cell 4: Date added (Jan 7, 2026 or "—")
-                        
-                        rank = (await cells[0].text_content() or '').strip()
-                        playlist_name = (await cells[1].text_content() or '').strip()
-                        made_by = (await cells[2].text_content() or '').strip()
-                        streams_text = (await cells[3].text_content() or '').strip()
-                        
-                        date_added = ''
-                        if len(cells) > 4:
-                            date_added = (await cells[4].text_content() or '').strip()
-                            if date_added == '\u2014':  # em dash
-                                date_added = ''
-                        
-                        # Clean streams: keep only digits
-                        streams_cleaned = re.sub(r'[^\d]', '', streams_text) or '0'
-                        
-                        playlists.append({
-                            'rank': rank,
-                            'name': playlist_name,
-                            'made_by': made_by,
-                            'streams': streams_cleaned,
-                            'date_added': date_added
-                        })
-                except Exception as e:
-                    print(f"  Error extracting row: {e}")
-                    continue
+            for cells in rows:
+                playlist = parse_playlist_cells(cells)
+                if playlist:
+                    playlists.append(playlist)
         except Exception as e:
             print(f"  Error reading playlist table: {e}")
         
@@ -455,6 +632,7 @@ class SpotifyArtistsPage:
         
         return stats
     
+    @METRICS.timed('extract.location')
     async def get_location_data(self) -> list:
         """Extract the 'Top countries for this song' table from the S4A Location tab.
 
@@ -475,27 +653,27 @@ class SpotifyArtistsPage:
                 if await dropdown.count() > 0:
                     current_text = (await dropdown.text_content() or '').strip()
                     if '28' not in current_text:
+                        await waits.pace(self.pacer)
                         await dropdown.click(force=True, timeout=3000)
-                        await asyncio.sleep(1)
+                        await waits.wait_for_visible(self.page, '[role="option"]', 'location_dropdown_open')
                         opt = self.page.locator('[role="option"]:has-text("Last 28 Days")').first
                         if await opt.count() > 0:
                             await opt.click(force=True, timeout=3000)
-                            await asyncio.sleep(2)
+                            await waits.wait_for_text_contains(
+                                self.page, 'button[aria-haspopup="listbox"]', '28', 'location_dropdown_label'
+                            )
                         else:
                             await self.page.keyboard.press('Escape')
-                            await asyncio.sleep(0.5)
             except Exception as e:
                 print(f"  Could not switch location dropdown to 28 days: {e}")
 
             # Scroll down to reveal the "Top countries" table
             await self.page.evaluate("window.scrollTo(0, document.body.scrollHeight / 2)")
-            await asyncio.sleep(1)
-
-            await asyncio.sleep(2)
+            await waits.wait_for_rows_stable(self.page, 'location_rows')
 
-            rows = await self.page.query_selector_all('[data-testid="sort-table-body-row"]')
-            if not rows:
-                rows = await self.page.query_selector_all('tbody tr')
+            rows = await self._read_table_rows(min_cells=2)
+            if rows is None:
+                rows = await self._read_table_rows_per_element(min_cells=2)
 
             if not rows:
                 print("  No country table rows found on Location tab")
@@ -504,55 +682,12 @@ class SpotifyArtistsPage:
             print(f"  Found {len(rows)} country rows")
 
             # Diagnostic: log first row structure
-            if rows:
-                first_cells = await rows[0].query_selector_all('td')
-                if not first_cells:
-                    first_cells = await rows[0].query_selector_all('[role="cell"], > div')
-                cell_texts = []
-                for c in (first_cells or []):
-                    cell_texts.append((await c.text_content() or '').strip())
-                print(f"  First row cells ({len(first_cells or [])}): {cell_texts}")
-
-            for row in rows:
-                try:
-                    cells = await row.query_selector_all('td')
-                    if not cells or len(cells) < 2:
-                        cells = await row.query_selector_all('[role="cell"], > div')
-
-                    cell_values = []
-                    for c in (cells or []):
-                        cell_values.append((await c.text_content() or '').strip())
-
-                    # Determine which cells are rank, country, and streams
-                    # by analyzing content: numbers-only = rank or streams, text = country
-                    rank_val = len(countries) + 1
-                    country_val = ''
-                    streams_val = 0
-
-                    if len(cell_values) >= 3:
-                        rank_val = int(cell_values[0]) if cell_values[0].isdigit() else len(countries) + 1
-                        country_val = cell_values[1]
-                        streams_val = int(re.sub(r'[^\d]', '', cell_values[2]) or '0')
-                    elif len(cell_values) == 2:
-                        # Two-column layout: country and streams
-                        country_val = cell_values[0]
-                        streams_val = int(re.sub(r'[^\d]', '', cell_values[1]) or '0')
-
-                    # Skip if country looks like a number (wrong data) or is empty
-                    if not country_val or country_val == '\u2014':
-                        continue
-                    # If country is purely numeric, it's not a country name
-                    if re.match(r'^[\d,. ]+$', country_val):
-                        continue
-
-                    countries.append({
-                        'rank': rank_val,
-                        'country': country_val,
-                        'streams': streams_val,
-                    })
-                except Exception as e:
-                    print(f"  Error extracting country row: {e}")
-                    continue
+            print(f"  First row cells ({len(rows[0])}): {rows[0]}")
+
+            for cells in rows:
+                country = parse_country_cells(cells, len(countries) + 1)
+                if country:
+                    countries.append(country)
 
         except Exception as e:
             print(f"  Error reading location data: {e}")
@@ -566,7 +701,6 @@ class SpotifyArtistsPage:
         
         # Scroll to top so dropdown is visible
         await self.page.evaluate("window.scrollTo(0, 0)")
-        await asyncio.sleep(0.5)
         
         # Find the playlists page dropdown (aria-haspopup="listbox")
         dropdown_btn = self.page.locator('button[aria-haspopup="listbox"]').first
@@ -584,9 +718,10 @@ class SpotifyArtistsPage:
             return True
         
         # Click to open the dropdown
+        await waits.pace(self.pacer)
         await dropdown_btn.click(force=True, timeout=5000)
         print(f"  Opened dropdown (was: {current_text})")
-        await asyncio.sleep(1.5)
+        await waits.wait_for_visible(self.page, '[role="option"], [role="listbox"] li', 'dropdown_open')
         
         # Try to select the desired option
         option_clicked = False
@@ -620,11 +755,12 @@ class SpotifyArtistsPage:
         if not option_clicked:
             print(f"  WARNING: Could not find option '{target_label}' in dropdown")
             await self.page.keyboard.press('Escape')
-            await asyncio.sleep(0.5)
             return False
         
-        # Wait for table to refresh after selection
-        await asyncio.sleep(2)
+        # Wait for the dropdown label to reflect the selection
+        await waits.wait_for_text_contains(
+            self.page, 'button[aria-haspopup="listbox"]', target_label, 'dropdown_label'
+        )
         
         # VERIFY: Re-read dropdown text to confirm the switch actually happened
         try:
@@ -637,14 +773,13 @@ class SpotifyArtistsPage:
         except Exception:
             pass  # Dropdown might have re-rendered, don't fail on verification read
         
-        # Wait for sort-table rows to appear (confirms data loaded)
-        try:
-            await self.page.wait_for_selector('[data-testid="sort-table-body-row"]', timeout=8000)
-        except Exception:
+        # Wait for sort-table rows to appear and settle (confirms data loaded)
+        if not await waits.wait_for_rows_stable(self.page, 'dropdown_rows'):
             print(f"  WARNING: Table rows did not appear after switching to {target_label}")
         
         return True
 
+    @METRICS.timed('switch_time_range')
     async def switch_time_range(self, range_type: str) -> None:
         """Switch between different time ranges using the playlists page dropdown.
         
@@ -655,7 +790,6 @@ class SpotifyArtistsPage:
         """
         try:
             print(f"Switching to {range_type} time range...")
-            await asyncio.sleep(1)
             
             range_labels = {
                 '7day':     'Last 7 days',
@@ -674,7 +808,7 @@ class SpotifyArtistsPage:
             if not success:
                 # Retry once: scroll, wait, try again
                 print(f"  Retrying dropdown switch for {target_label}...")
-                await asyncio.sleep(2)
+                await waits.wait_for_rows_stable(self.page, 'dropdown_retry_rows', timeout=3)
                 success = await self._try_switch_dropdown(target_label)
                 
                 if not success:
@@ -685,6 +819,13 @@ class SpotifyArtistsPage:
             
     async def get_song_insights(self) -> Dict[str, Any]:
         """Get additional song insights and performance metrics"""
+        try:
+            insights = await self.page.evaluate(INSIGHTS_JS)
+            if insights:
+                return insights
+        except Exception as e:
+            print(f"  Bulk insights read failed, falling back to per-element extraction: {e}")
+        
         insights = {}
         
         try:
@@ -717,4 +858,4 @@ class SpotifyArtistsPage:
         except:
             insights['geographical_data'] = []
             
-        return insights
\ No newline at end of file
+        return insights
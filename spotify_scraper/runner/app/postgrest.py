@@ -0,0 +1,172 @@
+"""
+Async PostgREST client for the production scraper.
+
+One pooled aiohttp session (keep-alive) is shared by every persistence
+coroutine so database writes no longer block the event loop that is also
+driving Playwright.
+"""
+import asyncio
+import json
+import logging
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# Statuses where PostgREST / Cloudflare did not process the request
+RETRYABLE_STATUSES = {429, 502, 503, 504, 520, 521, 522, 523, 524}
+
+# Methods that are safe to replay after a timeout or dropped connection
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'PATCH', 'PUT', 'DELETE'}
+
+
+class PostgrestResponse:
+    """Minimal response object mirroring the parts of requests.Response we use."""
+
+    def __init__(self, status_code: int, text: str, headers: Dict[str, str]):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers
+
+    def json(self) -> Any:
+        if not self.text:
+            return None
+        return json.loads(self.text)
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status_code < 300
+
+
+class PostgrestClient:
+    """Shared async client for Supabase's /rest/v1 endpoints.
+
+    Usage:
+        client = PostgrestClient(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+        resp = await client.get('spotify_campaigns', params={'id': 'eq.1'})
+        await client.close()
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        timeout: float = 30,
+        max_retries: int = 3,
+        backoff_base: float = 1.0,
+        pool_size: int = 10,
+    ):
+        self.rest_url = f"{base_url.rstrip('/')}/rest/v1"
+        self.api_key = api_key
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.pool_size = pool_size
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def default_headers(self) -> Dict[str, str]:
+        return {
+            'apikey': self.api_key or '',
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json',
+        }
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=self.default_headers,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def close(self) -> None:
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def request(
+        self,
+        method: str,
+        table: str,
+        params: Optional[Dict[str, str]] = None,
+        json_body: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> PostgrestResponse:
+        """Send a request with retry/backoff on transient failures.
+
+        Non-idempotent requests (POST) are only retried when the server
+        clearly did not process them (connect errors, 429/503), so a slow
+        insert is never duplicated.
+        """
+        method = method.upper()
+        url = f"{self.rest_url}/{table.lstrip('/')}" if table else f"{self.rest_url}/"
+        idempotent = method in IDEMPOTENT_METHODS
+        session = await self._get_session()
+        # Without a per-call timeout the session's default applies (timeout=None would disable it)
+        request_kwargs = {'timeout': aiohttp.ClientTimeout(total=timeout)} if timeout else {}
+
+        last_error: Optional[Exception] = None
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                async with session.request(
+                    method,
+                    url,
+                    params=params,
+                    json=json_body,
+                    headers=headers,
+                    **request_kwargs,
+                ) as resp:
+                    text = await resp.text()
+                    response = PostgrestResponse(resp.status, text, dict(resp.headers))
+
+                # Cloudflare error pages come back as HTML with a 5xx/200 status
+                is_html = 'text/html' in response.headers.get('Content-Type', '')
+                retryable = response.status_code in RETRYABLE_STATUSES or is_html
+                if not idempotent and response.status_code not in (429, 503):
+                    retryable = False
+
+                if retryable and attempt < self.max_retries:
+                    wait = self.backoff_base * (2 ** (attempt - 1))
+                    logger.warning(
+                        f"PostgREST {method} {table} returned {response.status_code}"
+                        f"{' (HTML)' if is_html else ''} - retrying in {wait:.1f}s "
+                        f"(attempt {attempt}/{self.max_retries})"
+                    )
+                    await asyncio.sleep(wait)
+                    continue
+                return response
+
+            except aiohttp.ClientConnectorError as e:
+                # Connection was never established - safe to retry any method
+                last_error = e
+            except (asyncio.TimeoutError, aiohttp.ClientError) as e:
+                last_error = e
+                if not idempotent:
+                    raise
+
+            if attempt < self.max_retries:
+                wait = self.backoff_base * (2 ** (attempt - 1))
+                logger.warning(
+                    f"PostgREST {method} {table} failed: {last_error!r} - retrying in {wait:.1f}s "
+                    f"(attempt {attempt}/{self.max_retries})"
+                )
+                await asyncio.sleep(wait)
+
+        raise last_error if last_error else RuntimeError(f"PostgREST {method} {table} failed")
+
+    async def get(self, table: str, params: Optional[Dict[str, str]] = None, **kwargs) -> PostgrestResponse:
+        return await self.request('GET', table, params=params, **kwargs)
+
+    async def post(self, table: str, json: Any = None, params: Optional[Dict[str, str]] = None, **kwargs) -> PostgrestResponse:
+        return await self.request('POST', table, params=params, json_body=json, **kwargs)
+
+    async def patch(self, table: str, json: Any = None, params: Optional[Dict[str, str]] = None, **kwargs) -> PostgrestResponse:
+        return await self.request('PATCH', table, params=params, json_body=json, **kwargs)
+
+    async def delete(self, table: str, params: Optional[Dict[str, str]] = None, **kwargs) -> PostgrestResponse:
+        return await self.request('DELETE', table, params=params, **kwargs)
@@ -0,0 +1,40 @@
+"""
+Global politeness limiter for S4A navigations.
+
+Several scraper tabs share one logged-in browser context. Each tab may spend
+most of its time waiting for pages to render, but page *requests* to
+artists.spotify.com must stay as spaced out as they were with a single tab.
+Every worker acquires the shared limiter before it navigates, which hands out
+start slots at least ``min_interval`` seconds apart.
+"""
+import asyncio
+import time
+
+
+class NavigationRateLimiter:
+    """Hands out navigation slots spaced at least ``min_interval`` seconds apart.
+
+    Slots are reserved under a lock and slept on outside it, so waiting
+    workers queue up in FIFO order without holding each other up longer
+    than necessary.
+    """
+
+    def __init__(self, min_interval: float = 4.0):
+        self.min_interval = max(0.0, min_interval)
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+        self.acquired = 0
+        self.total_wait = 0.0
+
+    async def acquire(self) -> float:
+        """Wait for the next free slot. Returns the seconds spent waiting."""
+        async with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.min_interval
+        wait = slot - now
+        if wait > 0:
+            await asyncio.sleep(wait)
+        self.acquired += 1
+        self.total_wait += wait
+        return wait
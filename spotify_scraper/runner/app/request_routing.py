@@ -0,0 +1,137 @@
+"""
+Request routing: abort resources the scrapers never read.
+
+S4A song and roster pages pull in images, cover artwork, fonts, video
+previews and analytics beacons. The extractors only read the DOM text and
+the insights API JSON. The extra traffic keeps 'networkidle' waiting and
+fills the profile cache that clear_browser_data_if_needed() later wipes.
+
+RequestPolicy installs one context.route() handler (page.route() for
+tabs on the browser host's shared context) that aborts requests
+by resource type (default: image, media, font) and by URL pattern
+(analytics/telemetry hosts), and keeps per-run counters.
+
+  - Documents, scripts, stylesheets, XHR/fetch and anything matching an
+    allow pattern (the insights API, login/challenge pages) always pass,
+    so extraction and ResponseCapture are unaffected.
+  - Aborted requests never reach the network, so their size is unknown.
+    The counters record blocked requests by reason, plus the bytes that
+    the allowed responses declared (Content-Length), as the
+    denominator.
+
+Config (env): REQUEST_ROUTING_ENABLED, REQUEST_BLOCK_TYPES (comma list),
+REQUEST_BLOCK_PATTERNS (comma-separated regexes added to the defaults).
+"""
+import os
+import re
+from typing import Dict, Iterable, Optional
+
+DEFAULT_BLOCKED_TYPES = ('image', 'media', 'font')
+
+DEFAULT_BLOCKED_PATTERNS = (
+    r'google-analytics\.com',
+    r'googletagmanager\.com',
+    r'doubleclick\.net',
+    r'connect\.facebook\.net',
+    r'hotjar\.com',
+    r'sentry\.io',
+    r'branch\.io',
+    r'/gabo-receiver-service/',   # Spotify client event logging
+    r'/pixel[/?]',
+)
+
+# Never blocked, whatever their type: data the scraper reads, and login/challenge flows
+DEFAULT_ALLOW_PATTERNS = (
+    r's4x-insights-api',
+    r'accounts\.spotify\.com',
+    r'challenge\.spotify\.com',
+    r'recaptcha|hcaptcha|arkoselabs',
+)
+
+
+def _compile(patterns: Iterable[str]) -> Optional['re.Pattern']:
+    patterns = [p for p in patterns if p]
+    return re.compile('|'.join(f'(?:{p})' for p in patterns), re.IGNORECASE) if patterns else None
+
+
+class RequestPolicy:
+    def __init__(
+        self,
+        blocked_types: Iterable[str] = DEFAULT_BLOCKED_TYPES,
+        blocked_patterns: Iterable[str] = DEFAULT_BLOCKED_PATTERNS,
+        allow_patterns: Iterable[str] = DEFAULT_ALLOW_PATTERNS,
+        enabled: bool = True,
+    ):
+        self.enabled = enabled
+        self.blocked_types = frozenset(t.strip().lower() for t in blocked_types if t.strip())
+        self._blocked = _compile(blocked_patterns)
+        self._allowed = _compile(allow_patterns)
+        self.blocked: Dict[str, int] = {}
+        self.allowed = 0
+        self.allowed_bytes = 0
+
+    @classmethod
+    def from_env(cls) -> 'RequestPolicy':
+        types = os.getenv('REQUEST_BLOCK_TYPES')
+        extra = [p.strip() for p in os.getenv('REQUEST_BLOCK_PATTERNS', '').split(',')]
+        return cls(
+            blocked_types=types.split(',') if types is not None else DEFAULT_BLOCKED_TYPES,
+            blocked_patterns=list(DEFAULT_BLOCKED_PATTERNS) + extra,
+            enabled=os.getenv('REQUEST_ROUTING_ENABLED', 'true').lower() == 'true',
+        )
+
+    def classify(self, resource_type: str, url: str) -> Optional[str]:
+        """Reason to block this request ('type:image', 'url'), or None to let it through."""
+        if self._allowed and self._allowed.search(url):
+            return None
+        if resource_type in self.blocked_types:
+            return f'type:{resource_type}'
+        if self._blocked and self._blocked.search(url):
+            return 'url'
+        return None
+
+    # ----- Playwright wiring -----
+
+    async def install(self, context) -> None:
+        """Route every request of the context (or a single page) through the policy (no-op when disabled)."""
+        if not self.enabled:
+            return
+        await context.route('**/*', self._handle)
+        context.on('response', self._on_response)
+
+    async def _handle(self, route) -> None:
+        request = route.request
+        reason = self.classify(request.resource_type, request.url)
+        if reason is None:
+            self.allowed += 1
+            await route.continue_()
+            return
+        self.blocked[reason] = self.blocked.get(reason, 0) + 1
+        try:
+            await route.abort('blockedbyclient')
+        except Exception:
+            pass  # page already navigated away / closed
+
+    def _on_response(self, response) -> None:
+        try:
+            length = response.headers.get('content-length')
+            if length and length.isdigit():
+                self.allowed_bytes += int(length)
+        except Exception:
+            pass
+
+    # ----- reporting -----
+
+    @property
+    def blocked_total(self) -> int:
+        return sum(self.blocked.values())
+
+    def summary(self) -> str:
+        if not self.enabled:
+            return 'request routing disabled'
+        total = self.blocked_total + self.allowed
+        share = (self.blocked_total / total * 100) if total else 0.0
+        reasons = ', '.join(f'{k}={v}' for k, v in sorted(self.blocked.items(), key=lambda kv: -kv[1]))
+        return (f'{self.blocked_total} of {total} requests blocked ({share:.0f}%)'
+                f'{f" [{reasons}]" if reasons else ""}; '
+                f'{self.allowed_bytes / (1024 * 1024):.1f}MB declared by allowed responses')
@@ -0,0 +1,322 @@
+"""
+Capture S4A's internal JSON responses while a song page loads.
+
+The S4A web app fills the Overview, Playlists and Location views from
+XHR/fetch calls to its insights API. Instead of waiting for the DOM to render
+and then clicking through time-range dropdowns, ResponseCapture records
+those JSON payloads as they arrive and can replay a captured request with a
+different time range.
+
+Endpoint URLs and payload shapes are not a public contract, so:
+  - the URL patterns are configurable (S4A_CAPTURE_PATTERNS, JSON object of
+    kind -> regex), as are the time-range query parameter values
+    (S4A_TIME_RANGE_VALUES);
+  - the parsers are tolerant and return None when a payload doesn't look
+    like what they expect, so the caller falls back to DOM parsing.
+
+Offline testing: ResponseCapture.from_har() loads a recorded HAR file and
+ingests its JSON responses exactly like the live page listener does.
+"""
+import asyncio
+import base64
+import json
+import os
+import re
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+
+DEFAULT_PATTERNS = {
+    'stats': r's4x-insights-api/.*/recording/[^/?]+/(timeline|stats|streams)',
+    'playlists': r's4x-insights-api/.*/recording/[^/?]+/playlists',
+    'location': r's4x-insights-api/.*/recording/[^/?]+/(location|countries|geography)',
+}
+
+# Query parameter names S4A has used for the selected time range
+TIME_PARAMS = ('time-filter', 'timeFilter', 'time_range', 'timeRange', 'period')
+
+# Scraper time range -> query parameter value
+DEFAULT_TIME_VALUES = {'7day': '7day', '28day': '28day', '12months': '12months'}
+
+# Headers that must not be copied onto a replayed request
+_SKIP_REPLAY_HEADERS = {'host', 'content-length', 'connection', 'accept-encoding'}
+
+
+def _env_json(name: str, default: Dict[str, str]) -> Dict[str, str]:
+    raw = os.getenv(name)
+    if not raw:
+        return dict(default)
+    try:
+        merged = dict(default)
+        merged.update(json.loads(raw))
+        return merged
+    except (ValueError, TypeError):
+        print(f"  WARNING: could not parse {name}, using defaults")
+        return dict(default)
+
+
+def _to_int(value: Any) -> Optional[int]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        digits = re.sub(r'[^\d]', '', value)
+        return int(digits) if digits else None
+    return None
+
+
+def _first(item: Dict[str, Any], keys) -> Any:
+    for key in keys:
+        if key in item and item[key] not in (None, ''):
+            return item[key]
+    return None
+
+
+def _find_record_lists(payload: Any, depth: int = 0):
+    """Yield every list of dicts found in the payload (breadth first-ish)."""
+    if depth > 6:
+        return
+    if isinstance(payload, list):
+        if payload and all(isinstance(x, dict) for x in payload):
+            yield payload
+        for x in payload:
+            if isinstance(x, (dict, list)):
+                yield from _find_record_lists(x, depth + 1)
+    elif isinstance(payload, dict):
+        for value in payload.values():
+            if isinstance(value, (dict, list)):
+                yield from _find_record_lists(value, depth + 1)
+
+
+_NAME_KEYS = ('title', 'name', 'playlistName', 'playlist_name')
+_STREAM_KEYS = ('streams', 'numStreams', 'streamCount', 'stream_count', 'value', 'count')
+_MADE_BY_KEYS = ('author', 'authorName', 'owner', 'ownerName', 'madeBy', 'made_by', 'curator')
+_DATE_KEYS = ('dateAdded', 'addedAt', 'added', 'date_added')
+_COUNTRY_KEYS = ('countryName', 'country', 'name', 'countryCode', 'country_code')
+
+
+def parse_playlists_payload(payload: Any) -> Optional[List[Dict[str, str]]]:
+    """Build get_song_stats()-style playlist dicts from a playlists payload."""
+    for records in _find_record_lists(payload):
+        if not any(_first(r, _NAME_KEYS) is not None and _first(r, _STREAM_KEYS) is not None for r in records):
+            continue
+        playlists = []
+        for i, record in enumerate(records, 1):
+            name = _first(record, _NAME_KEYS)
+            if name is None:
+                continue
+            made_by = _first(record, _MADE_BY_KEYS)
+            if isinstance(made_by, dict):
+                made_by = _first(made_by, ('name', 'displayName')) or ''
+            streams = _to_int(_first(record, _STREAM_KEYS)) or 0
+            playlists.append({
+                'rank': str(_first(record, ('rank', 'position')) or i),
+                'name': str(name).strip(),
+                'made_by': str(made_by or '').strip(),
+                'streams': str(streams),
+                'date_added': str(_first(record, _DATE_KEYS) or '').strip(),
+            })
+        return playlists
+    return None
+
+
+def parse_location_payload(payload: Any) -> Optional[List[Dict[str, Any]]]:
+    """Build get_location_data()-style country dicts from a location payload."""
+    for records in _find_record_lists(payload):
+        if not any(_first(r, _COUNTRY_KEYS) is not None and _first(r, _STREAM_KEYS) is not None for r in records):
+            continue
+        countries = []
+        for record in records:
+            country = _first(record, _COUNTRY_KEYS)
+            if country is None or re.match(r'^[\d,. ]+$', str(country)):
+                continue
+            countries.append({
+                'rank': len(countries) + 1,
+                'country': str(country).strip(),
+                'streams': _to_int(_first(record, _STREAM_KEYS)) or 0,
+            })
+        # Location tab lists countries by streams, highest first
+        countries.sort(key=lambda c: c['streams'], reverse=True)
+        for rank, c in enumerate(countries, 1):
+            c['rank'] = rank
+        return countries
+    return None
+
+
+def parse_stats_payload(payload: Any) -> Optional[int]:
+    """Total streams for the requested period from a stats/timeline payload.
+
+    Accepts either an explicit total (``totalStreams``/``streams``/``total``)
+    or a timeline of ``{date, streams|value}`` points that is summed.
+    """
+    if isinstance(payload, dict):
+        total = _first(payload, ('totalStreams', 'total_streams', 'streams', 'total'))
+        total = _to_int(total) if not isinstance(total, (dict, list)) else None
+        if total is not None:
+            return total
+    for records in _find_record_lists(payload):
+        values = [_to_int(_first(r, _STREAM_KEYS)) for r in records if _first(r, ('date', 'x', 'day')) is not None]
+        values = [v for v in values if v is not None]
+        if values:
+            return sum(values)
+    return None
+
+
+class CapturedResponse:
+    def __init__(self, kind: str, url: str, data: Any, headers: Optional[Dict[str, str]] = None):
+        self.kind = kind
+        self.url = url
+        self.data = data
+        self.headers = headers or {}
+
+
+class ResponseCapture:
+    """Records JSON payloads for the stats, playlists and location endpoints."""
+
+    def __init__(self, patterns: Optional[Dict[str, str]] = None, time_values: Optional[Dict[str, str]] = None):
+        patterns = patterns or _env_json('S4A_CAPTURE_PATTERNS', DEFAULT_PATTERNS)
+        self.patterns = {kind: re.compile(p) for kind, p in patterns.items()}
+        self.time_values = time_values or _env_json('S4A_TIME_RANGE_VALUES', DEFAULT_TIME_VALUES)
+        self.responses: List[CapturedResponse] = []
+        self._pending: List[asyncio.Task] = []
+        self._page = None
+
+    # ----- recording -----
+
+    def attach(self, page) -> None:
+        self._page = page
+        page.on('response', self._on_response)
+
+    def detach(self) -> None:
+        if self._page is not None:
+            try:
+                self._page.remove_listener('response', self._on_response)
+            except Exception:
+                pass
+            self._page = None
+
+    def reset(self) -> None:
+        """Forget payloads from the previous song."""
+        for task in self._pending:
+            task.cancel()
+        self._pending = []
+        self.responses = []
+
+    def classify(self, url: str) -> Optional[str]:
+        for kind, pattern in self.patterns.items():
+            if pattern.search(url):
+                return kind
+        return None
+
+    def ingest(self, url: str, data: Any, headers: Optional[Dict[str, str]] = None) -> Optional[str]:
+        kind = self.classify(url)
+        if kind:
+            self.responses.append(CapturedResponse(kind, url, data, headers))
+        return kind
+
+    def _on_response(self, response) -> None:
+        if not self.classify(response.url):
+            return
+        self._pending.append(asyncio.ensure_future(self._read_response(response)))
+
+    async def _read_response(self, response) -> None:
+        try:
+            if response.status != 200:
+                return
+            if 'json' not in (response.headers.get('content-type') or ''):
+                return
+            data = await response.json()
+            headers = await response.request.all_headers()
+            self.ingest(response.url, data, headers)
+        except Exception:
+            pass  # Page navigated away or body unavailable - DOM fallback covers it
+
+    async def settle(self) -> None:
+        """Wait for payloads whose bodies are still being read."""
+        pending, self._pending = self._pending, []
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    # ----- lookup -----
+
+    def time_range_of(self, url: str) -> Optional[str]:
+        query = dict(parse_qsl(urlsplit(url).query))
+        for param in TIME_PARAMS:
+            if param in query:
+                for range_type, value in self.time_values.items():
+                    if query[param] == value:
+                        return range_type
+        return None
+
+    def find(self, kind: str, range_type: Optional[str] = None) -> Optional[CapturedResponse]:
+        """Latest payload of this kind (for the given time range, if set)."""
+        for captured in reversed(self.responses):
+            if captured.kind != kind:
+                continue
+            if range_type is None or self.time_range_of(captured.url) == range_type:
+                return captured
+        return None
+
+    def rewrite_time_range(self, url: str, range_type: str) -> Optional[str]:
+        value = self.time_values.get(range_type)
+        parts = urlsplit(url)
+        query = parse_qsl(parts.query, keep_blank_values=True)
+        if value is None or not any(k in TIME_PARAMS for k, _ in query):
+            return None
+        query = [(k, value if k in TIME_PARAMS else v) for k, v in query]
+        return urlunsplit(parts._replace(query=urlencode(query)))
+
+    async def replay(self, kind: str, range_type: str, request_context=None) -> Optional[Any]:
+        """Re-issue a captured request for another time range.
+
+        Uses the page's APIRequestContext (same cookies) and the headers the
+        web app sent, which carry its bearer token. Returns the JSON payload
+        or None.
+        """
+        template = self.find(kind)
+        if template is None:
+            return None
+        url = self.rewrite_time_range(template.url, range_type)
+        if url is None:
+            return None
+        request_context = request_context or (self._page.request if self._page else None)
+        if request_context is None:
+            return None
+        headers = {
+            k: v for k, v in template.headers.items()
+            if not k.startswith(':') and k.lower() not in _SKIP_REPLAY_HEADERS
+        }
+        try:
+            resp = await request_context.get(url, headers=headers)
+            if not resp.ok:
+                return None
+            data = await resp.json()
+        except Exception:
+            return None
+        self.ingest(url, data, template.headers)
+        return data
+
+    # ----- offline fixtures -----
+
+    @classmethod
+    def from_har(cls, har_path, **kwargs) -> 'ResponseCapture':
+        """Build a capture from a recorded HAR file (for offline tests)."""
+        with open(har_path, 'r', encoding='utf-8') as f:
+            har = json.load(f)
+        capture = cls(**kwargs)
+        for entry in har.get('log', {}).get('entries', []):
+            request = entry.get('request', {})
+            content = entry.get('response', {}).get('content', {})
+            if 'json' not in (content.get('mimeType') or ''):
+                continue
+            text = content.get('text') or ''
+            if content.get('encoding') == 'base64':
+                text = base64.b64decode(text).decode('utf-8')
+            try:
+                data = json.loads(text)
+            except ValueError:
+                continue
+            headers = {h['name']: h['value'] for h in request.get('headers', [])}
+            capture.ingest(request.get('url', ''), data, headers)
+        return capture
@@ -0,0 +1,155 @@
+"""
+Per-campaign freshness scheduling for the production scraper.
+
+Not every active campaign needs a fresh scrape every run. The scheduler
+sorts campaigns into tiers from the data already on the campaign row:
+
+  - new:      never scraped - always due, scraped first
+  - near_goal: 12-month streams within NEAR_GOAL_RATIO of the goal, so
+               completion is detected promptly - due every run
+  - hot:      weekly streams high or moving fast vs the previous scrape
+              (scrape_data.previous) - due every run
+  - normal:   due once NORMAL_INTERVAL_HOURS have passed
+  - stagnant: weekly streams low and unchanged - due once
+              STAGNANT_INTERVAL_HOURS have passed
+
+Due campaigns are then ordered by priority and cut to what fits in the
+per-run time budget. Anything cut stays due and moves up the next run,
+because it is even more overdue by then.
+"""
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+TIER_NEW = 'new'
+TIER_NEAR_GOAL = 'near_goal'
+TIER_HOT = 'hot'
+TIER_NORMAL = 'normal'
+TIER_STAGNANT = 'stagnant'
+
+# Lower value = scraped earlier when the budget is tight
+TIER_RANK = {TIER_NEW: 0, TIER_NEAR_GOAL: 1, TIER_HOT: 2, TIER_NORMAL: 3, TIER_STAGNANT: 4}
+
+
+def _as_int(value: Any) -> int:
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _parse_ts(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        ts = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+
+class CampaignScheduler:
+    """Decides which campaigns to scrape this run.
+
+    Campaign dicts are expected to carry ``last_scraped_at``, ``goal``,
+    ``streams_24h`` (S4A 7-day), ``streams_7d`` (S4A 28-day), ``streams_12m``
+    and ``previous`` (``scrape_data->previous``). Missing fields just make a
+    campaign look new or normal.
+    """
+
+    def __init__(
+        self,
+        goal_parser: Callable[[Any], int],
+        normal_interval_hours: float = 20,
+        stagnant_interval_hours: float = 68,
+        near_goal_ratio: float = 0.8,
+        hot_weekly_streams: int = 5000,
+        hot_change_ratio: float = 0.15,
+        stagnant_weekly_streams: int = 100,
+        budget_minutes: float = 0,
+        seconds_per_campaign: float = 60,
+        parallel_workers: int = 1,
+    ):
+        self.goal_parser = goal_parser
+        self.normal_interval_hours = normal_interval_hours
+        self.stagnant_interval_hours = stagnant_interval_hours
+        self.near_goal_ratio = near_goal_ratio
+        self.hot_weekly_streams = hot_weekly_streams
+        self.hot_change_ratio = hot_change_ratio
+        self.stagnant_weekly_streams = stagnant_weekly_streams
+        self.budget_minutes = budget_minutes
+        self.seconds_per_campaign = max(1.0, seconds_per_campaign)
+        self.parallel_workers = max(1, parallel_workers)
+
+    def classify(self, campaign: Dict[str, Any]) -> Tuple[str, float]:
+        """Return (tier, due interval in hours) for a campaign."""
+        if _parse_ts(campaign.get('last_scraped_at')) is None:
+            return TIER_NEW, 0
+
+        goal = self.goal_parser(campaign.get('goal'))
+        streams_12m = _as_int(campaign.get('streams_12m'))
+        if goal > 0 and streams_12m >= goal * self.near_goal_ratio:
+            return TIER_NEAR_GOAL, 0
+
+        weekly = _as_int(campaign.get('streams_24h'))
+        monthly = _as_int(campaign.get('streams_7d'))
+        previous = campaign.get('previous') or {}
+        prev_weekly = _as_int(previous.get('streams_24h'))
+        prev_monthly = _as_int(previous.get('streams_7d'))
+
+        change = abs(weekly - prev_weekly) / max(prev_weekly, 1) if previous else 0
+        if weekly >= self.hot_weekly_streams or (previous and change >= self.hot_change_ratio and weekly > self.stagnant_weekly_streams):
+            return TIER_HOT, 0
+
+        unchanged = not previous or (weekly == prev_weekly and monthly == prev_monthly)
+        if weekly < self.stagnant_weekly_streams and unchanged:
+            return TIER_STAGNANT, self.stagnant_interval_hours
+
+        return TIER_NORMAL, self.normal_interval_hours
+
+    def capacity(self) -> Optional[int]:
+        """How many campaigns fit in the run budget (None = unlimited)."""
+        if not self.budget_minutes or self.budget_minutes <= 0:
+            return None
+        return max(1, int(self.budget_minutes * 60 * self.parallel_workers / self.seconds_per_campaign))
+
+    def plan(
+        self, campaigns: List[Dict[str, Any]], now: Optional[datetime] = None
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """Pick this run's campaigns, most urgent first.
+
+        Returns (selected campaigns, summary dict for logging).
+        """
+        now = now or datetime.now(timezone.utc)
+        due = []
+        tiers: Dict[str, int] = {}
+        not_due = 0
+
+        for campaign in campaigns:
+            tier, interval = self.classify(campaign)
+            tiers[tier] = tiers.get(tier, 0) + 1
+            last = _parse_ts(campaign.get('last_scraped_at'))
+            age_hours = (now - last).total_seconds() / 3600 if last else float('inf')
+            if interval and age_hours < interval:
+                not_due += 1
+                continue
+            # Most overdue (relative to its interval) first within a tier
+            overdue = age_hours / interval if interval else age_hours
+            due.append((TIER_RANK[tier], -overdue, campaign['id'], campaign))
+
+        due.sort(key=lambda x: x[:3])
+        capacity = self.capacity()
+        selected = [c for *_, c in due]
+        over_budget = 0
+        if capacity is not None and len(selected) > capacity:
+            over_budget = len(selected) - capacity
+            selected = selected[:capacity]
+
+        summary = {
+            'total': len(campaigns),
+            'selected': len(selected),
+            'not_due': not_due,
+            'over_budget': over_budget,
+            'tiers': tiers,
+            'capacity': capacity,
+        }
+        return selected, summary
@@ -0,0 +1,103 @@
+"""
+In-memory previous-value snapshot for spotify_campaigns.
+
+fetch_campaigns_from_database already reads every active campaign row at
+the start of the run. The stream fields it reads are loaded into a
+SnapshotTable, keyed by campaign id, so that:
+
+  - zero-protection and the ``scrape_data.previous`` trend no longer need a
+    GET before every PATCH;
+  - the goal evaluator can skip campaigns whose total 12-month streams are
+    still below the goal, without a campaign_playlists query;
+  - write avoidance can compare a new scrape's fingerprint with the stored
+    one and see whether today's history row was already written.
+
+Each row is a fixed tuple, not the API dict, so a few thousand campaigns
+cost a few hundred KB. A successful write refreshes the row, so a campaign
+scraped twice in one run compares against its latest values.
+"""
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+STREAM_FIELDS = ('streams_24h', 'streams_7d', 'streams_12m')
+
+# (streams_24h, streams_7d, streams_12m, goal, scrape_fingerprint, scrape_history_date)
+Snapshot = Tuple[int, int, int, int, Optional[str], Optional[str]]
+
+_EMPTY: Snapshot = (0, 0, 0, 0, None, None)
+
+
+def _as_int(value: Any) -> int:
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+class SnapshotTable:
+    def __init__(self, goal_parser: Optional[Callable[[Any], int]] = None):
+        self.goal_parser = goal_parser or _as_int
+        self._rows: Dict[Any, Snapshot] = {}
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, campaign_id) -> bool:
+        return campaign_id in self._rows
+
+    def load(self, campaigns: Iterable[Dict[str, Any]]) -> int:
+        """Load snapshots from campaign rows. Returns how many were loaded."""
+        count = 0
+        for campaign in campaigns:
+            self._rows[campaign['id']] = (
+                _as_int(campaign.get('streams_24h')),
+                _as_int(campaign.get('streams_7d')),
+                _as_int(campaign.get('streams_12m')),
+                self.goal_parser(campaign.get('goal')),
+                campaign.get('scrape_fingerprint'),
+                campaign.get('scrape_history_date'),
+            )
+            count += 1
+        return count
+
+    def previous_values(self, campaign_id) -> Optional[Dict[str, int]]:
+        """Stream values as of the last read or write, or None if unknown."""
+        row = self._rows.get(campaign_id)
+        if row is None:
+            return None
+        return dict(zip(STREAM_FIELDS, row[:3]))
+
+    def goal(self, campaign_id) -> int:
+        row = self._rows.get(campaign_id)
+        return row[3] if row else 0
+
+    def fingerprint(self, campaign_id) -> Optional[str]:
+        return self._rows.get(campaign_id, _EMPTY)[4]
+
+    def history_date(self, campaign_id) -> Optional[str]:
+        """UTC date (YYYY-MM-DD) of the last full history row."""
+        return self._rows.get(campaign_id, _EMPTY)[5]
+
+    def update(self, campaign_id, data: Dict[str, Any]) -> None:
+        """Refresh a row after a successful write (fields not written are kept)."""
+        old = self._rows.get(campaign_id, _EMPTY)
+        streams = tuple(
+            _as_int(data[field]) if field in data else old[i]
+            for i, field in enumerate(STREAM_FIELDS)
+        )
+        goal = self.goal_parser(data['goal']) if 'goal' in data else old[3]
+        self._rows[campaign_id] = streams + (
+            goal,
+            data.get('scrape_fingerprint', old[4]),
+            data.get('scrape_history_date', old[5]),
+        )
+
+    def below_goal(self, campaign_id) -> bool:
+        """True when total 12-month streams are known and still under the goal.
+
+        Vendor playlist streams are a subset of the song's streams, so such
+        a campaign cannot have reached its goal yet.
+        """
+        row = self._rows.get(campaign_id)
+        if row is None or row[3] <= 0 or row[2] <= 0:
+            return False
+        return row[2] < row[3]
@@ -0,0 +1,249 @@
+"""
+Song and artist name matching.
+
+RosterPage.find_song_match() used to walk every roster song for every
+campaign song and rebuild the lowercase and regex-stripped forms each
+time. Its substring rule returned the first song that contained the
+target, so "Love" could match "Lovesick" ahead of "Love (Acoustic)".
+
+A SongIndex is built once per artist (or across the whole roster). For
+each name it precomputes the key tiers below, with a dict per tier and a
+trigram inverted index for fuzzy lookups. best_match() returns the
+highest-scoring candidate with a confidence score and the rule that
+matched. match_all() matches a client's whole list of campaign songs in
+one call.
+
+  rule      score  key
+  exact     1.00   normalize_name (vendor_index.py)
+  alias     0.98   alias_key: accents, punctuation and '&' spelling ignored
+  compact   0.96   alias key without spaces (the old alphanumeric rule)
+  tokens    0.94   token_key: word order ignored
+  base      0.92   featured artists and " - Radio Edit" tails removed
+  core      0.90   "(feat. X)", "- Remix", "[Live]" ... suffixes removed
+  fuzzy     <0.90  best of a sequence ratio on the compact keys and a
+                   containment score; only trigram-sharing names are scored
+
+The key tiers are dicts (O(1)). A key claimed by two different names is
+ambiguous and falls through to the next tier; the names that collided are
+left out of the fuzzy pass, which would otherwise just guess between them.
+Fuzzy scores are capped below the key tiers. Pure Python (difflib); no extra dependency.
+"""
+import re
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .vendor_index import alias_key, normalize_name
+
+DEFAULT_MIN_SCORE = 0.8
+
+RULE_SCORES = {
+    'exact': 1.0,
+    'alias': 0.98,
+    'compact': 0.96,
+    'tokens': 0.94,
+    'base': 0.92,
+    'core': 0.9,
+}
+FUZZY_CAP = 0.89
+# Only the best trigram candidates get the (slower) sequence ratio
+FUZZY_CANDIDATES = 8
+
+_FEATURE_RE = re.compile(
+    r'\s*[(\[](?:feat|ft|featuring|with)\.?\s[^)\]]*[)\]]'   # "(feat. X)", "[with X]"
+    r'|\s(?:feat|ft|featuring)\.?\s.*$'                      # " feat. X"
+    r'|\s-\s.*$',                                             # " - Radio Edit"
+    re.IGNORECASE,
+)
+_SUFFIX_RE = re.compile(
+    r'\s*(?:[(\[][^)\]]*[)\]]'                       # "(Remix)", "[Live]"
+    r'|\s-\s.*$'                                     # " - Radio Edit"
+    r'|\s(?:feat|ft|featuring)\.?\s.*$)',            # " feat. X"
+    re.IGNORECASE,
+)
+
+
+def compact_key(name: Any) -> str:
+    return alias_key(name).replace(' ', '')
+
+
+def _stripped_key(text: str, pattern: re.Pattern) -> str:
+    return compact_key(pattern.sub('', text).strip() or text)
+
+
+def base_key(name: Any) -> str:
+    """Title without featured artists or a ' - ' tail ('Doe (X Remix) - Edit' -> 'doexremix')."""
+    return _stripped_key(normalize_name(name), _FEATURE_RE)
+
+
+def core_key(name: Any) -> str:
+    """Title without features, versions and bracketed suffixes ('DNBMF (feat. X)' -> 'dnbmf')."""
+    return _stripped_key(normalize_name(name), _SUFFIX_RE)
+
+
+def match_keys(name: Any) -> Dict[str, str]:
+    """Every key tier for one name, normalizing it only once."""
+    exact = normalize_name(name)
+    alias = alias_key(exact)
+    return {
+        'exact': exact,
+        'alias': alias,
+        'compact': alias.replace(' ', ''),
+        'tokens': ' '.join(sorted(set(alias.split()))),
+        'base': _stripped_key(exact, _FEATURE_RE),
+        'core': _stripped_key(exact, _SUFFIX_RE),
+    }
+
+
+def trigrams(key: str) -> Set[str]:
+    padded = f'  {key} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def fuzzy_score(a: str, b: str) -> float:
+    """Similarity of two compact keys, capped below the key tiers."""
+    if not a or not b:
+        return 0.0
+    ratio = SequenceMatcher(None, a, b, autojunk=False).ratio()
+    short, long_ = (a, b) if len(a) <= len(b) else (b, a)
+    # The old "contains" rule, scored by how much of the longer name is covered
+    contained = 0.0
+    if len(short) >= 3 and short in long_:
+        contained = 0.7 + 0.25 * len(short) / len(long_)
+    return min(FUZZY_CAP, max(ratio, contained))
+
+
+@dataclass
+class Match:
+    item: Any
+    name: str
+    score: float
+    rule: str
+
+
+class _Entry:
+    __slots__ = ('item', 'name', 'compact', 'grams')
+
+    def __init__(self, item: Any, name: str, compact: str):
+        self.item = item
+        self.name = name
+        self.compact = compact
+        self.grams: Set[str] = set()
+
+
+class SongIndex:
+    """Name index over roster songs (or artists). Usage:
+
+        index = SongIndex(roster_songs)              # items with a 'name' key
+        match = index.best_match('DNBMF')
+        if match:
+            match.item['sfa_url'], match.score, match.rule
+    """
+
+    _AMBIGUOUS = object()
+
+    def __init__(self, items: Iterable[Any], name: Optional[Callable[[Any], str]] = None,
+                 min_score: float = DEFAULT_MIN_SCORE):
+        self.min_score = min_score
+        get_name = name or (lambda item: item['name'])
+        self.entries: List[_Entry] = []
+        self.keys: Dict[str, Dict[str, Any]] = {rule: {} for rule in RULE_SCORES}
+        # (rule, key) -> positions of the entries that made the key ambiguous
+        self.collisions: Dict[Tuple[str, str], List[int]] = {}
+        # Trigram -> entry positions; built on the first lookup that needs it
+        self.grams: Optional[Dict[str, List[int]]] = None
+
+        for item in items:
+            entry_name = get_name(item)
+            if not entry_name:
+                continue
+            keys = match_keys(entry_name)
+            entry = _Entry(item, str(entry_name), keys['compact'])
+            pos = len(self.entries)
+            self.entries.append(entry)
+            for rule, key in keys.items():
+                if not key or key == 'unknown':
+                    continue
+                tier = self.keys[rule]
+                seen = tier.get(key)
+                if seen is None:
+                    tier[key] = pos
+                elif seen is self._AMBIGUOUS:
+                    # The plain title owns the key even when its variants collided first
+                    if entry.compact == key:
+                        tier[key] = pos
+                    else:
+                        self.collisions[(rule, key)].append(pos)
+                elif self.entries[seen].compact != entry.compact:
+                    # 'DNBMF' and 'DNBMF (Remix)' share a core key: the plain title owns it
+                    if entry.compact == key:
+                        tier[key] = pos
+                    elif self.entries[seen].compact != key:
+                        tier[key] = self._AMBIGUOUS
+                        self.collisions[(rule, key)] = [seen, pos]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _candidates(self, grams: Set[str], exclude: Set[int]) -> List[int]:
+        if self.grams is None:
+            self.grams = {}
+            for pos, entry in enumerate(self.entries):
+                entry.grams = trigrams(entry.compact)
+                for gram in entry.grams:
+                    self.grams.setdefault(gram, []).append(pos)
+        shared: Dict[int, int] = {}
+        for gram in grams:
+            for pos in self.grams.get(gram, ()):
+                if pos not in exclude:
+                    shared[pos] = shared.get(pos, 0) + 1
+        # Rank by trigram Jaccard similarity
+        ranked = sorted(
+            shared,
+            key=lambda pos: shared[pos] / (len(grams) + len(self.entries[pos].grams) - shared[pos]),
+            reverse=True,
+        )
+        return ranked[:FUZZY_CANDIDATES]
+
+    def best_match(self, name: str, min_score: Optional[float] = None) -> Optional[Match]:
+        """Best-scoring entry for name, or None if nothing scores min_score or better."""
+        threshold = self.min_score if min_score is None else min_score
+        if not name:
+            return None
+        keys = match_keys(name)
+        collided: Set[int] = set()
+        for rule, score in RULE_SCORES.items():
+            if score < threshold:
+                break
+            pos = self.keys[rule].get(keys[rule])
+            if pos is self._AMBIGUOUS:
+                # 'Song A' vs 'Song A (Remix)' and 'Song A (Live)': no way to tell which
+                collided.update(self.collisions[(rule, keys[rule])])
+            elif pos is not None:
+                entry = self.entries[pos]
+                return Match(entry.item, entry.name, score, rule)
+
+        target = keys['compact']
+        best: Optional[Tuple[float, int]] = None
+        for pos in self._candidates(trigrams(target), collided):
+            score = fuzzy_score(target, self.entries[pos].compact)
+            if best is None or score > best[0]:
+                best = (score, pos)
+        if best is None or best[0] < threshold:
+            return None
+        entry = self.entries[best[1]]
+        return Match(entry.item, entry.name, round(best[0], 3), 'fuzzy')
+
+    def match_all(self, names: Iterable[str], min_score: Optional[float] = None) -> List[Optional[Match]]:
+        """best_match() for each name, in order (e.g. every campaign song of one client)."""
+        return [self.best_match(name, min_score) for name in names]
+
+
+def name_score(name1: str, name2: str) -> Tuple[float, Optional[str]]:
+    """Score and rule for a single pair of names (0.0, None if nothing matches)."""
+    match = SongIndex([name1], name=str).best_match(name2, min_score=0.0)
+    return (match.score, match.rule) if match else (0.0, None)
+
+
+def names_match(name1: str, name2: str, min_score: float = DEFAULT_MIN_SCORE) -> bool:
+    return name_score(name1, name2)[0] >= min_score
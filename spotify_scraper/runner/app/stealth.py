@@ -0,0 +1,72 @@
+"""
+Browser launch settings shared by every process that opens the S4A profile.
+
+The session cookies are tied to how the browser presents itself. The
+production scraper, the keepalive and the browser host must launch the
+profile with the same args, user agent and viewport.
+"""
+
+USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+              '(KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36')
+
+VIEWPORT = {'width': 1920, 'height': 1080}
+
+STEALTH_ARGS = [
+    '--disable-blink-features=AutomationControlled',
+    '--disable-infobars',
+    '--disable-automation',
+    '--disable-browser-side-navigation',
+    '--disable-web-security',
+    '--disable-dev-shm-usage',
+    '--no-sandbox',
+    '--disable-setuid-sandbox',
+    '--disable-gpu',
+    '--disable-software-rasterizer',
+    '--disable-extensions',
+    '--disable-background-networking',
+    '--disable-background-timer-throttling',
+    '--disable-backgrounding-occluded-windows',
+    '--disable-breakpad',
+    '--disable-component-extensions-with-background-pages',
+    '--disable-features=TranslateUI',
+    '--disable-ipc-flooding-protection',
+    '--disable-renderer-backgrounding',
+    '--force-color-profile=srgb',
+    '--metrics-recording-only',
+    '--no-first-run',
+    '--password-store=basic',
+    '--use-mock-keychain',
+    '--disable-hang-monitor',
+    '--single-process',
+    '--disable-features=site-per-process',
+    '--excludeSwitches=enable-automation',
+    '--useAutomationExtension=false',
+]
+
+STEALTH_JS = """
+    Object.defineProperty(navigator, 'webdriver', { get: () => undefined });
+    delete window.cdc_adoQpoasnfa76pfcZLmcfl_Array;
+    delete window.cdc_adoQpoasnfa76pfcZLmcfl_Promise;
+    delete window.cdc_adoQpoasnfa76pfcZLmcfl_Symbol;
+    if (window.chrome) {
+        window.chrome.runtime = {
+            connect: () => {},
+            sendMessage: () => {},
+            onMessage: { addListener: () => {} }
+        };
+    }
+    const originalQuery = window.navigator.permissions.query;
+    window.navigator.permissions.query = (parameters) => (
+        parameters.name === 'notifications' ?
+            Promise.resolve({ state: Notification.permission }) :
+            originalQuery(parameters)
+    );
+    Object.defineProperty(navigator, 'plugins', {
+        get: () => [
+            { name: 'Chrome PDF Viewer', filename: 'internal-pdf-viewer' },
+            { name: 'Chrome PDF Plugin', filename: 'mhjfbmdgcfjbbpaeojofohoefgiehjai' },
+            { name: 'Native Client', filename: 'internal-nacl-plugin' }
+        ]
+    });
+    Object.defineProperty(navigator, 'languages', { get: () => ['en-US', 'en'] });
+"""
@@ -0,0 +1,279 @@
+"""
+Vendor-playlist matching index.
+
+Maps S4A playlist names to the vendor that owns the playlist, using the
+vendor_playlists table. The production scraper, sync_existing_data.py and
+scripts/generate_sql_import.py all share it.
+
+  - One normalizer (normalize_name) for every key. It matches
+    normalize_campaign_playlist_name() in the database: lowercase, NFKD,
+    whitespace collapsed. Keys are built from playlist_name, not from the
+    stored playlist_name_normalized, which the vendor_playlists trigger
+    fills with a different LOWER(TRIM()) rule.
+  - Full pagination with Range headers. A single GET is silently capped at
+    the PostgREST max-rows, so vendors past the cap never matched. Pages
+    are read until the exact count from the first page is reached (or a
+    page comes back empty), never until a short page: a max-rows below
+    PAGE_SIZE makes every page short.
+  - An on-disk cache that refreshes incrementally by updated_at. Deletes
+    are not visible through updated_at, so if the row count no longer
+    matches, or the cache is older than full_refresh_hours, it reloads in full.
+  - Lookup tiers, each a dict (O(1)): exact normalized name, then an alias
+    key (punctuation/emoji stripped, '&' -> 'and'), then the sorted set of
+    word tokens. Alias and token keys claimed by more than one vendor are
+    dropped rather than guessed.
+"""
+import json
+import os
+import re
+import unicodedata
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+PAGE_SIZE = 1000
+CACHE_VERSION = 1
+
+SELECT = 'id,playlist_name,vendor_id,updated_at'
+
+
+def normalize_name(name: Any) -> str:
+    """Shared playlist-name normalizer (same rule as the campaign_playlists upsert key)."""
+    if not name:
+        return 'unknown'
+    normalized = unicodedata.normalize('NFKD', str(name).lower().strip())
+    normalized = ' '.join(normalized.split())
+    return normalized or 'unknown'
+
+
+def alias_key(name: Any) -> str:
+    """Near-exact key: accents, punctuation, emoji and '&' spelling ignored."""
+    text = normalize_name(name).replace('&', ' and ')
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return ' '.join(re.sub(r'[^\w\s]|_', ' ', text).split())
+
+
+def token_key(name: Any) -> str:
+    """Word-order-insensitive key ('Chill Vibes 2025' == '2025 chill vibes')."""
+    return ' '.join(sorted(set(alias_key(name).split())))
+
+
+def _parse_ts(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        ts = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+
+def _total_from_content_range(value: Optional[str]) -> Optional[int]:
+    """'0-999/4321' -> 4321; '*/0' -> 0; unknown ('*') -> None."""
+    if not value or '/' not in value:
+        return None
+    total = value.rsplit('/', 1)[1]
+    return int(total) if total.isdigit() else None
+
+
+class VendorIndex:
+    def __init__(self, full_refresh_hours: float = 24):
+        self.full_refresh_hours = full_refresh_hours
+        # vendor_playlists id -> (playlist_name, vendor_id, updated_at)
+        self.rows: Dict[str, Tuple[str, Optional[str], Optional[str]]] = {}
+        self.full_refreshed_at: Optional[datetime] = None
+        self._exact: Dict[str, str] = {}
+        self._alias: Dict[str, Optional[str]] = {}
+        self._tokens: Dict[str, Optional[str]] = {}
+        self.hits = {'exact': 0, 'alias': 0, 'token': 0, 'miss': 0}
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    # ----- building -----
+
+    def merge(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """Add or replace rows from the API. Returns how many were merged."""
+        count = 0
+        for row in rows:
+            if row.get('id') is None:
+                continue
+            self.rows[str(row['id'])] = (row.get('playlist_name') or '', row.get('vendor_id'), row.get('updated_at'))
+            count += 1
+        self._rebuild()
+        return count
+
+    def _rebuild(self) -> None:
+        exact: Dict[str, str] = {}
+        alias: Dict[str, Optional[str]] = {}
+        tokens: Dict[str, Optional[str]] = {}
+        # Oldest first, so the most recently updated row wins an exact-name tie
+        ordered = sorted(self.rows.values(), key=lambda r: _parse_ts(r[2]) or datetime.min.replace(tzinfo=timezone.utc))
+        for name, vendor_id, _ in ordered:
+            if not vendor_id:
+                continue
+            exact[normalize_name(name)] = vendor_id
+            for table, key in ((alias, alias_key(name)), (tokens, token_key(name))):
+                if not key:
+                    continue
+                if key in table and table[key] != vendor_id:
+                    table[key] = None  # ambiguous - never guess between vendors
+                else:
+                    table.setdefault(key, vendor_id)
+        self._exact, self._alias, self._tokens = exact, alias, tokens
+
+    # ----- lookup -----
+
+    def match(self, playlist_name: Any) -> Optional[str]:
+        """vendor_id for an S4A playlist name, or None."""
+        vendor_id = self._exact.get(normalize_name(playlist_name))
+        if vendor_id:
+            self.hits['exact'] += 1
+            return vendor_id
+        vendor_id = self._alias.get(alias_key(playlist_name))
+        if vendor_id:
+            self.hits['alias'] += 1
+            return vendor_id
+        vendor_id = self._tokens.get(token_key(playlist_name))
+        if vendor_id:
+            self.hits['token'] += 1
+            return vendor_id
+        self.hits['miss'] += 1
+        return None
+
+    def get(self, playlist_name: Any, default=None) -> Optional[str]:
+        """dict-style alias for match()."""
+        return self.match(playlist_name) or default
+
+    # ----- disk cache -----
+
+    @classmethod
+    def load(cls, path, full_refresh_hours: float = 24) -> 'VendorIndex':
+        """Index from the on-disk cache (empty if missing or unreadable)."""
+        index = cls(full_refresh_hours)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != CACHE_VERSION:
+                return index
+            index.rows = {k: tuple(v) for k, v in data.get('rows', {}).items()}
+            index.full_refreshed_at = _parse_ts(data.get('full_refreshed_at'))
+            index._rebuild()
+        except (OSError, ValueError, TypeError, AttributeError):
+            pass
+        return index
+
+    def save(self, path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            'version': CACHE_VERSION,
+            'full_refreshed_at': self.full_refreshed_at.isoformat() if self.full_refreshed_at else None,
+            'rows': self.rows,
+        }
+        tmp = path.with_suffix('.tmp')
+        tmp.write_text(json.dumps(data, ensure_ascii=False))
+        tmp.replace(path)
+
+    # ----- refresh planning (shared by the async and sync refreshers) -----
+
+    def latest_update(self) -> Optional[str]:
+        stamps = [(ts, raw) for raw in (r[2] for r in self.rows.values()) if (ts := _parse_ts(raw))]
+        return max(stamps)[1] if stamps else None
+
+    def needs_full_refresh(self, now: Optional[datetime] = None) -> bool:
+        if not self.rows or self.full_refreshed_at is None:
+            return True
+        now = now or datetime.now(timezone.utc)
+        return now - self.full_refreshed_at >= timedelta(hours=self.full_refresh_hours)
+
+    def page_request(self, offset: int, since: Optional[str] = None) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """(params, headers) for one Range-paginated page."""
+        params = {'select': SELECT, 'order': 'id.asc'}
+        if since:
+            # gte: rows sharing the newest timestamp are re-read rather than missed
+            params['updated_at'] = f'gte.{since}'
+        headers = {'Range-Unit': 'items', 'Range': f'{offset}-{offset + PAGE_SIZE - 1}'}
+        if offset == 0:
+            # Total rows to expect, in the first page's Content-Range
+            headers['Prefer'] = 'count=exact'
+        return params, headers
+
+    @staticmethod
+    def _last_page(page: List[Dict[str, Any]], fetched: int, total: Optional[int]) -> bool:
+        """Done once the counted total is read, or a page is empty (a short page may just be max-rows)."""
+        return not page or (total is not None and fetched >= total)
+
+    @staticmethod
+    def count_request() -> Tuple[Dict[str, str], Dict[str, str]]:
+        return {'select': 'id'}, {'Range-Unit': 'items', 'Range': '0-0', 'Prefer': 'count=exact'}
+
+    def _finish(self, rows: List[Dict[str, Any]], full: bool) -> None:
+        if full:
+            self.rows = {}
+            self.full_refreshed_at = datetime.now(timezone.utc)
+        self.merge(rows)
+
+    # ----- refresh -----
+
+    async def refresh_async(self, db) -> str:
+        """Refresh with the async PostgrestClient. Returns 'full' or 'incremental'."""
+        async def fetch_all(since):
+            rows: List[Dict[str, Any]] = []
+            total = None
+            while True:
+                params, headers = self.page_request(len(rows), since)
+                resp = await db.get('vendor_playlists', params=params, headers=headers)
+                if resp.status_code not in (200, 206):
+                    raise RuntimeError(f"vendor_playlists page failed: {resp.status_code}")
+                page = resp.json() or []
+                rows.extend(page)
+                if total is None:
+                    total = _total_from_content_range(resp.headers.get('Content-Range'))
+                if self._last_page(page, len(rows), total):
+                    return rows
+
+        if not self.needs_full_refresh():
+            self._finish(await fetch_all(self.latest_update()), full=False)
+            params, headers = self.count_request()
+            resp = await db.get('vendor_playlists', params=params, headers=headers)
+            total = _total_from_content_range(resp.headers.get('Content-Range'))
+            if resp.status_code in (200, 206) and total == len(self.rows):
+                return 'incremental'
+        self._finish(await fetch_all(None), full=True)
+        return 'full'
+
+    def refresh_sync(self, session, rest_url: str) -> str:
+        """Refresh with a requests.Session (headers already set). Returns 'full' or 'incremental'."""
+        url = f"{rest_url.rstrip('/')}/vendor_playlists"
+
+        def fetch_all(since):
+            rows: List[Dict[str, Any]] = []
+            total = None
+            while True:
+                params, headers = self.page_request(len(rows), since)
+                resp = session.get(url, params=params, headers=headers, timeout=60)
+                if resp.status_code not in (200, 206):
+                    raise RuntimeError(f"vendor_playlists page failed: {resp.status_code}")
+                page = resp.json() or []
+                rows.extend(page)
+                if total is None:
+                    total = _total_from_content_range(resp.headers.get('Content-Range'))
+                if self._last_page(page, len(rows), total):
+                    return rows
+
+        if not self.needs_full_refresh():
+            self._finish(fetch_all(self.latest_update()), full=False)
+            params, headers = self.count_request()
+            resp = session.get(url, params=params, headers=headers, timeout=60)
+            total = _total_from_content_range(resp.headers.get('Content-Range'))
+            if resp.status_code in (200, 206) and total == len(self.rows):
+                return 'incremental'
+        self._finish(fetch_all(None), full=True)
+        return 'full'
+
+
+def default_cache_path() -> Path:
+    """spotify_scraper/data/vendor_index.json unless VENDOR_INDEX_CACHE is set."""
+    default = Path(__file__).resolve().parents[2] / 'data' / 'vendor_index.json'
+    return Path(os.getenv('VENDOR_INDEX_CACHE', str(default)))
@@ -0,0 +1,173 @@
+"""
+Condition-based waits for the S4A scrape path.
+
+Each wait returns as soon as the page reaches the state we need, such as
+the table rows settling or the dropdown label changing, instead of
+sleeping for a fixed 1-3 seconds. Every wait has a timeout. Every wait is
+timed into WAIT_STATS, so the end-of-run summary shows which waits dominate
+a campaign.
+
+Deliberate throttling is kept separate from these waits. Navigations go
+through the NavigationRateLimiter (SCRAPE_MIN_NAV_INTERVAL). In-page clicks
+are spaced by a per-page pacer (S4A_MIN_PACING_SECONDS).
+"""
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+
+from .metrics import METRICS
+from .rate_limiter import NavigationRateLimiter
+
+ROW_SELECTOR = '[data-testid="sort-table-body-row"]'
+
+# Minimum spacing between in-page interactions (chip / dropdown clicks)
+MIN_PACING_SECONDS = float(os.getenv('S4A_MIN_PACING_SECONDS', '0.5'))
+
+
+def make_pacer(min_interval: Optional[float] = None) -> NavigationRateLimiter:
+    """Per-page pacer for deliberate throttling of clicks."""
+    return NavigationRateLimiter(MIN_PACING_SECONDS if min_interval is None else min_interval)
+
+
+class WaitStats:
+    """Per-wait timing: count, total/max seconds and how many hit the timeout."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def record(self, name: str, seconds: float, timed_out: bool = False) -> None:
+        s = self._stats.setdefault(name, {'count': 0, 'total': 0.0, 'max': 0.0, 'timeouts': 0})
+        s['count'] += 1
+        s['total'] += seconds
+        s['max'] = max(s['max'], seconds)
+        if timed_out:
+            s['timeouts'] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        return {name: dict(s) for name, s in self._stats.items()}
+
+    def summary_lines(self) -> List[str]:
+        """Human-readable summary, slowest wait first."""
+        lines = []
+        for name, s in sorted(self._stats.items(), key=lambda kv: kv[1]['total'], reverse=True):
+            avg = s['total'] / s['count'] if s['count'] else 0
+            timeouts = f", {int(s['timeouts'])} timed out" if s['timeouts'] else ''
+            lines.append(
+                f"{name}: {int(s['count'])}x, total {s['total']:.1f}s, "
+                f"avg {avg:.2f}s, max {s['max']:.2f}s{timeouts}"
+            )
+        return lines
+
+
+WAIT_STATS = WaitStats()
+
+
+@asynccontextmanager
+async def timed(name: str):
+    """Record the duration of the enclosed wait under ``name``.
+
+    The body sets ``state['timed_out'] = True`` when the condition was not met.
+    """
+    state = {'timed_out': False}
+    start = time.monotonic()
+    try:
+        yield state
+    finally:
+        elapsed = time.monotonic() - start
+        WAIT_STATS.record(name, elapsed, state['timed_out'])
+        METRICS.record(f'wait.{name}', elapsed)
+
+
+async def pace(pacer: Optional[NavigationRateLimiter], name: str = 'pacing') -> None:
+    """Deliberate throttle before an interaction; only sleeps the remainder."""
+    if pacer is None:
+        return
+    async with timed(name):
+        await pacer.acquire()
+
+
+async def wait_for_function(page, name: str, expression: str, arg=None, timeout: float = 5.0) -> bool:
+    """page.wait_for_function with timing; returns False on timeout."""
+    async with timed(name) as state:
+        try:
+            await page.wait_for_function(expression, arg=arg, timeout=timeout * 1000, polling=100)
+            return True
+        except Exception:
+            state['timed_out'] = True
+            return False
+
+
+async def wait_for_visible(page, selector: str, name: str, timeout: float = 3.0) -> bool:
+    async with timed(name) as state:
+        try:
+            await page.wait_for_selector(selector, state='visible', timeout=timeout * 1000)
+            return True
+        except Exception:
+            state['timed_out'] = True
+            return False
+
+
+async def wait_for_text_change(page, selector: str, previous: str, name: str, timeout: float = 5.0) -> bool:
+    """Wait until the first element matching selector has text != previous."""
+    return await wait_for_function(
+        page, name,
+        """([sel, prev]) => {
+            const el = document.querySelector(sel);
+            return !!el && (el.textContent || '').trim() !== prev;
+        }""",
+        arg=[selector, (previous or '').strip()],
+        timeout=timeout,
+    )
+
+
+async def wait_for_text_contains(page, selector: str, expected: str, name: str, timeout: float = 5.0) -> bool:
+    """Wait until the first element matching selector contains expected (case-insensitive)."""
+    return await wait_for_function(
+        page, name,
+        """([sel, expected]) => {
+            const el = document.querySelector(sel);
+            return !!el && (el.textContent || '').toLowerCase().includes(expected);
+        }""",
+        arg=[selector, expected.lower()],
+        timeout=timeout,
+    )
+
+
+async def wait_for_rows_stable(
+    page,
+    name: str,
+    selector: str = ROW_SELECTOR,
+    timeout: float = 8.0,
+    settle: float = 0.5,
+    poll: float = 0.15,
+) -> int:
+    """Wait until at least one row exists and the row count stops changing.
+
+    The count must hold for ``settle`` seconds. Returns the last count seen,
+    which is 0 if no rows appeared before the timeout.
+    """
+    async with timed(name) as state:
+        deadline = time.monotonic() + timeout
+        last_count = -1
+        stable_since = time.monotonic()
+        count = 0
+        while True:
+            try:
+                count = await page.evaluate('(sel) => document.querySelectorAll(sel).length', selector)
+            except Exception:
+                count = 0
+            now = time.monotonic()
+            if count != last_count:
+                last_count = count
+                stable_since = now
+            elif count > 0 and now - stable_since >= settle:
+                return count
+            if now >= deadline:
+                state['timed_out'] = True
+                return count
+            await asyncio.sleep(poll)
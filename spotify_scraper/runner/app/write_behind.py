@@ -0,0 +1,88 @@
+"""
+Bounded write-behind queue for scrape results.
+
+The browser stage pushes (campaign, data) items onto the queue and moves on
+to the next page load while a small pool of persistence workers drains it.
+Because the queue is bounded, a slow database applies backpressure to the
+browser stage instead of letting results pile up in memory.
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindQueue:
+    """Fixed pool of async workers draining a bounded asyncio.Queue.
+
+    Args:
+        handler: Coroutine called with each queued item. Returns True when the
+            item was persisted, False otherwise. Exceptions count as failures.
+        workers: Number of concurrent persistence workers.
+        maxsize: Queue capacity; put() blocks once this many items are waiting.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Any], Awaitable[bool]],
+        workers: int = 2,
+        maxsize: int = 4,
+        name: str = 'persist',
+    ):
+        self.handler = handler
+        self.worker_count = max(1, workers)
+        self.name = name
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, maxsize))
+        self.succeeded = 0
+        self.failed = 0
+        self._workers: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        if self._workers:
+            return
+        self._workers = [
+            asyncio.create_task(self._worker(i), name=f'{self.name}-worker-{i}')
+            for i in range(1, self.worker_count + 1)
+        ]
+
+    async def put(self, item: Any) -> None:
+        """Queue an item, waiting if the persistence workers are behind."""
+        if self.queue.full():
+            logger.info(f"⏳ Write-behind queue full ({self.queue.qsize()} pending) - waiting for DB writes")
+        await self.queue.put(item)
+
+    async def drain(self) -> None:
+        """Wait for every queued item to be persisted, then stop the workers."""
+        if not self._workers:
+            return
+        pending = self.queue.qsize()
+        if pending:
+            logger.info(f"Flushing {pending} queued write(s) before finishing...")
+        await self.queue.join()
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    @property
+    def pending(self) -> int:
+        return self.queue.qsize()
+
+    async def _worker(self, worker_id: int) -> None:
+        while True:
+            item = await self.queue.get()
+            try:
+                ok = await self.handler(item)
+                if ok:
+                    self.succeeded += 1
+                else:
+                    self.failed += 1
+            except asyncio.CancelledError:
+                self.failed += 1
+                raise
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"[{self.name}-worker-{worker_id}] Unhandled persistence error: {e}")
+            finally:
+                self.queue.task_done()
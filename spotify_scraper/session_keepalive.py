@@ -4,6 +4,10 @@ Spotify Session Keepalive
 Keeps the Spotify for Artists session alive by periodically browsing S4A pages.
 Run via cron every 3 hours to prevent session expiry.
 
+Attaches to the shared browser host (browser_host.py) when it is running, so
+it also works during a scrape. Without a host it launches its own browser,
+or skips the run if another process holds the profile lease.
+
 Usage:
   python3 session_keepalive.py           # Check and refresh session
   python3 session_keepalive.py --check   # Only check, don't browse
@@ -32,99 +36,18 @@ logger = logging.getLogger('keepalive')
 
 # Configuration
 SCRAPER_DIR = Path(__file__).parent
-LOCK_FILE = SCRAPER_DIR / 'scraper.lock'
 SESSION_FLAG = LOG_DIR / 'session_expired.flag'
 USER_DATA_DIR = os.getenv(
     'USER_DATA_DIR',
     '/root/arti-marketing-ops/spotify_scraper/data/browser_data'
 )
+BROWSER_HOST_ENABLED = os.getenv('BROWSER_HOST_ENABLED', 'true').lower() == 'true'
 
-# Same stealth args as production scraper (MUST match for session compatibility)
-STEALTH_ARGS = [
-    '--disable-blink-features=AutomationControlled',
-    '--disable-infobars',
-    '--disable-automation',
-    '--disable-browser-side-navigation',
-    '--disable-web-security',
-    '--disable-dev-shm-usage',
-    '--no-sandbox',
-    '--disable-setuid-sandbox',
-    '--disable-gpu',
-    '--disable-software-rasterizer',
-    '--disable-extensions',
-    '--disable-background-networking',
-    '--disable-background-timer-throttling',
-    '--disable-backgrounding-occluded-windows',
-    '--disable-breakpad',
-    '--disable-component-extensions-with-background-pages',
-    '--disable-features=TranslateUI',
-    '--disable-ipc-flooding-protection',
-    '--disable-renderer-backgrounding',
-    '--force-color-profile=srgb',
-    '--metrics-recording-only',
-    '--no-first-run',
-    '--password-store=basic',
-    '--use-mock-keychain',
-    '--disable-hang-monitor',
-    '--single-process',
-    '--disable-features=site-per-process',
-    '--excludeSwitches=enable-automation',
-    '--useAutomationExtension=false',
-]
-
-# Same stealth JS as production scraper
-STEALTH_JS = """
-    Object.defineProperty(navigator, 'webdriver', { get: () => undefined });
-    delete window.cdc_adoQpoasnfa76pfcZLmcfl_Array;
-    delete window.cdc_adoQpoasnfa76pfcZLmcfl_Promise;
-    delete window.cdc_adoQpoasnfa76pfcZLmcfl_Symbol;
-    if (window.chrome) {
-        window.chrome.runtime = {
-            connect: () => {},
-            sendMessage: () => {},
-            onMessage: { addListener: () => {} }
-        };
-    }
-    const originalQuery = window.navigator.permissions.query;
-    window.navigator.permissions.query = (parameters) => (
-        parameters.name === 'notifications' ?
-            Promise.resolve({ state: Notification.permission }) :
-            originalQuery(parameters)
-    );
-    Object.defineProperty(navigator, 'plugins', {
-        get: () => [
-            { name: 'Chrome PDF Viewer', filename: 'internal-pdf-viewer' },
-            { name: 'Chrome PDF Plugin', filename: 'mhjfbmdgcfjbbpaeojofohoefgiehjai' },
-            { name: 'Native Client', filename: 'internal-nacl-plugin' }
-        ]
-    });
-    Object.defineProperty(navigator, 'languages', { get: () => ['en-US', 'en'] });
-"""
-
-
-def is_scraper_running():
-    """Check if the main scraper is currently running (via lock file)."""
-    if not LOCK_FILE.exists():
-        return False
-    try:
-        pid = int(LOCK_FILE.read_text().strip())
-        # Check if PID is still alive
-        os.kill(pid, 0)
-        return True
-    except (ValueError, ProcessLookupError, PermissionError):
-        return False
-
-
-def clear_browser_locks():
-    """Remove stale Chromium singleton lock files."""
-    for name in ['SingletonLock', 'SingletonSocket', 'SingletonCookie']:
-        lock_path = os.path.join(USER_DATA_DIR, name)
-        try:
-            if os.path.exists(lock_path):
-                os.remove(lock_path)
-                logger.info(f"Removed stale lock: {name}")
-        except Exception as e:
-            logger.warning(f"Could not remove {name}: {e}")
+# Same launch settings as the production scraper (MUST match for session compatibility)
+sys.path.insert(0, str(SCRAPER_DIR / 'runner'))
+from app.browser_host_client import attach as attach_browser_host, launch_lease
+from app.leases import Lease, lease_dir
+from app.stealth import STEALTH_ARGS, STEALTH_JS, USER_AGENT, VIEWPORT
 
 
 def mark_session_expired():
@@ -148,14 +71,8 @@ async def keepalive(check_only=False):
     logger.info("SESSION KEEPALIVE - %s", datetime.now(timezone.utc).isoformat())
     logger.info("=" * 50)
 
-    # Skip if scraper is actively running
-    if is_scraper_running():
-        logger.info("Scraper is currently running -- skipping keepalive")
-        return True
-
     # Prepare browser data dir
     os.makedirs(USER_DATA_DIR, exist_ok=True)
-    clear_browser_locks()
 
     # Determine headless mode
     display = os.getenv('DISPLAY')
@@ -165,22 +82,37 @@ async def keepalive(check_only=False):
 
     playwright = None
     context = None
+    session = None
+    lease = None
+    page = None
     try:
         playwright = await async_playwright().start()
 
-        context = await playwright.chromium.launch_persistent_context(
-            user_data_dir=USER_DATA_DIR,
-            headless=headless,
-            args=STEALTH_ARGS,
-            timeout=60000,
-            viewport={'width': 1920, 'height': 1080},
-            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
-                       '(KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
-            ignore_https_errors=True,
-        )
+        # Attach to the shared browser host if it runs (works alongside a scrape);
+        # otherwise launch our own browser, but only if nobody else has the profile
+        if BROWSER_HOST_ENABLED:
+            session = await attach_browser_host(playwright, USER_DATA_DIR, holder='keepalive')
+        if session is not None:
+            page = await session.context.new_page()
+        else:
+            lease = await launch_lease(USER_DATA_DIR, 'keepalive')
+            if lease is None:
+                holder = Lease(lease_dir(USER_DATA_DIR), 'profile').holder_info() or {}
+                logger.info("Browser profile in use by %s (pid %s) -- skipping keepalive",
+                            holder.get('holder', 'another process'), holder.get('pid'))
+                return True
+            context = await playwright.chromium.launch_persistent_context(
+                user_data_dir=USER_DATA_DIR,
+                headless=headless,
+                args=STEALTH_ARGS,
+                timeout=60000,
+                viewport=VIEWPORT,
+                user_agent=USER_AGENT,
+                ignore_https_errors=True,
+            )
+            page = context.pages[0] if context.pages else await context.new_page()
 
         # Apply stealth scripts
-        page = context.pages[0] if context.pages else await context.new_page()
         try:
             await page.add_init_script(STEALTH_JS)
         except Exception:
@@ -293,12 +225,18 @@ async def keepalive(check_only=False):
         return False
 
     finally:
-        # Clean shutdown
+        # Clean shutdown: an attached session only closes its tab and disconnects
         try:
+            if session:
+                if page and not page.is_closed():
+                    await page.close()
+                await session.close()
             if context:
                 await context.close()
         except Exception:
             pass
+        if lease:
+            lease.release()
         try:
             if playwright:
                 await playwright.stop()
@@ -14,6 +14,9 @@ import requests
 env_path = Path(__file__).parent / '.env'
 load_dotenv(env_path)
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'runner'))
+from app.vendor_index import VendorIndex, default_cache_path, normalize_name
+
 SUPABASE_URL = os.getenv('SUPABASE_URL', 'https://api.artistinfluence.com')
 SUPABASE_SERVICE_ROLE_KEY = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
 
@@ -23,7 +26,22 @@ headers = {
     'Content-Type': 'application/json'
 }
 
-def sync_campaign_playlists(campaign_id, scrape_data):
+def load_vendor_index():
+    """Vendor matching index shared with the production scraper (disk cache + refresh)."""
+    cache_path = default_cache_path()
+    index = VendorIndex.load(cache_path)
+    session = requests.Session()
+    session.headers.update(headers)
+    try:
+        mode = index.refresh_sync(session, f"{SUPABASE_URL}/rest/v1")
+        index.save(cache_path)
+        print(f"Loaded {len(index)} vendor playlists for auto-matching ({mode} refresh)")
+    except Exception as e:
+        print(f"⚠️  Could not refresh vendor_playlists ({e}) - using {len(index)} cached")
+    return index
+
+
+def sync_campaign_playlists(campaign_id, scrape_data, vendor_index=None):
     """Extract and sync playlist data from scrape_data JSON"""
     try:
         # Extract unique playlists across all time ranges
@@ -35,8 +53,11 @@ def sync_campaign_playlists(campaign_id, scrape_data):
             
             for playlist in playlists:
                 playlist_name = playlist.get('name', 'Unknown')
-                if playlist_name not in playlists_by_name:
-                    playlists_by_name[playlist_name] = {
+                # Key on the normalized name: campaign_playlists is unique on
+                # (campaign_id, playlist_name_normalized)
+                key = normalize_name(playlist_name)
+                if key not in playlists_by_name:
+                    playlists_by_name[key] = {
                         'playlist_name': playlist_name,
                         'streams_24h': 0,
                         'streams_7d': 0,
@@ -48,11 +69,11 @@ def sync_campaign_playlists(campaign_id, scrape_data):
                 streams = int(streams_str) if streams_str.isdigit() else 0
                 
                 if time_range == '24hour':
-                    playlists_by_name[playlist_name]['streams_24h'] = streams
+                    playlists_by_name[key]['streams_24h'] = streams
                 elif time_range == '7day':
-                    playlists_by_name[playlist_name]['streams_7d'] = streams
+                    playlists_by_name[key]['streams_7d'] = streams
                 elif time_range == '12months':
-                    playlists_by_name[playlist_name]['streams_12m'] = streams
+                    playlists_by_name[key]['streams_12m'] = streams
         
         if not playlists_by_name:
             return 0
@@ -71,6 +92,7 @@ def sync_campaign_playlists(campaign_id, scrape_data):
                 'streams_24h': playlist_data['streams_24h'],
                 'streams_7d': playlist_data['streams_7d'],
                 'streams_12m': playlist_data['streams_12m'],
+                'vendor_id': vendor_index.match(playlist_data['playlist_name']) if vendor_index else None,
             }
             playlist_records.append(record)
         
@@ -111,6 +133,7 @@ def main():
     
     campaigns = response.json()
     print(f"Found {len(campaigns)} campaigns with scraped data")
+    vendor_index = load_vendor_index()
     print()
     
     total_playlists = 0
@@ -126,7 +149,7 @@ def main():
         
         print(f"[{i}/{len(campaigns)}] {campaign_name}...", end=' ')
         
-        playlist_count = sync_campaign_playlists(campaign_id, scrape_data)
+        playlist_count = sync_campaign_playlists(campaign_id, scrape_data, vendor_index)
         
         if playlist_count > 0:
             print(f"✓ {playlist_count} playlists")
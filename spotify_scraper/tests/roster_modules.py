@@ -0,0 +1,35 @@
+"""
+roster_scraper modules for the tests.
+
+roster_scraper's package is also called runner.app, so its modules cannot be
+imported next to the scraper's; they are loaded from their files instead.
+
+    roster_index = load_roster_module('roster_index.py')
+    roster_scraper = load_roster_package_module('roster_scraper')   # relative imports
+"""
+import importlib
+import importlib.util
+import sys
+from pathlib import Path
+
+ROSTER_APP = Path(__file__).resolve().parents[2] / 'roster_scraper' / 'runner' / 'app'
+
+
+def load_roster_module(relative_path):
+    path = ROSTER_APP / relative_path
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_roster_package_module(name):
+    """A module of the roster package imported as roster_app.<name>, for modules with relative imports."""
+    if 'roster_app' not in sys.modules:
+        spec = importlib.util.spec_from_file_location(
+            'roster_app', ROSTER_APP / '__init__.py', submodule_search_locations=[str(ROSTER_APP)]
+        )
+        package = importlib.util.module_from_spec(spec)
+        sys.modules['roster_app'] = package
+        spec.loader.exec_module(package)
+    return importlib.import_module(f'roster_app.{name}')
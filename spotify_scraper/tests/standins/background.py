@@ -0,0 +1,39 @@
+"""
+Run stand-in servers on their own event loop in a daemon thread.
+
+The scraper's health check and campaign fetch use blocking `requests`
+calls from inside its event loop, so a stand-in served from that same loop
+would deadlock. ServerThread keeps the fakes responsive whatever the
+caller's loop is doing.
+
+    with ServerThread(FakePostgrest(...), FakeS4A(...)) as (db, s4a):
+        ...                     # db.url, s4a.url are live
+"""
+import asyncio
+import threading
+
+
+class ServerThread:
+    def __init__(self, *servers):
+        self.servers = servers
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name='standins', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        for server in self.servers:
+            asyncio.run_coroutine_threadsafe(server.start(), self.loop).result(timeout=10)
+        return self.servers
+
+    def stop(self) -> None:
+        for server in self.servers:
+            asyncio.run_coroutine_threadsafe(server.stop(), self.loop).result(timeout=10)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=10)
+        self.loop.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
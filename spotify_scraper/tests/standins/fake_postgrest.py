@@ -0,0 +1,271 @@
+"""
+In-memory PostgREST stand-in for throughput and integration tests.
+
+Serves /rest/v1/<table> with the subset of PostgREST the scraper uses:
+
+  - select lists with aliases and JSON paths (previous:scrape_data->previous);
+  - filters eq/neq/gt/gte/lt/lte/like/ilike/in/is, and or=(...);
+  - order (with nullsfirst/nullslast), limit/offset, Range headers and Prefer: count=exact;
+  - POST inserts and upserts (resolution=merge-duplicates + on_conflict),
+    PATCH and DELETE with filters, and return=representation.
+
+Every request is counted per (method, table) together with its server-side
+latency, so a run can report DB calls per campaign. An optional
+per-request delay simulates a remote database.
+
+    server = FakePostgrest({'spotify_campaigns': rows}, latency=0.02)
+    await server.start()            # server.url -> SUPABASE_URL
+    ...
+    server.call_counts()            # {'GET spotify_campaigns': 3, ...}
+    await server.stop()
+"""
+import asyncio
+import itertools
+import json
+import re
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+RESERVED_PARAMS = {'select', 'order', 'limit', 'offset', 'on_conflict', 'or'}
+
+
+def _split_top(text: str, sep: str = ',') -> List[str]:
+    """Split on sep outside parentheses."""
+    parts, depth, current = [], 0, ''
+    for ch in text:
+        if ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+        if ch == sep and depth == 0:
+            parts.append(current)
+            current = ''
+        else:
+            current += ch
+    if current:
+        parts.append(current)
+    return parts
+
+
+def _coerce(value: Any, literal: str) -> Tuple[Any, Any]:
+    """Comparable pair for a stored value and a filter literal."""
+    if isinstance(value, bool):
+        return value, literal.lower() == 'true'
+    if isinstance(value, (int, float)):
+        try:
+            return value, float(literal)
+        except ValueError:
+            return str(value), literal
+    return ('' if value is None else str(value)), literal
+
+
+def _like(value: Any, pattern: str, ignore_case: bool) -> bool:
+    regex = '^' + '.*'.join(re.escape(part) for part in pattern.replace('*', '%').split('%')) + '$'
+    return re.match(regex, '' if value is None else str(value), re.IGNORECASE if ignore_case else 0) is not None
+
+
+def matches(row: Dict[str, Any], column: str, expression: str) -> bool:
+    negate = expression.startswith('not.')
+    if negate:
+        expression = expression[4:]
+    op, _, literal = expression.partition('.')
+    value = row.get(column)
+    if op == 'is':
+        result = value is None if literal == 'null' else value is (literal == 'true')
+    elif op == 'in':
+        options = [o.strip().strip('"') for o in literal.strip('()').split(',') if o.strip()]
+        result = value is not None and any(_coerce(value, o)[0] == _coerce(value, o)[1] for o in options)
+    elif op in ('like', 'ilike'):
+        result = _like(value, literal, op == 'ilike')
+    elif value is None:
+        result = False
+    else:
+        left, right = _coerce(value, literal)
+        result = {
+            'eq': left == right, 'neq': left != right, 'gt': left > right,
+            'gte': left >= right, 'lt': left < right, 'lte': left <= right,
+        }.get(op, False)
+    return not result if negate else result
+
+
+def _or_matches(row: Dict[str, Any], expression: str) -> bool:
+    for clause in _split_top(expression.strip()[1:-1]):
+        column, _, rest = clause.partition('.')
+        if matches(row, column, rest):
+            return True
+    return False
+
+
+def _project(row: Dict[str, Any], select: Optional[str]) -> Dict[str, Any]:
+    if not select or select == '*':
+        return dict(row)
+    out = {}
+    for item in _split_top(select):
+        item = item.strip()
+        if not item or '(' in item:
+            continue  # embedded resources are not supported
+        alias, _, path = item.rpartition(':') if ':' in item else ('', '', item)
+        keys = re.split(r'->>?', path)
+        value: Any = row.get(keys[0])
+        for key in keys[1:]:
+            value = value.get(key) if isinstance(value, dict) else None
+        out[alias or keys[-1]] = value
+    return out
+
+
+class FakePostgrest:
+    def __init__(self, tables: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+                 latency: float = 0.0, host: str = '127.0.0.1', port: int = 0):
+        self.tables: Dict[str, List[Dict[str, Any]]] = {k: [dict(r) for r in v] for k, v in (tables or {}).items()}
+        self.latency = latency
+        self.host = host
+        self.port = port
+        self.calls: Dict[str, List[float]] = {}
+        self._ids = itertools.count(1_000_000)
+        self._runner: Optional[web.AppRunner] = None
+        self.url = ''
+
+    # ----- lifecycle -----
+
+    async def start(self) -> str:
+        app = web.Application()
+        app.router.add_route('*', '/rest/v1/', self._root)
+        app.router.add_route('*', '/rest/v1/{table}', self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        self.url = f'http://{self.host}:{self.port}'
+        return self.url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    # ----- stats -----
+
+    def call_counts(self) -> Dict[str, int]:
+        return {key: len(v) for key, v in sorted(self.calls.items())}
+
+    def total_calls(self, include_reads: bool = True) -> int:
+        return sum(len(v) for k, v in self.calls.items() if include_reads or not k.startswith('GET '))
+
+    def latency_summary(self) -> Dict[str, Dict[str, float]]:
+        out = {}
+        for key, values in sorted(self.calls.items()):
+            ordered = sorted(values)
+            out[key] = {
+                'count': len(values),
+                'mean_ms': round(sum(values) / len(values) * 1000, 2),
+                'p95_ms': round(ordered[max(0, int(len(ordered) * 0.95) - 1)] * 1000, 2),
+            }
+        return out
+
+    def reset_stats(self) -> None:
+        self.calls.clear()
+
+    # ----- request handling -----
+
+    async def _root(self, request: web.Request) -> web.Response:
+        return web.json_response({'swagger': '2.0', 'info': {'title': 'fake postgrest'}})
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        start = time.monotonic()
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        table = request.match_info['table']
+        try:
+            handler = {'GET': self._get, 'POST': self._post, 'PATCH': self._patch, 'DELETE': self._delete}.get(request.method)
+            if handler is None:
+                return web.json_response({'message': 'method not allowed'}, status=405)
+            return await handler(request, table, self.tables.setdefault(table, []))
+        finally:
+            self.calls.setdefault(f'{request.method} {table}', []).append(time.monotonic() - start)
+
+    def _filtered(self, request: web.Request, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        out = rows
+        for column, expression in request.query.items():
+            if column in RESERVED_PARAMS:
+                continue
+            out = [r for r in out if matches(r, column, expression)]
+        if 'or' in request.query:
+            out = [r for r in out if _or_matches(r, request.query['or'])]
+        return out
+
+    @staticmethod
+    def _prefer(request: web.Request) -> set:
+        return {p.strip() for p in request.headers.get('Prefer', '').split(',') if p.strip()}
+
+    @staticmethod
+    def _representation(request, rows, status):
+        if 'return=representation' in FakePostgrest._prefer(request):
+            select = request.query.get('select')
+            return web.json_response([_project(r, select) for r in rows], status=status)
+        return web.Response(status=status if status != 200 else 204)
+
+    async def _get(self, request, table, rows):
+        found = self._filtered(request, rows)
+        order = request.query.get('order')
+        if order:
+            for part in reversed(order.split(',')):
+                column, *flags = part.split('.')
+                present = [r for r in found if r.get(column) is not None]
+                missing = [r for r in found if r.get(column) is None]
+                descending = 'desc' in flags
+                present.sort(key=lambda r: r[column], reverse=descending)
+                # PostgreSQL default: NULLS LAST ascending, NULLS FIRST descending
+                nulls_first = 'nullsfirst' in flags or (descending and 'nullslast' not in flags)
+                found = missing + present if nulls_first else present + missing
+        total = len(found)
+        offset = int(request.query.get('offset', 0))
+        limit = request.query.get('limit')
+        range_header = request.headers.get('Range')
+        if range_header:
+            first, _, last = range_header.partition('-')
+            offset, limit = int(first), int(last) - int(first) + 1
+        page = found[offset:offset + int(limit)] if limit is not None else found[offset:]
+        headers = {}
+        status = 200
+        if range_header or 'count=exact' in self._prefer(request):
+            end = f'{offset}-{offset + len(page) - 1}' if page else '*'
+            headers['Content-Range'] = f"{end}/{total if 'count=exact' in self._prefer(request) else '*'}"
+            status = 206 if range_header else 200
+        select = request.query.get('select')
+        return web.json_response([_project(r, select) for r in page], status=status, headers=headers)
+
+    async def _post(self, request, table, rows):
+        body = json.loads(await request.text() or '[]')
+        records = body if isinstance(body, list) else [body]
+        merge = 'resolution=merge-duplicates' in self._prefer(request)
+        conflict = [c for c in request.query.get('on_conflict', 'id').split(',') if c]
+        written = []
+        for record in records:
+            existing = None
+            if merge and all(record.get(c) is not None for c in conflict):
+                existing = next((r for r in rows if all(r.get(c) == record.get(c) for c in conflict)), None)
+            if existing is not None:
+                existing.update(record)
+                written.append(existing)
+            else:
+                row = dict(record)
+                row.setdefault('id', next(self._ids))
+                rows.append(row)
+                written.append(row)
+        return self._representation(request, written, 201)
+
+    async def _patch(self, request, table, rows):
+        body = json.loads(await request.text() or '{}')
+        found = self._filtered(request, rows)
+        for row in found:
+            row.update(body)
+        return self._representation(request, found, 200)
+
+    async def _delete(self, request, table, rows):
+        found = self._filtered(request, rows)
+        ids = {id(r) for r in found}
+        rows[:] = [r for r in rows if id(r) not in ids]
+        return self._representation(request, found, 200)
@@ -0,0 +1,227 @@
+"""
+Local Spotify for Artists stand-in for throughput tests.
+
+Serves templated song pages (Overview /stats, /playlists, /location) that
+follow the 2026 S4A DOM the extractors read: hero-stat chips, the
+playlists time-range dropdown and the sort-table rows. Every song gets
+deterministic numbers, seeded from its id.
+
+Knobs:
+  latency         seconds added to each page response (plus up to 20% jitter)
+  rows            playlist rows per song
+  fail_rate       share of song pages served as S4A's "Something went wrong" page
+  login_rate      share of song pages that bounce to accounts.spotify.com/login;
+                  the login page returns to the dashboard after relogin_delay,
+                  standing in for the manual VNC login
+  not_found_rate  share of songs that show the 404 page
+
+install(context) routes https://artists.spotify.com and
+https://accounts.spotify.com to this server, so the scraper keeps its real
+URLs and session checks. Pages are fetched by the browser as usual.
+"""
+import asyncio
+import hashlib
+import json
+import random
+import re
+from typing import Dict, Optional
+
+from aiohttp import web
+
+HOST_RE = re.compile(r'^https://(artists|accounts)\.spotify\.com/')
+
+RANGE_FACTORS = {'Last 7 days': 0.25, 'Last 28 days': 1.0, 'Last 12 months': 9.0}
+
+PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title} - Spotify for Artists</title></head>
+<body>{body}</body></html>
+"""
+
+DASHBOARD = """<nav><a href="/home">Home</a><a href="/c/roster">Roster</a></nav>
+<h1>Home</h1><p>Welcome back</p>"""
+
+LOGIN = """<h1>Log in to Spotify</h1>
+<form action="/login"><input id="login-username" autocomplete="username"></form>
+<script>setTimeout(() => location.replace('https://artists.spotify.com/home'), {delay_ms});</script>"""
+
+LOGIN_BOUNCE = """<script>location.replace('https://accounts.spotify.com/login?continue=' + encodeURIComponent(location.href));</script>"""
+
+ERROR = "<h1>Something went wrong</h1><p>There's a problem on our end. Try again later.</p>"
+
+NOT_FOUND = "<h2>We couldn't find that page</h2>"
+
+STATS = """<header data-testid="song-header"><h1>{title}</h1><span>{artist}</span><span>Released Mar 14, 2025</span><span>{alltime}</span></header>
+<div role="group">{chips}</div>
+<button data-testid="hero-stats-button-streams"><span>Streams</span><span>{hero}</span></button>
+<script>
+document.querySelectorAll('[data-encore-id="chipFilter"]').forEach(chip => chip.addEventListener('click', () => {{
+  document.querySelectorAll('[data-encore-id="chipFilter"]').forEach(c => c.setAttribute('aria-pressed', 'false'));
+  chip.setAttribute('aria-pressed', 'true');
+  setTimeout(() => {{
+    document.querySelector('[data-testid="hero-stats-button-streams"] span:last-child').textContent = chip.dataset.streams;
+  }}, {render_ms});
+}}));
+</script>"""
+
+PLAYLISTS = """<header data-testid="song-header"><h1>{title}</h1></header>
+<a data-testid="tab-playlists" href="playlists">Playlists</a>
+<button aria-haspopup="listbox">Last 28 days</button>
+<ul role="listbox" style="display:none">
+  <li role="option">Last 7 days</li><li role="option">Last 28 days</li><li role="option">Last 12 months</li>
+</ul>
+<table data-testid="sort-table"><tbody id="rows"></tbody></table>
+<script>
+const BASE = {rows_json};
+const FACTORS = {factors_json};
+function fmt(n) {{ return n.toLocaleString('en-US'); }}
+function render(label) {{
+  const f = FACTORS[label];
+  document.getElementById('rows').innerHTML = BASE.map((r, i) =>
+    `<tr data-testid="sort-table-body-row"><td>${{i + 1}}</td><td>${{r[0]}}</td><td>${{r[1]}}</td>` +
+    `<td>${{fmt(Math.round(r[2] * f))}}</td><td>${{r[3]}}</td></tr>`).join('');
+}}
+const button = document.querySelector('[aria-haspopup="listbox"]');
+const list = document.querySelector('[role="listbox"]');
+button.addEventListener('click', () => {{ list.style.display = 'block'; }});
+list.querySelectorAll('[role="option"]').forEach(o => o.addEventListener('click', () => {{
+  list.style.display = 'none';
+  button.textContent = o.textContent;
+  document.getElementById('rows').innerHTML = '';
+  setTimeout(() => render(o.textContent), {render_ms});
+}}));
+render('Last 28 days');
+</script>"""
+
+LOCATION = """<header data-testid="song-header"><h1>{title}</h1></header>
+<button aria-haspopup="listbox">Last 28 Days</button>
+<h2>Top countries for this song</h2>
+<table data-testid="sort-table"><tbody>{rows}</tbody></table>"""
+
+COUNTRIES = ['United States', 'United Kingdom', 'Germany', 'Canada', 'Brazil', 'Mexico', 'Australia',
+             'France', 'Netherlands', 'Sweden', 'Poland', 'Spain', 'Italy', 'Philippines', 'Japan']
+
+
+def _seed(song_id: str) -> int:
+    return int(hashlib.sha1(song_id.encode()).hexdigest()[:8], 16)
+
+
+class FakeS4A:
+    def __init__(self, latency: float = 0.0, rows: int = 25, fail_rate: float = 0.0, login_rate: float = 0.0,
+                 not_found_rate: float = 0.0, relogin_delay: float = 1.0, render_delay: float = 0.05,
+                 seed: int = 7, host: str = '127.0.0.1', port: int = 0):
+        self.latency = latency
+        self.rows = rows
+        self.fail_rate = fail_rate
+        self.login_rate = login_rate
+        self.not_found_rate = not_found_rate
+        self.relogin_delay = relogin_delay
+        self.render_delay = render_delay
+        self.random = random.Random(seed)
+        self.host = host
+        self.port = port
+        self.url = ''
+        self.hits: Dict[str, int] = {}
+        self._runner: Optional[web.AppRunner] = None
+
+    # ----- lifecycle -----
+
+    async def start(self) -> str:
+        app = web.Application()
+        app.router.add_get('/{host}/{path:.*}', self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        self.url = f'http://{self.host}:{self.port}'
+        return self.url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def install(self, context) -> None:
+        """Serve the real S4A/accounts URLs of a Playwright context from this server."""
+        async def handler(route):
+            local = HOST_RE.sub(lambda m: f'{self.url}/{m.group(1)}.spotify.com/', route.request.url)
+            try:
+                response = await route.fetch(url=local)
+                await route.fulfill(response=response)
+            except Exception:
+                await route.abort()
+        await context.route(HOST_RE, handler)
+
+    # ----- pages -----
+
+    def _count(self, key: str) -> None:
+        self.hits[key] = self.hits.get(key, 0) + 1
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        host, path = request.match_info['host'], '/' + request.match_info['path']
+        if self.latency:
+            await asyncio.sleep(self.latency * (1 + 0.2 * self.random.random()))
+        if host == 'accounts.spotify.com':
+            self._count('login')
+            return self._html('Log in', LOGIN.format(delay_ms=int(self.relogin_delay * 1000)))
+
+        match = re.match(r'^/c/(?:artist/[^/]+/)?song/([^/]+)/(stats|playlists|location)$', path)
+        if not match:
+            self._count('dashboard')
+            return self._html('Home', DASHBOARD)
+
+        song_id, tab = match.groups()
+        self._count(tab)
+        if _seed(song_id) % 1000 < self.not_found_rate * 1000:
+            self._count('not_found')
+            return self._html('Not found', NOT_FOUND, status=404)
+        roll = self.random.random()
+        if roll < self.login_rate:
+            self._count('login_bounce')
+            return self._html('Redirecting', LOGIN_BOUNCE)
+        if roll < self.login_rate + self.fail_rate:
+            self._count('error')
+            return self._html('Error', ERROR, status=500)
+        return self._html(song_id, self.render(song_id, tab))
+
+    def _html(self, title: str, body: str, status: int = 200) -> web.Response:
+        return web.Response(text=PAGE.format(title=title, body=body), status=status, content_type='text/html')
+
+    def song(self, song_id: str) -> Dict:
+        """Deterministic data for one song (also what a correct scrape should store)."""
+        rng = random.Random(_seed(song_id))
+        playlists = [('Radio', 'Spotify', rng.randint(2000, 80000), '—')]
+        for i in range(1, self.rows):
+            playlists.append((f'Playlist {song_id[:6]} {i}', f'curator_{rng.randint(1, 40)}',
+                              rng.randint(10, 5000), f'Jan {rng.randint(1, 28)}, 2026'))
+        streams_28d = sum(p[2] for p in playlists) + rng.randint(0, 10000)
+        return {
+            'title': f'Song {song_id[:8]}',
+            'artist': f'Artist {song_id[-4:]}',
+            'playlists': playlists,
+            'streams': {'24 hours': streams_28d // 28, '7 days': streams_28d // 4,
+                        '28 days': streams_28d, '12 months': streams_28d * 9},
+            'alltime': streams_28d * 14,
+            'countries': [(c, rng.randint(100, 50000)) for c in COUNTRIES[:rng.randint(5, len(COUNTRIES))]],
+        }
+
+    def render(self, song_id: str, tab: str) -> str:
+        data = self.song(song_id)
+        render_ms = int(self.render_delay * 1000)
+        if tab == 'stats':
+            chips = ''.join(
+                f'<button data-encore-id="chipFilter" aria-pressed="{str(label == "28 days").lower()}" '
+                f'data-streams="{value:,}">{label}</button>'
+                for label, value in data['streams'].items()
+            )
+            return STATS.format(title=data['title'], artist=data['artist'], alltime=f"{data['alltime']:,}",
+                                chips=chips, hero=f"{data['streams']['28 days']:,}", render_ms=render_ms)
+        if tab == 'playlists':
+            return PLAYLISTS.format(title=data['title'], rows_json=json.dumps(data['playlists']),
+                                    factors_json=json.dumps(RANGE_FACTORS), render_ms=render_ms)
+        countries = sorted(data['countries'], key=lambda c: -c[1])
+        rows = ''.join(
+            f'<tr data-testid="sort-table-body-row"><td>{i}</td><td>{name}</td><td>{streams:,}</td></tr>'
+            for i, (name, streams) in enumerate(countries, 1)
+        )
+        return LOCATION.format(title=data['title'], rows=rows)
@@ -0,0 +1,160 @@
+import pytest
+
+from runner.app.browser_supervisor import BrowserSupervisor, chromium_rss_mb
+
+
+class FakePage:
+    def __init__(self, heap_mb=50):
+        self.heap_mb = heap_mb
+        self.closed = False
+        self.handlers = {}
+
+    def is_closed(self):
+        return self.closed
+
+    async def evaluate(self, script):
+        return self.heap_mb * 1024 * 1024
+
+    def on(self, event, handler):
+        self.handlers.setdefault(event, []).append(handler)
+
+    def emit(self, event):
+        for handler in self.handlers.get(event, []):
+            handler(self)
+
+
+class FakeContext:
+    def __init__(self):
+        self.handlers = {}
+        self.pages = [FakePage()]
+        self.closed = False
+
+    def on(self, event, handler):
+        self.handlers.setdefault(event, []).append(handler)
+
+    async def close(self):
+        self.closed = True
+        for handler in self.handlers.get('close', []):
+            handler(self)
+
+
+def _supervisor(rss, **limits):
+    launched = []
+
+    async def launch():
+        launched.append(FakeContext())
+        return launched[-1]
+
+    return BrowserSupervisor(launch, rss_probe=lambda: rss[0], **limits), launched
+
+
+@pytest.mark.asyncio
+async def test_context_is_reused_until_a_threshold_is_crossed():
+    rss = [400.0]
+    supervisor, launched = _supervisor(rss, max_rss_mb=1000, max_heap_mb=300)
+
+    context, fresh = await supervisor.acquire()
+    assert fresh
+    for _ in range(5):
+        assert await supervisor.check(context.pages) is None
+        assert await supervisor.acquire() == (context, False)
+    assert len(launched) == 1
+
+    rss[0] = 1200.0
+    assert (await supervisor.check(context.pages)).startswith('rss')
+    assert context.closed
+    # A deliberate recycle is not reported as a crash
+    assert supervisor.crashes == 0
+
+    rss[0] = 300.0
+    new_context, fresh = await supervisor.acquire()
+    assert fresh and new_context is not context
+    new_context.pages[0].heap_mb = 400
+    assert (await supervisor.check(new_context.pages)).startswith('heap')
+
+    stats = supervisor.stats()
+    assert stats['browser_restarts'] == 2
+    assert stats['browser_restart_reasons'] == {'rss': 1, 'heap': 1}
+    assert stats['browser_rss_peak_mb'] == 1200.0
+    assert stats['browser_heap_peak_mb'] == 400.0
+
+
+@pytest.mark.asyncio
+async def test_crashes_and_campaign_cap_trigger_a_relaunch():
+    supervisor, launched = _supervisor([100.0], max_campaigns=30)
+
+    context, _ = await supervisor.acquire()
+    context.pages[0].closed = True
+    assert await supervisor.check(context.pages) == 'tab closed unexpectedly'
+    assert supervisor.crashes == 1
+
+    context, fresh = await supervisor.acquire()
+    assert fresh
+    # Browser dying on its own (context 'close' event) is picked up on the next acquire
+    for handler in context.handlers['close']:
+        handler(context)
+    context, fresh = await supervisor.acquire()
+    assert fresh and supervisor.crashes == 2
+
+    supervisor.note_campaigns(15)
+    assert await supervisor.check(context.pages) is None
+    supervisor.note_campaigns(15)
+    assert (await supervisor.check(context.pages)).startswith('campaigns')
+    assert len(launched) == 3
+    await supervisor.close()
+
+
+@pytest.mark.asyncio
+async def test_custom_close_gets_the_recycle_reason():
+    closed = []
+
+    async def launch():
+        return FakeContext()
+
+    async def close(context, reason):
+        closed.append(reason)
+
+    supervisor = BrowserSupervisor(launch, rss_probe=lambda: 900.0, max_rss_mb=500, close=close)
+    context, _ = await supervisor.acquire()
+    assert (await supervisor.check(context.pages)).startswith('rss')
+    await supervisor.acquire()
+    await supervisor.close()
+    # The context itself is left to the close hook (e.g. a shared browser is only detached)
+    assert not context.closed
+    assert closed == ['rss: 900MB > 500MB', None]
+
+
+@pytest.mark.asyncio
+async def test_host_context_only_watches_registered_tabs():
+    host_context = FakeContext()
+    host_context.browser = object()  # attached over CDP
+    host_context.pages.append(FakePage())
+
+    async def launch():
+        return host_context
+
+    supervisor = BrowserSupervisor(launch, rss_probe=lambda: 100.0)
+    context, _ = await supervisor.acquire()
+    other_job_tab, own_tab = context.pages
+    supervisor.watch_page(own_tab)
+
+    other_job_tab.emit('crash')
+    assert supervisor.crashes == 0
+    own_tab.emit('crash')
+    assert supervisor.crashes == 1
+
+def test_rss_sums_the_profile_process_tree(tmp_path):
+    def proc(pid, ppid, cmdline, rss_kb):
+        d = tmp_path / str(pid)
+        d.mkdir()
+        (d / 'stat').write_text(f'{pid} (chrome (x)) S {ppid} 0 0')
+        (d / 'cmdline').write_text('\0'.join(cmdline))
+        (d / 'status').write_text(f'Name:\tchrome\nVmRSS:\t{rss_kb} kB\n')
+
+    proc(10, 1, ['chrome', '--user-data-dir=/data/profile', '--single-process'], 204800)
+    proc(11, 10, ['chrome', '--type=renderer'], 102400)
+    proc(12, 11, ['chrome', '--type=utility'], 10240)
+    proc(20, 1, ['chrome', '--user-data-dir=/other'], 999999)
+
+    assert chromium_rss_mb('/data/profile', proc_root=str(tmp_path)) == 310.0
+    assert chromium_rss_mb('/missing', proc_root=str(tmp_path)) is None
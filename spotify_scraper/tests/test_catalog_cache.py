@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta, timezone
+
+from runner.app.song_matcher import SongIndex
+from tests.roster_modules import load_roster_module
+
+catalog_cache = load_roster_module('catalog_cache.py')
+CatalogCache = catalog_cache.CatalogCache
+
+SONGS = [
+    {'name': 'Needed U', 'sfa_url': 'https://artists.spotify.com/c/artist/A/song/1/stats', 'track_id': '1',
+     'element': object()},
+    {'name': 'Breathe', 'sfa_url': 'https://artists.spotify.com/c/artist/A/song/2/stats', 'track_id': '2'},
+]
+
+
+def covers(cached, song_names):
+    """The check RosterScraper.get_artist_songs_from_roster() makes before skipping the Songs page."""
+    return all(SongIndex(cached).match_all(song_names, min_score=catalog_cache.CATALOG_MIN_SCORE))
+
+
+def test_store_keeps_serializable_fields_and_round_trips(tmp_path):
+    path = tmp_path / 'song_catalog.json'
+    cache = CatalogCache()
+    cache.store('A', 'A Dying Light', SONGS)
+    cache.save(path)
+
+    loaded = CatalogCache.load(path)
+    assert loaded.fresh_songs('A') == [{k: s[k] for k in ('name', 'sfa_url', 'track_id')} for s in SONGS]
+    assert loaded.fresh_songs('B') is None
+
+
+def test_entries_expire_after_ttl():
+    cache = CatalogCache(ttl_days=14)
+    cache.store('A', 'A Dying Light', SONGS)
+
+    assert cache.fresh_songs('A', now=datetime.now(timezone.utc) + timedelta(days=13))
+    assert cache.fresh_songs('A', now=datetime.now(timezone.utc) + timedelta(days=15)) is None
+
+
+def test_cache_covers_only_key_matches():
+    cache = CatalogCache()
+    cache.store('A', 'A Dying Light', SONGS)
+    cached = cache.fresh_songs('A')
+
+    assert covers(cached, ['NEEDED U', 'breathe'])
+    # A new campaign song, or a remix of a cached one, needs the live Songs page
+    assert not covers(cached, ['Needed U', 'Brand New Single'])
+    assert not covers(cached, ['Breathe (Ejeca Remix)'])
@@ -0,0 +1,39 @@
+from datetime import datetime, timedelta, timezone
+
+from runner.app.checkpoint import CheckpointJournal, STATUS_DONE, STATUS_NOT_FOUND
+
+
+def test_completed_since_only_counts_done_entries(tmp_path):
+    path = tmp_path / 'checkpoints.jsonl'
+    first = CheckpointJournal(path, run_id='run-a')
+    first.record(1, STATUS_DONE)
+    first.record(2, STATUS_NOT_FOUND)
+
+    second = CheckpointJournal(path, run_id='run-b')
+    second.record(3, STATUS_DONE)
+
+    assert second.completed_since(12) == {1: 'run-a', 3: 'run-b'}
+    assert second.runs_since(12) == {'run-a', 'run-b'}
+
+
+def test_window_and_truncated_lines(tmp_path):
+    path = tmp_path / 'checkpoints.jsonl'
+    journal = CheckpointJournal(path, run_id='run-a')
+    journal.record(1)
+    with open(path, 'a') as f:
+        f.write('{"ts": "2026-10-17T0')  # crash mid-write
+
+    later = datetime.now(timezone.utc) + timedelta(hours=13)
+    assert journal.completed_since(12) == {1: 'run-a'}
+    assert journal.completed_since(12, now=later) == {}
+
+
+def test_prune_drops_old_entries(tmp_path):
+    path = tmp_path / 'checkpoints.jsonl'
+    journal = CheckpointJournal(path, run_id='run-a')
+    journal.record(1)
+    journal.record(2)
+
+    assert journal.prune(keep_hours=1) == 0
+    assert journal.prune(keep_hours=1, now=datetime.now(timezone.utc) + timedelta(hours=2)) == 2
+    assert path.read_text() == ''
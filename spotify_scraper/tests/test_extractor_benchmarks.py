@@ -0,0 +1,146 @@
+"""
+Offline replay benchmarks for the S4A page extractors.
+
+Saved S4A pages (tests/fixtures/s4a_pages) are served by a local static
+server and loaded into headless Chromium. Each extractor is checked for
+correctness, then timed with pytest-benchmark against a wall-time budget,
+so slow-downs in extraction fail here instead of in a production run.
+
+The fixtures are S4A 2026 pages trimmed to the elements the extractors
+read. To add a capture from a live page (e.g. an artifact written by
+save_error_artifacts), strip personal data and keep the data-testid /
+data-encore-id attributes intact.
+
+Skips when pytest-benchmark or Chromium is unavailable. Run only these:
+  pytest tests/test_extractor_benchmarks.py --benchmark-only
+Budgets scale with BENCH_BUDGET_FACTOR (e.g. 2 on slow CI machines).
+"""
+import asyncio
+import functools
+import os
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+async_api = pytest.importorskip('playwright.async_api')
+
+from runner.app import waits
+from runner.app.pages.spotify_artists import SpotifyArtistsPage
+from runner.app.rate_limiter import NavigationRateLimiter
+
+FIXTURES = Path(__file__).parent / 'fixtures' / 's4a_pages'
+SONG_PATH = '/c/artist/0TnOYISbd1XYRBk9myaseg/song/4uLU6hMCjMI75M1A2tKUQC'
+
+# Mean seconds per call; wait_for_rows_stable alone settles for 0.5s
+BUDGET_FACTOR = float(os.getenv('BENCH_BUDGET_FACTOR', '1'))
+BUDGETS = {
+    'song_stats': 0.25,
+    'alltime_streams': 0.25,
+    'period_streams': 0.5,
+    'location': 1.0,
+}
+
+
+class S4AFixtureHandler(SimpleHTTPRequestHandler):
+    """Serve <song>/stats|playlists|location from the fixture corpus."""
+
+    def translate_path(self, path):
+        tab = path.split('?', 1)[0].rstrip('/').rsplit('/', 1)[-1]
+        return str(FIXTURES / f'{tab}.html')
+
+    def log_message(self, *args):
+        pass
+
+
+class Harness:
+    """Static server + headless Chromium driven from a private event loop.
+
+    pytest-benchmark calls plain functions, so the async extractors run via
+    loop.run_until_complete on a loop owned by the harness.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), S4AFixtureHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base = f'http://127.0.0.1:{self.server.server_address[1]}{SONG_PATH}'
+        self.playwright = self.browser = None
+
+    def start(self):
+        self.playwright = self.run(async_api.async_playwright().start())
+        self.browser = self.run(self.playwright.chromium.launch())
+        self.page = self.run(self.browser.new_page())
+        self.spotify_page = SpotifyArtistsPage(self.page, rate_limiter=NavigationRateLimiter(0))
+        self.spotify_page.pacer = waits.make_pacer(0)
+
+    def run(self, coro):
+        return self.loop.run_until_complete(coro)
+
+    def open(self, tab):
+        self.run(self.page.goto(f'{self.base}/{tab}', wait_until='load'))
+
+    def close(self):
+        if self.browser is not None:
+            self.run(self.browser.close())
+        if self.playwright is not None:
+            self.run(self.playwright.stop())
+        self.server.shutdown()
+        self.server.server_close()
+        self.loop.close()
+
+
+@pytest.fixture(scope='module')
+def harness():
+    h = Harness()
+    try:
+        h.start()
+    except Exception as e:
+        h.close()
+        pytest.skip(f'Chromium not available: {str(e).splitlines()[0]}')
+    yield h
+    h.close()
+
+
+def _bench(benchmark, harness, name, tab, extract, reload_each_round=False):
+    """Time extract() on the given tab and enforce its budget. Returns the last result."""
+    harness.open(tab)
+    setup = functools.partial(harness.open, tab) if reload_each_round else None
+    result = benchmark.pedantic(lambda: harness.run(extract()), setup=setup, rounds=5, iterations=1)
+    budget = BUDGETS[name] * BUDGET_FACTOR
+    mean = benchmark.stats.stats.mean
+    assert mean <= budget, f'{name}: mean {mean:.3f}s over budget {budget:.3f}s'
+    return result
+
+
+def test_get_song_stats(benchmark, harness):
+    stats = _bench(benchmark, harness, 'song_stats', 'playlists', harness.spotify_page.get_song_stats)
+    assert stats['title'] == 'Midnight Drive'
+    assert len(stats['playlists']) == 120
+    assert stats['playlists'][0] == {'rank': '1', 'name': 'Radio', 'made_by': 'Spotify', 'streams': '78360', 'date_added': ''}
+    assert stats['playlists'][-1]['date_added'] == 'Jan 3, 2026'
+    assert stats['streams'] == 358946
+
+
+def test_get_alltime_streams(benchmark, harness):
+    alltime = _bench(benchmark, harness, 'alltime_streams', 'stats', harness.spotify_page.get_alltime_streams)
+    assert alltime == 1284511
+
+
+def test_get_period_streams(benchmark, harness):
+    # Reload each round so the chip really switches (a selected chip is not clicked)
+    streams = _bench(
+        benchmark, harness, 'period_streams', 'stats',
+        functools.partial(harness.spotify_page.get_period_streams, '7day'),
+        reload_each_round=True,
+    )
+    assert streams == 41377
+
+
+def test_get_location_data(benchmark, harness):
+    countries = _bench(benchmark, harness, 'location', 'location', harness.spotify_page.get_location_data)
+    assert len(countries) == 20
+    assert countries[0] == {'rank': 1, 'country': 'United States', 'streams': 48211}
+    assert countries[-1] == {'rank': 20, 'country': 'Türkiye', 'streams': 612}
@@ -0,0 +1,43 @@
+import copy
+
+from runner.app.fingerprint import scrape_fingerprint
+
+
+SONG_DATA = {
+    'alltime_streams': 120000,
+    'time_ranges': {
+        '7day': {'stats': {'streams': 900, 'playlists': [
+            {'rank': '1', 'name': 'Chill  Vibes', 'made_by': 'Vendor A', 'streams': '500', 'date_added': 'Jan 1, 2026'},
+            {'rank': '2', 'name': 'Focus', 'made_by': 'Vendor B', 'streams': '500', 'date_added': ''},
+        ]}},
+        '28day': {'stats': {'streams': 4000, 'playlists': []}},
+        '12months': {'stats': {'streams': 50000, 'playlists': []}},
+    },
+    'regions': [{'rank': 1, 'country': 'United States', 'streams': 700}],
+}
+
+
+def test_same_numbers_hash_the_same():
+    other = copy.deepcopy(SONG_DATA)
+    # Tied rows swapped, rank relabelled, trend values and whitespace differ
+    other['time_ranges']['7day']['stats']['playlists'].reverse()
+    for i, p in enumerate(other['time_ranges']['7day']['stats']['playlists'], 1):
+        p['rank'] = str(i)
+    other['time_ranges']['7day']['stats']['playlists'][1]['name'] = 'chill vibes'
+    other['previous'] = {'streams_24h': 1}
+
+    assert scrape_fingerprint(other) == scrape_fingerprint(SONG_DATA)
+    assert scrape_fingerprint(SONG_DATA).startswith('v1:')
+
+
+def test_any_number_change_changes_the_hash():
+    base = scrape_fingerprint(SONG_DATA)
+
+    streams = copy.deepcopy(SONG_DATA)
+    streams['time_ranges']['28day']['stats']['streams'] = 4001
+    playlist = copy.deepcopy(SONG_DATA)
+    playlist['time_ranges']['7day']['stats']['playlists'][0]['streams'] = '501'
+    region = copy.deepcopy(SONG_DATA)
+    region['regions'].append({'rank': 2, 'country': 'Canada', 'streams': 10})
+
+    assert len({base, scrape_fingerprint(streams), scrape_fingerprint(playlist), scrape_fingerprint(region)}) == 4
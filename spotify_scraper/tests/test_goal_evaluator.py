@@ -0,0 +1,104 @@
+import pytest
+
+from runner.app.goal_evaluator import GoalEvaluator, completed_groups, vendor_streams_by_campaign
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, data=None):
+        self.status_code = status_code
+        self.data = data
+        self.text = ''
+
+    def json(self):
+        return self.data
+
+
+def _ids(filter_value):
+    return [int(i) for i in filter_value[len('in.('):-1].split(',')]
+
+
+class FakeDB:
+    def __init__(self, playlists, campaigns, clients):
+        self.playlists = playlists
+        self.campaigns = campaigns
+        self.clients = clients
+        self.calls = []
+
+    async def get(self, table, params=None):
+        self.calls.append(('GET', table))
+        if table == 'campaign_playlists':
+            ids = _ids(params['campaign_id'])
+            return FakeResponse(data=[p for p in self.playlists if p['campaign_id'] in ids])
+        if table == 'spotify_campaigns':
+            ids = _ids(params['campaign_group_id'])
+            return FakeResponse(data=[c for c in self.campaigns if c['campaign_group_id'] in ids])
+        if table == 'clients':
+            ids = _ids(params['id'])
+            return FakeResponse(data=[c for c in self.clients if c['id'] in ids])
+        return FakeResponse(404)
+
+    async def patch(self, table, params=None, json=None):
+        self.calls.append(('PATCH', table, _ids(params['id']), json['status']))
+        return FakeResponse(204)
+
+
+def test_vendor_streams_skip_organic_rows():
+    rows = [
+        {'campaign_id': 1, 'streams_12m': 500, 'is_organic': False},
+        {'campaign_id': 1, 'streams_12m': 900, 'is_organic': True},
+        {'campaign_id': 2, 'streams_12m': None},
+    ]
+    assert vendor_streams_by_campaign(rows) == {1: 500, 2: 0}
+
+
+def test_group_needs_every_song_with_a_goal():
+    siblings = [
+        {'id': 1, 'goal': '1000', 'campaign_group_id': 10},
+        {'id': 2, 'goal': '0', 'campaign_group_id': 10},
+        {'id': 3, 'goal': '1000', 'campaign_group_id': 20},
+        {'id': 4, 'goal': '1000', 'campaign_group_id': 20},
+        {'id': 5, 'goal': None, 'campaign_group_id': 30},
+    ]
+    vendor = {1: 1000, 3: 5000, 4: 10}
+    assert completed_groups(siblings, vendor, lambda g: int(g or 0)) == [10]
+
+
+@pytest.mark.asyncio
+async def test_batch_uses_fixed_number_of_requests():
+    playlists = [
+        {'campaign_id': 1, 'streams_12m': 1200, 'is_organic': False},
+        {'campaign_id': 2, 'streams_12m': 300, 'is_organic': False},
+        {'campaign_id': 3, 'streams_12m': 2000, 'is_organic': False},
+        {'campaign_id': 4, 'streams_12m': 800, 'is_organic': False},
+    ]
+    campaigns = [
+        {'id': 1, 'goal': '1000', 'campaign_group_id': 10},
+        {'id': 4, 'goal': '500', 'campaign_group_id': 10},
+        {'id': 3, 'goal': '1500', 'campaign_group_id': 20},
+        {'id': 2, 'goal': '1000', 'campaign_group_id': 20},
+    ]
+    db = FakeDB(playlists, campaigns, [{'id': 7, 'emails': ['a@example.com']}])
+    sent = []
+
+    async def notify(*args):
+        sent.append(args)
+
+    evaluator = GoalEvaluator(db, lambda g: int(g or 0), notify=notify, batch_size=3)
+    await evaluator.add({'id': 1, 'campaign': 'One', 'goal': '1000', 'campaign_group_id': 10, 'client_id': 7})
+    await evaluator.add({'id': 2, 'campaign': 'Two', 'goal': '1000', 'campaign_group_id': 20, 'client_id': 7})
+    assert db.calls == []
+    await evaluator.add({'id': 3, 'campaign': 'Three', 'goal': '1500', 'campaign_group_id': 20, 'client_id': 8})
+
+    # Campaign 4 is a sibling that was not scraped this batch - loaded in one extra query
+    assert db.calls == [
+        ('GET', 'campaign_playlists'),
+        ('PATCH', 'spotify_campaigns', [1, 3], 'complete'),
+        ('GET', 'spotify_campaigns'),
+        ('GET', 'campaign_playlists'),
+        ('PATCH', 'campaign_groups', [10], 'complete'),
+        ('GET', 'clients'),
+    ]
+    assert sent == [('One', 1200, 1000, ['a@example.com'])]
+    assert evaluator.campaigns_completed == 2
+    assert evaluator.groups_completed == 1
+    assert await evaluator.evaluate() == 0
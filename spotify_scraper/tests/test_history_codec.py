@@ -0,0 +1,132 @@
+import copy
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from runner.app.history_codec import ENCODING, HistoryChain, chain_from_rows, load_chains, rebuild, scalar_columns
+
+
+def _song(streams_7d, extra_playlist=None, regions=None):
+    playlists = [
+        {'rank': '1', 'name': 'Chill Vibes', 'made_by': 'Vendor A', 'streams': str(streams_7d), 'date_added': 'Jan 1, 2026'},
+        {'rank': '2', 'name': 'Radio', 'made_by': 'Spotify', 'streams': '40', 'date_added': ''},
+    ]
+    if extra_playlist:
+        playlists.append(extra_playlist)
+    return {
+        'time_ranges': {
+            '7day': {'stats': {'streams': streams_7d + 40, 'title': 'Song', 'playlists': playlists}},
+            '28day': {'stats': {'streams': 4000, 'playlists': copy.deepcopy(playlists)}},
+            '12months': {'stats': {'streams': 50000, 'playlists': []}},
+        },
+        'alltime_streams': 120000,
+        'regions': regions if regions is not None else [
+            {'rank': 1, 'country': 'United States', 'streams': 700},
+            {'rank': 2, 'country': 'Canada', 'streams': 90},
+        ],
+        'previous': {'streams_24h': 10, 'streams_7d': 20, 'streams_12m': 30},
+    }
+
+
+def _rows(payloads):
+    return [{'id': i, 'encoding': ENCODING, 'raw_data': json.loads(json.dumps(p))} for i, p in enumerate(payloads)]
+
+
+def test_round_trip_keyframes_and_deltas():
+    snapshots = [
+        _song(500),
+        _song(500),
+        _song(650, extra_playlist={'rank': '3', 'name': 'Focus', 'made_by': 'Vendor B', 'streams': '1,2', 'date_added': ''}),
+        _song(650, regions=[]),
+        _song(700),
+    ]
+    chain = HistoryChain(keyframe_every=3)
+    payloads = [chain.encode(s) for s in snapshots]
+
+    assert [p['k'] for p in payloads] == [1, 0, 0, 1, 0]
+    # Unchanged scrape stores nothing but the delta marker
+    assert payloads[1] == {'k': 0}
+    # A new playlist is added to the dictionary once, as a delta
+    assert payloads[2]['pl'] == [['Focus', 'Vendor B', '']]
+    assert set(payloads[2]['tr']) == {'7day', '28day'}
+
+    rebuilt = [song for _, song in rebuild(_rows(payloads), keyframe_every=3)]
+    assert rebuilt == snapshots
+
+
+def test_compact_rows_are_much_smaller_than_full_json():
+    chain = HistoryChain()
+    snapshots = [_song(500 + day % 2) for day in range(7)]
+    full = sum(len(json.dumps(s)) for s in snapshots)
+    compact = sum(len(json.dumps(chain.encode(s))) for s in snapshots)
+    assert compact * 3 < full
+
+
+def test_legacy_rows_and_resuming_a_chain():
+    legacy = {'id': 0, 'encoding': None, 'raw_data': _song(100)}
+    writer = HistoryChain(keyframe_every=7)
+    first = writer.encode(_song(200))
+    second = writer.encode(_song(300))
+    rows = [legacy] + _rows([first, second])
+
+    assert [song for _, song in rebuild(rows)] == [_song(100), _song(200), _song(300)]
+
+    # A later run picks the chain up from stored rows and keeps writing deltas
+    resumed = chain_from_rows(rows)
+    assert resumed.encode(_song(300)) == writer.encode(_song(300)) == {'k': 0}
+
+    # Orphaned delta (keyframe not loaded) is skipped by the reader
+    assert rebuild(_rows([second])) == []
+
+
+def test_scalar_columns_use_campaign_naming():
+    assert scalar_columns(_song(500)) == {'streams_24h': 540, 'streams_7d': 4000, 'streams_12m': 50000}
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, data=None):
+        self.status_code = status_code
+        self.data = data
+
+    def json(self):
+        return self.data
+
+
+class FakeDB:
+    def __init__(self, rows, failing=()):
+        self.rows = rows
+        self.failing = set(failing)
+        self.calls = 0
+
+    async def get(self, table, params=None):
+        self.calls += 1
+        ids = [int(i) for i in params['campaign_id'][len('in.('):-1].split(',')]
+        if self.failing & set(ids):
+            return FakeResponse(500)
+        matching = [r for r in self.rows if r['campaign_id'] in ids]
+        offset, limit = int(params['offset']), int(params['limit'])
+        return FakeResponse(200, matching[offset:offset + limit])
+
+
+@pytest.mark.asyncio
+async def test_load_chains_continues_each_campaign_without_a_read_per_save():
+    writers = {1: HistoryChain(7), 2: HistoryChain(7)}
+    rows = []
+    for cid in (1, 2):
+        for streams in (100, 200):
+            payload = json.loads(json.dumps(writers[cid].encode(_song(streams + cid))))
+            rows.append({'campaign_id': cid, 'id': len(rows), 'encoding': ENCODING, 'raw_data': payload})
+    db = FakeDB(rows, failing={9})
+
+    chains = await load_chains(db, [1, 2, 3, 9], datetime(2026, 1, 1, tzinfo=timezone.utc),
+                               keyframe_every=7, chunk_size=3, page_size=3)
+
+    # Rows paged across requests, per campaign; no rows -> keyframe next; failed chunk left out
+    assert set(chains) == {1, 2, 3}
+    assert db.calls == 4
+    for cid in (1, 2):
+        payload = chains[cid].encode(_song(300))
+        assert payload['k'] == 0
+        assert payload == writers[cid].encode(_song(300))
+    assert chains[3].encode(_song(300))['k'] == 1
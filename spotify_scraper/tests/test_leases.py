@@ -0,0 +1,109 @@
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from runner.app.browser_host_client import (
+    clear_restart_request, launch_lease, read_host, request_restart, restart_requested, write_host,
+)
+from runner.app.leases import Lease, lease_dir
+
+HOLD_SCRIPT = textwrap.dedent("""
+    import sys, time
+    sys.path.insert(0, {root!r})
+    from runner.app.leases import Lease
+    lease = Lease({directory!r}, {name!r}, holder='other')
+    assert lease.try_acquire(exclusive={exclusive!r})
+    print('held', flush=True)
+    sys.stdin.readline()
+""")
+
+
+class OtherProcess:
+    """Holds a lease in a separate process until closed (flock is per open file, per process)."""
+
+    def __init__(self, directory, name, exclusive=True):
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        script = HOLD_SCRIPT.format(root=root, directory=str(directory), name=name, exclusive=exclusive)
+        self.proc = subprocess.Popen([sys.executable, '-c', script], stdin=subprocess.PIPE,
+                                     stdout=subprocess.PIPE, text=True)
+        assert self.proc.stdout.readline().strip() == 'held'
+
+    def close(self):
+        self.proc.stdin.close()
+        self.proc.wait(timeout=10)
+
+
+def test_lease_dir_sits_next_to_the_profile(tmp_path):
+    assert lease_dir(str(tmp_path / 'browser_data') + '/') == tmp_path / 'browser_data.leases'
+
+
+@pytest.mark.asyncio
+async def test_exclusive_and_shared_leases(tmp_path):
+    other = OtherProcess(tmp_path, 'browser', exclusive=False)
+    try:
+        shared = Lease(tmp_path, 'browser')
+        assert shared.try_acquire(exclusive=False)
+        shared.release()
+        # The host cannot restart Chromium while a job holds the browser lease
+        assert not Lease(tmp_path, 'browser').try_acquire(exclusive=True)
+        assert not await Lease(tmp_path, 'browser').acquire(timeout=0.2, poll=0.05)
+        assert Lease(tmp_path, 'browser').is_held_elsewhere()
+    finally:
+        other.close()
+    # The kernel drops the lock when the holder exits: no stale lease
+    lease = Lease(tmp_path, 'browser', holder='host')
+    assert not lease.is_held_elsewhere()
+    with lease:
+        assert lease.holder_info()['holder'] == 'host'
+        with pytest.raises(BlockingIOError):
+            with Lease(tmp_path, 'browser'):
+                pass
+    assert not lease.held
+
+
+@pytest.mark.asyncio
+async def test_launch_lease_clears_singletons_only_when_the_profile_is_free(tmp_path):
+    profile = tmp_path / 'browser_data'
+    profile.mkdir()
+    (profile / 'SingletonCookie').write_text('x')
+    os.symlink('host-12345', profile / 'SingletonLock')
+
+    other = OtherProcess(lease_dir(str(profile)), 'profile')
+    try:
+        assert await launch_lease(str(profile), 'scraper', timeout=0) is None
+        assert os.path.lexists(profile / 'SingletonLock')
+    finally:
+        other.close()
+
+    lease = await launch_lease(str(profile), 'scraper', timeout=0)
+    try:
+        assert lease is not None
+        assert not os.path.lexists(profile / 'SingletonLock')
+        assert not (profile / 'SingletonCookie').exists()
+    finally:
+        lease.release()
+
+
+def test_host_file_is_only_trusted_while_the_host_holds_the_profile(tmp_path):
+    profile = str(tmp_path / 'browser_data')
+    info = {'endpoint': 'http://127.0.0.1:9222', 'pid': os.getpid()}
+    write_host(profile, info)
+    # Left over from a host that exited
+    assert read_host(profile) is None
+
+    other = OtherProcess(lease_dir(profile), 'profile')
+    try:
+        assert read_host(profile) == info
+    finally:
+        other.close()
+
+    assert restart_requested(profile) is None
+    request_restart(profile, 'rss: 1600MB > 1500MB')
+    assert restart_requested(profile) == 'rss: 1600MB > 1500MB'
+    assert json.loads((lease_dir(profile) / 'browser_host.restart').read_text())['pid'] == os.getpid()
+    clear_restart_request(profile)
+    assert restart_requested(profile) is None
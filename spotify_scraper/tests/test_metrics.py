@@ -0,0 +1,71 @@
+import asyncio
+import json
+
+import pytest
+
+from runner.app.metrics import Metrics, percentile, read_metrics, slowest_campaigns, stage_report
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile([], 95) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_spans_are_attributed_to_the_campaign_of_their_task():
+    metrics = Metrics()
+
+    @metrics.timed('navigate')
+    async def navigate():
+        await asyncio.sleep(0)
+
+    async def tab(campaign_id, pages):
+        token = metrics.set_campaign(campaign_id)
+        try:
+            for _ in range(pages):
+                await navigate()
+            metrics.record('persist.campaign', 0.5)
+        finally:
+            metrics.reset_campaign(token)
+
+    await asyncio.gather(tab('a', 1), tab('b', 3))
+    metrics.record('wait.untracked', 1.0)
+
+    summary = metrics.stage_summary()
+    assert summary['navigate']['count'] == 4
+    assert summary['persist.campaign']['total'] == 1.0
+    totals = metrics.campaign_totals()
+    assert set(totals) == {'a', 'b'}
+    assert totals['b']['persist.campaign'] == 0.5
+    assert 'wait.untracked' not in totals['a']
+
+
+def test_jsonl_prometheus_and_cross_run_report(tmp_path):
+    path = tmp_path / 'metrics.jsonl'
+    for run, slow in (('r1', 30.0), ('r2', 50.0)):
+        metrics = Metrics()
+        metrics.record('scrape.total', slow, campaign_id='slow')
+        metrics.record('switch_time_range', slow - 5, campaign_id='slow')
+        metrics.record('scrape.total', 10.0, campaign_id='fast')
+        metrics.record('navigate', 8.0, campaign_id='fast')
+        metrics.write_jsonl(path, run_id=run)
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line['type'] for line in lines].count('run') == 2
+
+    records = read_metrics(path)
+    report = stage_report(records)
+    assert report['scrape.total']['count'] == 4
+    assert report['scrape.total']['max'] == 50.0
+
+    ranked = slowest_campaigns(records)
+    assert ranked[0] == {'campaign_id': 'slow', 'runs': 2, 'mean': 40.0, 'max': 50.0, 'top_stage': 'switch_time_range'}
+    assert [r['run_id'] for r in read_metrics(path, last_runs=1)] == ['r2', 'r2', 'r2']
+
+    prom = tmp_path / 'metrics.prom'
+    metrics.write_prometheus(prom)
+    text = prom.read_text()
+    assert 'spotify_scraper_stage_seconds{stage="navigate",quantile="0.95"} 8.0' in text
+    assert 'spotify_scraper_stage_seconds_count{stage="scrape.total"} 2' in text
@@ -0,0 +1,100 @@
+import asyncio
+import time
+
+import pytest
+from aiohttp import web
+
+from runner.app.postgrest import PostgrestClient
+
+
+async def _start_server(routes):
+    app = web.Application()
+    app.add_routes(routes)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+@pytest.mark.asyncio
+async def test_get_sends_auth_headers_and_params():
+    seen = {}
+
+    async def handler(request):
+        seen['apikey'] = request.headers.get('apikey')
+        seen['auth'] = request.headers.get('Authorization')
+        seen['query'] = dict(request.query)
+        return web.json_response([{'id': 1}])
+
+    runner, base = await _start_server([web.get('/rest/v1/spotify_campaigns', handler)])
+    client = PostgrestClient(base, 'secret')
+    try:
+        resp = await client.get('spotify_campaigns', params={'id': 'eq.1'})
+        assert resp.status_code == 200
+        assert resp.json() == [{'id': 1}]
+        assert seen['apikey'] == 'secret'
+        assert seen['auth'] == 'Bearer secret'
+        assert seen['query'] == {'id': 'eq.1'}
+    finally:
+        await client.close()
+        await runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_idempotent_request_retries_on_503():
+    calls = {'n': 0}
+
+    async def handler(request):
+        calls['n'] += 1
+        if calls['n'] < 3:
+            return web.Response(status=503, text='busy')
+        return web.Response(status=204)
+
+    runner, base = await _start_server([web.patch('/rest/v1/spotify_campaigns', handler)])
+    client = PostgrestClient(base, 'secret', max_retries=3, backoff_base=0.01)
+    try:
+        resp = await client.patch('spotify_campaigns', params={'id': 'eq.1'}, json={'status': 'active'})
+        assert resp.status_code == 204
+        assert calls['n'] == 3
+    finally:
+        await client.close()
+        await runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_post_is_not_retried_on_server_error():
+    calls = {'n': 0}
+
+    async def handler(request):
+        calls['n'] += 1
+        return web.Response(status=502, text='bad gateway')
+
+    runner, base = await _start_server([web.post('/rest/v1/scraped_data', handler)])
+    client = PostgrestClient(base, 'secret', max_retries=3, backoff_base=0.01)
+    try:
+        resp = await client.post('scraped_data', json={'platform': 'spotify'})
+        assert resp.status_code == 502
+        assert calls['n'] == 1
+    finally:
+        await client.close()
+        await runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_session_timeout_applies_without_per_call_timeout():
+    async def handler(request):
+        await asyncio.sleep(2)
+        return web.json_response([])
+
+    runner, base = await _start_server([web.get('/rest/v1/spotify_campaigns', handler)])
+    client = PostgrestClient(base, 'secret', timeout=0.3, max_retries=1)
+    started = time.monotonic()
+    try:
+        with pytest.raises(asyncio.TimeoutError):
+            await client.get('spotify_campaigns')
+        assert time.monotonic() - started < 1.5
+    finally:
+        await client.close()
+        await runner.cleanup()
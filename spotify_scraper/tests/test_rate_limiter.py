@@ -0,0 +1,29 @@
+import asyncio
+import time
+
+import pytest
+
+from runner.app.rate_limiter import NavigationRateLimiter
+
+
+@pytest.mark.asyncio
+async def test_concurrent_acquires_are_spaced_by_min_interval():
+    limiter = NavigationRateLimiter(min_interval=0.05)
+    starts = []
+
+    async def navigate():
+        await limiter.acquire()
+        starts.append(time.monotonic())
+
+    await asyncio.gather(*(navigate() for _ in range(4)))
+
+    starts.sort()
+    gaps = [b - a for a, b in zip(starts, starts[1:])]
+    assert all(gap >= 0.045 for gap in gaps)
+    assert limiter.acquired == 4
+
+
+@pytest.mark.asyncio
+async def test_first_acquire_does_not_wait():
+    limiter = NavigationRateLimiter(min_interval=10)
+    assert await limiter.acquire() == 0
@@ -0,0 +1,60 @@
+import pytest
+
+from runner.app.request_routing import RequestPolicy
+
+
+class FakeRequest:
+    def __init__(self, resource_type, url):
+        self.resource_type = resource_type
+        self.url = url
+
+
+class FakeRoute:
+    def __init__(self, resource_type, url):
+        self.request = FakeRequest(resource_type, url)
+        self.outcome = None
+
+    async def continue_(self):
+        self.outcome = 'continue'
+
+    async def abort(self, error_code=None):
+        self.outcome = 'abort'
+
+
+def test_classify_blocks_types_and_analytics_but_keeps_scraped_data():
+    policy = RequestPolicy()
+    assert policy.classify('image', 'https://i.scdn.co/image/ab67616d0000b273') == 'type:image'
+    assert policy.classify('font', 'https://encore.scdn.co/fonts/CircularSp.woff2') == 'type:font'
+    assert policy.classify('script', 'https://www.googletagmanager.com/gtm.js') == 'url'
+    assert policy.classify('fetch', 'https://artists.spotify.com/gabo-receiver-service/v3/events') == 'url'
+    assert policy.classify('document', 'https://artists.spotify.com/c/song/abc/stats') is None
+    assert policy.classify('script', 'https://artists.spotify.com/static/main.js') is None
+    assert policy.classify('fetch', 'https://generic.wg.spotify.com/s4x-insights-api/v1/recording/abc/playlists') is None
+    # Login / challenge pages keep their images
+    assert policy.classify('image', 'https://challenge.spotify.com/static/captcha.png') is None
+
+
+def test_from_env_overrides(monkeypatch):
+    monkeypatch.setenv('REQUEST_BLOCK_TYPES', 'media')
+    monkeypatch.setenv('REQUEST_BLOCK_PATTERNS', r'ads\.example\.com')
+    policy = RequestPolicy.from_env()
+    assert policy.classify('image', 'https://i.scdn.co/image/x') is None
+    assert policy.classify('media', 'https://video.scdn.co/x.mp4') == 'type:media'
+    assert policy.classify('script', 'https://ads.example.com/tag.js') == 'url'
+
+
+@pytest.mark.asyncio
+async def test_route_handler_counts_blocked_and_allowed():
+    policy = RequestPolicy()
+    routes = [
+        FakeRoute('image', 'https://i.scdn.co/image/1'),
+        FakeRoute('image', 'https://i.scdn.co/image/2'),
+        FakeRoute('script', 'https://connect.facebook.net/en_US/fbevents.js'),
+        FakeRoute('document', 'https://artists.spotify.com/home'),
+    ]
+    for route in routes:
+        await policy._handle(route)
+    assert [r.outcome for r in routes] == ['abort', 'abort', 'abort', 'continue']
+    assert policy.blocked == {'type:image': 2, 'url': 1}
+    assert policy.allowed == 1
+    assert '3 of 4 requests blocked' in policy.summary()
@@ -0,0 +1,81 @@
+from pathlib import Path
+
+import pytest
+
+from runner.app.response_capture import (
+    ResponseCapture,
+    parse_location_payload,
+    parse_playlists_payload,
+    parse_stats_payload,
+)
+
+HAR = Path(__file__).parent / 'fixtures' / 's4a_song.har'
+
+
+@pytest.fixture
+def capture():
+    return ResponseCapture.from_har(HAR)
+
+
+def test_har_responses_are_classified(capture):
+    kinds = sorted(r.kind for r in capture.responses)
+    assert kinds == ['location', 'playlists', 'stats', 'stats']
+
+
+def test_song_data_from_har(capture):
+    assert parse_stats_payload(capture.find('stats', '7day').data) == 2500
+    assert parse_stats_payload(capture.find('stats', '28day').data) == 12345
+
+    playlists = parse_playlists_payload(capture.find('playlists', '28day').data)
+    assert playlists[0] == {
+        'rank': '1', 'name': 'Radio', 'made_by': 'Spotify', 'streams': '78360', 'date_added': '',
+    }
+    assert playlists[1]['made_by'] == 'dj_anna'
+
+    countries = parse_location_payload(capture.find('location', '28day').data)
+    assert [(c['rank'], c['country'], c['streams']) for c in countries] == [
+        (1, 'United States', 12345),
+        (2, 'Germany', 99),
+    ]
+
+
+def test_missing_range_is_not_matched(capture):
+    assert capture.find('playlists', '12months') is None
+    assert capture.find('stats', '12months') is None
+
+
+def test_rewrite_time_range_keeps_other_params(capture):
+    url = capture.find('playlists').url
+    rewritten = capture.rewrite_time_range(url, '12months')
+    assert 'time-filter=12months' in rewritten
+    assert 'aggregation-level=recording' in rewritten
+    assert capture.time_range_of(rewritten) == '12months'
+
+
+@pytest.mark.asyncio
+async def test_replay_uses_captured_headers(capture):
+    calls = []
+
+    class FakeResponse:
+        ok = True
+
+        async def json(self):
+            return {'playlists': [{'title': 'Year Mix', 'streams': 5}]}
+
+    class FakeRequestContext:
+        async def get(self, url, headers=None):
+            calls.append((url, headers))
+            return FakeResponse()
+
+    data = await capture.replay('playlists', '12months', request_context=FakeRequestContext())
+
+    assert parse_playlists_payload(data)[0]['name'] == 'Year Mix'
+    assert 'time-filter=12months' in calls[0][0]
+    assert calls[0][1]['authorization'] == 'Bearer REDACTED'
+    assert capture.find('playlists', '12months') is not None
+
+
+def test_unrecognised_payloads_fall_back():
+    assert parse_playlists_payload({'error': 'nope'}) is None
+    assert parse_location_payload([]) is None
+    assert parse_stats_payload({'message': 'x'}) is None
@@ -0,0 +1,86 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from tests.roster_modules import load_roster_module, load_roster_package_module
+
+roster_index = load_roster_module('roster_index.py')
+RosterIndex = roster_index.RosterIndex
+
+CRAWL = [
+    {'name': 'Segan', 'url': '/c/artist/0gYN2lkS1bs4s7rot34aJq/home'},
+    {'name': 'Reece Rosé', 'url': '/c/artist/1AbCdEfGh/home'},
+    {'name': 'No Link Row', 'url': ''},
+]
+
+
+def test_find_returns_direct_songs_url_with_fuzzy_names():
+    index = RosterIndex()
+    assert index.merge(CRAWL, full=True) == 2
+
+    found = index.find('reece rose')
+    assert found['name'] == 'Reece Rosé'
+    assert found['songs_url'] == 'https://artists.spotify.com/c/artist/1AbCdEfGh/music/songs'
+    assert index.find('SEGAN')['id'] == '0gYN2lkS1bs4s7rot34aJq'
+    assert index.find('Somebody Else') is None
+
+
+def test_similar_artist_names_are_not_a_directory_hit():
+    index = RosterIndex()
+    index.merge([
+        {'name': name, 'url': f'/c/artist/{i}x/home'}
+        for i, name in enumerate(['Kaiser', 'Segan Beats', 'Lil Nas X', 'DJ Snake - Live'])
+    ], full=True)
+
+    assert [index.find(name) for name in ('Kai', 'Segan', 'Nas', 'DJ Snake')] == [None] * 4
+    assert index.find('lil nas x')['name'] == 'Lil Nas X'
+
+
+def test_client_missing_from_fresh_index_triggers_refresh(tmp_path, monkeypatch):
+    pytest.importorskip('playwright.async_api')
+    monkeypatch.setenv('ROSTER_INDEX_PATH', str(tmp_path / 'roster_index.json'))
+    monkeypatch.setenv('ROSTER_CATALOG_PATH', str(tmp_path / 'song_catalog.json'))
+    scraper = load_roster_package_module('roster_scraper').RosterScraper()
+    scraper.roster_index.merge([{'name': 'Segan Beats', 'url': '/c/artist/1Beats/home'}], full=True)
+    crawls = []
+
+    async def crawl_roster(full, roster_page=None):
+        crawls.append(full)
+        scraper.roster_crawled = True
+        scraper.roster_index.merge([{'name': 'Segan', 'url': '/c/artist/2Segan/home'}])
+
+    scraper.crawl_roster = crawl_roster
+    found = asyncio.run(scraper.find_artist_in_index('Segan'))
+
+    assert crawls == [False]
+    assert found['id'] == '2Segan'
+
+
+def test_incremental_merge_keeps_artists_and_full_crawl_replaces():
+    index = RosterIndex()
+    index.merge(CRAWL, full=True)
+    crawled_at = index.crawled_at
+
+    assert index.merge([{'name': 'New Artist', 'url': '/c/artist/9New/home'}]) == 1
+    assert index.crawled_at == crawled_at  # incremental crawls do not reset the TTL
+    assert index.find('Segan') and index.find('New Artist')
+
+    index.merge([{'name': 'New Artist', 'url': '/c/artist/9New/home'}], full=True)
+    assert len(index) == 1 and index.find('Segan') is None
+
+
+def test_ttl_and_disk_round_trip(tmp_path):
+    path = tmp_path / 'roster_index.json'
+    index = RosterIndex(ttl_hours=24)
+    assert index.is_stale()
+    index.merge(CRAWL, full=True)
+    index.save(path)
+
+    loaded = RosterIndex.load(path, ttl_hours=24)
+    assert len(loaded) == 2 and not loaded.is_stale()
+    assert loaded.find('Segan')['url'] == '/c/artist/0gYN2lkS1bs4s7rot34aJq/home'
+    assert loaded.is_stale(now=datetime.now(timezone.utc) + timedelta(hours=25))
+
+    path.write_text('{"version": 0}')
+    assert len(RosterIndex.load(path)) == 0
@@ -0,0 +1,107 @@
+import asyncio
+import time
+
+import pytest
+
+from runner.app.rate_limiter import NavigationRateLimiter
+from tests.roster_modules import load_roster_module
+
+pytest.importorskip('playwright.async_api')
+
+roster_page = load_roster_module('pages/roster_page.py')
+
+
+class LazySongsPage:
+    """A Songs page that renders `batch` more rows each time it is scrolled to the bottom."""
+
+    def __init__(self, rows, batch=100):
+        self.rows = rows
+        self.batch = batch
+        self.loaded = min(batch, len(rows))
+        self.extractions = 0
+        self.scrolls = 0
+
+    async def evaluate(self, expression, arg=None):
+        if expression == roster_page.SONG_ROWS_JS:
+            self.extractions += 1
+            return self.rows[:self.loaded]
+        if 'scrollTo' in expression:
+            self.scrolls += 1
+            self.loaded = min(len(self.rows), self.loaded + self.batch)
+            return None
+        return self.loaded  # row count / page height
+
+    async def wait_for_function(self, expression, arg=None, timeout=None, polling=None):
+        if self.loaded <= arg[1]:
+            raise TimeoutError('no new rows')
+
+
+def _row(i, text=None, row=''):
+    return {'href': f'/c/artist/A/song/track{i}', 'text': f'Song {i}' if text is None else text, 'row': row}
+
+
+def _get_songs(page):
+    rp = roster_page.RosterPage(page)
+
+    async def no_navigation(artist_info):
+        pass
+
+    rp.open_songs_page = no_navigation
+    return asyncio.run(rp.get_artist_songs({'name': 'A'}))
+
+
+def test_get_artist_songs_loads_every_lazy_row_in_one_extraction():
+    rows = [_row(i) for i in range(1, 451)]
+    rows += [_row(7), dict(_row(999), text='Song 8')]          # repeated link, repeated name
+    rows += [_row(1000, text='', row='12\n  Late Night Drive\n3:21')]  # name only in the row cells
+    page = LazySongsPage(rows, batch=100)
+
+    songs = _get_songs(page)
+
+    assert page.loaded == len(rows)
+    assert len(songs) == 451
+    assert songs[0] == {
+        'name': 'Song 1',
+        'sfa_url': 'https://artists.spotify.com/c/artist/A/song/track1/stats',
+        'track_id': 'track1',
+    }
+    assert songs[-1]['name'] == 'Late Night Drive'
+    # Scrolling stops once a scroll loads nothing new; rows are read in one page.evaluate
+    assert page.scrolls == 5 and page.extractions == 1
+
+
+def test_large_catalog_is_read_in_one_extraction():
+    page = LazySongsPage([_row(i) for i in range(5000)], batch=5000)
+
+    songs = _get_songs(page)
+
+    assert len(songs) == 5000
+    # One scroll finds nothing new; no per-row element handles or round trips
+    assert page.extractions == 1 and page.scrolls == 1
+
+
+class NavPage:
+    def __init__(self, log):
+        self.log = log
+
+    async def goto(self, url, **kwargs):
+        self.log.append(time.monotonic())
+
+    async def wait_for_selector(self, selector, **kwargs):
+        pass
+
+
+def test_worker_tabs_share_one_navigation_rate():
+    limiter = NavigationRateLimiter(min_interval=0.05)
+    log = []
+    tabs = [roster_page.RosterPage(NavPage(log), rate_limiter=limiter) for _ in range(3)]
+
+    async def run():
+        await asyncio.gather(*(tab.open_songs_page({'name': 'A', 'songs_url': f'/s/{i}'})
+                               for i, tab in enumerate(tabs * 2)))
+
+    asyncio.run(run())
+
+    assert len(log) == 6 and limiter.acquired == 6
+    gaps = [b - a for a, b in zip(sorted(log), sorted(log)[1:])]
+    assert min(gaps) >= 0.045
@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta, timezone
+
+from runner.app.scheduler import CampaignScheduler
+
+NOW = datetime(2026, 10, 17, 12, 0, tzinfo=timezone.utc)
+
+
+def parse_goal(goal):
+    return int(str(goal).replace('K', '000')) if goal else 0
+
+
+def campaign(id, hours_ago=None, goal=None, weekly=0, monthly=0, streams_12m=0, previous=None):
+    return {
+        'id': id,
+        'goal': goal,
+        'last_scraped_at': (NOW - timedelta(hours=hours_ago)).isoformat() if hours_ago is not None else None,
+        'streams_24h': weekly,
+        'streams_7d': monthly,
+        'streams_12m': streams_12m,
+        'previous': previous,
+    }
+
+
+def make_scheduler(**kwargs):
+    return CampaignScheduler(parse_goal, **kwargs)
+
+
+def test_classification():
+    scheduler = make_scheduler()
+    assert scheduler.classify(campaign(1))[0] == 'new'
+    assert scheduler.classify(campaign(2, 5, goal='10K', streams_12m=9000))[0] == 'near_goal'
+    assert scheduler.classify(campaign(3, 5, weekly=8000))[0] == 'hot'
+    moving = {'streams_24h': 1000, 'streams_7d': 4000}
+    assert scheduler.classify(campaign(4, 5, weekly=1500, monthly=4500, previous=moving))[0] == 'hot'
+    flat = {'streams_24h': 20, 'streams_7d': 80}
+    assert scheduler.classify(campaign(5, 5, weekly=20, monthly=80, previous=flat)) == ('stagnant', 68)
+    steady = {'streams_24h': 1000, 'streams_7d': 4000}
+    assert scheduler.classify(campaign(6, 5, weekly=1050, monthly=4100, previous=steady)) == ('normal', 20)
+
+
+def test_plan_skips_recent_and_stagnant_campaigns():
+    flat = {'streams_24h': 20, 'streams_7d': 80}
+    steady = {'streams_24h': 1000, 'streams_7d': 4000}
+    campaigns = [
+        campaign(1, 30, weekly=1000, monthly=4000, previous=steady),   # normal, overdue
+        campaign(2, 10, weekly=1000, monthly=4000, previous=steady),   # normal, not due
+        campaign(3, 30, weekly=20, monthly=80, previous=flat),         # stagnant, not due
+        campaign(4, 80, weekly=20, monthly=80, previous=flat),         # stagnant, due
+        campaign(5, 1, weekly=9000),                                   # hot, always due
+        campaign(6),                                                   # never scraped
+    ]
+    selected, summary = make_scheduler(budget_minutes=0).plan(campaigns, now=NOW)
+
+    assert [c['id'] for c in selected] == [6, 5, 1, 4]
+    assert summary['not_due'] == 2
+    assert summary['over_budget'] == 0
+
+
+def test_budget_keeps_most_urgent_first():
+    campaigns = [campaign(i, 30, weekly=1000, monthly=4000, previous={'streams_24h': 1000, 'streams_7d': 4000})
+                 for i in range(1, 11)]
+    campaigns.append(campaign(99, 1, goal='10K', streams_12m=9500))
+
+    scheduler = make_scheduler(budget_minutes=3, seconds_per_campaign=60, parallel_workers=1)
+    selected, summary = scheduler.plan(campaigns, now=NOW)
+
+    assert len(selected) == 3
+    assert selected[0]['id'] == 99
+    assert summary['over_budget'] == 8
@@ -0,0 +1,41 @@
+from runner.app.snapshots import SnapshotTable
+
+
+def test_previous_values_and_refresh_after_write():
+    table = SnapshotTable()
+    table.load([
+        {'id': 1, 'streams_24h': 10, 'streams_7d': None, 'streams_12m': '900', 'goal': 1000},
+    ])
+
+    assert 2 not in table
+    assert table.previous_values(2) is None
+    assert table.previous_values(1) == {'streams_24h': 10, 'streams_7d': 0, 'streams_12m': 900}
+    assert table.below_goal(1)
+
+    # A write that only touched some fields keeps the rest
+    table.update(1, {'streams_12m': 1200, 'scrape_data': {}})
+    assert table.previous_values(1) == {'streams_24h': 10, 'streams_7d': 0, 'streams_12m': 1200}
+    assert not table.below_goal(1)
+
+
+def test_unknown_streams_or_goal_never_skip_the_goal_check():
+    table = SnapshotTable(goal_parser=lambda g: int(str(g or 0).replace('K', '000')))
+    table.load([
+        {'id': 1, 'streams_12m': 0, 'goal': '5K'},
+        {'id': 2, 'streams_12m': 100, 'goal': None},
+    ])
+    assert table.goal(1) == 5000
+    assert not table.below_goal(1)
+    assert not table.below_goal(2)
+    assert not table.below_goal(3)
+
+
+def test_fingerprint_and_history_date_follow_writes():
+    table = SnapshotTable()
+    table.load([{'id': 1, 'scrape_fingerprint': 'v1:aa', 'scrape_history_date': '2026-10-16'}])
+    assert table.fingerprint(1) == 'v1:aa'
+    assert table.fingerprint(2) is None
+
+    table.update(1, {'last_scraped_at': '2026-10-17T08:00:00+00:00', 'scrape_history_date': '2026-10-17'})
+    assert table.fingerprint(1) == 'v1:aa'
+    assert table.history_date(1) == '2026-10-17'
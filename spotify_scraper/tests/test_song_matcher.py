@@ -0,0 +1,144 @@
+import csv
+import re
+import unicodedata
+from pathlib import Path
+
+import pytest
+
+from runner.app.song_matcher import SongIndex, base_key, core_key, name_score, names_match
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+ACTIVE_CSV = REPO_ROOT / 'Spotify Playlisting-Active Campaigns.csv'
+ALL_CSV = REPO_ROOT / 'Spotify Playlisting-All Campaigns.csv'
+
+
+def legacy_find_song_match(target, roster_songs):
+    """RosterPage.find_song_match before the index: first exact / alphanumeric / contains hit."""
+    target_clean = target.lower().strip()
+    target_alphanum = re.sub(r'[^a-z0-9]', '', target_clean)
+    for song in roster_songs:
+        song_clean = song['name'].lower().strip()
+        song_alphanum = re.sub(r'[^a-z0-9]', '', song_clean)
+        if target_clean == song_clean or target_alphanum == song_alphanum:
+            return song
+        if target_alphanum in song_alphanum or song_alphanum in target_alphanum:
+            return song
+    return None
+
+
+def _songs(names):
+    return [{'name': name, 'sfa_url': f'https://artists.spotify.com/song/{i}'} for i, name in enumerate(names)]
+
+
+def test_key_tiers_score_in_order():
+    index = SongIndex(_songs(['The Same', 'Beyoncé & Me', 'Chill Vibes 2025', 'DNBMF (feat. Kid Ray)']))
+
+    assert (index.best_match('The Same').rule, index.best_match('The Same').score) == ('exact', 1.0)
+    assert index.best_match('Beyonce and Me').rule == 'alias'
+    assert index.best_match('TheSame').rule == 'compact'
+    assert index.best_match('2025 Chill Vibes').rule == 'tokens'
+    assert index.best_match('DNBMF').rule == 'base'
+    assert index.best_match('DNBMF').name == 'DNBMF (feat. Kid Ray)'
+
+
+def test_best_match_beats_first_contains_hit():
+    roster = _songs(['BREATHE', 'Breathe (Ejeca Remix)', 'Lovesick', 'Love (Acoustic)'])
+    index = SongIndex(roster)
+
+    # The old contains rule returned 'BREATHE' (first hit) for the remix
+    assert legacy_find_song_match('BREATHE (EJECA REMIX)', roster)['name'] == 'BREATHE'
+    assert index.best_match('BREATHE (EJECA REMIX)').name == 'Breathe (Ejeca Remix)'
+    assert index.best_match('Breathe').name == 'BREATHE'
+    assert index.best_match('Love').name == 'Love (Acoustic)'
+
+
+def test_plain_title_owns_shared_core_key():
+    index = SongIndex(_songs(['Final Flash (CRP)', 'Final Flash', 'Final Flash - Radio Edit']))
+
+    assert index.best_match('final flash').name == 'Final Flash'
+    assert index.best_match('Final Flash (Live)').name == 'Final Flash'
+    assert index.best_match('Final Flash (CRP)').name == 'Final Flash (CRP)'
+    # Row order is arbitrary on S4A: the plain title wins even after two variants collided
+    for roster in (['DNBMF', 'DNBMF (Remix)', 'DNBMF (Live)'], ['DNBMF (Remix)', 'DNBMF (Live)', 'DNBMF']):
+        assert SongIndex(_songs(roster)).best_match('DNBMF (Sped Up)').name == 'DNBMF'
+    assert core_key('Onyx Doe (Arnaud Rebotini Remix) - Radio Edit') == 'onyxdoe'
+    assert base_key('Onyx Doe (Arnaud Rebotini Remix) (feat. DJ Bo)') == 'onyxdoearnaudrebotiniremix'
+
+
+def test_ambiguous_key_is_not_resolved_by_a_fuzzy_guess():
+    index = SongIndex(_songs(['Song A (Remix)', 'Song A (Live)', 'Other Song']))
+
+    assert index.best_match('Song A') is None
+    assert index.best_match('Song A (Live)').name == 'Song A (Live)'
+    assert index.best_match('Other Songs').name == 'Other Song'
+
+
+def test_fuzzy_match_scores_below_key_tiers_and_respects_threshold():
+    index = SongIndex(_songs(['Midnight Drive', 'Sunrise']))
+
+    typo = index.best_match('Midnite Drive')
+    assert typo.rule == 'fuzzy' and typo.name == 'Midnight Drive'
+    assert 0.8 <= typo.score < 0.9
+    assert index.best_match('Completely Different') is None
+    assert index.best_match('') is None
+
+
+def test_match_all_keeps_order_and_items():
+    roster = _songs(['War', 'Gods', 'Final Flash'])
+    matches = SongIndex(roster).match_all(['gods', 'nothing here', 'WAR'])
+
+    assert [m.item['sfa_url'] if m else None for m in matches] == [roster[1]['sfa_url'], None, roster[0]['sfa_url']]
+
+
+def test_names_match_for_artists():
+    assert names_match('Reece Rosé', 'Reece Rose')
+    assert names_match('Simon & Garfunkel', 'simon and garfunkel')
+    assert not names_match('Segan', 'Sega Genesis Orchestra')
+    assert name_score('Segan', 'SEGAN') == (1.0, 'exact')
+    assert name_score('DNBMF', 'D.N.B.M.F') == (0.96, 'compact')
+
+
+def _campaign_songs(path):
+    songs = {}
+    with open(path, encoding='utf-8-sig') as f:
+        for row in csv.DictReader(f):
+            campaign, client = row.get('Campaign', '').strip(), row.get('Client', '').strip()
+            if campaign and client:
+                song = campaign.split(' - ', 1)[1].strip() if ' - ' in campaign else campaign
+                songs.setdefault(client, []).append(song)
+    return {client: sorted(set(names)) for client, names in songs.items()}
+
+
+def _variant(name, i):
+    """How the same song tends to be written in the campaign sheet vs the S4A roster."""
+    stripped = ''.join(ch for ch in unicodedata.normalize('NFKD', name) if not unicodedata.combining(ch))
+    return [
+        name,
+        name.upper(),
+        f'{name} (feat. Kid Ray)',
+        stripped.replace("'", ''),
+        f'{name}!',
+        f'{name} - Radio Edit',
+    ][i % 6]
+
+
+@pytest.mark.skipif(not (ACTIVE_CSV.exists() and ALL_CSV.exists()), reason='campaign CSVs not present')
+def test_more_accurate_than_legacy_matcher_on_campaign_csv():
+    """Roster = every song a client ever ran; targets = active campaign songs, re-spelled."""
+    active, every = _campaign_songs(ACTIVE_CSV), _campaign_songs(ALL_CSV)
+    results = {'legacy': [0, 0], 'index': [0, 0]}  # [correct, wrong or missing]
+    i = 0
+    for client, songs in active.items():
+        roster = _songs(sorted(set(every.get(client, [])) | set(songs)))
+        index = SongIndex(roster)
+        for song in songs:
+            target = _variant(song, i)
+            i += 1
+            legacy = legacy_find_song_match(target, roster)
+            new = index.best_match(target)
+            results['legacy'][0 if legacy and legacy['name'] == song else 1] += 1
+            results['index'][0 if new and new.name == song else 1] += 1
+
+    assert i > 100
+    assert results['index'][0] >= results['legacy'][0]
+    assert results['index'][1] <= 1
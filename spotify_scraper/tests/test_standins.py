@@ -0,0 +1,135 @@
+import aiohttp
+import pytest
+import pytest_asyncio
+import requests
+
+from runner.app.postgrest import PostgrestClient
+from runner.app.vendor_index import VendorIndex
+from tests.standins.background import ServerThread
+from tests.standins.fake_postgrest import FakePostgrest
+from tests.standins.fake_s4a import FakeS4A
+
+
+def _campaigns():
+    return [
+        {'id': 1, 'campaign': 'A', 'sfa': 'https://artists.spotify.com/c/song/a', 'status': 'active',
+         'scrape_data': {'previous': {'streams_7d': 10}}, 'last_scraped_at': '2026-10-01T00:00:00'},
+        {'id': 2, 'campaign': 'B', 'sfa': 'https://artists.spotify.com/c/song/b', 'status': 'active',
+         'scrape_data': None, 'last_scraped_at': None},
+        {'id': 3, 'campaign': 'C', 'sfa': 'https://open.spotify.com/track/c', 'status': 'active',
+         'scrape_data': None, 'last_scraped_at': None},
+        {'id': 4, 'campaign': 'D', 'sfa': 'https://artists.spotify.com/c/song/d', 'status': 'paused',
+         'scrape_data': None, 'last_scraped_at': None},
+    ]
+
+
+@pytest_asyncio.fixture
+async def postgrest():
+    server = FakePostgrest({'spotify_campaigns': _campaigns()})
+    await server.start()
+    client = PostgrestClient(server.url, 'key', max_retries=1)
+    yield server, client
+    await client.close()
+    await server.stop()
+
+
+@pytest.mark.asyncio
+async def test_fake_postgrest_campaign_fetch(postgrest):
+    server, client = postgrest
+    resp = await client.get('spotify_campaigns', params={
+        'select': 'id,campaign,previous:scrape_data->previous',
+        'sfa': 'like.https://artists.spotify.com%',
+        'status': 'eq.active',
+        'order': 'last_scraped_at.asc.nullsfirst,id.asc',
+        'limit': '10',
+    })
+    assert resp.status_code == 200
+    assert resp.json() == [
+        {'id': 2, 'campaign': 'B', 'previous': None},
+        {'id': 1, 'campaign': 'A', 'previous': {'streams_7d': 10}},
+    ]
+    assert server.call_counts() == {'GET spotify_campaigns': 1}
+
+
+@pytest.mark.asyncio
+async def test_fake_postgrest_upsert_patch_delete(postgrest):
+    server, client = postgrest
+    upsert = {'Prefer': 'resolution=merge-duplicates,return=representation'}
+    params = {'on_conflict': 'campaign_id,playlist_name_normalized'}
+    first = await client.post('campaign_playlists', json=[
+        {'campaign_id': 1, 'playlist_name_normalized': 'x', 'streams_28d': 5},
+        {'campaign_id': 1, 'playlist_name_normalized': 'y', 'streams_28d': 7},
+    ], params=params, headers=upsert)
+    second = await client.post('campaign_playlists', json=[
+        {'campaign_id': 1, 'playlist_name_normalized': 'x', 'streams_28d': 9},
+    ], params=params, headers=upsert)
+    assert first.status_code == 201 and second.status_code == 201
+    assert second.json()[0]['id'] == first.json()[0]['id']
+    assert len(server.tables['campaign_playlists']) == 2
+
+    await client.patch('spotify_campaigns', params={'id': 'in.(1,2)'}, json={'status': 'complete'})
+    assert [c['status'] for c in server.tables['spotify_campaigns']] == ['complete', 'complete', 'active', 'paused']
+
+    resp = await client.delete('campaign_playlists', params={
+        'campaign_id': 'eq.1', 'or': '(streams_28d.is.null,streams_28d.lt.8)',
+    })
+    assert resp.status_code == 204
+    assert [r['playlist_name_normalized'] for r in server.tables['campaign_playlists']] == ['x']
+
+    assert server.call_counts() == {
+        'DELETE campaign_playlists': 1, 'PATCH spotify_campaigns': 1, 'POST campaign_playlists': 2,
+    }
+    assert server.total_calls(include_reads=False) == 4
+
+
+@pytest.mark.asyncio
+async def test_fake_postgrest_serves_vendor_index_refresh():
+    rows = [{'id': i, 'playlist_name': f'List {i}', 'vendor_id': 1, 'updated_at': '2026-10-01T00:00:00+00:00'}
+            for i in range(1, 6)]
+    server = FakePostgrest({'vendor_playlists': rows})
+    await server.start()
+    client = PostgrestClient(server.url, 'key', max_retries=1)
+    try:
+        index = VendorIndex()
+        assert await index.refresh_async(client) == 'full'
+        assert await index.refresh_async(client) == 'incremental'
+        assert len(index.rows) == 5
+        assert server.call_counts() == {'GET vendor_playlists': 3}
+    finally:
+        await client.close()
+        await server.stop()
+
+
+@pytest.mark.asyncio
+async def test_fake_s4a_pages_and_injection():
+    s4a = FakeS4A(rows=12)
+    await s4a.start()
+    try:
+        async with aiohttp.ClientSession() as session:
+            song = f'{s4a.url}/artists.spotify.com/c/artist/x/song/abc123'
+            async with session.get(f'{song}/playlists') as resp:
+                page = await resp.text()
+            assert resp.status == 200
+            assert page.count('"curator_') + page.count('"Spotify"') == 12
+            assert 'aria-haspopup="listbox"' in page
+            assert s4a.song('abc123') == s4a.song('abc123')
+
+            s4a.fail_rate = 1.0
+            async with session.get(f'{song}/stats') as resp:
+                assert resp.status == 500
+                assert 'Something went wrong' in await resp.text()
+
+            s4a.fail_rate, s4a.login_rate = 0.0, 1.0
+            async with session.get(f'{song}/location') as resp:
+                assert 'accounts.spotify.com/login' in await resp.text()
+        assert s4a.hits == {'playlists': 1, 'stats': 1, 'error': 1, 'location': 1, 'login_bounce': 1}
+    finally:
+        await s4a.stop()
+
+
+def test_server_thread_answers_blocking_clients():
+    # The scraper's health check uses requests from inside its own event loop
+    with ServerThread(FakePostgrest()) as (server,):
+        resp = requests.get(f'{server.url}/rest/v1/', timeout=5)
+        assert resp.status_code == 200
+        assert resp.headers['Content-Type'].startswith('application/json')
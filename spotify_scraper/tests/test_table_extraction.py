@@ -0,0 +1,61 @@
+import pytest
+import pytest_asyncio
+
+from runner.app.pages.spotify_artists import (
+    SpotifyArtistsPage,
+    parse_country_cells,
+    parse_playlist_cells,
+)
+
+PLAYLIST_TABLE = """
+<h1>Test Song</h1>
+<table data-testid="sort-table"><tbody>
+  <tr data-testid="sort-table-body-row"><td>1</td><td>Radio</td><td>Spotify</td><td>78,360</td><td>—</td></tr>
+  <tr data-testid="sort-table-body-row"><td>2</td><td>Chill Vibes</td><td>dj_anna</td><td>1,204</td><td>Jan 7, 2026</td></tr>
+  <tr data-testid="sort-table-body-row"><td>3</td><td>Broken</td></tr>
+</tbody></table>
+"""
+
+
+def test_parse_playlist_cells():
+    assert parse_playlist_cells(['1', 'Radio', 'Spotify', '78,360', '—']) == {
+        'rank': '1', 'name': 'Radio', 'made_by': 'Spotify', 'streams': '78360', 'date_added': '',
+    }
+    assert parse_playlist_cells(['2', 'Mix', 'x', ''])['streams'] == '0'
+    assert parse_playlist_cells(['1', 'Too short']) is None
+
+
+def test_parse_country_cells():
+    assert parse_country_cells(['1', 'United States', '12,345'], 1) == {
+        'rank': 1, 'country': 'United States', 'streams': 12345,
+    }
+    assert parse_country_cells(['Germany', '99'], 4) == {'rank': 4, 'country': 'Germany', 'streams': 99}
+    assert parse_country_cells(['1', '1,234', '5'], 1) is None
+    assert parse_country_cells(['1', '—', '5'], 1) is None
+
+
+@pytest_asyncio.fixture
+async def browser_page():
+    async_api = pytest.importorskip('playwright.async_api')
+    async with async_api.async_playwright() as p:
+        try:
+            browser = await p.chromium.launch()
+        except Exception as e:
+            pytest.skip(f'Chromium not available: {e}')
+        page = await browser.new_page()
+        yield page
+        await browser.close()
+
+
+@pytest.mark.asyncio
+async def test_bulk_and_per_element_reads_match(browser_page):
+    await browser_page.set_content(PLAYLIST_TABLE)
+    spotify_page = SpotifyArtistsPage(browser_page)
+
+    bulk = await spotify_page._read_table_rows(min_cells=4)
+    per_element = await spotify_page._read_table_rows_per_element(min_cells=4)
+    assert bulk == per_element
+
+    stats = await spotify_page.get_song_stats()
+    assert [p['name'] for p in stats['playlists']] == ['Radio', 'Chill Vibes']
+    assert stats['streams'] == 79564
@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from runner.app.vendor_index import PAGE_SIZE, VendorIndex, alias_key, normalize_name, token_key
+
+
+class FakeResponse:
+    def __init__(self, data, headers=None, status_code=200):
+        self.data = data
+        self.headers = headers or {}
+        self.status_code = status_code
+
+    def json(self):
+        return self.data
+
+
+class FakeVendorTable:
+    """vendor_playlists behind PostgREST: Range pagination, updated_at filter, exact count, max-rows."""
+
+    def __init__(self, rows, max_rows=None):
+        self.rows = rows
+        self.max_rows = max_rows
+        self.requests = []
+
+    async def get(self, table, params=None, headers=None):
+        self.requests.append((dict(params), dict(headers or {})))
+        rows = sorted(self.rows, key=lambda r: r['id'])
+        if 'updated_at' in params:
+            since = params['updated_at'][len('gte.'):]
+            rows = [r for r in rows if r['updated_at'] >= since]
+        start, end = (int(x) for x in headers['Range'].split('-'))
+        if self.max_rows:
+            end = min(end, start + self.max_rows - 1)
+        page = rows[start:end + 1]
+        total = len(rows) if headers.get('Prefer') == 'count=exact' else '*'
+        return FakeResponse(page, {'Content-Range': f'{start}-{start + len(page) - 1}/{total}'}, 206)
+
+
+def _row(i, name, vendor, updated='2026-10-01T00:00:00+00:00'):
+    return {'id': f'{i:05d}', 'playlist_name': name, 'vendor_id': vendor, 'updated_at': updated}
+
+
+def test_shared_normalizer_and_near_exact_keys():
+    assert normalize_name('  Café   Hits ') == normalize_name('café hits')
+    assert normalize_name('') == 'unknown'
+    assert alias_key('Rap & Trap 🔥') == alias_key('rap and trap')
+    assert token_key('Chill Vibes 2025') == token_key('2025 - chill vibes')
+
+
+def test_match_tiers_and_ambiguous_aliases():
+    index = VendorIndex()
+    index.merge([
+        _row(1, 'Rap & Trap', 'v1'),
+        _row(2, 'Chill Vibes 2025', 'v2'),
+        _row(3, 'Top Hits!', 'v3'),
+        _row(4, 'Top Hits?', 'v4'),
+        _row(5, 'No Vendor', None),
+    ])
+    assert index.match('rap & trap') == 'v1'          # exact
+    assert index.match('Rap and Trap') == 'v1'        # alias
+    assert index.match('2025 Chill Vibes') == 'v2'    # token
+    assert index.match('top hits!') == 'v3'           # exact still works
+    assert index.match('Top Hits') is None            # alias claimed by two vendors
+    assert index.match('No Vendor') is None
+    assert index.hits == {'exact': 2, 'alias': 1, 'token': 1, 'miss': 2}
+
+
+@pytest.mark.asyncio
+async def test_paginates_past_the_row_cap_and_refreshes_incrementally(tmp_path):
+    base = datetime(2026, 9, 1, tzinfo=timezone.utc)
+    rows = [_row(i, f'Playlist {i}', f'v{i % 7}', (base + timedelta(seconds=i)).isoformat()) for i in range(PAGE_SIZE + 5)]
+    table = FakeVendorTable(rows)
+    cache = tmp_path / 'vendor_index.json'
+
+    index = VendorIndex.load(cache)
+    assert await index.refresh_async(table) == 'full'
+    assert len(index) == PAGE_SIZE + 5
+    assert index.match(f'playlist {PAGE_SIZE + 4}') == f'v{(PAGE_SIZE + 4) % 7}'
+    index.save(cache)
+
+    # New and renamed rows arrive via updated_at; nothing else is re-read
+    table.rows.append(_row(99999, 'Brand New', 'v9', '2026-10-02T00:00:00+00:00'))
+    table.rows[0] = _row(0, 'Renamed', 'v0', '2026-10-02T00:00:00+00:00')
+    table.requests.clear()
+    reloaded = VendorIndex.load(cache)
+    assert await reloaded.refresh_async(table) == 'incremental'
+    assert len(table.requests) == 2
+    assert reloaded.match('brand new') == 'v9'
+    assert reloaded.match('renamed') == 'v0'
+    assert reloaded.match('playlist 0') is None
+
+    # A delete only shows up in the count - falls back to a full reload
+    del table.rows[1]
+    assert await reloaded.refresh_async(table) == 'full'
+    assert reloaded.match('playlist 1') is None
+
+
+@pytest.mark.asyncio
+async def test_max_rows_below_page_size_still_reads_every_page():
+    table = FakeVendorTable([_row(i, f'Playlist {i}', 'v1') for i in range(750)], max_rows=300)
+
+    index = VendorIndex()
+    assert await index.refresh_async(table) == 'full'
+    assert len(index) == 750
+    assert len(table.requests) == 3
+
+
+def test_stale_cache_triggers_full_refresh():
+    index = VendorIndex(full_refresh_hours=24)
+    index.merge([_row(1, 'A', 'v1')])
+    index.full_refreshed_at = datetime.now(timezone.utc) - timedelta(hours=1)
+    assert not index.needs_full_refresh()
+    assert index.needs_full_refresh(now=datetime.now(timezone.utc) + timedelta(hours=24))
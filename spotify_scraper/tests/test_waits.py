@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from runner.app import waits
+
+
+class FakePage:
+    """Row count grows for a few polls, then holds steady."""
+
+    def __init__(self, counts):
+        self.counts = list(counts)
+
+    async def evaluate(self, expression, arg=None):
+        return self.counts.pop(0) if len(self.counts) > 1 else self.counts[0]
+
+    async def wait_for_function(self, expression, arg=None, timeout=None, polling=None):
+        await asyncio.sleep(timeout / 1000)
+        raise TimeoutError('condition not met')
+
+
+@pytest.fixture(autouse=True)
+def fresh_stats():
+    waits.WAIT_STATS.reset()
+    yield
+    waits.WAIT_STATS.reset()
+
+
+@pytest.mark.asyncio
+async def test_rows_stable_returns_once_count_settles():
+    page = FakePage([0, 3, 10, 25, 25])
+    count = await waits.wait_for_rows_stable(page, 'rows', timeout=2, settle=0.05, poll=0.01)
+    assert count == 25
+    stats = waits.WAIT_STATS.snapshot()['rows']
+    assert stats['count'] == 1
+    assert stats['timeouts'] == 0
+
+
+@pytest.mark.asyncio
+async def test_rows_stable_times_out_without_rows():
+    page = FakePage([0])
+    count = await waits.wait_for_rows_stable(page, 'rows', timeout=0.05, settle=0.01, poll=0.01)
+    assert count == 0
+    assert waits.WAIT_STATS.snapshot()['rows']['timeouts'] == 1
+
+
+@pytest.mark.asyncio
+async def test_condition_wait_records_timeout():
+    ok = await waits.wait_for_text_change(FakePage([0]), 'h1', 'old', 'hero', timeout=0.01)
+    assert ok is False
+    lines = waits.WAIT_STATS.summary_lines()
+    assert lines[0].startswith('hero: 1x') and '1 timed out' in lines[0]
+
+
+@pytest.mark.asyncio
+async def test_pace_is_noop_without_pacer():
+    await waits.pace(None)
+    assert waits.WAIT_STATS.snapshot() == {}
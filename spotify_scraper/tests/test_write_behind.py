@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from runner.app.write_behind import WriteBehindQueue
+
+
+@pytest.mark.asyncio
+async def test_drain_flushes_every_queued_item():
+    persisted = []
+
+    async def handler(item):
+        await asyncio.sleep(0.01)
+        persisted.append(item)
+        return item % 2 == 0
+
+    queue = WriteBehindQueue(handler, workers=2, maxsize=2)
+    await queue.start()
+    for i in range(6):
+        await queue.put(i)
+    await queue.drain()
+
+    assert sorted(persisted) == list(range(6))
+    assert queue.succeeded == 3
+    assert queue.failed == 3
+
+
+@pytest.mark.asyncio
+async def test_put_applies_backpressure_when_workers_are_behind():
+    release = asyncio.Event()
+
+    async def handler(item):
+        await release.wait()
+        return True
+
+    queue = WriteBehindQueue(handler, workers=1, maxsize=1)
+    await queue.start()
+    await queue.put('a')  # taken by the worker
+    await asyncio.sleep(0)
+    await queue.put('b')  # fills the queue
+
+    blocked = asyncio.create_task(queue.put('c'))
+    await asyncio.sleep(0.05)
+    assert not blocked.done()
+
+    release.set()
+    await blocked
+    await queue.drain()
+    assert queue.succeeded == 3
+
+
+@pytest.mark.asyncio
+async def test_handler_exceptions_count_as_failures():
+    async def handler(item):
+        raise RuntimeError('db down')
+
+    queue = WriteBehindQueue(handler, workers=1, maxsize=1)
+    await queue.start()
+    await queue.put('x')
+    await queue.drain()
+    assert queue.failed == 1
+    assert queue.succeeded == 0
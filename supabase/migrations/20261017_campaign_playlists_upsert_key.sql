@@ -0,0 +1,68 @@
+-- Migration: Upsert key for campaign_playlists
+-- Purpose: Let the scraper upsert playlist rows keyed on (campaign_id, normalized
+-- playlist name) instead of deleting and re-inserting every row per campaign.
+-- Readers no longer see an empty playlist list mid-sync, and rows keep their ids.
+
+-- 1. Normalized name column (matches the scraper's normalize_playlist_name:
+--    lowercase, NFKD, whitespace collapsed and trimmed)
+ALTER TABLE campaign_playlists
+  ADD COLUMN IF NOT EXISTS playlist_name_normalized TEXT;
+
+CREATE OR REPLACE FUNCTION normalize_campaign_playlist_name(p_name TEXT)
+RETURNS TEXT AS $$
+  SELECT COALESCE(
+    NULLIF(BTRIM(REGEXP_REPLACE(NORMALIZE(LOWER(p_name), NFKD), '\s+', ' ', 'g')), ''),
+    'unknown'
+  );
+$$ LANGUAGE sql IMMUTABLE;
+
+-- 2. Backfill existing rows
+UPDATE campaign_playlists
+SET playlist_name_normalized = normalize_campaign_playlist_name(playlist_name)
+WHERE playlist_name_normalized IS NULL;
+
+-- 3. Keep it filled for rows inserted by the UI (the scraper sends its own value)
+CREATE OR REPLACE FUNCTION set_campaign_playlist_normalized()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF NEW.playlist_name_normalized IS NULL
+     OR (TG_OP = 'UPDATE'
+         AND NEW.playlist_name IS DISTINCT FROM OLD.playlist_name
+         AND NEW.playlist_name_normalized IS NOT DISTINCT FROM OLD.playlist_name_normalized) THEN
+    NEW.playlist_name_normalized := normalize_campaign_playlist_name(NEW.playlist_name);
+  END IF;
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_campaign_playlist_normalize ON campaign_playlists;
+CREATE TRIGGER trigger_campaign_playlist_normalize
+  BEFORE INSERT OR UPDATE ON campaign_playlists
+  FOR EACH ROW
+  EXECUTE FUNCTION set_campaign_playlist_normalized();
+
+-- 4. Remove duplicates so the unique index can be built.
+--    Keep the vendor-linked row if there is one, then the most recently scraped.
+DELETE FROM campaign_playlists cp
+USING (
+  SELECT id,
+         ROW_NUMBER() OVER (
+           PARTITION BY campaign_id, playlist_name_normalized
+           ORDER BY (vendor_id IS NOT NULL) DESC,
+                    last_scraped DESC NULLS LAST,
+                    created_at DESC NULLS LAST
+         ) AS rn
+  FROM campaign_playlists
+) ranked
+WHERE cp.id = ranked.id
+  AND ranked.rn > 1;
+
+-- 5. Upsert target (PostgREST on_conflict=campaign_id,playlist_name_normalized)
+CREATE UNIQUE INDEX IF NOT EXISTS uq_campaign_playlists_campaign_name_normalized
+  ON campaign_playlists (campaign_id, playlist_name_normalized);
+
+-- Stale-row cleanup after each sync filters on campaign_id + last_scraped
+CREATE INDEX IF NOT EXISTS idx_campaign_playlists_campaign_last_scraped
+  ON campaign_playlists (campaign_id, last_scraped);
+
+COMMENT ON COLUMN campaign_playlists.playlist_name_normalized IS 'Lowercase, NFKD, whitespace-collapsed playlist name; scraper upsert key with campaign_id';
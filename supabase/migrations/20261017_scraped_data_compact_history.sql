@@ -0,0 +1,32 @@
+-- Migration: Compact scraped_data history
+-- Purpose: The scraper now writes raw_data in a dictionary-encoded delta format
+-- (encoding = 'dict-delta/1', see spotify_scraper/runner/app/history_codec.py)
+-- instead of the full song_data JSON on every run. Rows are tied to their
+-- campaign and carry the headline stream totals as plain columns, so
+-- time-series queries no longer have to read or parse raw_data.
+-- Existing rows are converted with spotify_scraper/compact_scraped_history.py.
+
+ALTER TABLE scraped_data
+  ADD COLUMN IF NOT EXISTS campaign_id INTEGER REFERENCES spotify_campaigns(id) ON DELETE CASCADE,
+  ADD COLUMN IF NOT EXISTS encoding TEXT,
+  ADD COLUMN IF NOT EXISTS streams_24h BIGINT,
+  ADD COLUMN IF NOT EXISTS streams_7d BIGINT,
+  ADD COLUMN IF NOT EXISTS streams_12m BIGINT;
+
+-- Stream totals for legacy full-JSON rows (the compaction tool also fills them)
+UPDATE scraped_data
+SET streams_24h = NULLIF(REGEXP_REPLACE(raw_data->'time_ranges'->'7day'->'stats'->>'streams', '[^0-9]', '', 'g'), '')::BIGINT,
+    streams_7d  = NULLIF(REGEXP_REPLACE(raw_data->'time_ranges'->'28day'->'stats'->>'streams', '[^0-9]', '', 'g'), '')::BIGINT,
+    streams_12m = NULLIF(REGEXP_REPLACE(raw_data->'time_ranges'->'12months'->'stats'->>'streams', '[^0-9]', '', 'g'), '')::BIGINT
+WHERE encoding IS NULL
+  AND streams_24h IS NULL
+  AND raw_data ? 'time_ranges';
+
+-- Campaign history reads: latest rows first, back to the last keyframe
+CREATE INDEX IF NOT EXISTS idx_scraped_data_campaign_scraped_at
+  ON scraped_data (campaign_id, scraped_at DESC);
+
+COMMENT ON COLUMN scraped_data.encoding IS 'NULL = full song_data JSON; dict-delta/1 = dictionary-encoded keyframe/delta payload (history_codec.py)';
+COMMENT ON COLUMN scraped_data.streams_24h IS 'S4A 7-day streams at scrape time (spotify_campaigns naming)';
+COMMENT ON COLUMN scraped_data.streams_7d IS 'S4A 28-day streams at scrape time (spotify_campaigns naming)';
+COMMENT ON COLUMN scraped_data.streams_12m IS 'S4A 12-month streams at scrape time';
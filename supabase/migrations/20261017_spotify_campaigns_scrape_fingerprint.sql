@@ -0,0 +1,12 @@
+-- Migration: Scrape fingerprint for write avoidance
+-- Purpose: The scraper hashes the normalized song_data of every scrape. When the
+-- hash matches the stored one, it only updates last_scraped_at (plus one history
+-- row per day) instead of rewriting the campaign, campaign_playlists and
+-- campaign_regions.
+
+ALTER TABLE spotify_campaigns
+  ADD COLUMN IF NOT EXISTS scrape_fingerprint TEXT,
+  ADD COLUMN IF NOT EXISTS scrape_history_date DATE;
+
+COMMENT ON COLUMN spotify_campaigns.scrape_fingerprint IS 'Versioned sha256 of the normalized scrape (streams per time range, playlists, regions); unchanged scrapes skip the heavy writes';
+COMMENT ON COLUMN spotify_campaigns.scrape_history_date IS 'UTC date of the latest scraped_data history row written for this campaign';
@@ -0,0 +1,7 @@
+-- Migration: Index vendor_playlists.updated_at
+-- Purpose: The scraper's vendor matching index (spotify_scraper/runner/app/vendor_index.py)
+-- keeps an on-disk cache and refreshes it with updated_at=gte.<latest seen>,
+-- so each run reads only the rows changed since the previous one.
+
+CREATE INDEX IF NOT EXISTS idx_vendor_playlists_updated_at
+  ON vendor_playlists (updated_at);